@@ -14,14 +14,19 @@ from abc import ABC, abstractmethod
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 from datetime import datetime
-import grpc
-import jwt
+from functools import lru_cache
+import time
 
 # Assume these are imported from a GRID SDK
 from .http_adapter_template import (
-    Principal, Resource, Action, Context, GridRequest, GridResponse, ProtocolAdapter
+    Principal, Resource, Action, Context, GridRequest, GridResponse, ProtocolAdapter, lazy_import
 )
 
+# Imported on first use: a process that only loads this module to build
+# resources or translate responses never pays for grpc
+grpc = lazy_import('grpc')
+jwt = lazy_import('jwt')
+
 
 # =============================================================================
 # gRPC-Specific Types
@@ -33,7 +38,7 @@ class gRPCRequest:
     service_name: str
     method_name: str
     request_message: Any
-    context: grpc.ServicerContext
+    context: 'grpc.ServicerContext'
 
 
 @dataclass
@@ -57,10 +62,23 @@ class gRPCAdapter(ProtocolAdapter):
     - gRPC request message -> Action parameters
     """
 
-    def __init__(self, jwt_secret: str, resource_registry: Dict[str, Resource]):
+    def __init__(self, jwt_secret: str, resource_registry: Dict[str, Resource],
+                 preload: bool = False):
+        """
+        Args:
+            jwt_secret: Secret for validating JWT tokens
+            resource_registry: Map of resource ids to GRID resources
+            preload: Import grpc, jwt and protobuf now instead of on the
+                first request (for long-running servers, where first-request
+                latency matters more than start-up time)
+        """
         self.jwt_secret = jwt_secret
         self.resource_registry = resource_registry
         self._principal_cache = {}
+        if preload:
+            for module in (grpc, jwt):
+                getattr(module, '__file__')  # Any attribute access runs the import
+            import google.protobuf.json_format  # noqa: F401
 
     def translate_request(self, grpc_request: gRPCRequest) -> GridRequest:
         """Translate gRPC request to GRID format."""
@@ -97,7 +115,7 @@ class gRPCAdapter(ProtocolAdapter):
         )
 
     def translate_response(self, grid_response: GridResponse, 
-                          error: Optional[str] = None) -> grpc.ServicerContext:
+                          error: Optional[str] = None) -> 'grpc.ServicerContext':
         """Translate GRID response to gRPC context for termination."""
         if error:
             return self._abort_grpc_context(
@@ -116,7 +134,7 @@ class gRPCAdapter(ProtocolAdapter):
         # We can't construct a full response here as the handler hasn't run yet.
         return None # Indicates success, proceed with handler
 
-    def get_principal(self, context: grpc.ServicerContext) -> Principal:
+    def get_principal(self, context: 'grpc.ServicerContext') -> Principal:
         """Extract principal from gRPC metadata."""
         metadata = dict(context.invocation_metadata())
         auth_header = metadata.get('authorization', '')
@@ -158,7 +176,7 @@ class gRPCAdapter(ProtocolAdapter):
         from google.protobuf.json_format import MessageToDict
         return MessageToDict(message, preserving_proto_field_name=True)
 
-    def _abort_grpc_context(self, code: grpc.StatusCode, details: str) -> grpc.ServicerContext:
+    def _abort_grpc_context(self, code: 'grpc.StatusCode', details: str) -> 'grpc.ServicerContext':
         """Helper to abort a gRPC context."""
         class AbortContext:
             def abort(self, code, details):
@@ -174,53 +192,107 @@ class gRPCAdapter(ProtocolAdapter):
 # Usage Example (in a gRPC Interceptor)
 # =============================================================================
 
-class GridInterceptor(grpc.ServerInterceptor):
-    def __init__(self, adapter: gRPCAdapter):
-        self._adapter = adapter
-
-    def intercept_service(self, continuation, handler_call_details):
-        service_name = handler_call_details.method.split('/')[1]
-        method_name = handler_call_details.method.split('/')[2]
-
-        def grid_wrapper(request, context):
-            grpc_request = gRPCRequest(
-                service_name=service_name,
-                method_name=method_name,
-                request_message=request,
-                context=context
-            )
-
-            try:
-                # 1. Translate and evaluate
-                grid_request = self._adapter.translate_request(grpc_request)
-                
-                # This would be a call to the GRID policy engine
-                # grid_response = policy_engine.evaluate(grid_request)
-                # For this example, we'll simulate a response.
-                grid_response = GridResponse(allowed=True, reason="Policy allows access")
-
-                # 2. Translate response (check for denial)
+@lru_cache(maxsize=None)
+def _interceptor_class() -> type:
+    # Subclassing grpc.ServerInterceptor imports grpc, so the class is
+    # only defined when first used (see __getattr__)
+    class GridInterceptor(grpc.ServerInterceptor):
+        """
+        Args:
+            adapter: gRPC adapter
+            engine: Policy engine; wrap it in a ResilientPolicyEngine so a
+                slow or failing engine gives degraded decisions instead of
+                blocking or erroring every call, or in an
+                AdmittedPolicyEngine to pass on the call's deadline and shed
+                load with RESOURCE_EXHAUSTED
+        """
+
+        def __init__(self, adapter: gRPCAdapter, engine: Optional[Any] = None):
+            self._adapter = adapter
+            self._engine = engine
+
+        def intercept_service(self, continuation, handler_call_details):
+            service_name = handler_call_details.method.split('/')[1]
+            method_name = handler_call_details.method.split('/')[2]
+
+            def grid_wrapper(request, context):
+                grpc_request = gRPCRequest(
+                    service_name=service_name,
+                    method_name=method_name,
+                    request_message=request,
+                    context=context
+                )
+
+                # context.abort() raises, so it is never called inside the try
+                # blocks (which would turn every abort into INTERNAL)
+                try:
+                    # 1. Translate
+                    grid_request = self._adapter.translate_request(grpc_request)
+                except ValueError as e:
+                    error = (grpc.StatusCode.UNAUTHENTICATED, str(e))
+                except Exception as e:
+                    error = (grpc.StatusCode.INTERNAL, f"GRID Interceptor Error: {e}")
+                else:
+                    error = None
+                if error:
+                    context.abort(*error)
+
+                # 2. Evaluate
+                if self._engine is None:
+                    # For this example, we'll simulate a response.
+                    grid_response = GridResponse(allowed=True, reason="Policy allows access")
+                else:
+                    evaluate_args = (grid_request.principal, grid_request.resource,
+                                     grid_request.action, grid_request.context)
+                    if getattr(self._engine, 'admission', None) is None:
+                        decision = self._engine.evaluate(*evaluate_args)
+                    else:
+                        # Only engines with admission control load it (and its engine stack)
+                        from .admission_control import AdmissionRejected, GRPC_STATUS
+                        remaining = context.time_remaining()
+                        deadline = None if remaining is None else time.monotonic() + remaining
+                        try:
+                            decision = self._engine.evaluate(*evaluate_args, deadline=deadline)
+                        except AdmissionRejected as e:
+                            error = (getattr(grpc.StatusCode, GRPC_STATUS[e.kind]), e.reason)
+                        else:
+                            error = None
+                        if error:
+                            context.abort(*error)
+                    if decision.degraded and decision.degraded['mode'] == 'fail_closed':
+                        # Denied only because no decision could be made: retryable
+                        context.abort(grpc.StatusCode.UNAVAILABLE, decision.reason)
+                    grid_response = GridResponse(allowed=decision.allowed, reason=decision.reason,
+                                                 policy_id=decision.policy_id,
+                                                 constraints=decision.constraints)
+
+                # 3. Translate response (check for denial)
                 abort_context = self._adapter.translate_response(grid_response)
                 if abort_context:
                     return # The context would have been aborted
 
-                # 3. If allowed, continue to the actual gRPC method handler
+                # 4. If allowed, continue to the actual gRPC method handler
                 return continuation(request, context)
 
-            except Exception as e:
-                context.abort(grpc.StatusCode.INTERNAL, f"GRID Interceptor Error: {e}")
+            # This is a simplification of how interceptors work.
+            # The actual implementation is more complex.
+            # This demonstrates the logic flow.
 
-        # This is a simplification of how interceptors work.
-        # The actual implementation is more complex.
-        # This demonstrates the logic flow.
-        
-        # We would replace the handler with our wrapper
-        # return grpc.unary_unary_rpc_method_handler(
-        #     grid_wrapper,
-        #     request_deserializer=...,
-        #     response_serializer=...
-        # )
-        return continuation(handler_call_details)
+            # We would replace the handler with our wrapper
+            # return grpc.unary_unary_rpc_method_handler(
+            #     grid_wrapper,
+            #     request_deserializer=...,
+            #     response_serializer=...
+            # )
+            return continuation(handler_call_details)
+
+    return GridInterceptor
+
+
+def __getattr__(name: str) -> Any:
+    if name == 'GridInterceptor':
+        return _interceptor_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == '__main__':
@@ -241,8 +313,8 @@ if __name__ == '__main__':
     }
     adapter = gRPCAdapter(jwt_secret='your-secret-key', resource_registry=resource_registry)
 
-    # 2. Create interceptor
-    interceptor = GridInterceptor(adapter)
+    # 2. Create interceptor (GridInterceptor; defining it imports grpc)
+    interceptor = _interceptor_class()(adapter)
 
     # 3. Add interceptor to gRPC server
     # server = grpc.server(
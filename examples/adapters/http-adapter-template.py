@@ -11,11 +11,54 @@ Use this template for:
 """
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import Any, Dict, Optional
-from datetime import datetime
-import jwt
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from datetime import datetime, timezone
+import importlib.util
 import json
+import re
+import sys
+import time
+import types
+
+
+# =============================================================================
+# Lazy Imports
+# =============================================================================
+
+class _MissingModule(types.ModuleType):
+    """Stands in for an optional module that is not installed"""
+
+    def __getattr__(self, name: str) -> Any:
+        raise ImportError(f"{self.__name__} is required for this feature but is not installed")
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """
+    Import a module on first attribute access
+
+    Adapters often run in short-lived serverless functions and sidecars,
+    where importing heavy optional dependencies (jwt, grpc, yaml) that a
+    given deployment never uses dominates cold start. A module that is
+    not installed raises ImportError when first used, not at import.
+
+    Args:
+        name: Top-level module name
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        return _MissingModule(name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+jwt = lazy_import('jwt')
 
 
 # =============================================================================
@@ -41,6 +84,7 @@ class Resource:
     sensitivity: str  # low, medium, high, critical
     owner: Optional[str] = None
     managers: Optional[list] = None
+    capabilities: Optional[list] = None  # §6.2 declarations: name, sensitivity_level, ...
 
 
 @dataclass
@@ -59,6 +103,7 @@ class Context:
     environment: Optional[str] = None
     request_id: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
+    trace_id: Optional[str] = None  # Federation trace id, the same on every node a request reaches
 
 
 @dataclass
@@ -103,6 +148,57 @@ class HTTPResponse:
     body: Optional[Any] = None
 
 
+# =============================================================================
+# Request Translation
+# =============================================================================
+
+# HTTP method → GRID operation; other methods map to 'execute'
+HTTP_METHOD_ACTIONS = {
+    'GET': 'read',
+    'HEAD': 'read',
+    'POST': 'write',
+    'PUT': 'write',
+    'PATCH': 'write',
+    'DELETE': 'write',
+    'OPTIONS': 'read'
+}
+
+# Bounds on per-path and per-Host caches, both keyed by client-controlled
+# values: once full, a cache starts over
+MAX_TRANSLATORS = 10_000
+MAX_HOSTS = 1_000
+
+# Carries the federation trace id (Context.trace_id) between nodes
+TRACE_HEADER = 'X-Grid-Trace-Id'
+
+
+class CoarseClock:
+    """
+    Request timestamps at a coarse resolution
+
+    Formatting the current time costs more than the rest of a request's
+    translation; this formats it at most once per `resolution` seconds.
+    Timestamps are ISO-8601 UTC truncated to the resolution, e.g.
+    '2025-11-27T14:00:00Z' at the default of one second.
+    """
+
+    def __init__(self, resolution: float = 1.0, clock: Callable[[], float] = time.time):
+        self.resolution = resolution
+        self._clock = clock
+        self._current = (0.0, '')  # (valid until, timestamp), swapped as one
+
+    def __call__(self) -> str:
+        now = self._clock()
+        until, timestamp = self._current
+        if now >= until:
+            start = now - now % self.resolution
+            moment = datetime.fromtimestamp(start, timezone.utc)
+            timespec = 'seconds' if self.resolution >= 1 else 'milliseconds'
+            timestamp = moment.isoformat(timespec=timespec).replace('+00:00', 'Z')
+            self._current = (start + self.resolution, timestamp)
+        return timestamp
+
+
 # =============================================================================
 # Protocol Adapter Interface
 # =============================================================================
@@ -136,6 +232,21 @@ class ProtocolAdapter(ABC):
 # HTTP Adapter Implementation
 # =============================================================================
 
+def _segment_pattern(pattern: str) -> Optional['re.Pattern']:
+    """Regex for a route pattern with a '*' inside ('*' is one path segment)"""
+    if '*' not in pattern[:-1]:
+        return None
+    return re.compile('[^/]+'.join(re.escape(part) for part in pattern.rstrip('*').split('*'))
+                      + ('.*' if pattern.endswith('*') else ''))
+
+
+def _specificity(pattern: str) -> Tuple[int, int]:
+    """How specific a route pattern is: its literal prefix, then all its literal characters"""
+    literal = pattern.rstrip('*')
+    prefix = literal.find('*')
+    return (len(literal) if prefix < 0 else prefix, len(literal.replace('*', '')))
+
+
 class HTTPAdapter(ProtocolAdapter):
     """
     GRID adapter for HTTP/REST APIs
@@ -145,19 +256,33 @@ class HTTPAdapter(ProtocolAdapter):
     - Authorization header → Principal
     - URL path → Resource
     - Request context → GRID context
+
+    Each route gets a translator (`compile_route`) holding its resolved
+    resource, compiled when the route is added with `register_route` or
+    first requested; a request path is matched to its route once, and
+    later requests for it do no registry scan and no per-request setup.
+    Route changes after construction go through `register_route`, which
+    keeps the translators consistent with the registry.
     """
     
-    def __init__(self, jwt_secret: str, resource_registry: Dict[str, Resource]):
+    def __init__(self, jwt_secret: str, resource_registry: Dict[str, Resource],
+                 clock: Optional[Callable[[], str]] = None):
         """
         Initialize HTTP adapter
         
         Args:
             jwt_secret: Secret for validating JWT tokens
             resource_registry: Map of URL paths to GRID resources
+            clock: Returns request timestamps (default: CoarseClock())
         """
         self.jwt_secret = jwt_secret
         self.resource_registry = resource_registry
+        self.clock = clock or CoarseClock()
         self._principal_cache = {}
+        self._translators: Dict[str, Callable[[HTTPRequest], GridRequest]] = {}  # By request path
+        self._route_translators: Dict[str, Callable[[HTTPRequest], GridRequest]] = {}  # By route
+        self._patterns: Optional[List[Tuple[Optional['re.Pattern'], str, str]]] = None
+        self._environments: Dict[str, str] = {}
     
     def translate_request(self, http_request: HTTPRequest) -> GridRequest:
         """
@@ -173,39 +298,86 @@ class HTTPAdapter(ProtocolAdapter):
             HTTP: GET /api/users?id=123
             GRID: Principal=alice, Resource=/api/users, Action=read
         """
-        # Extract principal from Authorization header
-        principal = self.get_principal(http_request)
-        
-        # Map URL path to resource
-        resource = self._get_resource_from_path(http_request.path)
-        
-        # Map HTTP method to GRID action
-        action = self._map_http_method_to_action(
-            http_request.method,
-            http_request.body
-        )
-        
-        # Build context
-        context = Context(
-            timestamp=datetime.utcnow().isoformat() + 'Z',
-            ip_address=http_request.remote_addr,
-            user_agent=http_request.headers.get('User-Agent'),
-            environment=self._detect_environment(http_request),
-            request_id=http_request.headers.get('X-Request-ID'),
-            metadata={
-                'protocol': 'http',
-                'method': http_request.method,
-                'path': http_request.path,
-                'query_params': http_request.query_params
-            }
-        )
-        
-        return GridRequest(
-            principal=principal,
-            resource=resource,
-            action=action,
-            context=context
-        )
+        translator = self._translators.get(http_request.path)
+        if translator is None:
+            translator = self._translator_for(http_request.path)
+        return translator(http_request)
+
+    def compile_route(self, resource: Resource) -> Callable[[HTTPRequest], GridRequest]:
+        """
+        Build the translator for requests to one route
+
+        What depends only on the route is resolved once, here: the
+        resource and the adapter state the translator reads. Per request
+        it looks up the cached principal and Host environment and builds
+        the GRID request, with the same result as get_principal,
+        _map_http_method_to_action and _detect_environment. A capability
+        declared for the request's HTTP method (`method`) sets the
+        resource's sensitivity for that request.
+
+        Args:
+            resource: GRID resource the route maps to
+
+        Returns:
+            Function translating an HTTPRequest for the route
+        """
+        principals = self._principal_cache
+        get_principal = self.get_principal
+        environments = self._environments
+        environment_for_host = self._environment_for_host
+        operations = HTTP_METHOD_ACTIONS
+        clock = self.clock
+        by_method = {c['method']: replace(resource, sensitivity=c['sensitivity_level'])
+                     for c in resource.capabilities or () if c.get('method')}
+
+        def translate(http_request: HTTPRequest) -> GridRequest:
+            headers = http_request.headers
+            principal = principals.get(headers.get('Authorization', ''))
+            if principal is None:
+                principal = get_principal(http_request)
+            host = headers.get('Host', '')
+            method = http_request.method
+            operation = operations.get(method) or operations.get(method.upper(), 'execute')
+            body = http_request.body
+            return GridRequest(
+                principal,
+                by_method.get(method, resource) if by_method else resource,
+                Action(operation, body if isinstance(body, dict) else {}),
+                Context(
+                    clock(),
+                    http_request.remote_addr,
+                    headers.get('User-Agent'),
+                    environments.get(host) or environment_for_host(host),
+                    headers.get('X-Request-ID'),
+                    {'protocol': 'http', 'method': method, 'path': http_request.path,
+                     'query_params': http_request.query_params},
+                    headers.get(TRACE_HEADER),
+                ),
+            )
+
+        return translate
+
+    def register_route(self, path: str, resource: Resource) -> None:
+        """
+        Add or replace a route and compile its translator
+
+        Args:
+            path: URL path or wildcard pattern (e.g. '/api/admin/*')
+            resource: GRID resource the route maps to
+        """
+        self.resource_registry[path] = resource
+        self._patterns = None
+        self._translators.clear()  # Other paths may now match this pattern
+        translator = self._route_translators[path] = self.compile_route(resource)
+        self._translators[path] = translator
+
+    def unregister_route(self, path: str) -> None:
+        """Remove a route and the translators that used it"""
+        if self.resource_registry.pop(path, None) is None:
+            return
+        self._patterns = None
+        self._translators.clear()
+        self._route_translators.pop(path, None)
     
     def translate_response(self, grid_response: GridResponse,
                           error: Optional[str] = None) -> HTTPResponse:
@@ -327,6 +499,21 @@ class HTTPAdapter(ProtocolAdapter):
     # Private Helper Methods
     # =========================================================================
     
+    def _translator_for(self, path: str) -> Callable[[HTTPRequest], GridRequest]:
+        """Find (compiling if need be) and cache the translator for a new path"""
+        route = self._route_for_path(path)
+        if route is None:
+            translator = self.compile_route(self._get_resource_from_path(path))
+        else:
+            translator = self._route_translators.get(route)
+            if translator is None:
+                translator = self.compile_route(self.resource_registry[route])
+                self._route_translators[route] = translator
+        if len(self._translators) >= MAX_TRANSLATORS:
+            self._translators.clear()
+        self._translators[path] = translator
+        return translator
+
     def _extract_principal_from_jwt(self, token: str) -> Principal:
         """Extract principal from JWT token"""
         try:
@@ -368,14 +555,9 @@ class HTTPAdapter(ProtocolAdapter):
     
     def _get_resource_from_path(self, path: str) -> Resource:
         """Map URL path to GRID resource"""
-        # Try exact match first
-        if path in self.resource_registry:
-            return self.resource_registry[path]
-        
-        # Try pattern matching (simplified)
-        for pattern, resource in self.resource_registry.items():
-            if self._path_matches_pattern(path, pattern):
-                return resource
+        route = self._route_for_path(path)
+        if route is not None:
+            return self.resource_registry[route]
         
         # Default resource if not found
         return Resource(
@@ -385,26 +567,31 @@ class HTTPAdapter(ProtocolAdapter):
             sensitivity='medium'
         )
     
-    def _path_matches_pattern(self, path: str, pattern: str) -> bool:
-        """Check if path matches pattern (simplified)"""
-        # Simple wildcard matching
-        # In production, use proper regex or path matching library
-        return pattern.replace('*', '') in path
+    def _route_for_path(self, path: str) -> Optional[str]:
+        """Registry key (route) a URL path maps to, if any"""
+        # Try exact match first
+        if path in self.resource_registry:
+            return path
+        
+        # Try pattern matching (simplified): a pattern with a '*' inside
+        # matches whole paths, '*' standing for one segment; other patterns
+        # match paths containing them (less a trailing '*'). Of the patterns
+        # that match, the most specific wins: the longest literal prefix
+        # before the first inner '*', then the most literal characters, then
+        # registry order. E.g. '/api/admin/*' beats '/api/*/public'.
+        if self._patterns is None:
+            patterns = [(_segment_pattern(pattern), pattern.replace('*', ''), pattern)
+                        for pattern in self.resource_registry]
+            self._patterns = sorted(patterns, key=lambda p: _specificity(p[2]), reverse=True)
+        for regex, needle, pattern in self._patterns:
+            if regex.fullmatch(path) if regex is not None else needle in path:
+                return pattern
+        return None
     
     def _map_http_method_to_action(self, method: str, 
                                    body: Optional[Any]) -> Action:
         """Map HTTP method to GRID action"""
-        method_map = {
-            'GET': 'read',
-            'HEAD': 'read',
-            'POST': 'write',
-            'PUT': 'write',
-            'PATCH': 'write',
-            'DELETE': 'write',
-            'OPTIONS': 'read'
-        }
-        
-        operation = method_map.get(method.upper(), 'execute')
+        operation = HTTP_METHOD_ACTIONS.get(method.upper(), 'execute')
         
         return Action(
             operation=operation,
@@ -413,14 +600,22 @@ class HTTPAdapter(ProtocolAdapter):
     
     def _detect_environment(self, http_request: HTTPRequest) -> str:
         """Detect environment from request (simplified)"""
-        host = http_request.headers.get('Host', '')
-        
-        if 'localhost' in host or '127.0.0.1' in host:
-            return 'dev'
-        elif 'staging' in host:
-            return 'staging'
-        else:
-            return 'production'
+        return self._environment_for_host(http_request.headers.get('Host', ''))
+
+    def _environment_for_host(self, host: str) -> str:
+        """Environment for a Host header, worked out once per distinct header"""
+        environment = self._environments.get(host)
+        if environment is None:
+            if 'localhost' in host or '127.0.0.1' in host:
+                environment = 'dev'
+            elif 'staging' in host:
+                environment = 'staging'
+            else:
+                environment = 'production'
+            if len(self._environments) >= MAX_HOSTS:
+                self._environments.clear()
+            self._environments[host] = environment
+        return environment
 
 
 # =============================================================================
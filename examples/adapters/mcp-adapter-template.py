@@ -0,0 +1,758 @@
+"""
+GRID Protocol Adapter: MCP (Model Context Protocol) Template
+
+This template is the reference MCP adapter from spec §9.2. It sits between
+an MCP client (usually an AI agent) and an MCP server and governs every
+tool call:
+
+- `tools/call` → GRID action `execute` on resource `mcp-{server}:{tool}`
+- `tools/list` results are pre-authorized, so agents only see tools they
+  are allowed to call
+- JSON-RPC batch arrays are authorized with one deduplicated decision pass
+- The principal is resolved once per MCP session, not per message; a
+  session ends when its JWT expires or after `session_ttl`, whichever is
+  first
+
+Both MCP transports are included: stdio (newline-delimited JSON-RPC) and
+streamable HTTP (a single POST endpoint with `Mcp-Session-Id` sessions).
+
+Use this template for:
+- AI agent tool access governance
+- Fronting third-party MCP servers with GRID policy
+- High-volume agent traffic (batching, session pinning)
+"""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+import hashlib
+import hmac
+import json
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+# Assume these are imported from a GRID SDK
+from .http_adapter_template import (
+    Principal, Resource, Action, Context, GridRequest, GridResponse, ProtocolAdapter, lazy_import
+)
+from .canonical_policy_engine import PolicyEngine
+
+jwt = lazy_import('jwt')
+
+
+# =============================================================================
+# MCP-Specific Types
+# =============================================================================
+
+JSONRPC_VERSION = '2.0'
+
+# JSON-RPC error codes
+PARSE_ERROR = -32700
+INVALID_REQUEST = -32600
+INTERNAL_ERROR = -32603
+ACCESS_DENIED = -32000  # Implementation-defined server error (spec §9.2)
+
+SESSION_TTL = 3600.0           # Longest session lifetime in seconds, whatever the JWT allows
+SESSION_SWEEP_INTERVAL = 60.0  # Seconds between purges of expired sessions
+
+Message = Union[Dict[str, Any], List[Dict[str, Any]]]
+
+
+@dataclass
+class MCPTool:
+    """A tool exposed by an MCP server"""
+    name: str
+    description: str = ''
+    sensitivity_level: str = 'medium'
+    parameters: Optional[Dict[str, Any]] = None  # JSON Schema of arguments
+
+
+@dataclass
+class MCPServer:
+    """An MCP server governed by the adapter"""
+    name: str
+    tools: List[MCPTool] = field(default_factory=list)
+    sensitivity_level: str = 'medium'
+    transport: str = 'stdio'  # stdio, streamable-http
+    mcp_version: str = '2025-03-26'
+    owner: Optional[str] = None
+
+
+@dataclass
+class MCPSession:
+    """An MCP session with its pinned principal"""
+    session_id: str
+    principal: Principal
+    credential_digest: bytes  # SHA-256 of the credentials presented at start
+    created_at: str
+    expires_at: float = float('inf')  # Epoch seconds: JWT `exp` or created + session TTL
+
+
+@dataclass
+class MCPRequest:
+    """A single JSON-RPC request or notification"""
+    method: str
+    params: Dict[str, Any]
+    session: MCPSession
+    server: str
+    id: Optional[Union[str, int]] = None  # None for notifications
+
+    @property
+    def tool(self) -> Optional[str]:
+        return self.params.get('name')
+
+    @property
+    def arguments(self) -> Dict[str, Any]:
+        return self.params.get('arguments') or {}
+
+    def to_message(self) -> Dict[str, Any]:
+        message = {'jsonrpc': JSONRPC_VERSION, 'method': self.method}
+        if self.params:
+            message['params'] = self.params
+        if self.id is not None:
+            message['id'] = self.id
+        return message
+
+
+@dataclass
+class MCPResponse:
+    """A JSON-RPC response"""
+    id: Optional[Union[str, int]]
+    result: Optional[Any] = None
+    error: Optional[Dict[str, Any]] = None
+
+    def to_message(self) -> Dict[str, Any]:
+        message = {'jsonrpc': JSONRPC_VERSION, 'id': self.id}
+        if self.error is not None:
+            message['error'] = self.error
+        else:
+            message['result'] = self.result
+        return message
+
+
+def _error(request_id: Any, code: int, message: str) -> Dict[str, Any]:
+    return MCPResponse(id=request_id, error={'code': code, 'message': message}).to_message()
+
+
+# =============================================================================
+# MCP Adapter Implementation
+# =============================================================================
+
+class MCPAdapter(ProtocolAdapter):
+    """
+    GRID adapter for the Model Context Protocol
+
+    Maps MCP concepts to GRID abstractions:
+    - MCP session credentials → Principal (resolved once per session)
+    - MCP server tool → Resource `mcp-{server}:{tool}`
+    - `tools/call` → Action `execute` with the tool arguments as parameters
+    """
+
+    def __init__(self, server: MCPServer, policy_engine: PolicyEngine,
+                 upstream: Callable[[Message], Optional[Message]],
+                 jwt_secret: str, session_ttl: float = SESSION_TTL,
+                 clock: Callable[[], float] = time.time):
+        """
+        Initialize MCP adapter
+
+        Args:
+            server: The governed MCP server and its tools
+            policy_engine: GRID policy engine (spec §10.1)
+            upstream: Sends a JSON-RPC message or batch to the MCP server and
+                returns its reply (see StdioUpstream, HTTPUpstream)
+            jwt_secret: Secret for validating session JWTs
+            session_ttl: Longest session lifetime in seconds; a session also
+                ends when its JWT expires
+            clock: Epoch clock in seconds (injectable for tests)
+        """
+        self.server = server
+        self.policy_engine = policy_engine
+        self.upstream = upstream
+        self.jwt_secret = jwt_secret
+        self.session_ttl = session_ttl
+        self.clock = clock
+        self.resource_registry: Dict[str, Resource] = {}
+        self.sessions: Dict[str, MCPSession] = {}
+        self._sessions_lock = threading.Lock()
+        self._next_sweep = clock() + SESSION_SWEEP_INTERVAL
+        self.register_resource(server)
+
+    # =========================================================================
+    # Sessions
+    # =========================================================================
+
+    def open_session(self, credentials: str) -> MCPSession:
+        """
+        Start an MCP session and pin its principal
+
+        Args:
+            credentials: Authorization header value (e.g. "Bearer eyJ...")
+
+        Returns:
+            MCPSession
+
+        Raises:
+            ValueError: If the credentials are not a valid, unexpired JWT
+        """
+        claims = self._validate_token(credentials)
+        now = self.clock()
+        expires_at = now + self.session_ttl
+        if claims.get('exp') is not None:
+            expires_at = min(expires_at, float(claims['exp']))
+        session = MCPSession(
+            session_id=uuid.uuid4().hex,
+            principal=self._extract_principal(claims),
+            credential_digest=hashlib.sha256(credentials.encode()).digest(),
+            created_at=datetime.utcnow().isoformat() + 'Z',
+            expires_at=expires_at
+        )
+        with self._sessions_lock:
+            if now >= self._next_sweep:
+                self._evict_expired(now)
+            self.sessions[session.session_id] = session
+        return session
+
+    def resume_session(self, session_id: str, credentials: str) -> MCPSession:
+        """
+        Look up an existing session for a follow-up message
+
+        The credentials are compared against the digest taken when the
+        session was opened instead of being validated again; the expiry
+        taken then still applies.
+
+        Raises:
+            KeyError: If the session is unknown or has expired (it is removed)
+            ValueError: If the credentials do not match the session
+        """
+        session = self.sessions.get(session_id)
+        if session is None:
+            raise KeyError(f"Unknown MCP session: {session_id}")
+        digest = hashlib.sha256(credentials.encode()).digest()
+        if not hmac.compare_digest(digest, session.credential_digest):
+            raise ValueError("Credentials do not match the MCP session")
+        if session.expires_at <= self.clock():
+            self.close_session(session_id)
+            raise KeyError(f"MCP session expired: {session_id}")
+        return session
+
+    def close_session(self, session_id: str) -> None:
+        with self._sessions_lock:
+            self.sessions.pop(session_id, None)
+
+    # =========================================================================
+    # ProtocolAdapter Interface
+    # =========================================================================
+
+    def translate_request(self, mcp_request: MCPRequest) -> GridRequest:
+        """
+        Translate an MCP tool call to GRID format
+
+        Example:
+            MCP:  {"method": "tools/call", "params": {"name": "jira_search", ...}}
+            GRID: Resource=mcp-jira-server:jira_search, Action=execute
+        """
+        resource = self._tool_resource(mcp_request.tool)
+        return GridRequest(
+            principal=self.get_principal(mcp_request.session),
+            resource=resource,
+            action=Action(operation='execute', parameters=mcp_request.arguments),
+            context=Context(
+                timestamp=datetime.utcnow().isoformat() + 'Z',
+                request_id=str(mcp_request.id) if mcp_request.id is not None else None,
+                metadata={
+                    'protocol': 'mcp',
+                    'server': mcp_request.server,
+                    'method': mcp_request.method,
+                    'session_id': mcp_request.session.session_id
+                }
+            )
+        )
+
+    def translate_response(self, grid_response: GridResponse,
+                           error: Optional[str] = None,
+                           request_id: Optional[Union[str, int]] = None) -> MCPResponse:
+        """Translate a GRID decision to an MCP response"""
+        if error:
+            return MCPResponse(
+                id=request_id,
+                error={'code': INTERNAL_ERROR, 'message': f"Internal error: {error}"}
+            )
+
+        if not grid_response.allowed:
+            return MCPResponse(
+                id=request_id,
+                error={
+                    'code': ACCESS_DENIED,
+                    'message': f"Access denied: {grid_response.reason}",
+                    'data': {'policy_id': grid_response.policy_id}
+                }
+            )
+
+        return MCPResponse(
+            id=request_id,
+            result={'content': [{'type': 'text', 'text': grid_response.data}]}
+        )
+
+    def get_principal(self, session: MCPSession) -> Principal:
+        """Return the principal pinned to the MCP session"""
+        return session.principal
+
+    def register_resource(self, mcp_server: MCPServer) -> Resource:
+        """Register an MCP server and each of its tools in GRID"""
+        for tool in mcp_server.tools:
+            resource_id = f"mcp-{mcp_server.name}:{tool.name}"
+            self.resource_registry[resource_id] = Resource(
+                id=resource_id,
+                type='tool',
+                name=f"{mcp_server.name}.{tool.name}",
+                sensitivity=tool.sensitivity_level,
+                owner=mcp_server.owner
+            )
+
+        return Resource(
+            id=f"mcp-{mcp_server.name}",
+            type='service',
+            name=mcp_server.name,
+            sensitivity=mcp_server.sensitivity_level,
+            owner=mcp_server.owner
+        )
+
+    def health_check(self) -> bool:
+        """Ping the upstream MCP server"""
+        try:
+            reply = self.upstream({'jsonrpc': JSONRPC_VERSION, 'id': 'grid-health',
+                                   'method': 'ping'})
+            return isinstance(reply, dict) and 'result' in reply
+        except (OSError, ValueError):
+            return False
+
+    # =========================================================================
+    # Message Handling
+    # =========================================================================
+
+    def handle(self, message: Message, session: MCPSession) -> Optional[Message]:
+        """
+        Govern one JSON-RPC message or batch from the client
+
+        All `tools/call` requests in a batch are authorized together; each
+        distinct tool is evaluated once. Allowed requests are forwarded to
+        the MCP server as one batch, denied ones are answered locally.
+
+        Returns:
+            The reply to send to the client, or None if there is nothing to
+            send (notifications only)
+        """
+        is_batch = isinstance(message, list)
+        if is_batch and not message:
+            return _error(None, INVALID_REQUEST, "Empty batch")
+        items = message if is_batch else [message]
+
+        replies: Dict[int, Dict[str, Any]] = {}
+        requests: List[Tuple[int, MCPRequest]] = []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or not isinstance(item.get('method'), str) \
+                    or not isinstance(item.get('params', {}), dict):
+                replies[index] = _error(
+                    item.get('id') if isinstance(item, dict) else None,
+                    INVALID_REQUEST, "Invalid JSON-RPC request")
+                continue
+            requests.append((index, MCPRequest(
+                method=item['method'],
+                params=item.get('params', {}),
+                session=session,
+                server=self.server.name,
+                id=item.get('id')
+            )))
+
+        calls = [(i, r) for i, r in requests if r.method == 'tools/call']
+        decisions = self.authorize([self.translate_request(r) for _, r in calls])
+
+        forward: List[Tuple[int, MCPRequest]] = []
+        denied = {i for (i, _), d in zip(calls, decisions) if not d.allowed}
+        for (index, request), decision in zip(calls, decisions):
+            if not decision.allowed and request.id is not None:
+                replies[index] = self.translate_response(
+                    decision, request_id=request.id).to_message()
+        for index, request in requests:
+            if index not in denied:
+                forward.append((index, request))
+
+        if forward:
+            self._forward(forward, is_batch, session, replies)
+
+        ordered = [replies[i] for i in sorted(replies)]
+        if is_batch:
+            return ordered or None
+        return ordered[0] if ordered else None
+
+    def authorize(self, grid_requests: List[GridRequest]) -> List[GridResponse]:
+        """
+        Authorize a list of requests with one deduplicated decision pass
+
+        Requests for the same (principal, resource, operation) share one
+        policy evaluation. MCP tool calls are authorized per tool; argument
+        validation is left to the tool's input schema.
+        """
+        decisions: Dict[Tuple[str, str, str], GridResponse] = {}
+        responses = []
+        for grid_request in grid_requests:
+            key = (grid_request.principal.id, grid_request.resource.id,
+                   grid_request.action.operation)
+            if key not in decisions:
+                decision = self.policy_engine.evaluate(
+                    grid_request.principal, grid_request.resource,
+                    grid_request.action, grid_request.context)
+                decisions[key] = GridResponse(
+                    allowed=decision.allowed,
+                    reason=decision.reason,
+                    policy_id=decision.policy_id,
+                    constraints=decision.constraints
+                )
+            responses.append(decisions[key])
+        return responses
+
+    # =========================================================================
+    # Private Helper Methods
+    # =========================================================================
+
+    def _evict_expired(self, now: float) -> None:
+        """Drop expired sessions (called with the sessions lock held)"""
+        for session_id in [s.session_id for s in self.sessions.values() if s.expires_at <= now]:
+            del self.sessions[session_id]
+        self._next_sweep = now + SESSION_SWEEP_INTERVAL
+
+    def _forward(self, forward: List[Tuple[int, MCPRequest]], is_batch: bool,
+                 session: MCPSession, replies: Dict[int, Dict[str, Any]]) -> None:
+        """
+        Send allowed messages upstream and collect replies by request id
+
+        If the MCP server cannot be reached or its reply cannot be read,
+        each forwarded request is answered with -32603.
+        """
+        messages = [request.to_message() for _, request in forward]
+        try:
+            upstream_reply = self.upstream(messages if is_batch else messages[0])
+        except (OSError, ValueError) as e:
+            for index, request in forward:
+                if request.id is not None:
+                    replies[index] = _error(request.id, INTERNAL_ERROR, f"MCP server error: {e}")
+            return
+
+        if upstream_reply is None:
+            return
+        upstream_replies = upstream_reply if isinstance(upstream_reply, list) else [upstream_reply]
+        by_id = {reply.get('id'): reply for reply in upstream_replies if isinstance(reply, dict)}
+
+        for index, request in forward:
+            if request.id is None or request.id not in by_id:
+                continue
+            reply = by_id[request.id]
+            if request.method == 'tools/list' and isinstance(reply.get('result'), dict):
+                reply = self._filter_tool_list(reply, session)
+            replies[index] = reply
+
+    def _filter_tool_list(self, reply: Dict[str, Any], session: MCPSession) -> Dict[str, Any]:
+        """Remove tools the session principal may not call from a tools/list result"""
+        tools = [tool for tool in reply['result'].get('tools') or [] if isinstance(tool, dict)]
+        context = Context(
+            timestamp=datetime.utcnow().isoformat() + 'Z',
+            metadata={'protocol': 'mcp', 'server': self.server.name,
+                      'method': 'tools/list', 'session_id': session.session_id}
+        )
+        decisions = self.authorize([
+            GridRequest(
+                principal=session.principal,
+                resource=self._tool_resource(tool.get('name')),
+                action=Action(operation='execute', parameters={}),
+                context=context
+            )
+            for tool in tools
+        ])
+        visible = [tool for tool, d in zip(tools, decisions) if d.allowed]
+        return {**reply, 'result': {**reply['result'], 'tools': visible}}
+
+    def _tool_resource(self, tool: Optional[str]) -> Resource:
+        """Map a tool name to its registered GRID resource"""
+        resource_id = f"mcp-{self.server.name}:{tool}"
+        return self.resource_registry.get(resource_id, Resource(
+            id=resource_id,
+            type='tool',
+            name=f"{self.server.name}.{tool}",
+            sensitivity='medium'
+        ))
+
+    def _validate_token(self, credentials: str) -> Dict[str, Any]:
+        """Validate a Bearer JWT (signature and `exp`) and return its claims"""
+        if not credentials.startswith('Bearer '):
+            raise ValueError("Missing or invalid Bearer token for MCP session")
+        try:
+            return jwt.decode(credentials[7:], self.jwt_secret, algorithms=['HS256'])
+        except jwt.InvalidTokenError as e:
+            raise ValueError(f"Invalid JWT token: {e}")
+
+    def _extract_principal(self, payload: Dict[str, Any]) -> Principal:
+        """Extract principal from validated JWT claims"""
+        return Principal(
+            id=payload['sub'],
+            type=payload.get('type', 'agent'),
+            role=payload.get('role'),
+            teams=payload.get('teams', []),
+            attributes=payload.get('attributes', {})
+        )
+
+
+# =============================================================================
+# Upstream Connections (adapter → MCP server)
+# =============================================================================
+
+def _expects_reply(message: Message) -> bool:
+    items = message if isinstance(message, list) else [message]
+    return any('id' in item for item in items)
+
+
+class StdioUpstream:
+    """
+    Runs an MCP server as a subprocess and exchanges newline-delimited
+    JSON-RPC messages over its stdin/stdout
+
+    Simplification: assumes the server answers each message (or batch) with
+    exactly one line and does not send server-initiated messages.
+    """
+
+    def __init__(self, command: List[str]):
+        self.process = subprocess.Popen(
+            command, stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True, bufsize=1
+        )
+        self._lock = threading.Lock()
+
+    def __call__(self, message: Message) -> Optional[Message]:
+        with self._lock:
+            self.process.stdin.write(json.dumps(message) + '\n')
+            self.process.stdin.flush()
+            if not _expects_reply(message):
+                return None
+            line = self.process.stdout.readline()
+        if not line:
+            raise OSError("MCP server closed its stdout")
+        return json.loads(line)
+
+    def close(self) -> None:
+        self.process.stdin.close()
+        self.process.wait(timeout=5)
+
+
+class HTTPUpstream:
+    """
+    Forwards messages to a streamable-HTTP MCP endpoint
+
+    All client sessions share one upstream session. Only `application/json`
+    replies are handled; servers that answer with an SSE stream need a
+    streaming client.
+    """
+
+    def __init__(self, url: str, timeout: float = 30.0):
+        import urllib.request  # Only deployments with an HTTP upstream pay for it
+        self._urllib = urllib.request
+        self.url = url
+        self.timeout = timeout
+        self.session_id: Optional[str] = None
+
+    def __call__(self, message: Message) -> Optional[Message]:
+        headers = {
+            'Content-Type': 'application/json',
+            'Accept': 'application/json, text/event-stream'
+        }
+        if self.session_id:
+            headers['Mcp-Session-Id'] = self.session_id
+        request = self._urllib.Request(
+            self.url, data=json.dumps(message).encode(), headers=headers, method='POST'
+        )
+        with self._urllib.urlopen(request, timeout=self.timeout) as response:
+            self.session_id = response.headers.get('Mcp-Session-Id', self.session_id)
+            if response.status == 202:
+                return None
+            return json.loads(response.read())
+
+
+# =============================================================================
+# Client-Facing Transports (MCP client → adapter)
+# =============================================================================
+
+def serve_stdio(adapter: MCPAdapter, credentials: str,
+                stdin=sys.stdin, stdout=sys.stdout) -> None:
+    """
+    Serve the adapter over stdio
+
+    A stdio connection is a single MCP session; its credentials are fixed
+    when the process is launched (e.g. from an environment variable). Once
+    the session expires every message is refused. A message that cannot be
+    handled is answered with an error; the session goes on.
+    """
+    session = adapter.open_session(credentials)
+    for line in stdin:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            message = json.loads(line)
+        except json.JSONDecodeError:
+            reply = _error(None, PARSE_ERROR, "Parse error")
+        else:
+            try:
+                adapter.resume_session(session.session_id, credentials)
+            except KeyError:
+                reply = _error(_message_id(message), INVALID_REQUEST, "MCP session expired")
+            else:
+                reply = _handle(adapter, message, session)
+        if reply is not None:
+            stdout.write(json.dumps(reply) + '\n')
+            stdout.flush()
+
+
+class StreamableHTTPTransport:
+    """
+    Serves the adapter on a single streamable-HTTP MCP endpoint
+
+    - POST without `Mcp-Session-Id` must carry `initialize`; it opens a
+      session and the id is returned in the `Mcp-Session-Id` header
+    - POST with `Mcp-Session-Id` reuses the pinned principal
+    - DELETE ends the session
+    """
+
+    def __init__(self, adapter: MCPAdapter, host: str = '127.0.0.1',
+                 port: int = 0, path: str = '/mcp'):
+        from http.server import ThreadingHTTPServer  # Not imported by stdio-only deployments
+        self.adapter = adapter
+        self.path = path
+        self.httpd = ThreadingHTTPServer((host, port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}{self.path}"
+
+    def start(self) -> 'StreamableHTTPTransport':
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def shutdown(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def _handler(self):
+        from http.server import BaseHTTPRequestHandler
+        transport = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                if self.path != transport.path:
+                    return self._send(404, None)
+                try:
+                    body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                    message = json.loads(body)
+                except (ValueError, json.JSONDecodeError):
+                    return self._send(400, _error(None, PARSE_ERROR, "Parse error"))
+
+                credentials = self.headers.get('Authorization', '')
+                session_id = self.headers.get('Mcp-Session-Id')
+                try:
+                    if session_id:
+                        session = transport.adapter.resume_session(session_id, credentials)
+                    elif _is_initialize(message):
+                        session = transport.adapter.open_session(credentials)
+                    else:
+                        return self._send(400, _error(
+                            None, INVALID_REQUEST, "Missing Mcp-Session-Id"))
+                except KeyError:
+                    return self._send(404, _error(None, INVALID_REQUEST, "Session not found"))
+                except ValueError as e:
+                    return self._send(401, _error(None, ACCESS_DENIED, str(e)))
+
+                reply = _handle(transport.adapter, message, session)
+                self._send(202 if reply is None else 200, reply,
+                           {'Mcp-Session-Id': session.session_id})
+
+            def do_DELETE(self):
+                session_id = self.headers.get('Mcp-Session-Id')
+                credentials = self.headers.get('Authorization', '')
+                try:
+                    transport.adapter.resume_session(session_id or '', credentials)
+                except (KeyError, ValueError):
+                    return self._send(404, None)
+                transport.adapter.close_session(session_id)
+                self._send(204, None)
+
+            def do_GET(self):
+                # No server-initiated SSE stream is offered
+                self._send(405, None)
+
+            def _send(self, status: int, body: Optional[Message],
+                      headers: Optional[Dict[str, str]] = None):
+                data = json.dumps(body).encode() if body is not None else b''
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                if body is not None:
+                    self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+def _handle(adapter: MCPAdapter, message: Message, session: MCPSession) -> Optional[Message]:
+    """Handle one client message; a failure is answered with -32603"""
+    try:
+        return adapter.handle(message, session)
+    except Exception as e:  # One bad message must not end the session
+        return _error(_message_id(message), INTERNAL_ERROR, f"Internal error: {e}")
+
+
+def _message_id(message: Any) -> Optional[Union[str, int]]:
+    return message.get('id') if isinstance(message, dict) else None
+
+
+def _is_initialize(message: Message) -> bool:
+    items = message if isinstance(message, list) else [message]
+    return any(isinstance(m, dict) and m.get('method') == 'initialize' for m in items)
+
+
+# =============================================================================
+# Usage Example
+# =============================================================================
+
+if __name__ == '__main__':
+    import os
+    from .canonical_policy_engine import CanonicalPolicyEngine, load_policy_file
+
+    # 1. Describe the governed MCP server and its tools
+    server = MCPServer(
+        name='jira-server',
+        tools=[
+            MCPTool(name='jira_search', sensitivity_level='medium'),
+            MCPTool(name='jira_delete_project', sensitivity_level='critical'),
+        ]
+    )
+
+    # 2. Policy engine and upstream connection
+    engine = CanonicalPolicyEngine([load_policy_file(os.environ['GRID_POLICY_FILE'])])
+    upstream = StdioUpstream(os.environ['MCP_SERVER_COMMAND'].split())
+
+    adapter = MCPAdapter(
+        server=server,
+        policy_engine=engine,
+        upstream=upstream,
+        jwt_secret=os.environ['GRID_JWT_SECRET']
+    )
+
+    # 3. Serve the agent over stdio; the session token comes from the environment
+    serve_stdio(adapter, credentials=f"Bearer {os.environ['GRID_SESSION_TOKEN']}")
@@ -0,0 +1,539 @@
+"""
+GRID Audit: Streaming Anomaly Detection
+
+This template demonstrates inline anomaly detection on the decision stream
+(spec §12.2 "monitor for anomalies (unusual access patterns)", §12.1 DoS
+against policy evaluation). Every audited decision updates fixed-size
+sketches; nothing is stored per principal, so memory is the same for ten
+principals or ten million:
+
+- Request and deny rates per principal: count-min sketches of
+  exponentially decayed counts (forward decay, conservative update), with
+  a fast half-life for the current rate and a slow one for the baseline
+- Distinct resources per principal: a count-min-style grid of HyperLogLog
+  sketches over a sliding window, e.g. to catch enumeration
+- Whole-stream request rate: two decayed counters, for floods
+- Alerts are emitted as §7.2 audit events and, optionally, as temporary
+  `rate_limit` constraints enforced by `RateLimitedEngine`
+
+Sketches only ever overestimate a principal's counts (hash collisions add,
+never subtract), so the error is false alerts for light principals when
+the sketch is too narrow for the traffic, never missed heavy hitters.
+
+Use this template for:
+- Flagging request spikes, deny storms and resource enumeration per
+  principal without per-principal state
+- Automatic, time-limited throttling of anomalous principals
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+import hashlib
+import math
+import threading
+import time
+import uuid
+import numpy as np
+
+# Assume these are imported from a GRID SDK
+from .http_adapter_template import Principal, Resource, Action, Context
+from .canonical_policy_engine import Policy, PolicyDecision, PolicyEngine
+from .audit_cold_tier import format_timestamps
+
+DETECTOR_ID = 'grid:anomaly-detector'  # Resource id of alert events (never observed)
+RATE_LIMIT_POLICY = 'grid-anomaly-rate-limit'
+LN2 = math.log(2)
+MAX_SCALE = 1e12  # Forward-decay weights are rescaled beyond this
+
+
+# =============================================================================
+# Sketches
+# =============================================================================
+
+def _hash(text: str, seed: int) -> Tuple[int, int]:
+    digest = hashlib.blake2b(text.encode(), digest_size=16, salt=seed.to_bytes(16, 'little')).digest()
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+
+class DecayedCountMin:
+    """
+    Count-min sketch of exponentially decayed counts, several metrics at once
+
+    All metrics share the hashing of a key, so one update touches
+    `depth` cells per metric. Decay uses a landmark: an event at time t
+    adds exp(rate * (t - landmark)), and estimates are scaled back by
+    exp(-rate * (now - landmark)), so nothing has to be decayed per tick.
+    """
+
+    def __init__(self, half_lives: Sequence[float], width: int = 4096, depth: int = 4, seed: int = 0):
+        if width <= 0 or depth <= 0:
+            raise ValueError("width and depth must be positive")
+        self.width, self.depth, self.seed = width, depth, seed
+        self.rates = np.array([LN2 / h for h in half_lives])
+        self.metrics = len(half_lives)
+        self.table = np.zeros(self.metrics * depth * width)  # Metric, row, column
+        self.landmark: Optional[float] = None
+        self._base = (np.arange(self.metrics)[:, None] * depth + np.arange(depth)[None, :]) * width
+
+    def cells(self, key: str) -> np.ndarray:
+        """Column of `key` in each row"""
+        h1, h2 = _hash(key, self.seed)
+        return np.array([(h1 + i * h2) % self.width for i in range(self.depth)])
+
+    def _scale(self, now: float) -> np.ndarray:
+        if self.landmark is None:
+            self.landmark = now
+        scale = np.exp(self.rates * (now - self.landmark))
+        if scale.max() > MAX_SCALE:
+            self.table /= np.repeat(scale, self.depth * self.width)
+            self.landmark = now
+            scale = np.ones_like(scale)
+        return scale
+
+    def add(self, cells: np.ndarray, weights: np.ndarray, now: float) -> np.ndarray:
+        """
+        Add per-metric weights for a key at time `now` (seconds)
+
+        Conservative update: only cells below the new estimate are raised.
+
+        Returns:
+            The key's decayed counts after the update, per metric
+        """
+        scale = self._scale(now)
+        index = (self._base + cells).ravel()
+        current = self.table.take(index).reshape(self.metrics, self.depth)
+        estimate = current.min(axis=1) + weights * scale
+        self.table.put(index, np.maximum(current, estimate[:, None]))
+        return estimate / scale
+
+    def estimate(self, cells: np.ndarray, now: float) -> np.ndarray:
+        """The key's decayed counts at `now`, per metric"""
+        scale = self._scale(now)
+        index = (self._base + cells).ravel()
+        return self.table.take(index).reshape(self.metrics, self.depth).min(axis=1) / scale
+
+
+def _hll_alpha(m: int) -> float:
+    return {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+
+
+class DistinctSketch:
+    """
+    Distinct items per key over a sliding window, in fixed memory
+
+    A depth × width grid of HyperLogLog sketches: a key is hashed to one
+    sketch per row and the estimate is the smallest of them (collisions
+    only add items). Two generations are kept; a window rotates them, so
+    estimates cover between one and two windows.
+    """
+
+    def __init__(self, window: float, precision: int = 6, width: int = 4096, depth: int = 4,
+                 seed: int = 0):
+        if not 4 <= precision <= 16:
+            raise ValueError("precision must be between 4 and 16")
+        self.window, self.precision = window, precision
+        self.width, self.depth, self.seed = width, depth, seed
+        self.m = 1 << precision
+        self.registers = np.zeros((2, depth, width, self.m), dtype=np.uint8)
+        self.current = 0
+        self.window_start: Optional[float] = None
+        self._flat = self.registers.reshape(-1)
+        self._alpha = _hll_alpha(self.m)
+        self._powers = np.exp2(-np.arange(65, dtype=np.float64))  # 2^-rank
+
+    def _rotate(self, now: float) -> None:
+        if self.window_start is None:
+            self.window_start = now
+        while now - self.window_start >= self.window:
+            self.current ^= 1
+            self.registers[self.current] = 0
+            self.window_start += self.window
+            if now - self.window_start >= self.window:  # Idle for two windows
+                self.registers[:] = 0
+                self.window_start = now
+
+    def add(self, cells: np.ndarray, item: str, now: float) -> bool:
+        """
+        Add `item` to the key at `cells` (from `DecayedCountMin.cells`)
+
+        Returns:
+            Whether a register grew; if not, the estimate is unchanged
+            (the usual case for items seen before)
+        """
+        self._rotate(now)
+        h, _ = _hash(item, self.seed + 1)
+        register = h & (self.m - 1)
+        rest = h >> self.precision
+        rank = (64 - self.precision) - rest.bit_length() + 1
+        changed = False
+        for row, cell in enumerate(cells.tolist()):
+            slot = ((self.current * self.depth + row) * self.width + cell) * self.m + register
+            if self._flat[slot] < rank:
+                self._flat[slot] = rank
+                changed = True
+        return changed
+
+    def estimate(self, cells: np.ndarray, below: Optional[float] = None) -> float:
+        """
+        The key's distinct estimate over the current and previous window
+
+        Args:
+            cells: The key's columns
+            below: Stop at the first row estimating less than this; the
+                result is then only known to be below it
+        """
+        best = math.inf
+        for row, cell in enumerate(cells.tolist()):
+            union = np.maximum(self.registers[0, row, cell], self.registers[1, row, cell])
+            estimate = self._alpha * self.m * self.m / self._powers[union].sum()
+            zeros = self.m - np.count_nonzero(union)
+            if estimate <= 2.5 * self.m and zeros:  # Small range: linear counting
+                estimate = self.m * math.log(self.m / zeros)
+            best = min(best, float(estimate))
+            if below is not None and best < below:
+                break
+        return best
+
+
+class DecayedCounter:
+    """One exponentially decayed count"""
+
+    def __init__(self, half_life: float):
+        self.rate = LN2 / half_life
+        self.value = 0.0
+        self.updated: Optional[float] = None
+
+    def add(self, weight: float, now: float) -> float:
+        self.value = self.get(now) + weight
+        self.updated = now if self.updated is None else max(self.updated, now)
+        return self.value
+
+    def get(self, now: float) -> float:
+        if self.updated is None:
+            return 0.0
+        return self.value * math.exp(-self.rate * max(0.0, now - self.updated))
+
+
+# =============================================================================
+# Rate Limits
+# =============================================================================
+
+@dataclass
+class RateLimit:
+    """A temporary per-principal limit imposed after an alert"""
+    limit: int                 # Allowed requests per window
+    window: float              # Seconds
+    expires: float             # Epoch seconds
+    window_start: float = 0.0
+    used: int = 0
+
+
+class RateLimiter:
+    """
+    Temporary rate limits for flagged principals
+
+    Holds at most `max_principals` limits; beyond that the one expiring
+    soonest is dropped. Thread-safe.
+    """
+
+    def __init__(self, max_principals: int = 10_000, clock: Callable[[], float] = time.time):
+        self.max_principals = max_principals
+        self.clock = clock
+        self._limits: Dict[str, RateLimit] = {}
+        self._lock = threading.Lock()
+
+    def impose(self, principal_id: str, limit: int, window: float, duration: float) -> RateLimit:
+        """Limit a principal to `limit` requests per `window` seconds for `duration` seconds"""
+        now = self.clock()
+        with self._lock:
+            self._limits.pop(principal_id, None)
+            if len(self._limits) >= self.max_principals:
+                soonest = min(self._limits, key=lambda p: self._limits[p].expires)
+                del self._limits[soonest]
+            rate_limit = self._limits[principal_id] = RateLimit(
+                limit=max(1, int(limit)), window=window, expires=now + duration, window_start=now)
+            return rate_limit
+
+    def consume(self, principal_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Count one request against a principal's limit, if it has one
+
+        Returns:
+            None if the principal is not limited, else the `rate_limit`
+            constraint (`limit`, `remaining`, `reset`, `exceeded`)
+        """
+        now = self.clock()
+        with self._lock:
+            rate_limit = self._limits.get(principal_id)
+            if rate_limit is None:
+                return None
+            if now >= rate_limit.expires:
+                del self._limits[principal_id]
+                return None
+            if now - rate_limit.window_start >= rate_limit.window:
+                rate_limit.window_start += (now - rate_limit.window_start) // rate_limit.window * rate_limit.window
+                rate_limit.used = 0
+            exceeded = rate_limit.used >= rate_limit.limit
+            if not exceeded:
+                rate_limit.used += 1
+            return {
+                'limit': rate_limit.limit,
+                'remaining': rate_limit.limit - rate_limit.used,
+                'reset': int(rate_limit.window_start + rate_limit.window),
+                'exceeded': exceeded,
+            }
+
+    def __len__(self) -> int:
+        return len(self._limits)
+
+
+class RateLimitedEngine(PolicyEngine):
+    """
+    Wraps a PolicyEngine with the limits imposed by the anomaly detector
+
+    Allowed decisions of a limited principal carry a `rate_limit`
+    constraint (shown by adapters as X-RateLimit-* headers); once the
+    limit is used up they become denies until the window resets.
+    """
+
+    def __init__(self, engine: Any, limiter: RateLimiter):
+        self.engine = engine
+        self.limiter = limiter
+
+    def evaluate(self, principal: Principal, resource: Resource,
+                 action: Action, context: Context) -> PolicyDecision:
+        decision = self.engine.evaluate(principal, resource, action, context)
+        if not decision.allowed:
+            return decision
+        rate_limit = self.limiter.consume(principal.id)
+        if rate_limit is None:
+            return decision
+        if rate_limit.pop('exceeded'):
+            return PolicyDecision(allowed=False, reason='Access denied: rate limit exceeded (anomaly)',
+                                  policy_id=RATE_LIMIT_POLICY, constraints={'rate_limit': rate_limit})
+        return replace(decision, constraints={**(decision.constraints or {}), 'rate_limit': rate_limit})
+
+    def validate_policy(self, policy: str) -> bool:
+        return self.engine.validate_policy(policy)
+
+    def deploy_policy(self, policy: Policy) -> None:
+        self.engine.deploy_policy(policy)
+
+
+# =============================================================================
+# Detector
+# =============================================================================
+
+@dataclass
+class DetectorConfig:
+    """Sketch sizes and alert thresholds; rates are per minute"""
+    width: int = 4096
+    depth: int = 4
+    fast_half_life: float = 60.0        # Seconds; the current rate
+    slow_half_life: float = 3600.0      # Seconds; the baseline
+    warmup: Optional[float] = None      # No per-principal alerts this long (None: slow half-life)
+    spike_ratio: float = 8.0            # Current rate over baseline
+    min_request_rate: float = 60.0      # Request spikes below this are ignored
+    min_deny_rate: float = 10.0         # Deny spikes below this are ignored
+    flood_ratio: float = 4.0            # Whole-stream current rate over baseline
+    min_flood_rate: float = 6000.0
+    distinct_window: float = 600.0      # Seconds
+    max_distinct_resources: float = 100.0
+    hll_precision: int = 6
+    alert_cooldown: float = 300.0       # Seconds between alerts of one kind for a principal
+    max_alert_keys: int = 10_000        # Cooldowns tracked (least recently alerted dropped)
+    rate_limit_kinds: Tuple[str, ...] = ('request_spike', 'deny_spike', 'resource_scan')
+    rate_limit_window: float = 60.0
+    rate_limit_duration: float = 900.0
+    seed: int = 0
+
+
+@dataclass
+class Alert:
+    """One detected anomaly"""
+    kind: str                   # request_spike, deny_spike, resource_scan, request_flood
+    principal_id: str           # '*' for the whole stream
+    timestamp: int              # Epoch ms of the triggering event
+    observed: float
+    baseline: float
+    threshold: float
+    rate_limit: Optional[Dict[str, Any]] = None
+
+    def to_event(self) -> Dict[str, Any]:
+        """The alert as a §7.2 audit event"""
+        parameters = {
+            'anomaly': self.kind,
+            'observed': round(self.observed, 3),
+            'baseline': round(self.baseline, 3),
+            'threshold': round(self.threshold, 3),
+        }
+        if self.rate_limit is not None:
+            parameters['rate_limit'] = self.rate_limit
+        return {
+            'event': {'id': str(uuid.uuid4()),
+                      'timestamp': format_timestamps(np.array([self.timestamp], dtype=np.int64))[0]},
+            'principal': {'id': self.principal_id},
+            'resource': {'id': DETECTOR_ID, 'type': 'service', 'name': 'Anomaly Detector',
+                         'sensitivity': 'high'},
+            'action': {'operation': 'audit', 'parameters': parameters},
+            'decision': {'result': 'allow',
+                         'reason': f"Anomaly detected: {self.kind.replace('_', ' ')}",
+                         'policy_id': RATE_LIMIT_POLICY if self.rate_limit else None},
+            'context': {'metadata': {'alert': True}},
+        }
+
+
+@dataclass
+class DetectorStats:
+    events: int = 0
+    alerts: Dict[str, int] = field(default_factory=dict)
+    suppressed: int = 0
+
+
+class AnomalyDetector:
+    """
+    Consumes audited decisions and emits anomaly alerts
+
+    Attach it to an AuditStore with
+    `store.on_append.append(detector.observe)` and `emit=store.append`:
+    alerts are then audit events in the same log (the detector ignores
+    its own events). Thread-safe.
+    """
+
+    def __init__(self, config: Optional[DetectorConfig] = None,
+                 emit: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                 limiter: Optional[RateLimiter] = None):
+        """
+        Args:
+            config: Sketch sizes and thresholds
+            emit: Called with each alert as an audit event
+            limiter: If set, alerts of `rate_limit_kinds` impose a
+                temporary limit on the principal
+        """
+        self.config = config = config or DetectorConfig()
+        self.emit = emit
+        self.limiter = limiter
+        # Metrics: requests (fast, slow), denies (fast, slow)
+        self.rates = DecayedCountMin([config.fast_half_life, config.slow_half_life] * 2,
+                                     config.width, config.depth, config.seed)
+        self.distinct = DistinctSketch(config.distinct_window, config.hll_precision,
+                                       config.width, config.depth, config.seed)
+        self.stream = (DecayedCounter(config.fast_half_life), DecayedCounter(config.slow_half_life))
+        self.stats = DetectorStats()
+        self._per_minute = np.array([60 * LN2 / h for h in
+                                     [config.fast_half_life, config.slow_half_life] * 2])
+        self._alerted: 'OrderedDict[Tuple[str, str], float]' = OrderedDict()
+        self._started: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def memory_bytes(self) -> int:
+        """Sketch memory; fixed at construction"""
+        return self.rates.table.nbytes + self.distinct.registers.nbytes
+
+    def observe(self, event: Dict[str, Any], millis: int) -> List[Alert]:
+        """
+        Update the sketches with one audited decision
+
+        Args:
+            event: §7.2 audit event
+            millis: Its timestamp in epoch ms
+
+        Returns:
+            The alerts raised (already emitted)
+        """
+        principal = _get(event, 'principal', 'id')
+        resource = _get(event, 'resource', 'id')
+        if principal is None or resource == DETECTOR_ID:
+            return []
+        denied = _get(event, 'decision', 'result') == 'deny'
+        now = millis / 1000
+        config = self.config
+        alerts = []
+        with self._lock:
+            self.stats.events += 1
+            if self._started is None:
+                self._started = now
+            cells = self.rates.cells(str(principal))
+            counts = self.rates.add(cells, np.array([1.0, 1.0, float(denied), float(denied)]), now)
+            fast, slow, deny_fast, deny_slow = (counts * self._per_minute).tolist()
+            distinct = None
+            if resource is not None and self.distinct.add(cells, str(resource), now):
+                distinct = self.distinct.estimate(cells, below=config.max_distinct_resources)
+            stream_fast = self.stream[0].add(1.0, now) * self._per_minute[0]
+            stream_slow = self.stream[1].add(1.0, now) * self._per_minute[1]
+
+            warmup = config.warmup if config.warmup is not None else config.slow_half_life
+            if now - self._started >= warmup:
+                threshold = max(config.min_request_rate, config.spike_ratio * slow)
+                if fast >= threshold:
+                    alerts.append(Alert('request_spike', principal, millis, fast, slow, threshold))
+                threshold = max(config.min_deny_rate, config.spike_ratio * deny_slow)
+                if denied and deny_fast >= threshold:
+                    alerts.append(Alert('deny_spike', principal, millis, deny_fast, deny_slow, threshold))
+                threshold = max(config.min_flood_rate, config.flood_ratio * stream_slow)
+                if stream_fast >= threshold:
+                    alerts.append(Alert('request_flood', '*', millis, stream_fast, stream_slow, threshold))
+            if distinct is not None and distinct >= config.max_distinct_resources:
+                alerts.append(Alert('resource_scan', principal, millis, distinct, 0.0,
+                                    config.max_distinct_resources))
+            alerts = [alert for alert in alerts if self._due(alert, now)]
+
+        for alert in alerts:
+            if self.limiter is not None and alert.kind in config.rate_limit_kinds:
+                per_window = alert.baseline * config.rate_limit_window / 60
+                limit = self.limiter.impose(alert.principal_id,
+                                            max(config.min_request_rate * config.rate_limit_window / 60,
+                                                per_window),
+                                            config.rate_limit_window, config.rate_limit_duration)
+                alert.rate_limit = {'limit': limit.limit, 'window_seconds': limit.window,
+                                    'expires': int(limit.expires)}
+            if self.emit is not None:
+                self.emit(alert.to_event())
+        return alerts
+
+    def _due(self, alert: Alert, now: float) -> bool:
+        key = (alert.kind, alert.principal_id)
+        last = self._alerted.get(key)
+        if last is not None and now - last < self.config.alert_cooldown:
+            self.stats.suppressed += 1
+            return False
+        self._alerted[key] = now
+        self._alerted.move_to_end(key)
+        while len(self._alerted) > self.config.max_alert_keys:
+            self._alerted.popitem(last=False)
+        self.stats.alerts[alert.kind] = self.stats.alerts.get(alert.kind, 0) + 1
+        return True
+
+
+def _get(event: Dict[str, Any], *path: str) -> Any:
+    for key in path:
+        event = event.get(key) if isinstance(event, dict) else None
+    return event
+
+
+# =============================================================================
+# Usage Example
+# =============================================================================
+
+if __name__ == '__main__':
+    import random
+
+    # Steady traffic from 5,000 principals for two hours, then one
+    # principal starts enumerating resources and getting denied
+    start = 1764460800000
+    alerts = []
+    detector = AnomalyDetector(DetectorConfig(warmup=1800), emit=alerts.append, limiter=RateLimiter())
+    rng = random.Random(1)
+    for i in range(7200 * 5):
+        millis = start + i * 200
+        event = {'principal': {'id': f"user-{rng.randrange(5000)}@company.com"},
+                 'resource': {'id': f"res-{rng.randrange(50)}"},
+                 'decision': {'result': 'allow'}}
+        detector.observe(event, millis)
+        if i > 7000 * 5 and i % 2 == 0:
+            detector.observe({'principal': {'id': 'mallory@company.com'},
+                              'resource': {'id': f"res-{i}"}, 'decision': {'result': 'deny'}}, millis)
+    for alert in alerts:
+        print(alert['event']['timestamp'], alert['principal']['id'], alert['action']['parameters'])
+    print(f"{detector.stats.events} events, sketch memory {detector.memory_bytes() / 1e6:.1f} MB")
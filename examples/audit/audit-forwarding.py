@@ -0,0 +1,849 @@
+"""
+GRID Audit: SIEM Forwarding
+
+This template demonstrates the audit backends of spec §10.3 and real-time
+forwarding of audit events to SIEM and compliance systems (§7.2
+`compliance.forwarded_to_siem`):
+
+- `AuditBackend` with Splunk HEC, Datadog Logs and Kafka implementations
+- Forwarded events are appended to an on-disk spool. Each sink reads the
+  spool from its own cursor, so a sink that is down only falls behind,
+  and after a restart every sink resumes where it left off
+- Each sink sends on its own thread, in batches (by count, size or age),
+  compressed; a slow sink never holds up the others
+- Failed batches are retried with exponential backoff and jitter until
+  the sink recovers; a batch the sink rejects is split to isolate the
+  rejected events, which go to a dead-letter file
+- Denies of critical resources take an expedited lane: each is sent on
+  its own, at once, ahead of any backlog
+
+Delivery is at least once: an event may be sent twice (after a crash, or
+by both lanes), never lost. SIEMs deduplicate on `event.id`.
+
+Use this template for:
+- Real-time SIEM forwarding that survives sink outages and restarts
+- Writing a backend for another SIEM or log pipeline
+"""
+
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlparse
+import gzip
+import json
+import os
+import queue
+import random
+import socket
+import ssl
+import struct
+import threading
+import time
+import zlib
+
+# Assume these are imported from a GRID SDK
+from .canonical_policy_engine import parse_timestamp
+from .policy_replay import event_timestamp
+
+SPOOL_SEGMENT = 'segment-{:08d}.ndjson'
+
+
+class RejectedBatchError(Exception):
+    """The sink refused the batch itself (retrying it cannot succeed)"""
+
+
+def is_critical_deny(event: Dict[str, Any]) -> bool:
+    """Default expedited-lane predicate: a deny of a critical resource"""
+    return (_get(event, 'decision', 'result') == 'deny'
+            and _get(event, 'resource', 'sensitivity') == 'critical')
+
+
+def _get(event: Dict[str, Any], *path: str) -> Any:
+    for key in path:
+        event = event.get(key) if isinstance(event, dict) else None
+    return event
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat(timespec='milliseconds').replace('+00:00', 'Z')
+
+
+def _stamped(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of `event` with `compliance.forwarded_to_siem` set to now"""
+    compliance = event.get('compliance')
+    return {**event, 'compliance': {**(compliance if isinstance(compliance, dict) else {}),
+                                    'forwarded_to_siem': _now()}}
+
+
+def _epoch(event: Dict[str, Any]) -> float:
+    """Event time in epoch seconds (now if missing or invalid)"""
+    try:
+        parsed = parse_timestamp(event_timestamp(event))
+    except ValueError:
+        parsed = None
+    return parsed.timestamp() if parsed is not None else time.time()
+
+
+# =============================================================================
+# Backends
+# =============================================================================
+
+class AuditBackend(ABC):
+    """
+    Abstract audit backend for forwarding (spec §10.3)
+
+    `send_batch` returns False for failures worth retrying (the sink is
+    unreachable, overloaded or misconfigured) and raises
+    `RejectedBatchError` when the sink refuses the payload itself.
+    Backends are called from two threads at once (the batch and the
+    expedited lane).
+    """
+
+    name: str = 'backend'
+    max_batch_events: int = 10_000  # The sink's own limits
+    max_batch_bytes: int = 5_000_000
+    last_error: Optional[str] = None
+
+    def send_event(self, event: Dict[str, Any]) -> bool:
+        """Send one event"""
+        return self.send_batch([event])
+
+    @abstractmethod
+    def send_batch(self, events: List[Dict[str, Any]]) -> bool:
+        """Send a batch of events"""
+        pass
+
+    @abstractmethod
+    def health_check(self) -> bool:
+        """Check backend connectivity"""
+        pass
+
+    @abstractmethod
+    def format_event(self, event: Dict[str, Any]) -> dict:
+        """Format an event for the backend"""
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class _Connection:
+    """One keep-alive HTTP(S) connection, reopened after errors"""
+
+    def __init__(self, base_url: str, timeout: float, ssl_context: Optional[ssl.SSLContext]):
+        parsed = urlparse(base_url)
+        self.scheme, self.host, self.port = parsed.scheme, parsed.hostname, parsed.port
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self._connection: Optional[HTTPConnection] = None
+
+    def request(self, method: str, path: str, body: Optional[bytes],
+                headers: Dict[str, str]) -> Tuple[int, bytes]:
+        """
+        Returns:
+            (status, body)
+
+        Raises:
+            ConnectionError: The request could not be sent or answered
+        """
+        for attempt in range(2):
+            reused = self._connection is not None
+            if not reused:
+                self._connection = HTTPSConnection(self.host, self.port, timeout=self.timeout,
+                                                   context=self.ssl_context) \
+                    if self.scheme == 'https' else HTTPConnection(self.host, self.port, timeout=self.timeout)
+            try:
+                self._connection.request(method, path, body=body, headers=headers)
+                response = self._connection.getresponse()
+                data = response.read()
+            except (HTTPException, OSError) as e:
+                self.close()
+                if reused and attempt == 0:
+                    continue  # The sink closed an idle connection
+                raise ConnectionError(f"{self.host}: {e}") from e
+            if response.will_close:
+                self.close()
+            return response.status, data
+        raise ConnectionError(f"{self.host}: connection closed")
+
+    def close(self) -> None:
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+
+class HTTPBackend(AuditBackend):
+    """
+    Base for SIEMs with an HTTP intake API
+
+    Keeps one keep-alive connection per calling thread. 400 and 413 are
+    rejections; any other error status is retried.
+    """
+
+    def __init__(self, base_url: str, compression: Optional[str] = 'gzip', timeout: float = 10.0,
+                 ssl_context: Optional[ssl.SSLContext] = None):
+        if compression not in (None, 'gzip'):
+            raise ValueError(f"Unsupported compression: {compression}")
+        self.base_url = base_url.rstrip('/')
+        self.compression = compression
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self._local = threading.local()
+        self._connections: List[_Connection] = []
+
+    def _request(self, method: str, path: str, body: Optional[bytes] = None,
+                 headers: Optional[Dict[str, str]] = None) -> Tuple[int, bytes]:
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = _Connection(self.base_url, self.timeout, self.ssl_context)
+            self._connections.append(connection)
+        return connection.request(method, path, body, headers or {})
+
+    def _post(self, path: str, payload: bytes, headers: Dict[str, str]) -> bool:
+        headers = dict(headers)
+        if self.compression == 'gzip':
+            payload = gzip.compress(payload, compresslevel=6)
+            headers['Content-Encoding'] = 'gzip'
+        try:
+            status, body = self._request('POST', path, payload, headers)
+        except ConnectionError as e:
+            self.last_error = str(e)
+            return False
+        if 200 <= status < 300:
+            return True
+        self.last_error = f"HTTP {status}: {body[:200].decode(errors='replace')}"
+        if status in (400, 413):
+            raise RejectedBatchError(self.last_error)
+        return False
+
+    def _healthy(self, path: str, headers: Dict[str, str]) -> bool:
+        try:
+            status, body = self._request('GET', path, None, headers)
+        except ConnectionError as e:
+            self.last_error = str(e)
+            return False
+        if status != 200:
+            self.last_error = f"HTTP {status}: {body[:200].decode(errors='replace')}"
+        return status == 200
+
+    def close(self) -> None:
+        for connection in self._connections:
+            connection.close()
+
+
+class SplunkBackend(HTTPBackend):
+    """Splunk HTTP Event Collector (`/services/collector/event`)"""
+
+    name = 'splunk'
+
+    def __init__(self, base_url: str, token: str, index: Optional[str] = None,
+                 sourcetype: str = 'grid:audit', host: Optional[str] = None, **kwargs):
+        super().__init__(base_url, **kwargs)
+        self.token = token
+        self.index = index
+        self.sourcetype = sourcetype
+        self.host = host or socket.gethostname()
+
+    def format_event(self, event: Dict[str, Any]) -> dict:
+        formatted = {'time': round(_epoch(event), 3), 'host': self.host, 'source': 'grid',
+                     'sourcetype': self.sourcetype, 'event': _stamped(event)}
+        if self.index:
+            formatted['index'] = self.index
+        return formatted
+
+    def send_batch(self, events: List[Dict[str, Any]]) -> bool:
+        # HEC takes concatenated JSON objects, not an array
+        payload = ''.join(json.dumps(self.format_event(e), separators=(',', ':')) for e in events).encode()
+        return self._post('/services/collector/event', payload,
+                          {'Authorization': f"Splunk {self.token}", 'Content-Type': 'application/json'})
+
+    def health_check(self) -> bool:
+        return self._healthy('/services/collector/health', {'Authorization': f"Splunk {self.token}"})
+
+
+class DatadogBackend(HTTPBackend):
+    """Datadog Logs intake (`/api/v2/logs`)"""
+
+    name = 'datadog'
+    max_batch_events = 1000  # Intake limits per request (uncompressed)
+    max_batch_bytes = 5_000_000
+
+    def __init__(self, api_key: str, base_url: str = 'https://http-intake.logs.datadoghq.com',
+                 service: str = 'grid', tags: Sequence[str] = (), host: Optional[str] = None, **kwargs):
+        super().__init__(base_url, **kwargs)
+        self.api_key = api_key
+        self.service = service
+        self.tags = list(tags)
+        self.host = host or socket.gethostname()
+
+    def format_event(self, event: Dict[str, Any]) -> dict:
+        tags = self.tags + [f"{name}:{value}" for name, value in (
+            ('decision', _get(event, 'decision', 'result')),
+            ('sensitivity', _get(event, 'resource', 'sensitivity'))) if value]
+        return {'ddsource': 'grid', 'service': self.service, 'hostname': self.host,
+                'ddtags': ','.join(tags), 'message': json.dumps(_stamped(event), separators=(',', ':'))}
+
+    def send_batch(self, events: List[Dict[str, Any]]) -> bool:
+        payload = json.dumps([self.format_event(e) for e in events], separators=(',', ':')).encode()
+        return self._post('/api/v2/logs', payload,
+                          {'DD-API-KEY': self.api_key, 'Content-Type': 'application/json'})
+
+    def health_check(self) -> bool:
+        return self._healthy('/api/v1/validate', {'DD-API-KEY': self.api_key})
+
+
+# -- Kafka --------------------------------------------------------------------
+#
+# Just enough of the Kafka protocol to produce: Produce v3 requests carrying
+# v2 record batches, and ApiVersions v0 as a health check. The broker given
+# must lead the topic's partitions (there is no metadata discovery); use a
+# full Kafka client for clusters where leadership moves.
+
+PRODUCE, API_VERSIONS = 0, 18
+GZIP_CODEC = 1
+# Errors for which the broker refuses the batch itself: CORRUPT_MESSAGE,
+# MESSAGE_TOO_LARGE, RECORD_LIST_TOO_LARGE, INVALID_RECORD
+KAFKA_REJECTED = {2, 10, 18, 87}
+
+
+def _crc32c_table() -> List[int]:
+    table = []
+    for n in range(256):
+        for _ in range(8):
+            n = (n >> 1) ^ 0x82F63B78 if n & 1 else n >> 1
+        table.append(n)
+    return table
+
+
+_CRC32C = _crc32c_table()
+
+
+def crc32c(data: bytes) -> int:
+    """CRC-32C (Castagnoli), the checksum of Kafka record batches"""
+    crc = 0xFFFFFFFF
+    table = _CRC32C
+    for byte in data:
+        crc = table[(crc ^ byte) & 0xFF] ^ (crc >> 8)
+    return crc ^ 0xFFFFFFFF
+
+
+def _varint(value: int) -> bytes:
+    """Zigzag varint"""
+    value = (value << 1) ^ (value >> 63)
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _string(value: str) -> bytes:
+    data = value.encode()
+    return struct.pack('>h', len(data)) + data
+
+
+def record_batch(records: Sequence[Tuple[Optional[bytes], bytes, int]], compression: Optional[str]) -> bytes:
+    """
+    Encode a v2 record batch
+
+    Args:
+        records: (key, value, epoch ms) per record
+        compression: 'gzip' or None
+    """
+    first = min(timestamp for _, _, timestamp in records)
+    last = max(timestamp for _, _, timestamp in records)
+    encoded = bytearray()
+    for delta, (key, value, timestamp) in enumerate(records):
+        body = b'\x00' + _varint(timestamp - first) + _varint(delta) \
+            + (_varint(-1) if key is None else _varint(len(key)) + key) \
+            + _varint(len(value)) + value + _varint(0)
+        encoded += _varint(len(body)) + body
+    data = gzip.compress(bytes(encoded), compresslevel=6) if compression == 'gzip' else bytes(encoded)
+    attributes = GZIP_CODEC if compression == 'gzip' else 0
+    checked = struct.pack('>hiqqqhii', attributes, len(records) - 1, first, last, -1, -1, -1, len(records)) + data
+    # baseOffset, batchLength, partitionLeaderEpoch, magic, crc
+    return struct.pack('>qiibI', 0, len(checked) + 9, -1, 2, crc32c(checked)) + checked
+
+
+class KafkaBackend(AuditBackend):
+    """
+    Kafka topic (records keyed by principal id, gzip-compressed batches)
+
+    Records are spread over `partitions` by CRC-32 of the key, so one
+    principal's events stay in order.
+    """
+
+    name = 'kafka'
+    max_batch_bytes = 1_000_000  # Broker default message.max.bytes
+
+    def __init__(self, broker: str, topic: str, partitions: int = 1, acks: int = -1,
+                 compression: Optional[str] = 'gzip', timeout: float = 10.0, client_id: str = 'grid-audit'):
+        if compression not in (None, 'gzip'):
+            raise ValueError(f"Unsupported compression: {compression}")
+        host, _, port = broker.rpartition(':')
+        self.address = (host, int(port))
+        self.topic = topic
+        self.partitions = partitions
+        self.acks = acks
+        self.compression = compression
+        self.timeout = timeout
+        self.client_id = client_id
+        self._local = threading.local()
+        self._sockets: List[socket.socket] = []
+        self._correlation = 0
+        self._lock = threading.Lock()
+
+    def format_event(self, event: Dict[str, Any]) -> dict:
+        return _stamped(event)
+
+    def send_batch(self, events: List[Dict[str, Any]]) -> bool:
+        partitions: Dict[int, List[Tuple[Optional[bytes], bytes, int]]] = {}
+        for event in events:
+            principal = _get(event, 'principal', 'id')
+            key = str(principal).encode() if principal is not None else None
+            partition = zlib.crc32(key) % self.partitions if key is not None else 0
+            partitions.setdefault(partition, []).append(
+                (key, json.dumps(self.format_event(event), separators=(',', ':')).encode(),
+                 int(_epoch(event) * 1000)))
+
+        body = struct.pack('>hhi', -1, self.acks, int(self.timeout * 1000)) + struct.pack('>i', 1) \
+            + _string(self.topic) + struct.pack('>i', len(partitions))
+        for partition, records in partitions.items():
+            batch = record_batch(records, self.compression)
+            body += struct.pack('>ii', partition, len(batch)) + batch
+        try:
+            response = self._call(PRODUCE, 3, body)
+        except (OSError, struct.error) as e:
+            self.last_error = f"{self.address[0]}: {e}"
+            return False
+        if self.acks == 0:
+            return True
+
+        (topics,), offset = struct.unpack_from('>i', response), 4
+        errors = []
+        for _ in range(topics):
+            (length,) = struct.unpack_from('>h', response, offset)
+            offset += 2 + length
+            (count,) = struct.unpack_from('>i', response, offset)
+            offset += 4
+            for _ in range(count):
+                partition, error = struct.unpack_from('>ih', response, offset)
+                offset += 22  # partition, error, base offset, log append time
+                if error:
+                    errors.append(error)
+        if not errors:
+            return True
+        self.last_error = f"Kafka errors {sorted(set(errors))}"
+        if set(errors) & KAFKA_REJECTED:
+            raise RejectedBatchError(self.last_error)
+        return False
+
+    def health_check(self) -> bool:
+        try:
+            response = self._call(API_VERSIONS, 0, b'')
+        except (OSError, struct.error) as e:
+            self.last_error = f"{self.address[0]}: {e}"
+            return False
+        return struct.unpack_from('>h', response)[0] == 0
+
+    def _call(self, api_key: int, version: int, body: bytes) -> bytes:
+        """Send a request and return the response after its correlation id"""
+        with self._lock:
+            self._correlation = correlation = (self._correlation + 1) & 0x7FFFFFFF
+        request = struct.pack('>hhi', api_key, version, correlation) + _string(self.client_id) + body
+        sock = getattr(self._local, 'socket', None)
+        if sock is None:
+            sock = self._local.socket = socket.create_connection(self.address, timeout=self.timeout)
+            self._sockets.append(sock)
+        try:
+            sock.sendall(struct.pack('>i', len(request)) + request)
+            if api_key == PRODUCE and self.acks == 0:
+                return b''  # No response
+            (size,) = struct.unpack('>i', self._receive(sock, 4))
+            response = self._receive(sock, size)
+        except (OSError, struct.error):
+            self._local.socket = None
+            sock.close()
+            raise
+        if struct.unpack_from('>i', response)[0] != correlation:
+            self._local.socket = None
+            sock.close()
+            raise ConnectionError("Kafka response out of order")
+        return response[4:]
+
+    @staticmethod
+    def _receive(sock: socket.socket, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            chunk = sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("Kafka broker closed the connection")
+            data += chunk
+        return bytes(data)
+
+    def close(self) -> None:
+        for sock in self._sockets:
+            sock.close()
+
+
+# =============================================================================
+# Forwarder
+# =============================================================================
+
+@dataclass
+class SinkConfig:
+    """Batching and retry settings of one sink"""
+    batch_events: int = 500
+    batch_bytes: int = 1_000_000    # Uncompressed spool bytes
+    max_delay: float = 1.0          # Seconds an event may wait for its batch to fill
+    backoff: float = 0.5            # First retry delay; doubles per failure
+    max_backoff: float = 60.0
+    expedite_attempts: int = 3      # Then the batch lane delivers it
+
+
+@dataclass
+class SinkStats:
+    """Per-sink counters"""
+    events: int = 0                 # Delivered by the batch lane
+    batches: int = 0
+    expedited: int = 0              # Delivered by the expedited lane
+    failures: int = 0
+    dead_lettered: int = 0
+    last_error: Optional[str] = None
+    last_success: Optional[float] = None
+
+
+@dataclass
+class _Sink:
+    backend: AuditBackend
+    config: SinkConfig
+    position: Tuple[int, int]       # Spool (segment, byte offset) of the next event to send
+    stats: SinkStats = field(default_factory=SinkStats)
+    expedite: 'queue.Queue[Optional[Tuple[Tuple[int, int], Dict[str, Any]]]]' = field(default_factory=queue.Queue)
+    expedited: set = field(default_factory=set)  # Positions already sent by the expedited lane
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    threads: List[threading.Thread] = field(default_factory=list)
+
+
+class AuditForwarder:
+    """
+    Forwards audit events to several backends through a durable spool
+
+    Attach it to an AuditStore with `store.on_append.append(forwarder.forward)`.
+    """
+
+    def __init__(self, directory: str, backends: Sequence[AuditBackend],
+                 config: Optional[SinkConfig] = None, configs: Optional[Dict[str, SinkConfig]] = None,
+                 expedite: Callable[[Dict[str, Any]], bool] = is_critical_deny,
+                 segment_bytes: int = 64_000_000, fsync: bool = False):
+        """
+        Open (or resume) a spool and start one batch and one expedited
+        thread per backend
+
+        Args:
+            directory: Holds the spool, each sink's cursor and dead letters
+            backends: Sinks; their `name`s must be unique
+            config: Settings for every sink
+            configs: Settings by sink name, overriding `config`
+            expedite: Events it accepts take the expedited lane
+            segment_bytes: Spool segment size
+            fsync: fsync each forwarded event (else it survives a process
+                crash but not a power failure)
+        """
+        names = [b.name for b in backends]
+        if len(set(names)) != len(names):
+            raise ValueError(f"Backend names must be unique: {names}")
+        self.directory = directory
+        self.expedite = expedite
+        self.segment_bytes = segment_bytes
+        self.fsync = fsync
+        for sub in ('spool', 'cursors', 'dead-letter'):
+            os.makedirs(os.path.join(directory, sub), exist_ok=True)
+
+        segments = self._segments()
+        self._segment = segments[-1] if segments else 1
+        self._file = open(self._spool_path(self._segment), 'ab')
+        self._lock = threading.Lock()
+        self._appended = threading.Condition(self._lock)
+        self._stopping = False
+        self.sinks: Dict[str, _Sink] = {}
+        for backend in backends:
+            sink_config = (configs or {}).get(backend.name) or config or SinkConfig()
+            first = (segments[0] if segments else self._segment, 0)
+            self.sinks[backend.name] = _Sink(backend, sink_config, self._load_cursor(backend.name) or first)
+        for sink in self.sinks.values():
+            for target, lane in ((self._batch_lane, 'batch'), (self._expedited_lane, 'expedited')):
+                thread = threading.Thread(target=target, args=(sink,), daemon=True,
+                                          name=f"grid-forward-{sink.backend.name}-{lane}")
+                sink.threads.append(thread)
+                thread.start()
+
+    # -- Spool ----------------------------------------------------------------
+
+    def forward(self, event: Dict[str, Any], millis: Optional[int] = None) -> None:
+        """
+        Spool one event for every sink (returns once it is on disk)
+
+        The signature matches `AuditStore.on_append` callbacks.
+        """
+        line = json.dumps(event, separators=(',', ':')).encode() + b'\n'
+        with self._lock:
+            if self._stopping:
+                raise RuntimeError("Forwarder is closed")
+            if self._file.tell() >= self.segment_bytes:
+                self._file.close()
+                self._segment += 1
+                self._file = open(self._spool_path(self._segment), 'ab')
+            position = (self._segment, self._file.tell())
+            self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+            self._appended.notify_all()
+        if self.expedite(event):
+            for sink in self.sinks.values():
+                sink.expedite.put((position, event))
+
+    def _spool_path(self, segment: int) -> str:
+        return os.path.join(self.directory, 'spool', SPOOL_SEGMENT.format(segment))
+
+    def _segments(self) -> List[int]:
+        return sorted(int(name[8:16]) for name in os.listdir(os.path.join(self.directory, 'spool'))
+                      if name.startswith('segment-'))
+
+    def _end(self) -> Tuple[int, int]:
+        with self._lock:
+            return self._segment, self._file.tell()
+
+    def _read(self, sink: _Sink, limit_events: int, limit_bytes: int
+              ) -> Tuple[List[Tuple[Tuple[int, int], Dict[str, Any]]], Tuple[int, int], int]:
+        """
+        Read spooled events from the sink's position
+
+        Returns:
+            ([(position, event)], position after the last event read,
+            bytes read)
+        """
+        events = []
+        size = 0
+        segment, offset = sink.position
+        end_segment, _ = self._end()
+        while len(events) < limit_events and size < limit_bytes:
+            try:
+                f = open(self._spool_path(segment), 'rb')
+            except FileNotFoundError:
+                if segment >= end_segment:
+                    break
+                segment, offset = segment + 1, 0
+                continue
+            with f:
+                f.seek(offset)
+                while len(events) < limit_events and size < limit_bytes:
+                    line = f.readline()
+                    if not line.endswith(b'\n'):
+                        break  # End of segment, or a line still being written
+                    events.append(((segment, offset), json.loads(line)))
+                    offset += len(line)
+                    size += len(line)
+                else:
+                    break
+            if segment >= end_segment:
+                break
+            segment, offset = segment + 1, 0
+        return events, (segment, offset), size
+
+    def _load_cursor(self, name: str) -> Optional[Tuple[int, int]]:
+        try:
+            with open(os.path.join(self.directory, 'cursors', f"{name}.json")) as f:
+                cursor = json.load(f)
+            return cursor['segment'], cursor['offset']
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+    def _commit(self, sink: _Sink, position: Tuple[int, int]) -> None:
+        """
+        Persist the sink's cursor, drop spool segments every sink has
+        passed, then publish the new position (which `flush` waits for)
+        """
+        path = os.path.join(self.directory, 'cursors', f"{sink.backend.name}.json")
+        with open(path + '.tmp', 'w') as f:
+            json.dump({'segment': position[0], 'offset': position[1]}, f)
+            if self.fsync:
+                os.fsync(f.fileno())
+        os.replace(path + '.tmp', path)
+
+        with self._lock:
+            oldest = min([s.position[0] for s in self.sinks.values() if s is not sink] + [position[0]])
+            active = self._segment
+        for segment in self._segments():
+            if segment >= min(oldest, active):
+                break
+            try:
+                os.remove(self._spool_path(segment))
+            except FileNotFoundError:
+                pass
+        with sink.lock:
+            sink.position = position
+            sink.expedited = {at for at in sink.expedited if at >= position}
+
+    # -- Lanes ----------------------------------------------------------------
+
+    def _batch_lane(self, sink: _Sink) -> None:
+        config = sink.config
+        limit_events = min(config.batch_events, sink.backend.max_batch_events)
+        limit_bytes = min(config.batch_bytes, sink.backend.max_batch_bytes)
+        failures = 0
+        waiting_since: Optional[float] = None
+        while True:
+            events, position, size = self._read(sink, limit_events, limit_bytes)
+            with self._lock:
+                stopping = self._stopping
+                if not events:
+                    if stopping:
+                        return
+                    self._appended.wait(1.0)
+                    continue
+                if len(events) < limit_events and size < limit_bytes and not stopping:
+                    # Let the batch fill for up to max_delay
+                    waiting_since = waiting_since or time.monotonic()
+                    remaining = config.max_delay - (time.monotonic() - waiting_since)
+                    if remaining > 0:  # Not re-read on every append: parsing is the cost
+                        self._appended.wait_for(lambda: self._stopping, remaining)
+                        continue
+            waiting_since = None
+
+            with sink.lock:
+                batch = [event for at, event in events if at not in sink.expedited]
+            if batch and not self._deliver(sink, batch):
+                failures += 1
+                sink.stats.failures += 1
+                sink.stats.last_error = sink.backend.last_error
+                if stopping:
+                    return  # Left in the spool for the next start
+                delay = min(config.max_backoff, config.backoff * 2 ** (failures - 1))
+                with self._lock:
+                    self._appended.wait_for(lambda: self._stopping, random.uniform(delay / 2, delay))
+                continue
+            failures = 0
+            if batch:
+                sink.stats.events += len(batch)
+                sink.stats.batches += 1
+                sink.stats.last_success = time.time()
+            self._commit(sink, position)
+
+    def _deliver(self, sink: _Sink, batch: List[Dict[str, Any]]) -> bool:
+        """
+        Send a batch; a rejected batch is split until the rejected events
+        are isolated, and those are dead-lettered
+
+        Returns:
+            False if the sink failed (retry the whole batch later)
+        """
+        try:
+            return sink.backend.send_batch(batch)
+        except RejectedBatchError as e:
+            if len(batch) > 1:
+                middle = len(batch) // 2
+                return self._deliver(sink, batch[:middle]) and self._deliver(sink, batch[middle:])
+            with open(os.path.join(self.directory, 'dead-letter', f"{sink.backend.name}.ndjson"), 'a') as f:
+                f.write(json.dumps({'error': str(e), 'event': batch[0]}, separators=(',', ':')) + '\n')
+            sink.stats.dead_lettered += 1
+            return True
+
+    def _expedited_lane(self, sink: _Sink) -> None:
+        config = sink.config
+        while True:
+            item = sink.expedite.get()
+            if item is None:
+                return
+            position, event = item
+            for attempt in range(config.expedite_attempts):
+                try:
+                    if sink.backend.send_event(event):
+                        with sink.lock:
+                            if position >= sink.position:  # Else the batch lane already sent it
+                                sink.expedited.add(position)
+                        sink.stats.expedited += 1
+                        sink.stats.last_success = time.time()
+                        break
+                except RejectedBatchError:
+                    break  # The batch lane dead-letters it
+                sink.stats.last_error = sink.backend.last_error
+                if attempt + 1 < config.expedite_attempts:
+                    time.sleep(min(config.max_backoff, config.backoff * 2 ** attempt))
+
+    # -- Status ---------------------------------------------------------------
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every sink has sent everything spooled so far
+
+        Returns:
+            False if `timeout` seconds passed first
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        end = self._end()
+        while any(sink.position < end for sink in self.sinks.values()):
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            with self._lock:
+                self._appended.notify_all()
+            time.sleep(0.01)
+        return True
+
+    def health(self) -> Dict[str, Dict[str, Any]]:
+        """Per sink: connectivity, delivery counters and spooled bytes not yet sent"""
+        end_segment, end_offset = self._end()
+        report = {}
+        for name, sink in self.sinks.items():
+            segment, offset = sink.position
+            pending = end_offset - offset if segment == end_segment else \
+                sum(os.path.getsize(self._spool_path(s)) for s in range(segment, end_segment)
+                    if os.path.exists(self._spool_path(s))) - offset + end_offset
+            report[name] = {'healthy': sink.backend.health_check(), 'pending_bytes': pending,
+                            **asdict(sink.stats)}
+        return report
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Send what can be sent within `timeout` seconds and stop; the rest stays spooled"""
+        with self._lock:
+            self._stopping = True
+            self._appended.notify_all()
+        for sink in self.sinks.values():
+            sink.expedite.put(None)
+        deadline = time.monotonic() + timeout
+        for sink in self.sinks.values():
+            for thread in sink.threads:
+                thread.join(max(0.0, deadline - time.monotonic()))
+            sink.backend.close()
+        with self._lock:
+            self._file.close()
+
+
+# =============================================================================
+# Usage Example
+# =============================================================================
+
+if __name__ == '__main__':
+    import tempfile
+
+    # Forward to Splunk and Kafka; audit events come from an AuditStore:
+    #   store.on_append.append(forwarder.forward)
+    forwarder = AuditForwarder(tempfile.mkdtemp(prefix='grid-forward-'), [
+        SplunkBackend('https://splunk.company.com:8088', token='00000000-0000-0000-0000-000000000000'),
+        KafkaBackend('kafka.company.com:9092', topic='grid-audit', partitions=12),
+    ], config=SinkConfig(batch_events=500, max_delay=1.0))
+
+    forwarder.forward({
+        'event': {'id': 'event-001', 'timestamp': '2025-11-27T19:45:31.123Z'},
+        'principal': {'id': 'alice@company.com', 'type': 'human'},
+        'resource': {'id': 'prod-db', 'type': 'data', 'sensitivity': 'critical'},
+        'action': {'operation': 'write'},
+        'decision': {'result': 'deny', 'reason': 'Access denied: requires approval'},
+    })  # A critical deny: also sent at once on the expedited lane
+    for name, status in forwarder.health().items():
+        print(name, status)
+    forwarder.close(timeout=1.0)
@@ -0,0 +1,450 @@
+"""
+GRID Audit: Streaming Rollups
+
+This template demonstrates pre-aggregated audit rollups for compliance
+dashboards. Questions like "denies per resource per hour" or "top
+principals by critical access this month" would otherwise scan every raw
+event on every page load. Instead, counts are kept at ingest time:
+
+- One cell per (time bucket, principal, resource, operation, decision,
+  sensitivity), at minute, hour and day granularity
+- Each cell holds the event count, the latency count and sum, and a
+  fixed-bucket latency histogram (for percentile estimates)
+- Ingest updates minute cells only; hour and day cells are derived from
+  them when a table is first aggregated at that granularity
+- One table per segment: it is saved when the segment seals, loaded at
+  startup and can be rebuilt from the segment's raw events at any time
+- `aggregate()` filters and groups dictionary-encoded cell arrays; it
+  never reads an event
+
+Use this template for:
+- Compliance dashboards and reports over the audit log
+- Any count/latency breakdown that must not scan raw events
+"""
+
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import json
+import math
+import os
+import struct
+import zlib
+import numpy as np
+
+# Assume these are imported from a GRID SDK
+from .audit_cold_tier import NAT, format_timestamps
+
+ROLLUP_MAGIC = b'GRIDRUP1'
+COMPRESSION_LEVEL = 6
+
+# Bucket width in epoch milliseconds, finest first
+GRANULARITIES = {'minute': 60_000, 'hour': 3_600_000, 'day': 86_400_000}
+MINUTE = GRANULARITIES['minute']
+
+# Rollup dimension → event path
+DIMENSIONS = {
+    'principal': ('principal', 'id'),
+    'resource': ('resource', 'id'),
+    'operation': ('action', 'operation'),
+    'decision': ('decision', 'result'),
+    'sensitivity': ('resource', 'sensitivity'),
+}
+
+# Dotted paths a rollup needs, e.g. to project cold segments when rebuilding
+ROLLUP_FIELDS = ['.'.join(path) for path in DIMENSIONS.values()] + ['outcome.latency_ms']
+
+# Histogram bucket upper bounds (inclusive) in milliseconds; one more
+# bucket counts everything slower
+LATENCY_BOUNDS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+# Cell layout: [count, latency count, latency sum, histogram...]
+COUNT, LATENCY_COUNT, LATENCY_SUM, HISTOGRAM = 0, 1, 2, 3
+CELL_SIZE = HISTOGRAM + len(LATENCY_BOUNDS) + 1
+
+Key = Tuple[Any, ...]  # Bucket start, then one value per dimension
+
+
+# =============================================================================
+# Tables
+# =============================================================================
+
+def _value(value: Any) -> Any:
+    """Dimension value as a JSON-stable dictionary key"""
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    return json.dumps(value, sort_keys=True)
+
+
+def dimensions(event: Dict[str, Any]) -> Tuple[Any, ...]:
+    """The rollup dimensions of one event, in `DIMENSIONS` order"""
+    key = []
+    for path in DIMENSIONS.values():
+        value: Any = event
+        for part in path:
+            value = value.get(part) if isinstance(value, dict) else None
+        key.append(_value(value))
+    return tuple(key)
+
+
+def _latency(event: Dict[str, Any]) -> Optional[float]:
+    outcome = event.get('outcome')
+    value = outcome.get('latency_ms') if isinstance(outcome, dict) else None
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+        return None
+    return value
+
+
+@dataclass
+class RollupColumns:
+    """One granularity of a table as arrays, one row per cell"""
+    starts: np.ndarray       # int64 bucket start (epoch ms)
+    codes: np.ndarray        # int32, rows × dimensions, into `values`
+    values: List[List[Any]]  # Per dimension: code → value
+    cells: np.ndarray        # float64, rows × CELL_SIZE
+    _lookup: List[Dict[Any, int]] = field(default_factory=list, repr=False)
+
+    def code(self, dimension: int, value: Any) -> Optional[int]:
+        """The code of `value` in a dimension (None: no cell has it)"""
+        if not self._lookup:
+            self._lookup = [{v: c for c, v in enumerate(values)} for values in self.values]
+        return self._lookup[dimension].get(value)
+
+
+def _group_sum(keys: np.ndarray, cells: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum `cells` rows that share a row of `keys` (int64, rows × k)"""
+    if keys.shape[1] == 0:
+        return keys[:1], cells.sum(axis=0, keepdims=True)
+    # One int64 per row (mixed radix) groups much faster than rows
+    low = keys.min(axis=0)
+    sizes = (keys.max(axis=0) - low + 1).tolist()
+    space = math.prod(sizes)
+    if space >= 2 ** 62:
+        unique, inverse = np.unique(keys, axis=0, return_inverse=True)
+        groups = len(unique)
+    else:
+        combined = np.zeros(len(keys), dtype=np.int64)
+        for i, size in enumerate(sizes):
+            combined = combined * size + (keys[:, i] - low[i])
+        if space <= max(4 * len(keys), 1 << 16):
+            # Small key space: count into it directly, no sort
+            present = np.flatnonzero(np.bincount(combined, minlength=space))
+            inverse = np.searchsorted(present, combined)
+            digits, rest = [], present
+            for size in reversed(sizes):
+                rest, digit = np.divmod(rest, size)
+                digits.append(digit)
+            unique = np.column_stack(digits[::-1]) + low
+        else:
+            _, first, inverse = np.unique(combined, return_index=True, return_inverse=True)
+            unique = keys[first]
+        groups = len(unique)
+    inverse = inverse.ravel()
+    sums = np.column_stack([np.bincount(inverse, weights=cells[:, j], minlength=groups)
+                            for j in range(cells.shape[1])])
+    return unique, sums
+
+
+class RollupTable:
+    """
+    Rollup cells for a set of events
+
+    `add()` updates minute cells in a dictionary; `columns()` returns any
+    granularity as `RollupColumns`, cached until the next `add()`. Tables
+    read with `load()` are read-only. Not thread-safe; the store guards
+    tables with its lock.
+    """
+
+    def __init__(self):
+        self.events = 0
+        self._cells: Dict[Key, List[float]] = {}  # Minute cells
+        self._columns: Dict[str, RollupColumns] = {}
+        self._read_only = False
+
+    def add(self, event: Dict[str, Any], millis: int) -> None:
+        """Count one event with timestamp `millis` (epoch ms)"""
+        if self._read_only:
+            raise ValueError("Rollup table was loaded from a file and is read-only")
+        key = (millis - millis % MINUTE,) + dimensions(event)
+        cell = self._cells.get(key)
+        if cell is None:
+            cell = self._cells[key] = [0] * CELL_SIZE
+        cell[COUNT] += 1
+        latency = _latency(event)
+        if latency is not None:
+            cell[LATENCY_COUNT] += 1
+            cell[LATENCY_SUM] += latency
+            cell[HISTOGRAM + bisect_left(LATENCY_BOUNDS, latency)] += 1
+        self.events += 1
+        if self._columns:
+            self._columns.clear()
+
+    @classmethod
+    def from_events(cls, events: Iterable[Tuple[int, Dict[str, Any]]]) -> 'RollupTable':
+        """Build a table from (epoch ms, event) pairs, e.g. a raw segment"""
+        table = cls()
+        for millis, event in events:
+            table.add(event, millis)
+        return table
+
+    def columns(self, granularity: str) -> RollupColumns:
+        """The cells at one granularity as arrays"""
+        columns = self._columns.get(granularity)
+        if columns is not None:
+            return columns
+        if granularity == 'minute':
+            columns = self._encode()
+        else:
+            # Coarser buckets: sum minute cells by (bucket, dimensions)
+            minute = self.columns('minute')
+            width = GRANULARITIES[granularity]
+            keys = np.column_stack([minute.starts - minute.starts % width,
+                                    minute.codes.astype(np.int64)])
+            unique, cells = _group_sum(keys, minute.cells)
+            columns = RollupColumns(unique[:, 0].copy(), unique[:, 1:].astype(np.int32),
+                                    minute.values, cells)
+        self._columns[granularity] = columns
+        return columns
+
+    def _encode(self) -> RollupColumns:
+        keys = list(self._cells)
+        codes = np.zeros((len(keys), len(DIMENSIONS)), dtype=np.int32)
+        values = []
+        for i in range(len(DIMENSIONS)):
+            lookup: Dict[Any, int] = {}
+            codes[:, i] = [lookup.setdefault(key[i + 1], len(lookup)) for key in keys]
+            values.append(list(lookup))
+        starts = np.array([key[0] for key in keys], dtype=np.int64)
+        cells = np.array(list(self._cells.values()), dtype=np.float64).reshape(-1, CELL_SIZE)
+        return RollupColumns(starts, codes, values, cells)
+
+    def save(self, path: str) -> int:
+        """
+        Write the minute cells atomically
+
+        Layout: magic, footer length (<Q), zlib-compressed JSON footer
+        (event count, dimension dictionaries, array sizes), then the
+        zlib-compressed starts, codes and cells arrays.
+
+        Returns:
+            The file size in bytes
+        """
+        columns = self.columns('minute')
+        arrays = [zlib.compress(array.tobytes(), COMPRESSION_LEVEL)
+                  for array in (columns.starts, columns.codes, columns.cells)]
+        footer = zlib.compress(json.dumps({
+            'events': self.events,
+            'rows': len(columns.starts),
+            'dimensions': list(DIMENSIONS),
+            'latency_bounds': list(LATENCY_BOUNDS),
+            'values': columns.values,
+            'arrays': [len(a) for a in arrays],
+        }, separators=(',', ':')).encode())
+        data = b''.join([ROLLUP_MAGIC, struct.pack('<Q', len(footer)), footer] + arrays)
+        with open(f"{path}.tmp", 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(f"{path}.tmp", path)
+        return len(data)
+
+    @classmethod
+    def load(cls, path: str) -> 'RollupTable':
+        """
+        Read a table written by `save()`
+
+        Raises:
+            ValueError: If the file is not a rollup table of this layout
+        """
+        with open(path, 'rb') as f:
+            data = f.read()
+        if not data.startswith(ROLLUP_MAGIC):
+            raise ValueError(f"Not a rollup file: {path}")
+        try:
+            offset = len(ROLLUP_MAGIC) + 8
+            (length,) = struct.unpack_from('<Q', data, len(ROLLUP_MAGIC))
+            footer = json.loads(zlib.decompress(data[offset:offset + length]))
+            offset += length
+            arrays = []
+            for size in footer['arrays']:
+                arrays.append(zlib.decompress(data[offset:offset + size]))
+                offset += size
+        except (struct.error, zlib.error, KeyError) as e:
+            raise ValueError(f"Damaged rollup file: {path}") from e
+        if footer.get('dimensions') != list(DIMENSIONS) or \
+                footer.get('latency_bounds') != list(LATENCY_BOUNDS):
+            raise ValueError(f"Rollup file has another layout: {path}")
+        rows = footer['rows']
+        table = cls()
+        table.events = footer['events']
+        table._read_only = True
+        table._columns['minute'] = RollupColumns(
+            np.frombuffer(arrays[0], dtype=np.int64),
+            np.frombuffer(arrays[1], dtype=np.int32).reshape(rows, len(DIMENSIONS)),
+            footer['values'],
+            np.frombuffer(arrays[2], dtype=np.float64).reshape(rows, CELL_SIZE))
+        return table
+
+
+# =============================================================================
+# Aggregation
+# =============================================================================
+
+GROUPS = ('bucket',) + tuple(DIMENSIONS)
+ORDERS = ('count', 'bucket')
+
+
+def choose_granularity(time_range: Tuple[Optional[int], Optional[int]]) -> str:
+    """The coarsest granularity whose buckets fall exactly on the range bounds"""
+    for name in sorted(GRANULARITIES, key=GRANULARITIES.get, reverse=True):
+        width = GRANULARITIES[name]
+        if all(bound is None or bound % width == 0 for bound in time_range):
+            return name
+    return 'minute'
+
+
+def _percentile(histogram: Sequence[int], total: int, q: float) -> Optional[float]:
+    """Upper bound of the histogram bucket holding quantile `q` (None: slowest bucket)"""
+    rank = q * total
+    seen = 0
+    for bound, count in zip(LATENCY_BOUNDS, histogram):
+        seen += count
+        if seen >= rank:
+            return bound
+    return None
+
+
+def _summary(cell: np.ndarray) -> Dict[str, Any]:
+    count = int(cell[LATENCY_COUNT])
+    histogram = [int(c) for c in cell[HISTOGRAM:]]
+    return {
+        'count': count,
+        'sum': float(cell[LATENCY_SUM]),
+        'mean': float(cell[LATENCY_SUM]) / count if count else None,
+        'p50': _percentile(histogram, count, 0.50) if count else None,
+        'p95': _percentile(histogram, count, 0.95) if count else None,
+        'p99': _percentile(histogram, count, 0.99) if count else None,
+        'histogram': histogram,
+    }
+
+
+def aggregate(tables: Sequence[RollupTable], time_range: Tuple[Optional[int], Optional[int]],
+              granularity: Optional[str] = None, filters: Optional[Dict[str, Any]] = None,
+              group_by: Sequence[str] = (), order: Optional[str] = None,
+              limit: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Answer a count/latency breakdown from rollup tables
+
+    The range is half-open, [from, to), and applied at bucket granularity:
+    every bucket that overlaps it is counted whole. The response reports
+    the range that was actually covered.
+
+    Args:
+        tables: Tables to aggregate together (e.g. one per segment)
+        time_range: (from, to) in epoch ms; None leaves a side open
+        granularity: 'minute', 'hour' or 'day' (None: the coarsest that
+            fits the range exactly)
+        filters: Dimension → value; cells must match every one
+        group_by: 'bucket' and/or dimensions (empty: one total)
+        order: 'count' (descending) or 'bucket' (None: 'bucket' when
+            grouping by bucket, else 'count')
+        limit: Return at most this many groups (top-K by `order`)
+
+    Returns:
+        Dictionary with the granularity, the covered range, the latency
+        histogram bounds and one entry per group
+
+    Raises:
+        ValueError: On an unknown granularity, dimension or order
+    """
+    if granularity is None:
+        granularity = choose_granularity(time_range)
+    if granularity not in GRANULARITIES:
+        raise ValueError(f"Invalid granularity: {granularity}")
+    filters = filters or {}
+    for name in list(filters) + list(group_by):
+        if name not in GROUPS or (name == 'bucket' and name in filters):
+            raise ValueError(f"Invalid rollup dimension: {name}")
+    if order is None:
+        order = 'bucket' if 'bucket' in group_by else 'count'
+    if order not in ORDERS or (order == 'bucket' and 'bucket' not in group_by):
+        raise ValueError(f"Invalid order: {order}")
+
+    width = GRANULARITIES[granularity]
+    low, high = time_range
+    first = None if low is None else low - low % width
+    names = list(DIMENSIONS)
+    wanted = [(names.index(name), _value(value)) for name, value in filters.items()]
+    positions = [names.index(name) for name in group_by if name != 'bucket']
+    by_bucket = 'bucket' in group_by
+
+    groups: Dict[Key, np.ndarray] = {}
+    for table in tables:
+        if not table.events:
+            continue
+        columns = table.columns(granularity)
+        mask = np.ones(len(columns.starts), dtype=bool)
+        if first is not None:
+            mask &= columns.starts >= first
+        if high is not None:
+            mask &= columns.starts < high
+        for i, value in wanted:
+            code = columns.code(i, value)
+            if code is None:
+                mask[:] = False
+                break
+            mask &= columns.codes[:, i] == code
+        if not mask.any():
+            continue
+        if mask.all():
+            starts, codes, cells = columns.starts, columns.codes, columns.cells
+        else:
+            starts, codes, cells = columns.starts[mask], columns.codes[mask], columns.cells[mask]
+        # Reduce within the table on codes, then merge tables on values
+        keys = codes[:, positions].astype(np.int64)
+        if by_bucket:
+            keys = np.column_stack([starts, keys])
+        unique, sums = _group_sum(keys, cells)
+        for row, cell in zip(unique.tolist(), sums):
+            labels = row[1:] if by_bucket else row
+            group = tuple(columns.values[p][c] for p, c in zip(positions, labels))
+            if by_bucket:
+                group = (row[0],) + group
+            total = groups.get(group)
+            if total is None:
+                groups[group] = cell
+            else:
+                total += cell
+
+    if order == 'bucket':
+        ranked = sorted(groups.items(), key=lambda item: (item[0][0], -item[1][COUNT], str(item[0])))
+    else:
+        ranked = sorted(groups.items(), key=lambda item: (-item[1][COUNT], str(item[0])))
+    if limit is not None:
+        ranked = ranked[:limit]
+
+    labels = [name for name in group_by if name != 'bucket']
+    buckets = format_timestamps(np.array([group[0] for group, _ in ranked], dtype=np.int64)) \
+        if by_bucket and ranked else []
+    results = []
+    for i, (group, cell) in enumerate(ranked):
+        row: Dict[str, Any] = {}
+        if by_bucket:
+            row['bucket'] = buckets[i]
+            group = group[1:]
+        row.update(zip(labels, group))
+        row['count'] = int(cell[COUNT])
+        row['latency_ms'] = _summary(cell)
+        results.append(row)
+
+    # Covered range: the requested one widened to bucket boundaries
+    last = None if high is None else -(-high // width) * width
+    span = format_timestamps(np.array([NAT if first is None else first,
+                                       NAT if last is None else last], dtype=np.int64))
+    return {
+        'granularity': granularity,
+        'from_timestamp': span[0],
+        'to_timestamp': span[1],
+        'latency_bounds_ms': list(LATENCY_BOUNDS),
+        'groups': results,
+    }
@@ -0,0 +1,529 @@
+"""
+GRID Audit: Full-Text Search Index
+
+This template demonstrates the inverted index behind §7.3 "full-text
+search (on details)". Without it, every search is a linear scan over each
+event's reason, parameters and context. Instead, one index is built per
+segment when the segment seals and is stored next to it:
+
+- Text fields (`decision.reason`, `action.parameters`, `context`) are
+  tokenized into lowercase word terms with positions
+- Filter fields (principal, resource, operation, decision, teams,
+  federation trace id) are indexed as exact keyword terms, so filters
+  are posting-list intersections as well
+- Posting lists are delta-encoded document ids in LEB128 varints; term
+  positions are stored separately and read only by phrase queries
+- Event timestamps are stored delta-encoded, so time ranges are applied
+  to postings without reading the segment
+
+Queries support terms, "quoted phrases", AND (also implicit), OR, NOT and
+parentheses, e.g. `jql AND denied`, `"project = P3" OR confluence`.
+
+Use this template for:
+- §7.3 full-text search over sealed audit segments
+- Narrowing any audit query to candidate rows before reading events
+"""
+
+from dataclasses import dataclass
+from itertools import chain
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import json
+import mmap
+import os
+import re
+import struct
+import zlib
+import numpy as np
+
+# Assume these are imported from a GRID SDK
+from .policy_replay import event_timestamp, parse_timestamps
+
+
+# =============================================================================
+# Tokenizing
+# =============================================================================
+
+INDEX_MAGIC = b'GRIDIDX1'
+SEPARATOR = '\x1f'
+# ASCII punctuation and whitespace split words; the separator stays a token
+_SPLIT = {c: ' ' for c in range(128) if not (chr(c).isalnum() or chr(c) == '_')}
+_SPLIT[ord(SEPARATOR)] = f' {SEPARATOR} '
+POSITION_GAP = 100  # Between values, so phrases never span two of them
+
+# Fields whose text is searchable
+TEXT_FIELDS = (('decision', 'reason'), ('action', 'parameters'), ('context',))
+
+# Fields indexed as exact keyword terms (`<field>=<value>`)
+KEYWORD_FIELDS = {
+    'principal.id': ('principal', 'id'),
+    'principal.attributes.role': ('principal', 'attributes', 'role'),
+    'principal.attributes.teams': ('principal', 'attributes', 'teams'),
+    'resource.id': ('resource', 'id'),
+    'resource.type': ('resource', 'type'),
+    'resource.sensitivity': ('resource', 'sensitivity'),
+    'action.operation': ('action', 'operation'),
+    'decision.result': ('decision', 'result'),
+    'event.trace_id': ('event', 'trace_id'),
+}
+
+
+def tokenize(text: str) -> List[str]:
+    return text.lower().translate(_SPLIT).split()
+
+
+def keyword(field: str, value: Any) -> str:
+    """Term for an exact field value (`=` never occurs in word terms)"""
+    return f"{field}={value}"
+
+
+def _lookup(event: Any, path: Sequence[str]) -> Any:
+    try:
+        for key in path:
+            event = event[key]
+    except (KeyError, TypeError, IndexError):
+        return None
+    return event
+
+
+def _collect(value: Any, out: List[str]) -> None:
+    """Append the keys and leaf values of a JSON value, as text"""
+    if isinstance(value, dict):
+        for key, item in value.items():
+            out.append(key)
+            _collect(item, out)
+    elif isinstance(value, list):
+        for item in value:
+            _collect(item, out)
+    elif value is not None and not isinstance(value, bool):
+        out.append(str(value))
+
+
+def event_terms(event: Dict[str, Any]) -> Dict[str, List[int]]:
+    """Term → positions for one event; keyword terms have no positions"""
+    texts: List[str] = []
+    for path in TEXT_FIELDS:
+        _collect(_lookup(event, path), texts)
+    terms: Dict[str, List[int]] = {}
+    position = 0
+    # One pass over all values; the separator opens a gap between values
+    for token in tokenize(SEPARATOR.join(texts)):
+        if token == SEPARATOR:
+            position += POSITION_GAP
+            continue
+        places = terms.get(token)
+        if places is None:
+            terms[token] = [position]
+        else:
+            places.append(position)
+        position += 1
+    for field, path in KEYWORD_FIELDS.items():
+        value = _lookup(event, path)
+        for item in (value if isinstance(value, list) else [value]):
+            if item is not None:
+                terms[keyword(field, item)] = []
+    return terms
+
+
+# =============================================================================
+# Posting Lists
+# =============================================================================
+
+def encode_varints(values: np.ndarray) -> bytes:
+    """LEB128-encode non-negative integers"""
+    values = np.asarray(values, dtype=np.uint64)
+    if values.size == 0:
+        return b''
+    lengths = np.ones(values.size, dtype=np.int64)
+    rest = values >> np.uint64(7)
+    while rest.any():
+        lengths += rest > 0
+        rest >>= np.uint64(7)
+    starts = np.cumsum(lengths) - lengths
+    out = np.empty(int(lengths.sum()), dtype=np.uint8)
+    for k in range(int(lengths.max())):
+        selected = lengths > k
+        byte = (values[selected] >> np.uint64(7 * k)) & np.uint64(0x7F)
+        more = (lengths[selected] > k + 1).astype(np.uint64) << np.uint64(7)
+        out[starts[selected] + k] = byte | more
+    return out.tobytes()
+
+
+def decode_varints(data: bytes) -> np.ndarray:
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if raw.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    last = raw < 0x80
+    group = np.concatenate(([0], np.cumsum(last)[:-1]))
+    first = np.flatnonzero(np.concatenate(([True], last[:-1])))
+    shift = (np.arange(raw.size) - first[group]) * 7
+    parts = (raw & 0x7F).astype(np.int64) << shift
+    return np.bincount(group, weights=parts).astype(np.int64)  # Exact below 2**53
+
+
+def _grouped_cumsum(deltas: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    """Cumulative sums that restart at each group boundary"""
+    totals = np.cumsum(deltas)
+    starts = np.cumsum(counts) - counts
+    offsets = np.repeat(totals[starts] - deltas[starts], counts)
+    return totals - offsets
+
+
+# =============================================================================
+# Segment Index
+# =============================================================================
+
+@dataclass
+class IndexSummary:
+    """What an index build produced"""
+    documents: int
+    terms: int
+    bytes: int
+
+
+def write_index(path: str, events: Sequence[Dict[str, Any]]) -> IndexSummary:
+    """
+    Build and write the index of one segment (atomically, via a temp file)
+
+    Document ids are the events' positions in the segment.
+    """
+    docs: Dict[str, List[int]] = {}
+    positions: Dict[str, List[List[int]]] = {}
+    for doc, event in enumerate(events):
+        for term, places in event_terms(event).items():
+            docs.setdefault(term, []).append(doc)
+            if places:
+                positions.setdefault(term, []).append(places)
+    millis = parse_timestamps([event_timestamp(e) for e in events]).astype(np.int64)
+
+    directory: Dict[str, List[int]] = {}
+    tmp = f"{path}.tmp"
+    with open(tmp, 'wb') as f:
+        f.write(INDEX_MAGIC)
+        for term in sorted(docs):
+            # [document frequency, offset, doc id bytes, position bytes]
+            ids = np.array(docs[term], dtype=np.int64)
+            postings = encode_varints(np.diff(ids, prepend=0))
+            places = b''
+            if term in positions:  # Word terms: positions of every doc, in doc order
+                counts = np.fromiter(map(len, positions[term]), dtype=np.int64)
+                flat = np.fromiter(chain.from_iterable(positions[term]), dtype=np.int64)
+                deltas = np.diff(flat, prepend=0)
+                starts = np.cumsum(counts) - counts
+                deltas[starts] = flat[starts]  # Restart at each document
+                places = encode_varints(counts) + encode_varints(deltas)
+            directory[term] = [len(ids), f.tell(), len(postings), len(places)]
+            f.write(postings + places)
+
+        timestamps_offset = f.tell()
+        f.write(zlib.compress(np.diff(millis, prepend=0).tobytes()))
+        footer = zlib.compress(json.dumps({
+            'documents': len(events),
+            'timestamps': [timestamps_offset, f.tell() - timestamps_offset],
+            'terms': directory,
+        }, separators=(',', ':')).encode())
+        f.write(footer)
+        f.write(struct.pack('<Q', len(footer)) + INDEX_MAGIC)
+        f.flush()
+        os.fsync(f.fileno())
+        size = f.tell()
+    os.replace(tmp, path)
+    return IndexSummary(documents=len(events), terms=len(directory), bytes=size)
+
+
+class SegmentIndex:
+    """Reader for one segment's index; postings are decoded on demand"""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        data = self._data
+        if data[:len(INDEX_MAGIC)] != INDEX_MAGIC or data[-len(INDEX_MAGIC):] != INDEX_MAGIC:
+            raise ValueError(f"Not an audit search index: {path}")
+        tail = len(data) - len(INDEX_MAGIC) - 8
+        length = struct.unpack('<Q', data[tail:tail + 8])[0]
+        footer = json.loads(zlib.decompress(data[tail - length:tail]))
+        self.documents: int = footer['documents']
+        self._terms: Dict[str, List[int]] = footer['terms']
+        self._timestamps_at = footer['timestamps']
+        self._timestamps: Optional[np.ndarray] = None
+        self.postings_read = 0  # Posting lists decoded, for tests and tuning
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._terms
+
+    def docs(self, term: str) -> np.ndarray:
+        """Sorted ids of the documents containing a term"""
+        entry = self._terms.get(term)
+        if entry is None:
+            return np.zeros(0, dtype=np.int64)
+        self.postings_read += 1
+        _, offset, length, _ = entry
+        return np.cumsum(decode_varints(self._data[offset:offset + length]))
+
+    def positions(self, term: str) -> Dict[int, np.ndarray]:
+        """Document id → sorted positions of a term"""
+        entry = self._terms.get(term)
+        if entry is None or entry[3] == 0:
+            return {}
+        count, offset, length, places_length = entry
+        docs = self.docs(term)
+        start = offset + length
+        values = decode_varints(self._data[start:start + places_length])
+        counts, flat = values[:count], values[count:]
+        places = _grouped_cumsum(flat, counts)
+        ends = np.cumsum(counts)
+        return {int(doc): places[end - n:end] for doc, n, end in zip(docs, counts, ends)}
+
+    def all(self) -> np.ndarray:
+        return np.arange(self.documents, dtype=np.int64)
+
+    def timestamps(self) -> np.ndarray:
+        """Epoch milliseconds of every document"""
+        if self._timestamps is None:
+            offset, length = self._timestamps_at
+            deltas = np.frombuffer(zlib.decompress(self._data[offset:offset + length]), dtype=np.int64)
+            self._timestamps = np.cumsum(deltas)
+        return self._timestamps
+
+    def close(self) -> None:
+        self._data.close()
+
+
+# =============================================================================
+# Queries
+# =============================================================================
+
+class Expression:
+    """A parsed search query"""
+
+    def docs(self, index: SegmentIndex) -> np.ndarray:
+        raise NotImplementedError
+
+    def matches(self, terms: Dict[str, List[int]]) -> bool:
+        """Evaluate against one event's `event_terms()` (unindexed rows)"""
+        raise NotImplementedError
+
+
+@dataclass
+class Term(Expression):
+    term: str
+
+    def docs(self, index: SegmentIndex) -> np.ndarray:
+        return index.docs(self.term)
+
+    def matches(self, terms: Dict[str, List[int]]) -> bool:
+        return self.term in terms
+
+
+@dataclass
+class Phrase(Expression):
+    terms: List[str]
+
+    def docs(self, index: SegmentIndex) -> np.ndarray:
+        candidates = And([Term(t) for t in self.terms]).docs(index)
+        if candidates.size == 0:
+            return candidates
+        places = [index.positions(term) for term in self.terms]
+        hits = [doc for doc in candidates.tolist()
+                if self._adjacent([p[doc] for p in places])]
+        return np.array(hits, dtype=np.int64)
+
+    def matches(self, terms: Dict[str, List[int]]) -> bool:
+        if not all(t in terms for t in self.terms):
+            return False
+        return self._adjacent([np.array(terms[t]) for t in self.terms])
+
+    @staticmethod
+    def _adjacent(places: List[np.ndarray]) -> bool:
+        starts = places[0]
+        for offset, following in enumerate(places[1:], start=1):
+            starts = starts[np.isin(starts + offset, following)]
+        return starts.size > 0
+
+
+@dataclass
+class And(Expression):
+    parts: List[Expression]
+
+    def docs(self, index: SegmentIndex) -> np.ndarray:
+        # Most selective first, so later intersections work on short lists
+        positives = [p for p in self.parts if not isinstance(p, Not)]
+        ordered = sorted(positives, key=lambda p: _estimate(p, index))
+        result = ordered[0].docs(index) if ordered else index.all()
+        for part in ordered[1:]:
+            if result.size == 0:
+                break
+            result = np.intersect1d(result, part.docs(index), assume_unique=True)
+        for part in self.parts:
+            if isinstance(part, Not) and result.size:
+                result = np.setdiff1d(result, part.part.docs(index), assume_unique=True)
+        return result
+
+    def matches(self, terms: Dict[str, List[int]]) -> bool:
+        return all(part.matches(terms) for part in self.parts)
+
+
+@dataclass
+class Or(Expression):
+    parts: List[Expression]
+
+    def docs(self, index: SegmentIndex) -> np.ndarray:
+        result = np.zeros(0, dtype=np.int64)
+        for part in self.parts:
+            result = np.union1d(result, part.docs(index))
+        return result
+
+    def matches(self, terms: Dict[str, List[int]]) -> bool:
+        return any(part.matches(terms) for part in self.parts)
+
+
+@dataclass
+class Not(Expression):
+    part: Expression
+
+    def docs(self, index: SegmentIndex) -> np.ndarray:
+        return np.setdiff1d(index.all(), self.part.docs(index), assume_unique=True)
+
+    def matches(self, terms: Dict[str, List[int]]) -> bool:
+        return not self.part.matches(terms)
+
+
+def _estimate(expression: Expression, index: SegmentIndex) -> int:
+    """Upper bound on matches, from document frequencies alone"""
+    if isinstance(expression, Term):
+        entry = index._terms.get(expression.term)
+        return entry[0] if entry else 0
+    if isinstance(expression, (Phrase, And)):
+        parts = [Term(t) for t in expression.terms] if isinstance(expression, Phrase) else \
+            [p for p in expression.parts if not isinstance(p, Not)]
+        return min((_estimate(p, index) for p in parts), default=index.documents)
+    if isinstance(expression, Or):
+        return sum(_estimate(p, index) for p in expression.parts)
+    return index.documents
+
+
+_QUERY_TOKEN = re.compile(r'"[^"]*"|\(|\)|[^\s()"]+')
+
+
+def parse_query(text: str) -> Expression:
+    """
+    Parse a search query
+
+    Words are ANDed unless joined by OR; NOT binds tightest. A word that
+    tokenizes to several terms (e.g. `PROJ-12`) is matched as a phrase.
+
+    Raises:
+        ValueError: If the query is empty or malformed
+    """
+    tokens = _QUERY_TOKEN.findall(text)
+    position = 0
+
+    def peek() -> Optional[str]:
+        return tokens[position] if position < len(tokens) else None
+
+    def take() -> str:
+        nonlocal position
+        position += 1
+        return tokens[position - 1]
+
+    def parse_or() -> Expression:
+        parts = [parse_and()]
+        while peek() == 'OR':
+            take()
+            parts.append(parse_and())
+        return parts[0] if len(parts) == 1 else Or(parts)
+
+    def parse_and() -> Expression:
+        parts = [parse_unary()]
+        while peek() not in (None, 'OR', ')'):
+            if peek() == 'AND':
+                take()
+            parts.append(parse_unary())
+        parts = [p for p in parts if p is not None]
+        if not parts:
+            raise ValueError(f"Query has no searchable terms: {text!r}")
+        return parts[0] if len(parts) == 1 else And(parts)
+
+    def parse_unary() -> Optional[Expression]:
+        token = peek()
+        if token is None or token in ('AND', 'OR', ')'):
+            raise ValueError(f"Unexpected {token or 'end of query'} in {text!r}")
+        take()
+        if token == 'NOT':
+            part = parse_unary()
+            if part is None:
+                raise ValueError(f"NOT without terms in {text!r}")
+            return Not(part)
+        if token == '(':
+            inner = parse_or()
+            if take_if(')') is None:
+                raise ValueError(f"Unbalanced parentheses in {text!r}")
+            return inner
+        words = tokenize(token.strip('"'))
+        if not words:
+            return None  # Punctuation only
+        return Term(words[0]) if len(words) == 1 else Phrase(words)
+
+    def take_if(expected: str) -> Optional[str]:
+        return take() if peek() == expected else None
+
+    expression = parse_or()
+    if peek() is not None:
+        raise ValueError(f"Unexpected {peek()} in {text!r}")
+    return expression
+
+
+def search(index: SegmentIndex, expression: Optional[Expression] = None,
+           keywords: Iterable[Tuple[str, Any]] = (),
+           time_range: Tuple[Optional[int], Optional[int]] = (None, None)) -> np.ndarray:
+    """
+    Documents of a segment that match a query and exact filters
+
+    Args:
+        index: The segment's index
+        expression: Parsed search query (None: no text condition)
+        keywords: (field, value) pairs from KEYWORD_FIELDS that must hold
+        time_range: Inclusive epoch-millisecond bounds
+
+    Returns:
+        Sorted document ids (positions in the segment)
+    """
+    parts: List[Expression] = [Term(keyword(f, v)) for f, v in keywords]
+    if expression is not None:
+        parts.append(expression)
+    docs = And(parts).docs(index) if parts else index.all()
+
+    low, high = time_range
+    if docs.size and (low is not None or high is not None):
+        millis = index.timestamps()[docs]
+        keep = np.ones(docs.size, dtype=bool)
+        if low is not None:
+            keep &= millis >= low
+        if high is not None:
+            keep &= millis <= high
+        docs = docs[keep]
+    return docs
+
+
+# =============================================================================
+# Usage Example
+# =============================================================================
+
+if __name__ == '__main__':
+    events = [
+        {'event': {'id': 'evt-1', 'timestamp': '2025-11-27T09:00:00Z'},
+         'principal': {'id': 'alice@company.com'},
+         'action': {'operation': 'execute', 'parameters': {'jql': 'project = PROJ-123'}},
+         'decision': {'result': 'deny', 'reason': 'Access denied: outside business hours'}},
+        {'event': {'id': 'evt-2', 'timestamp': '2025-11-27T10:00:00Z'},
+         'principal': {'id': 'bob@company.com'},
+         'action': {'operation': 'read', 'parameters': {'query': 'SELECT * FROM customers'}},
+         'decision': {'result': 'allow', 'reason': 'Role-based access'}},
+    ]
+    summary = write_index('/tmp/audit-demo.idx', events)
+    index = SegmentIndex('/tmp/audit-demo.idx')
+    print(summary)
+    print(search(index, parse_query('jql AND denied')))                       # [0]
+    print(search(index, parse_query('"business hours" OR customers'),
+                 keywords=[('principal.id', 'bob@company.com')]))             # [1]
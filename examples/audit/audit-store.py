@@ -0,0 +1,783 @@
+"""
+GRID Audit: Tiered Audit Store
+
+This template demonstrates an insert-only audit log (spec §7.4) with a hot
+and a cold tier behind one `/v1/audit` query API (spec §7.3):
+
+- Hot tier: events are appended to the active segment as newline-delimited
+  JSON and flushed per event. A segment is sealed once it holds
+  `max_segment_events` events or is `max_segment_age` seconds old; sealed
+  segments are never written again
+- Compaction job: `compact()` rewrites sealed hot segments into columnar
+  cold segments (see audit-cold-tier.py) and removes the row JSON
+- Queries: `query()` plans across both tiers. Segments outside the time
+  range are skipped using the manifest, cold segments get predicate
+  pushdown and column projection, hot segments are scanned row by row.
+  Results are merged by timestamp, so callers never see the tiers
+- Search: each sealed segment gets an inverted index (see audit-search.py),
+  built in the background; a search reads only the rows its postings,
+  filters and time range leave
+- Traces: a `trace_id` query (every event of one federated request) is
+  answered from index postings for sealed segments and from a trace id
+  map for the active one
+- Rollups: every event is counted into per-segment rollups (see
+  audit-rollups.py) as it is appended; `aggregate()` and
+  `/v1/audit/aggregate` answer breakdowns from them without reading events
+
+Use this template for:
+- Self-hosted audit storage for a GRID server
+- Serving `/v1/audit` over a full retention period
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+import heapq
+import json
+import os
+import re
+import threading
+import time
+import numpy as np
+
+# Assume these are imported from a GRID SDK
+from .canonical_policy_engine import parse_timestamp
+from .policy_replay import event_timestamp, parse_timestamps
+from .audit_cold_tier import ColdSegment, Predicate, ScanStats, project, write_segment
+from .audit_search import Expression, SegmentIndex, event_terms, parse_query, search, write_index
+from .audit_rollups import GRANULARITIES, GROUPS, ORDERS, ROLLUP_FIELDS, RollupTable, aggregate
+
+AUDIT_PATH = '/api/v1/audit'
+AGGREGATE_PATH = '/api/v1/audit/aggregate'
+MANIFEST = 'manifest.json'
+DEFAULT_LIMIT = 1000
+MAX_LIMIT = 10000
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+DURATION = re.compile(r'^(\d+)([smhd])$')
+UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+# =============================================================================
+# Queries
+# =============================================================================
+
+def _millis(timestamp: Optional[str]) -> Optional[int]:
+    if timestamp is None:
+        return None
+    parsed = parse_timestamp(timestamp)
+    if parsed is None:
+        raise ValueError(f"Invalid timestamp: {timestamp}")
+    return (parsed - EPOCH) // timedelta(milliseconds=1)
+
+
+def _time_range(from_timestamp: Optional[str], to_timestamp: Optional[str],
+                last: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    low = _millis(from_timestamp)
+    if last is not None:
+        match = DURATION.match(last)
+        if match is None or from_timestamp is not None:
+            raise ValueError(f"Invalid last: {last} (e.g. '24h'; not with from_timestamp)")
+        seconds = int(match.group(1)) * UNITS[match.group(2)]
+        low = int(time.time() * 1000) - seconds * 1000
+    return low, _millis(to_timestamp)
+
+
+def _lookup(event: Dict[str, Any], *path: str) -> Any:
+    for key in path:
+        event = event.get(key) if isinstance(event, dict) else None
+    return event
+
+
+# Equality filter → column
+_EQUALS = {
+    'principal_id': 'principal.id',
+    'role': 'principal.attributes.role',
+    'resource_id': 'resource.id',
+    'resource_type': 'resource.type',
+    'sensitivity': 'resource.sensitivity',
+    'operation': 'action.operation',
+    'decision': 'decision.result',
+}
+
+
+@dataclass
+class AuditQuery:
+    """A §7.3 audit query; every filter that is set must hold"""
+    from_timestamp: Optional[str] = None
+    to_timestamp: Optional[str] = None
+    principal_id: Optional[str] = None
+    role: Optional[str] = None
+    team: Optional[str] = None
+    resource_id: Optional[str] = None
+    resource_type: Optional[str] = None
+    sensitivity: Optional[str] = None
+    operation: Optional[str] = None
+    decision: Optional[str] = None
+    trace_id: Optional[str] = None        # Federation trace id (event.trace_id)
+    min_latency_ms: Optional[float] = None
+    last: Optional[str] = None            # Relative time range, e.g. '15m', '24h', '7d'
+    text: Optional[str] = None            # Search query (see audit-search.py)
+    fields: Optional[List[str]] = None    # Dotted paths to return (None: whole events)
+    limit: int = DEFAULT_LIMIT
+    order: str = 'asc'                    # By timestamp
+
+    def __post_init__(self):
+        if self.order not in ('asc', 'desc'):
+            raise ValueError(f"Invalid order: {self.order}")
+        if not 0 < self.limit <= MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+        self.time_range = _time_range(self.from_timestamp, self.to_timestamp, self.last)
+        self.expression: Optional[Expression] = \
+            parse_query(self.text) if self.text is not None else None
+
+    @classmethod
+    def from_params(cls, params: Dict[str, List[str]]) -> 'AuditQuery':
+        """
+        Build a query from `/v1/audit` query parameters
+
+        Besides the OpenAPI parameters (`from_timestamp`, `to_timestamp`,
+        `principal_id`, `resource_id`, `decision`) this accepts `role`,
+        `last`, `team`, `resource_type`, `sensitivity`, `operation`,
+        `trace_id`, `min_latency_ms`, `q` (search query), `fields` (comma-separated),
+        `limit` and `order`.
+        """
+        values = {name: items[-1] for name, items in params.items()}
+        kwargs: Dict[str, Any] = {}
+        for name, value in values.items():
+            if name == 'q':
+                kwargs['text'] = value
+            elif name == 'fields':
+                kwargs['fields'] = [f for f in value.split(',') if f]
+            elif name == 'limit':
+                kwargs['limit'] = int(value)
+            elif name == 'min_latency_ms':
+                kwargs['min_latency_ms'] = float(value)
+            elif name in cls.__dataclass_fields__ and name not in ('text', 'fields'):
+                kwargs[name] = value
+            else:
+                raise ValueError(f"Unknown query parameter: {name}")
+        return cls(**kwargs)
+
+    def keywords(self) -> List[Tuple[str, Any]]:
+        """The filters that a search index can answer from postings"""
+        pairs = [(column, getattr(self, name)) for name, column in _EQUALS.items()
+                 if getattr(self, name) is not None]
+        if self.team is not None:
+            pairs.append(('principal.attributes.teams', self.team))
+        if self.trace_id is not None:
+            pairs.append(('event.trace_id', self.trace_id))
+        return pairs
+
+    @property
+    def indexed(self) -> bool:
+        """Whether segments are narrowed through their search index first"""
+        return self.expression is not None or self.trace_id is not None
+
+    def unindexed_matches(self, event: Dict[str, Any]) -> bool:
+        """The filters that neither postings nor cold-segment predicates answered"""
+        if self.trace_id is not None and _lookup(event, 'event', 'trace_id') != self.trace_id:
+            return False
+        return self.expression is None or self.expression.matches(event_terms(event))
+
+    def predicates(self) -> List[Predicate]:
+        """The filters that cold segments can push down"""
+        predicates = []
+        low, high = self.time_range
+        if low is not None or high is not None:
+            predicates.append(Predicate('event.timestamp', 'range', (low, high)))
+        for name, column in _EQUALS.items():
+            value = getattr(self, name)
+            if value is not None:
+                predicates.append(Predicate(column, 'in', [value]))
+        if self.team is not None:
+            predicates.append(Predicate('principal.attributes.teams', 'contains', [self.team]))
+        if self.min_latency_ms is not None:
+            predicates.append(Predicate('outcome.latency_ms', 'range', (self.min_latency_ms, None)))
+        return predicates
+
+    def matches(self, event: Dict[str, Any], millis: int) -> bool:
+        """Row-by-row check, used for hot segments"""
+        low, high = self.time_range
+        if (low is not None and millis < low) or (high is not None and millis > high):
+            return False
+        for name, column in _EQUALS.items():
+            value = getattr(self, name)
+            if value is not None and _lookup(event, *column.split('.')) != value:
+                return False
+        if self.team is not None and \
+                self.team not in (_lookup(event, 'principal', 'attributes', 'teams') or ()):
+            return False
+        if self.min_latency_ms is not None:
+            latency = _lookup(event, 'outcome', 'latency_ms')
+            if not isinstance(latency, (int, float)) or latency < self.min_latency_ms:
+                return False
+        return self.unindexed_matches(event)
+
+
+# Aggregation filter → rollup dimension
+_DIMENSIONS = {
+    'principal_id': 'principal',
+    'resource_id': 'resource',
+    'operation': 'operation',
+    'decision': 'decision',
+    'sensitivity': 'sensitivity',
+}
+
+
+@dataclass
+class AggregateQuery:
+    """A breakdown answered from rollups, e.g. denies per resource per hour"""
+    from_timestamp: Optional[str] = None  # Inclusive
+    to_timestamp: Optional[str] = None    # Exclusive; both widened to whole buckets
+    last: Optional[str] = None
+    granularity: Optional[str] = None     # 'minute', 'hour', 'day' (None: fit the range)
+    principal_id: Optional[str] = None
+    resource_id: Optional[str] = None
+    operation: Optional[str] = None
+    decision: Optional[str] = None
+    sensitivity: Optional[str] = None
+    group_by: List[str] = field(default_factory=list)  # 'bucket' and/or dimensions
+    order: Optional[str] = None           # 'count' (descending) or 'bucket'
+    limit: int = DEFAULT_LIMIT
+
+    def __post_init__(self):
+        if self.granularity is not None and self.granularity not in GRANULARITIES:
+            raise ValueError(f"Invalid granularity: {self.granularity}")
+        for name in self.group_by:
+            if name not in GROUPS:
+                raise ValueError(f"Invalid group_by: {name} (one of {', '.join(GROUPS)})")
+        if self.order is not None and self.order not in ORDERS:
+            raise ValueError(f"Invalid order: {self.order}")
+        if not 0 < self.limit <= MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+        self.time_range = _time_range(self.from_timestamp, self.to_timestamp, self.last)
+
+    @classmethod
+    def from_params(cls, params: Dict[str, List[str]]) -> 'AggregateQuery':
+        """Build an aggregation from `/v1/audit/aggregate` query parameters"""
+        kwargs: Dict[str, Any] = {}
+        for name, items in params.items():
+            value = items[-1]
+            if name == 'group_by':
+                kwargs['group_by'] = [g for g in value.split(',') if g]
+            elif name == 'limit':
+                kwargs['limit'] = int(value)
+            elif name in cls.__dataclass_fields__:
+                kwargs[name] = value
+            else:
+                raise ValueError(f"Unknown query parameter: {name}")
+        return cls(**kwargs)
+
+    def filters(self) -> Dict[str, str]:
+        return {dimension: getattr(self, name) for name, dimension in _DIMENSIONS.items()
+                if getattr(self, name) is not None}
+
+
+# =============================================================================
+# Segments
+# =============================================================================
+
+@dataclass
+class SegmentInfo:
+    """One segment in the manifest"""
+    id: int
+    tier: str                              # 'hot' or 'cold'
+    file: str                              # Relative to the store directory
+    events: int = 0
+    min_timestamp: Optional[int] = None    # Epoch milliseconds
+    max_timestamp: Optional[int] = None
+    sealed: bool = False
+    created_at: float = 0.0
+    bytes: int = 0
+    index: Optional[str] = None            # Search index file, once built
+    rollup: Optional[str] = None           # Rollup file, once written
+
+    def overlaps(self, low: Optional[int], high: Optional[int]) -> bool:
+        return (low is None or self.max_timestamp >= low) and \
+            (high is None or self.min_timestamp <= high)
+
+
+@dataclass
+class StoreStats:
+    """Work done by queries"""
+    queries: int = 0
+    segments_scanned: Dict[str, int] = field(default_factory=lambda: {'hot': 0, 'cold': 0})
+    segments_skipped: int = 0
+    compactions: int = 0
+
+
+class AuditStore:
+    """
+    Insert-only audit store with a hot (row JSON) and a cold (columnar) tier
+
+    Callbacks in `on_seal` are called with (segment, events) whenever a
+    segment is sealed, and callbacks in `on_append` with (event, epoch
+    milliseconds) after each append, outside the store lock (so they may
+    append events themselves).
+    """
+
+    def __init__(self, directory: str, max_segment_events: int = 100_000,
+                 max_segment_age: float = 3600.0, clock: Callable[[], float] = time.time,
+                 full_text_index: bool = True, rollups: bool = True):
+        """
+        Open (or create) a store
+
+        Args:
+            directory: Holds the manifest and both tiers
+            max_segment_events: Seal the active segment at this many events
+            max_segment_age: Seal the active segment after this many seconds
+            clock: Time source for segment age
+            full_text_index: Build a search index for each sealed segment
+                (in a background thread; until it exists, searches of that
+                segment scan it)
+            rollups: Count events into rollups as they are appended, for
+                `aggregate()`; sealed segments' rollups are written to
+                `rollups/` and rebuilt from the segment if missing
+        """
+        if max_segment_events <= 0:
+            raise ValueError("max_segment_events must be positive")
+        self.directory = directory
+        self.max_segment_events = max_segment_events
+        self.max_segment_age = max_segment_age
+        self.clock = clock
+        self.full_text_index = full_text_index
+        self.rollups = rollups
+        self.on_seal: List[Callable[[SegmentInfo, List[Dict[str, Any]]], None]] = []
+        self.on_append: List[Callable[[Dict[str, Any], int], None]] = []
+        self.stats = StoreStats()
+        self.cold_stats = ScanStats()
+        self._lock = threading.RLock()
+        self._cold: Dict[int, ColdSegment] = {}
+        self._indexes: Dict[int, SegmentIndex] = {}
+        self._background = ThreadPoolExecutor(max_workers=1) if full_text_index or rollups else None
+        self._pending: List[Future] = []
+        self._rollups: Dict[int, RollupTable] = {}  # Sealed segment id → its rollups
+        self._active_rollup = RollupTable()
+
+        for tier in ('hot', 'cold', 'index', 'rollups'):
+            os.makedirs(os.path.join(directory, tier), exist_ok=True)
+        self._segments: List[SegmentInfo] = []
+        self._next_id = 1
+        manifest = os.path.join(directory, MANIFEST)
+        if os.path.exists(manifest):
+            with open(manifest) as f:
+                state = json.load(f)
+            self._next_id = state['next_id']
+            self._segments = [SegmentInfo(**s) for s in state['segments']]
+
+        if rollups:
+            for segment in self._segments:
+                if segment.sealed:
+                    self._load_rollup(segment)
+
+        active = [s for s in self._segments if not s.sealed]
+        self._active: Optional[SegmentInfo] = active[0] if active else None
+        self._active_events: List[Dict[str, Any]] = []
+        self._active_millis: List[int] = []
+        self._active_traces: Dict[str, List[int]] = {}  # Trace id → positions in the active segment
+        self._file = None
+        if self._active is not None:
+            # Reopen after a restart: the file is the source of truth
+            events = self._read_hot(self._active)
+            self._active.events = 0
+            self._active.min_timestamp = self._active.max_timestamp = None
+            for event in events:
+                self._track(event, _millis(event_timestamp(event)))
+            self._file = open(self._path(self._active), 'a')
+
+    # -- Writing --------------------------------------------------------------
+
+    def append(self, event: Dict[str, Any]) -> SegmentInfo:
+        """
+        Append one event to the active hot segment
+
+        Returns:
+            The segment the event was written to
+        """
+        millis = _millis(event_timestamp(event))
+        if millis is None:
+            raise ValueError("Audit event has no timestamp")
+        line = json.dumps(event, separators=(',', ':')) + '\n'
+        with self._lock:
+            if self._active is not None and \
+                    self.clock() - self._active.created_at >= self.max_segment_age:
+                self.seal()
+            if self._active is None:
+                self._open_segment()
+            self._file.write(line)
+            self._file.flush()
+            segment = self._active
+            self._track(event, millis)
+            if segment.events >= self.max_segment_events:
+                self.seal()
+        for callback in self.on_append:
+            callback(event, millis)
+        return segment
+
+    def _open_segment(self) -> None:
+        segment = SegmentInfo(id=self._next_id, tier='hot',
+                              file=os.path.join('hot', f"segment-{self._next_id:08d}.ndjson"),
+                              created_at=self.clock())
+        self._next_id += 1
+        self._segments.append(segment)
+        self._active = segment
+        self._active_events, self._active_millis, self._active_traces = [], [], {}
+        self._active_rollup = RollupTable()
+        self._file = open(self._path(segment), 'a')
+        self._save_manifest()
+
+    def _track(self, event: Dict[str, Any], millis: int) -> None:
+        segment = self._active
+        trace_id = _lookup(event, 'event', 'trace_id')
+        if trace_id is not None:
+            self._active_traces.setdefault(trace_id, []).append(len(self._active_events))
+        self._active_events.append(event)
+        self._active_millis.append(millis)
+        if self.rollups:
+            self._active_rollup.add(event, millis)
+        segment.events += 1
+        segment.min_timestamp = millis if segment.min_timestamp is None else min(segment.min_timestamp, millis)
+        segment.max_timestamp = millis if segment.max_timestamp is None else max(segment.max_timestamp, millis)
+
+    def seal(self) -> Optional[SegmentInfo]:
+        """Seal the active segment (if it has events); returns it"""
+        with self._lock:
+            segment = self._active
+            if segment is None or segment.events == 0:
+                return None
+            self._file.close()
+            self._file = None
+            segment.sealed = True
+            segment.bytes = os.path.getsize(self._path(segment))
+            events = self._active_events
+            self._active, self._active_events, self._active_millis, self._active_traces = None, [], [], {}
+            if self.rollups:
+                table = self._rollups[segment.id] = self._active_rollup
+                self._active_rollup = RollupTable()
+            self._save_manifest()
+        if self.full_text_index:
+            self._pending.append(self._background.submit(self._build_index, segment, events))
+        if self.rollups:
+            self._pending.append(self._background.submit(self._save_rollup, segment, table))
+        for callback in self.on_seal:
+            callback(segment, events)
+        return segment
+
+    def _build_index(self, segment: SegmentInfo, events: List[Dict[str, Any]]) -> None:
+        index_file = os.path.join('index', f"segment-{segment.id:08d}.idx")
+        write_index(os.path.join(self.directory, index_file), events)
+        with self._lock:
+            segment.index = index_file
+            self._save_manifest()
+
+    def _save_rollup(self, segment: SegmentInfo, table: RollupTable) -> None:
+        rollup_file = os.path.join('rollups', f"segment-{segment.id:08d}.rollup")
+        table.save(os.path.join(self.directory, rollup_file))
+        for granularity in GRANULARITIES:  # Derive hour and day cells off the query path
+            table.columns(granularity)
+        with self._lock:
+            segment.rollup = rollup_file
+            self._save_manifest()
+
+    def _load_rollup(self, segment: SegmentInfo) -> None:
+        if segment.rollup is not None:
+            try:
+                self._rollups[segment.id] = RollupTable.load(os.path.join(self.directory, segment.rollup))
+                return
+            except (OSError, ValueError):
+                pass  # Missing, damaged or of an older layout: rebuild it
+        self.rebuild_rollups(segment)
+
+    def rebuild_rollups(self, segment: Optional[SegmentInfo] = None) -> int:
+        """
+        Recompute rollups from raw events
+
+        Args:
+            segment: The sealed segment to rebuild (None: every segment,
+                including the active one)
+
+        Returns:
+            The number of events counted
+        """
+        if not self.rollups:
+            raise ValueError("Rollups are disabled for this store")
+        if segment is None:
+            with self._lock:
+                sealed = [s for s in self._segments if s.sealed]
+                self._active_rollup = RollupTable.from_events(
+                    zip(self._active_millis, self._active_events))
+                counted = self._active_rollup.events
+            return counted + sum(self.rebuild_rollups(s) for s in sealed)
+        table = RollupTable.from_events(self._raw_events(segment))
+        with self._lock:
+            self._rollups[segment.id] = table
+        self._save_rollup(segment, table)
+        return table.events
+
+    def wait_for_indexes(self) -> None:
+        """Block until every sealed segment's index and rollup file is written"""
+        while self._pending:
+            self._pending.pop(0).result()
+
+    def compact(self) -> List[SegmentInfo]:
+        """
+        Compaction job: rewrite sealed hot segments as cold segments
+
+        Each segment is written to its cold file first, then switched in the
+        manifest, and only then is the hot file removed, so a crash at any
+        point leaves every event readable.
+
+        Returns:
+            The segments that were compacted
+        """
+        self.wait_for_indexes()
+        with self._lock:
+            pending = [s for s in self._segments if s.tier == 'hot' and s.sealed]
+        compacted = []
+        for segment in pending:
+            hot_path = self._path(segment)
+            events = self._read_hot(segment)
+            if self.full_text_index and segment.index is None:  # E.g. crashed before indexing
+                self._build_index(segment, events)
+            cold_file = os.path.join('cold', f"segment-{segment.id:08d}.col")
+            summary = write_segment(os.path.join(self.directory, cold_file), events)
+            with self._lock:
+                segment.tier, segment.file, segment.bytes = 'cold', cold_file, summary.bytes
+                self._save_manifest()
+            os.remove(hot_path)
+            self.stats.compactions += 1
+            compacted.append(segment)
+        return compacted
+
+    # -- Reading --------------------------------------------------------------
+
+    def segments(self, tier: Optional[str] = None) -> List[SegmentInfo]:
+        with self._lock:
+            return [s for s in self._segments if tier is None or s.tier == tier]
+
+    def query(self, query: AuditQuery) -> List[Dict[str, Any]]:
+        """
+        Answer a query across both tiers
+
+        Segments are visited in timestamp order (reversed for `desc`), and
+        the scan stops once `limit` results are held that no later segment
+        could displace.
+        """
+        low, high = query.time_range
+        descending = query.order == 'desc'
+        with self._lock:
+            segments = [s for s in self._segments if s.events]
+            if query.trace_id is not None:
+                active = [(self._active_millis[i], self._active_events[i])
+                          for i in self._active_traces.get(query.trace_id, ())]
+            else:
+                active = list(zip(self._active_millis, self._active_events))
+
+        candidates = [s for s in segments if s.overlaps(low, high)]
+        self.stats.queries += 1
+        self.stats.segments_skipped += len(segments) - len(candidates)
+        candidates.sort(key=(lambda s: -s.max_timestamp) if descending else (lambda s: s.min_timestamp))
+
+        best: List[Tuple[int, int, Dict[str, Any]]] = []  # Heap of the current top `limit`
+        sequence = 0
+        for segment in candidates:
+            if len(best) == query.limit:
+                worst = -best[0][0] if not descending else best[0][0]
+                if (not descending and segment.min_timestamp > worst) or \
+                        (descending and segment.max_timestamp < worst):
+                    break
+            self.stats.segments_scanned[segment.tier] += 1
+            for millis, event in self._scan(segment, query, active):
+                sequence += 1
+                # Keep the `limit` smallest (asc) or largest (desc); ties by log order
+                key = (-millis, -sequence) if not descending else (millis, -sequence)
+                if len(best) < query.limit:
+                    heapq.heappush(best, (*key, event))
+                elif key > best[0][:2]:
+                    heapq.heapreplace(best, (*key, event))
+
+        ordered = sorted(best, key=lambda item: item[:2], reverse=True)
+        return [event for *_, event in ordered]
+
+    def _scan(self, segment: SegmentInfo, query: AuditQuery,
+              active: List[Tuple[int, Dict[str, Any]]]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        rows = None
+        if query.indexed and segment.index is not None:
+            # Postings narrow the segment to candidate rows; only those are read
+            rows = search(self._segment_index(segment), query.expression,
+                          query.keywords(), query.time_range)
+            if rows.size == 0:
+                return
+        if segment.tier == 'cold':
+            yield from self._scan_cold(segment, query, rows)
+            return
+        if segment.sealed:
+            try:
+                events = self._read_hot(segment, rows)
+            except FileNotFoundError:  # Compacted since the query started
+                yield from self._scan_cold(segment, query, rows)
+                return
+            millis = parse_timestamps([event_timestamp(e) for e in events]).astype(np.int64).tolist()
+            candidates = zip(millis, events)
+        else:
+            candidates = iter(active)
+        for value, event in candidates:
+            if query.matches(event, value):
+                yield value, (project(event, query.fields) if query.fields else event)
+
+    def _scan_cold(self, segment: SegmentInfo, query: AuditQuery,
+                   rows: Optional[np.ndarray]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        reader = self._cold_segment(segment)
+        if not query.indexed or rows is not None:
+            yield from reader.scan(query.predicates(), query.fields, rows)
+            return
+        # Unindexed search or trace lookup needs whole events; project after filtering
+        for millis, event in reader.scan(query.predicates()):
+            if query.unindexed_matches(event):
+                yield millis, (project(event, query.fields) if query.fields else event)
+
+    def _segment_index(self, segment: SegmentInfo) -> SegmentIndex:
+        index = self._indexes.get(segment.id)
+        if index is None:
+            index = self._indexes[segment.id] = SegmentIndex(os.path.join(self.directory, segment.index))
+        return index
+
+    def _cold_segment(self, segment: SegmentInfo) -> ColdSegment:
+        reader = self._cold.get(segment.id)
+        if reader is None:
+            reader = self._cold[segment.id] = ColdSegment(self._path(segment))
+            reader.stats = self.cold_stats  # One tally for the whole tier
+        return reader
+
+    def aggregate(self, query: AggregateQuery) -> Dict[str, Any]:
+        """
+        Answer a breakdown from rollups (see audit-rollups.py `aggregate()`)
+
+        Covers every appended event, including the active segment's.
+        """
+        if not self.rollups:
+            raise ValueError("Rollups are disabled for this store")
+        with self._lock:
+            return aggregate(list(self._rollups.values()) + [self._active_rollup],
+                             query.time_range, query.granularity, query.filters(),
+                             query.group_by, query.order, query.limit)
+
+    def _raw_events(self, segment: SegmentInfo) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        """(epoch ms, event) for every event of a sealed segment"""
+        if segment.tier == 'hot':
+            try:
+                events = self._read_hot(segment)
+            except FileNotFoundError:  # Compacted meanwhile
+                pass
+            else:
+                millis = parse_timestamps([event_timestamp(e) for e in events]).astype(np.int64)
+                return zip(millis.tolist(), events)
+        return self._cold_segment(segment).scan(fields=ROLLUP_FIELDS)
+
+    def _read_hot(self, segment: SegmentInfo,
+                  rows: Optional[np.ndarray] = None) -> List[Dict[str, Any]]:
+        with open(self._path(segment)) as f:
+            lines = [line for line in f if line.strip()]
+        if rows is not None:
+            lines = [lines[i] for i in rows.tolist()]
+        return [json.loads(line) for line in lines]
+
+    def _path(self, segment: SegmentInfo) -> str:
+        return os.path.join(self.directory, segment.file)
+
+    def _save_manifest(self) -> None:
+        path = os.path.join(self.directory, MANIFEST)
+        state = {'next_id': self._next_id, 'segments': [asdict(s) for s in self._segments]}
+        with open(f"{path}.tmp", 'w') as f:
+            json.dump(state, f, indent=1)
+        os.replace(f"{path}.tmp", path)
+
+    def close(self) -> None:
+        self.wait_for_indexes()
+        if self._background is not None:
+            self._background.shutdown()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            for index in self._indexes.values():
+                index.close()
+            self._indexes.clear()
+
+
+# =============================================================================
+# /v1/audit API
+# =============================================================================
+
+def serve(store: AuditStore, host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    """Serve `GET /api/v1/audit` and `/api/v1/audit/aggregate` in a background thread"""
+    httpd = ThreadingHTTPServer((host, port), _handler(store))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def _handler(store: AuditStore):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep-alive
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path == AGGREGATE_PATH and store.rollups:
+                try:
+                    return self._send(200, store.aggregate(AggregateQuery.from_params(parse_qs(url.query))))
+                except (ValueError, TypeError) as e:
+                    return self._send(400, {'error': f"Invalid aggregation: {e}"})
+            if url.path != AUDIT_PATH:
+                return self._send(404, {'error': 'Not found'})
+            try:
+                query = AuditQuery.from_params(parse_qs(url.query))
+            except (ValueError, TypeError) as e:
+                return self._send(400, {'error': f"Invalid query: {e}"})
+            self._send(200, store.query(query))
+
+        def _send(self, status: int, body: Any):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+# =============================================================================
+# Usage Example
+# =============================================================================
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serve /v1/audit from a tiered audit store')
+    parser.add_argument('--directory', required=True)
+    parser.add_argument('--port', type=int, default=8090)
+    parser.add_argument('--load', help='Append events from a newline-delimited JSON file')
+    parser.add_argument('--compact-every', type=float, default=300.0, help='Seconds between compactions')
+    args = parser.parse_args()
+
+    store = AuditStore(args.directory)
+    if args.load:
+        with open(args.load) as f:
+            for line in f:
+                if line.strip():
+                    store.append(json.loads(line))
+        store.seal()
+
+    httpd = serve(store, port=args.port)
+    print(f"listening on {httpd.server_address[1]}", flush=True)
+    # e.g. curl 'localhost:8090/api/v1/audit?min_latency_ms=1000&fields=event.id,outcome.latency_ms'
+    #      curl 'localhost:8090/api/v1/audit/aggregate?decision=deny&granularity=hour&group_by=bucket,resource'
+    while True:
+        store.compact()
+        time.sleep(args.compact_every)
@@ -0,0 +1,716 @@
+"""
+GRID Resource Catalog: Indexed Registry
+
+This template demonstrates a resource catalog (spec §2.2 resources, the
+`/resources` endpoints of schemas/openapi.yaml) that stays fast with
+hundreds of thousands of endpoints, tools and gRPC methods:
+
+- Secondary indexes on type, sensitivity, owner and managers: sorted
+  posting lists of resource ids per value, so a filtered listing reads
+  only the smallest matching list
+- Stable cursor pagination: pages are ordered by resource id and a
+  cursor resumes after the last id it returned, so resources added or
+  removed between pages never make a listing skip or repeat the others
+- Bulk registration from newline-delimited JSON, validated completely
+  and then applied as one transaction (all or nothing, one revision)
+- A change feed: every transaction bumps the catalog revision, and
+  adapters holding a `resource_registry` copy fetch (or long-poll for)
+  the resources changed since their revision instead of reloading
+
+Use this template for:
+- Central resource registries behind `GET/POST /api/v1/resources`
+- Loading resource inventories generated from API descriptions
+- Keeping adapter registries in sync with the catalog (CatalogMirror)
+"""
+
+from bisect import bisect_left, bisect_right, insort
+from dataclasses import asdict, dataclass, field, fields
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, quote, urlsplit
+from contextlib import contextmanager
+import base64
+import gc
+import hashlib
+import json
+import threading
+
+# Assume these are imported from a GRID SDK
+from .http_adapter_template import Resource
+from .federation_client import ConnectionPool, FederationError
+
+
+RESOURCES_PATH = '/api/v1/resources'
+BULK_PATH = f"{RESOURCES_PATH}/bulk"
+CHANGES_PATH = f"{RESOURCES_PATH}/changes"
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+# schemas/resource.schema.json
+RESOURCE_TYPES = ('tool', 'data', 'service', 'device')
+SENSITIVITIES = ('low', 'medium', 'high', 'critical')
+
+# Indexed fields; `managers` holds a list, so a resource is posted under each manager
+INDEXED_FIELDS = ('type', 'sensitivity', 'owner', 'managers')
+
+# Listing filter → indexed field
+FILTERS = {
+    'type': 'type',
+    'sensitivity': 'sensitivity',
+    'owner': 'owner',
+    'manager': 'managers',
+}
+
+# Above this many changed ids in one transaction, posting lists are
+# rebuilt by merging instead of updated one id at a time
+_MERGE_THRESHOLD = 32
+
+
+class CatalogError(Exception):
+    """A catalog change was rejected; nothing was applied"""
+
+    def __init__(self, message: str, errors: Optional[List[Dict[str, Any]]] = None):
+        super().__init__(message)
+        self.errors = errors or []
+
+
+class RevisionConflict(CatalogError):
+    """The catalog changed since the revision the caller expected"""
+
+
+@dataclass
+class Page:
+    """One page of a listing"""
+    resources: List[Resource]
+    next_cursor: Optional[str]  # None: last page
+    revision: int
+
+
+@dataclass
+class ChangeSet:
+    """Resources changed after a revision"""
+    revision: int
+    upserts: List[Resource] = field(default_factory=list)
+    removed: List[str] = field(default_factory=list)
+    reset: bool = False  # History does not reach back: reload everything
+
+
+@dataclass
+class TransactionResult:
+    """Outcome of a bulk registration"""
+    revision: int
+    upserted: int = 0
+    deleted: int = 0
+    unchanged: int = 0
+
+
+# =============================================================================
+# Validation
+# =============================================================================
+
+_RESOURCE_FIELDS = {f.name for f in fields(Resource)}
+
+
+def parse_resource(data: Any) -> Resource:
+    """
+    Build a Resource from its JSON form
+
+    Raises:
+        ValueError: If required fields are missing, a field is unknown,
+            `type` or `sensitivity` is not one of the schema's values, or a
+            capability declaration is malformed
+    """
+    if not isinstance(data, dict):
+        raise ValueError("Resource must be a JSON object")
+    if not (data.get('id') and data.get('type') and data.get('name') and data.get('sensitivity')):
+        missing = [name for name in ('id', 'type', 'name', 'sensitivity') if not data.get(name)]
+        raise ValueError(f"Missing field(s): {', '.join(missing)}")
+    unknown = data.keys() - _RESOURCE_FIELDS
+    if unknown:
+        raise ValueError(f"Unknown field(s): {', '.join(sorted(unknown))}")
+    if data['type'] not in RESOURCE_TYPES:
+        raise ValueError(f"Invalid type: {data['type']!r}")
+    if data['sensitivity'] not in SENSITIVITIES:
+        raise ValueError(f"Invalid sensitivity: {data['sensitivity']!r}")
+    managers = data.get('managers')
+    if managers is not None and not (type(managers) is list and
+                                     all(type(m) is str for m in managers)):
+        raise ValueError("managers must be a list of strings")
+    capabilities = data.get('capabilities')
+    if capabilities is not None and not (type(capabilities) is list and all(
+            type(c) is dict and type(c.get('name')) is str and c.get('sensitivity_level') in SENSITIVITIES
+            for c in capabilities)):
+        raise ValueError("capabilities must be a list of objects with a name and a sensitivity_level")
+    return Resource(**data)
+
+
+def parse_ndjson(lines: Iterable[str]) -> Tuple[Dict[str, Resource], Set[str]]:
+    """
+    Parse bulk registration lines
+
+    Each line is a resource (an upsert), `{"op": "upsert", "resource": {...}}`
+    or `{"op": "delete", "id": "..."}`. Later lines for the same id win.
+
+    Returns:
+        (upserts by id, ids to delete)
+
+    Raises:
+        CatalogError: Listing every invalid line (1-based line numbers)
+    """
+    upserts: Dict[str, Resource] = {}
+    deletes: Set[str] = set()
+    errors = []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+            op = entry.pop('op', 'upsert') if isinstance(entry, dict) else 'upsert'
+            if op == 'upsert':
+                resource = parse_resource(entry.get('resource', entry) if isinstance(entry, dict) else entry)
+                upserts[resource.id] = resource
+                deletes.discard(resource.id)
+            elif op == 'delete':
+                if not isinstance(entry.get('id'), str):
+                    raise ValueError("delete needs an id")
+                deletes.add(entry['id'])
+                upserts.pop(entry['id'], None)
+            else:
+                raise ValueError(f"Unknown op: {op!r}")
+        except (ValueError, TypeError) as e:  # json.JSONDecodeError is a ValueError
+            errors.append({'line': number, 'error': str(e)})
+    if errors:
+        raise CatalogError(f"{len(errors)} invalid line(s); nothing was applied", errors)
+    return upserts, deletes
+
+
+@contextmanager
+def _gc_paused() -> Iterator[None]:
+    """
+    Pause the cyclic garbage collector
+
+    A bulk load allocates hundreds of thousands of long-lived objects,
+    and every few hundred allocations the collector would scan them (and
+    the catalog) again; none of them can be garbage yet.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _index_values(resource: Resource, name: str) -> List[str]:
+    value = getattr(resource, name)
+    if value is None:
+        return []
+    return list(dict.fromkeys(value)) if type(value) is list else [value]
+
+
+# =============================================================================
+# Resource Catalog
+# =============================================================================
+
+class ResourceCatalog:
+    """
+    Resources by id, with sorted secondary indexes and a change feed
+
+    All reads and writes take one lock, so a listing page or change set
+    always reflects whole transactions.
+
+    Args:
+        max_history: Transactions remembered for the change feed
+        max_changes: Change sets larger than this tell the caller to
+            reload (`reset`) instead of listing every resource
+    """
+
+    def __init__(self, max_history: int = 10_000, max_changes: int = 10_000):
+        self.revision = 0
+        self.max_history = max_history
+        self.max_changes = max_changes
+        self._resources: Dict[str, Resource] = {}
+        self._ids: List[str] = []  # Every id, sorted
+        self._indexes: Dict[str, Dict[str, List[str]]] = {name: {} for name in INDEXED_FIELDS}
+        self._history: List[Tuple[int, Set[str]]] = []  # (revision, changed ids)
+        self._changed = threading.Condition()
+
+    def __len__(self) -> int:
+        return len(self._resources)
+
+    def get(self, resource_id: str) -> Optional[Resource]:
+        with self._changed:
+            return self._resources.get(resource_id)
+
+    def register(self, resource: Resource) -> int:
+        """Add or replace one resource; returns the catalog revision"""
+        parse_resource(asdict(resource))
+        return self.apply({resource.id: resource}, set()).revision
+
+    def register_many(self, resources: Iterable[Resource],
+                      expected_revision: Optional[int] = None) -> TransactionResult:
+        """Add or replace resources in one transaction (e.g. from an adapter's register_resource)"""
+        upserts = {}
+        for resource in resources:
+            parse_resource(asdict(resource))
+            upserts[resource.id] = resource
+        return self.apply(upserts, set(), expected_revision)
+
+    def bulk_register(self, lines: Iterable[str],
+                      expected_revision: Optional[int] = None) -> TransactionResult:
+        """
+        Apply newline-delimited JSON changes as one transaction
+
+        Args:
+            lines: Lines as described in `parse_ndjson`
+            expected_revision: Apply only if the catalog is still at this
+                revision (optimistic concurrency)
+
+        Raises:
+            CatalogError: If any line is invalid (nothing is applied)
+            RevisionConflict: If the catalog moved past `expected_revision`
+        """
+        with _gc_paused():
+            upserts, deletes = parse_ndjson(lines)
+            return self.apply(upserts, deletes, expected_revision)
+
+    def apply(self, upserts: Dict[str, Resource], deletes: Set[str],
+              expected_revision: Optional[int] = None) -> TransactionResult:
+        """Apply validated changes atomically; one new revision if anything changed"""
+        with self._changed:
+            if expected_revision is not None and expected_revision != self.revision:
+                raise RevisionConflict(
+                    f"Catalog is at revision {self.revision}, not {expected_revision}")
+            requested = len(upserts) + len(deletes)
+            upserts = {rid: r for rid, r in upserts.items() if self._resources.get(rid) != r}
+            deletes = {rid for rid in deletes if rid in self._resources}
+            result = TransactionResult(revision=self.revision,
+                                       unchanged=requested - len(upserts) - len(deletes))
+            if not upserts and not deletes:
+                return result
+
+            added: Dict[Tuple[str, str], List[str]] = {}
+            removed: Dict[Tuple[str, str], Set[str]] = {}
+            for rid in list(upserts) + list(deletes):
+                old, new = self._resources.get(rid), upserts.get(rid)
+                if old is None:  # New resource: only additions
+                    for name in INDEXED_FIELDS:
+                        for value in _index_values(new, name):
+                            added.setdefault((name, value), []).append(rid)
+                    continue
+                for name in INDEXED_FIELDS:
+                    before = _index_values(old, name)
+                    after = _index_values(new, name) if new else []
+                    for value in before:
+                        if value not in after:
+                            removed.setdefault((name, value), set()).add(rid)
+                    for value in after:
+                        if value not in before:
+                            added.setdefault((name, value), []).append(rid)
+
+            new_ids = [rid for rid in upserts if rid not in self._resources]
+            self._ids = _update_postings(self._ids, new_ids, deletes)
+            for (name, value) in set(added) | set(removed):
+                index = self._indexes[name]
+                postings = _update_postings(index.get(value, []), added.get((name, value), []),
+                                            removed.get((name, value), set()))
+                if postings:
+                    index[value] = postings
+                else:
+                    index.pop(value, None)
+            self._resources.update(upserts)
+            for rid in deletes:
+                del self._resources[rid]
+
+            self.revision += 1
+            self._history.append((self.revision, set(upserts) | deletes))
+            if len(self._history) > self.max_history:
+                del self._history[:len(self._history) - self.max_history]
+            self._changed.notify_all()
+            result.revision = self.revision
+            result.upserted, result.deleted = len(upserts), len(deletes)
+            return result
+
+    # -------------------------------------------------------------------------
+    # Listing
+    # -------------------------------------------------------------------------
+
+    def list(self, limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None,
+             **filters: Optional[str]) -> Page:
+        """
+        One page of resources in id order
+
+        Args:
+            limit: Page size (1 to MAX_LIMIT)
+            cursor: `next_cursor` of the previous page
+            **filters: Any of `type`, `sensitivity`, `owner`, `manager`
+
+        Raises:
+            ValueError: For an invalid limit, filter or cursor
+        """
+        if not 0 < limit <= MAX_LIMIT:
+            raise ValueError(f"limit must be between 1 and {MAX_LIMIT}")
+        unknown = set(filters) - set(FILTERS)
+        if unknown:
+            raise ValueError(f"Unknown filter(s): {', '.join(sorted(unknown))}")
+        wanted = {FILTERS[name]: value for name, value in filters.items() if value is not None}
+        digest = _filter_digest(wanted)
+        after = _decode_cursor(cursor, digest) if cursor else None
+
+        with self._changed:
+            postings = [self._indexes[name].get(value, []) for name, value in wanted.items()]
+            matches = _intersect(postings or [self._ids], after)
+            ids = [rid for rid, _ in zip(matches, range(limit + 1))]
+            page = [self._resources[rid] for rid in ids[:limit]]
+            next_cursor = _encode_cursor(ids[limit - 1], digest) if len(ids) > limit else None
+            return Page(resources=page, next_cursor=next_cursor, revision=self.revision)
+
+    def count(self, **filters: Optional[str]) -> int:
+        """Number of resources matching one filter (an index lookup), or all"""
+        wanted = {FILTERS[name]: value for name, value in filters.items() if value is not None}
+        if len(wanted) > 1:
+            raise ValueError("count takes at most one filter")
+        with self._changed:
+            if not wanted:
+                return len(self._ids)
+            (name, value), = wanted.items()
+            return len(self._indexes[name].get(value, []))
+
+    # -------------------------------------------------------------------------
+    # Change Feed
+    # -------------------------------------------------------------------------
+
+    def changes(self, since: int) -> ChangeSet:
+        """
+        Resources upserted or removed after revision `since`
+
+        Several changes to one resource are collapsed into its current state.
+        If the history no longer reaches back to `since`, or more than
+        `max_changes` resources changed, the change set says `reset` and
+        the caller reloads through `list`.
+        """
+        with self._changed:
+            return self._changes(since)
+
+    def wait_for_change(self, since: int, timeout: float) -> ChangeSet:
+        """Block until the revision is past `since` or the timeout elapses, then return `changes(since)`"""
+        with self._changed:
+            self._changed.wait_for(lambda: self.revision > since, timeout)
+            return self._changes(since)
+
+    def _changes(self, since: int) -> ChangeSet:
+        if since >= self.revision:
+            return ChangeSet(revision=self.revision)
+        oldest = self._history[0][0] if self._history else self.revision + 1
+        if since < oldest - 1:
+            return ChangeSet(revision=self.revision, reset=True)
+        start = bisect_right([revision for revision, _ in self._history], since)
+        changed: Set[str] = set()
+        for _, ids in self._history[start:]:
+            changed |= ids
+            if len(changed) > self.max_changes:
+                return ChangeSet(revision=self.revision, reset=True)
+        ordered = sorted(changed)
+        return ChangeSet(
+            revision=self.revision,
+            upserts=[self._resources[rid] for rid in ordered if rid in self._resources],
+            removed=[rid for rid in ordered if rid not in self._resources]
+        )
+
+
+def _intersect(postings: List[List[str]], after: Optional[str]) -> Iterator[str]:
+    """
+    Ids in every sorted posting list, ascending, after `after`
+
+    Leapfrog join: each list jumps (by bisection) to the largest id seen
+    so far, so runs of ids that are missing from another list are skipped
+    instead of read.
+    """
+    postings = sorted(postings, key=len)
+    positions = [bisect_right(p, after) if after is not None else 0 for p in postings]
+    first = postings[0]
+    while positions[0] < len(first):
+        candidate = first[positions[0]]
+        for i in range(1, len(postings)):
+            position = positions[i] = bisect_left(postings[i], candidate, positions[i])
+            if position == len(postings[i]):
+                return
+            if postings[i][position] != candidate:
+                positions[0] = bisect_left(first, postings[i][position], positions[0])
+                break
+        else:
+            yield candidate
+            positions[0] += 1
+
+
+def _update_postings(postings: List[str], added: List[str], removed: Set[str]) -> List[str]:
+    """Sorted postings with ids added and removed (in place, or a new list when merged)"""
+    if len(added) + len(removed) <= _MERGE_THRESHOLD:
+        for rid in removed:
+            position = bisect_left(postings, rid)
+            if position < len(postings) and postings[position] == rid:
+                del postings[position]
+        for rid in added:
+            insort(postings, rid)
+        return postings
+    kept = [rid for rid in postings if rid not in removed] if removed else list(postings)
+    kept.extend(sorted(added))
+    kept.sort()  # Two sorted runs: a linear merge
+    return kept
+
+
+def _filter_digest(wanted: Dict[str, str]) -> str:
+    return hashlib.sha256(json.dumps(sorted(wanted.items())).encode()).hexdigest()[:12]
+
+
+def _encode_cursor(after: str, digest: str) -> str:
+    data = json.dumps({'after': after, 'filters': digest}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+
+def _decode_cursor(cursor: str, digest: str) -> str:
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+        after, filters = data['after'], data['filters']
+    except (ValueError, KeyError, TypeError):
+        raise ValueError("Invalid cursor")
+    if filters != digest:
+        raise ValueError("Cursor belongs to a listing with other filters")
+    return after
+
+
+# =============================================================================
+# Catalog Mirror (adapter side)
+# =============================================================================
+
+class CatalogMirror:
+    """
+    Keeps an adapter's `resource_registry` in step with a catalog
+
+    Args:
+        registry: The adapter's registry dict
+        key: Registry key of a resource (gRPC: the resource id; HTTP: the
+            route, e.g. from a naming convention), or None to skip it
+        upsert: Called instead of `registry[key] = resource` (e.g.
+            `HTTPAdapter.register_route`, which also compiles translators)
+        remove: Called instead of `del registry[key]` (e.g.
+            `HTTPAdapter.unregister_route`)
+    """
+
+    def __init__(self, registry: Dict[str, Resource],
+                 key: Callable[[Resource], Optional[str]] = lambda r: r.id,
+                 upsert: Optional[Callable[[str, Resource], None]] = None,
+                 remove: Optional[Callable[[str], None]] = None):
+        self.registry = registry
+        self.key = key
+        self.upsert = upsert or registry.__setitem__
+        self.remove = remove or (lambda k: registry.pop(k, None))
+        self.revision = 0
+        self.reloads = 0
+        self._keys: Dict[str, str] = {}  # Resource id → registry key
+
+    def apply(self, changes: ChangeSet, reload: Callable[[], Iterable[Resource]]) -> int:
+        """
+        Apply a change set; `reload` returns every resource when it says reset
+
+        Returns:
+            Number of registry entries upserted or removed
+        """
+        if changes.reset:
+            current = {}
+            for resource in reload():
+                current[resource.id] = resource
+            for rid in set(self._keys) - set(current):
+                self.remove(self._keys.pop(rid))
+            upserts, removed = list(current.values()), []
+            self.reloads += 1
+        else:
+            upserts, removed = changes.upserts, changes.removed
+        for resource in upserts:
+            key = self.key(resource)
+            previous = self._keys.get(resource.id)
+            if previous is not None and previous != key:
+                self.remove(previous)
+                del self._keys[resource.id]
+            if key is not None:
+                self.upsert(key, resource)
+                self._keys[resource.id] = key
+        for rid in removed:
+            if rid in self._keys:
+                self.remove(self._keys.pop(rid))
+        self.revision = changes.revision
+        return len(upserts) + len(removed)
+
+    def sync_local(self, catalog: ResourceCatalog) -> int:
+        """Catch up with an in-process catalog"""
+        return self.apply(catalog.changes(self.revision), lambda: _all_local(catalog))
+
+    def sync(self, pool: ConnectionPool, timeout: float = 0.0) -> int:
+        """
+        Catch up with a remote catalog, waiting up to `timeout` seconds
+        for a change (long poll)
+
+        Raises:
+            FederationError: If the catalog answers with an error
+        """
+        status, body, _ = pool.request('GET', f"{CHANGES_PATH}?since={self.revision}&timeout={timeout}")
+        if status != 200:
+            raise FederationError(f"Catalog change feed returned HTTP {status}")
+        changes = ChangeSet(revision=body['revision'], reset=body.get('reset', False),
+                            upserts=[Resource(**r) for r in body.get('upserts', [])],
+                            removed=body.get('removed', []))
+        return self.apply(changes, lambda: _all_remote(pool))
+
+    def watch(self, pool: ConnectionPool, stop: threading.Event, timeout: float = 30.0) -> None:
+        """Long-poll the catalog until `stop` is set (the pool's timeout must exceed `timeout`)"""
+        while not stop.is_set():
+            self.sync(pool, timeout)
+
+
+def _all_local(catalog: ResourceCatalog) -> Iterable[Resource]:
+    cursor = None
+    while True:
+        page = catalog.list(limit=MAX_LIMIT, cursor=cursor)
+        yield from page.resources
+        if page.next_cursor is None:
+            return
+        cursor = page.next_cursor
+
+
+def _all_remote(pool: ConnectionPool) -> Iterable[Resource]:
+    cursor = None
+    while True:
+        path = f"{RESOURCES_PATH}?limit={MAX_LIMIT}" + (f"&cursor={quote(cursor)}" if cursor else '')
+        status, body, _ = pool.request('GET', path)
+        if status != 200:
+            raise FederationError(f"Catalog listing returned HTTP {status}")
+        for data in body['resources']:
+            yield Resource(**data)
+        cursor = body.get('next_cursor')
+        if cursor is None:
+            return
+
+
+# =============================================================================
+# /v1/resources API
+# =============================================================================
+
+def handle_catalog_request(catalog: ResourceCatalog, handler: Any, method: str) -> bool:
+    """
+    Serve the catalog endpoints from a BaseHTTPRequestHandler
+
+    - GET  /api/v1/resources?type=&sensitivity=&owner=&manager=&limit=&cursor=
+    - POST /api/v1/resources                    body: one resource (JSON)
+    - POST /api/v1/resources/bulk?expected_revision=N
+                                                body: NDJSON (application/x-ndjson)
+    - GET  /api/v1/resources/changes?since=N&timeout=S   (long poll)
+
+    Returns:
+        True if the request was handled
+    """
+    url = urlsplit(handler.path)
+    query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+    try:
+        if method == 'GET' and url.path == RESOURCES_PATH:
+            limit = int(query.pop('limit', DEFAULT_LIMIT))
+            cursor = query.pop('cursor', None)
+            page = catalog.list(limit=limit, cursor=cursor, **query)
+            _send_json(handler, 200, {'resources': [asdict(r) for r in page.resources],
+                                      'next_cursor': page.next_cursor, 'revision': page.revision})
+        elif method == 'POST' and url.path == RESOURCES_PATH:
+            resource = parse_resource(json.loads(_read_body(handler)))
+            _send_json(handler, 201, {'resource': asdict(resource), 'revision': catalog.register(resource)})
+        elif method == 'POST' and url.path == BULK_PATH:
+            expected = query.get('expected_revision')
+            result = catalog.bulk_register(_read_body(handler).decode().splitlines(),
+                                           int(expected) if expected is not None else None)
+            _send_json(handler, 200, asdict(result))
+        elif method == 'GET' and url.path == CHANGES_PATH:
+            since = int(query.get('since', 0))
+            timeout = min(float(query.get('timeout', 0)), 60.0)
+            changes = catalog.wait_for_change(since, timeout) if timeout > 0 else catalog.changes(since)
+            body: Dict[str, Any] = {'revision': changes.revision}
+            if changes.reset:
+                body['reset'] = True
+            else:
+                body['upserts'] = [asdict(r) for r in changes.upserts]
+                body['removed'] = changes.removed
+            _send_json(handler, 200, body)
+        else:
+            return False
+    except RevisionConflict as e:
+        _send_json(handler, 409, {'error': str(e)})
+    except CatalogError as e:
+        _send_json(handler, 400, {'error': str(e), 'errors': e.errors})
+    except (ValueError, TypeError) as e:
+        _send_json(handler, 400, {'error': str(e)})
+    return True
+
+
+def _read_body(handler: Any) -> bytes:
+    return handler.rfile.read(int(handler.headers.get('Content-Length', 0)))
+
+
+def _send_json(handler: Any, status: int, body: Dict[str, Any]) -> None:
+    data = json.dumps(body).encode()
+    handler.send_response(status)
+    handler.send_header('Content-Type', 'application/json')
+    handler.send_header('Content-Length', str(len(data)))
+    handler.end_headers()
+    handler.wfile.write(data)
+
+
+def serve(catalog: ResourceCatalog, host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    """Serve the catalog endpoints in a background thread"""
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep-alive
+        wbufsize = 64 * 1024  # Headers and body in one send (no Nagle / delayed-ACK stall)
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if not handle_catalog_request(catalog, self, 'GET'):
+                _send_json(self, 404, {'error': 'Not found'})
+
+        def do_POST(self):
+            if not handle_catalog_request(catalog, self, 'POST'):
+                _send_json(self, 404, {'error': 'Not found'})
+
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    httpd.daemon_threads = True
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+# =============================================================================
+# Usage Example
+# =============================================================================
+
+if __name__ == '__main__':
+    import random
+
+    rng = random.Random(7)
+    catalog = ResourceCatalog()
+    lines = [json.dumps({'id': f"grpc-Orders{i // 40}/Method{i % 40}", 'type': 'service',
+                         'name': f"Orders{i // 40}/Method{i % 40}",
+                         'sensitivity': rng.choice(SENSITIVITIES), 'owner': f"team-{i % 50}",
+                         'managers': [f"lead-{i % 7}@company.com"]})
+             for i in range(100_000)]
+    print(catalog.bulk_register(lines))
+
+    # An adapter mirrors the catalog and then only applies changes
+    registry: Dict[str, Resource] = {}
+    mirror = CatalogMirror(registry)
+    mirror.sync_local(catalog)
+    catalog.bulk_register([json.dumps({'op': 'delete', 'id': 'grpc-Orders0/Method0'}),
+                           json.dumps({'id': 'grpc-Billing/Charge', 'type': 'service',
+                                       'name': 'Billing/Charge', 'sensitivity': 'critical'})])
+    print(f"mirror applied {mirror.sync_local(catalog)} changes, {len(registry)} resources")
+
+    page = catalog.list(limit=3, sensitivity='critical', owner='team-7')
+    print([r.id for r in page.resources], catalog.count(sensitivity='critical'))
+    print([r.id for r in catalog.list(limit=3, cursor=page.next_cursor,
+                                      sensitivity='critical', owner='team-7').resources])
@@ -0,0 +1,651 @@
+"""
+GRID Client SDK: Pooled Decision Client
+
+This template demonstrates how applications should ask a GRID policy
+decision point (PDP) for decisions. Calling `requests.post` for every
+check pays for a TCP (and TLS) handshake each time and sends one HTTP
+request per check; this client instead:
+
+- Keeps a pool of keep-alive HTTP/1.1 connections, or multiplexes every
+  check over one HTTP/2 connection (optional, needs `httpx[http2]`)
+- Talks to a sidecar PDP on the same host over a Unix domain socket
+- Coalesces checks made while earlier requests are in flight into one
+  batch request (micro-batching), sending identical checks only once
+- Caches decisions for as long as the PDP says they stay valid (a
+  decision's `ttl`, or `Cache-Control: max-age`), and not otherwise
+- Bounds every check by a deadline, which is passed on to the PDP
+
+It only uses the standard library, so applications can vendor the file.
+
+Use this template for:
+- Applications and gateways calling a remote or sidecar PDP
+- Replacing per-request `requests.post` authorization calls
+"""
+
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+import json
+import queue
+import socket
+import ssl
+import threading
+import time
+
+
+DEADLINE_HEADER = 'X-Grid-Deadline-Ms'  # Time the caller still waits, in milliseconds
+
+# Context fields left out of cache keys: they differ on every request. A
+# decision that depends on them (time-based policies) is only cached for
+# as long as the PDP says it holds.
+VOLATILE_CONTEXT = ('timestamp', 'request_id')
+
+
+class GridClientError(Exception):
+    """The PDP gave no valid decision"""
+
+
+class PDPUnavailableError(GridClientError):
+    """The PDP could not be reached"""
+
+
+class DeadlineExceeded(GridClientError):
+    """No decision within the check's deadline"""
+
+
+class PDPOverloadedError(GridClientError):
+    """The PDP shed the check under overload (HTTP 429)"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after  # Seconds the PDP asks callers to wait
+
+
+# =============================================================================
+# Client Types
+# =============================================================================
+
+@dataclass
+class Decision:
+    """A PDP decision"""
+    allowed: bool
+    reason: str = ''
+    policy_id: Optional[str] = None
+    audit_id: Optional[str] = None
+    constraints: Optional[Dict[str, Any]] = None
+    ttl: Optional[float] = None  # Seconds the PDP says the decision holds
+    cached: bool = False
+
+
+@dataclass
+class ClientStats:
+    """Client counters"""
+    checks: int = 0
+    cache_hits: int = 0
+    requests: int = 0           # HTTP requests sent to the PDP
+    batched: int = 0            # Checks sent in multi-check batch requests
+    deduplicated: int = 0       # Checks answered by an identical check in flight
+    deadline_exceeded: int = 0
+    errors: int = 0
+
+
+@dataclass
+class _Call:
+    """One check waiting for its decision"""
+    key: str
+    request: Dict[str, Any]
+    deadline: float
+    decision: Optional[Decision] = None
+    error: Optional[Exception] = None
+    sent: bool = False
+
+
+# =============================================================================
+# Wire Formats
+# =============================================================================
+
+class GridAPI:
+    """
+    GRID Policy API: `POST /api/v1/policy/evaluate`, and
+    `POST /api/v1/policy/evaluate/batch` ({"requests": [...]} answered by
+    {"decisions": [...]}) for batches
+    """
+
+    def __init__(self, path: str = '/api/v1/policy/evaluate',
+                 batch_path: Optional[str] = '/api/v1/policy/evaluate/batch'):
+        self.path = path
+        self.batch_path = batch_path
+
+    @property
+    def batchable(self) -> bool:
+        return self.batch_path is not None
+
+    def encode(self, requests: List[Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+        if len(requests) == 1:
+            return self.path, requests[0]
+        return self.batch_path, {'requests': requests}
+
+    def decode(self, body: Dict[str, Any], count: int) -> List[Dict[str, Any]]:
+        if count == 1 and 'decisions' not in body:
+            return [body]
+        return body['decisions']
+
+
+class OPAAPI:
+    """
+    OPA Data API (`POST /v1/data/<policy path>` with {"input": ...}), one
+    check per request. The result is a boolean or an object with `allow`;
+    an undefined result is a deny.
+    """
+
+    batchable = False
+
+    def __init__(self, path: str = '/v1/data/grid/authz/allow'):
+        self.path = path
+
+    def encode(self, requests: List[Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+        return self.path, {'input': requests[0]}
+
+    def decode(self, body: Dict[str, Any], count: int) -> List[Dict[str, Any]]:
+        result = body.get('result', False)
+        if isinstance(result, dict):
+            return [{**result, 'allowed': bool(result.get('allow', result.get('allowed', False)))}]
+        return [{'allowed': result is True}]
+
+
+# =============================================================================
+# Transports
+# =============================================================================
+
+class HTTPTransport:
+    """
+    Keep-alive HTTP/1.1 connections to the PDP
+
+    Connections are reused LIFO so the warmest one is picked first; a
+    reused connection the PDP has closed is retried once on a fresh one.
+    """
+
+    def __init__(self, base_url: str, ssl_context: Optional[ssl.SSLContext] = None,
+                 max_connections: int = 8):
+        parsed = urlparse(base_url)
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.base_path = parsed.path.rstrip('/')
+        self.ssl_context = ssl_context
+        self.max_connections = max_connections
+        self.created = 0
+        self._idle: 'queue.LifoQueue[HTTPConnection]' = queue.LifoQueue(max_connections)
+
+    def request(self, path: str, body: bytes, headers: Dict[str, str],
+                timeout: float) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        POST one request
+
+        Returns:
+            (status, lower-cased response headers, response body)
+
+        Raises:
+            DeadlineExceeded: No response within `timeout` seconds
+            PDPUnavailableError: The connection failed
+        """
+        for attempt in range(2):
+            connection, reused = self._acquire()
+            connection.timeout = timeout
+            if connection.sock is not None:
+                connection.sock.settimeout(timeout)
+            try:
+                connection.request('POST', self.base_path + path, body=body, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except socket.timeout:
+                connection.close()
+                raise DeadlineExceeded(f"PDP did not answer within {timeout * 1000:.0f} ms")
+            except (HTTPException, ConnectionError) as e:
+                connection.close()
+                if reused and attempt == 0:
+                    continue
+                raise PDPUnavailableError(f"{self._name()}: {e}")
+            except OSError as e:
+                connection.close()
+                raise PDPUnavailableError(f"{self._name()}: {e}")
+
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(connection)
+            return response.status, {k.lower(): v for k, v in response.getheaders()}, data
+
+        raise PDPUnavailableError(f"{self._name()}: connection closed")
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _name(self) -> str:
+        return f"{self.host}:{self.port}" if self.port else str(self.host)
+
+    def _connect(self) -> HTTPConnection:
+        if self.scheme == 'https':
+            return HTTPSConnection(self.host, self.port, context=self.ssl_context)
+        return HTTPConnection(self.host, self.port)
+
+    def _acquire(self) -> Tuple[HTTPConnection, bool]:
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            pass
+        self.created += 1
+        return self._connect(), False
+
+    def _release(self, connection: HTTPConnection) -> None:
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+
+class _UnixHTTPConnection(HTTPConnection):
+    def __init__(self, socket_path: str):
+        super().__init__('localhost')
+        self.socket_path = socket_path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.socket_path)
+        except OSError:
+            sock.close()
+            raise
+        self.sock = sock
+
+
+class UnixSocketTransport(HTTPTransport):
+    """
+    Keep-alive HTTP/1.1 over a Unix domain socket, for a sidecar PDP on the
+    same host: no TCP handshake, no loopback network stack, and access is
+    controlled by the socket file's permissions
+    """
+
+    def __init__(self, socket_path: str, max_connections: int = 8):
+        super().__init__('http://localhost', max_connections=max_connections)
+        self.socket_path = socket_path
+
+    def _name(self) -> str:
+        return self.socket_path
+
+    def _connect(self) -> HTTPConnection:
+        return _UnixHTTPConnection(self.socket_path)
+
+
+class HTTP2Transport:
+    """
+    Every check multiplexed over one HTTP/2 connection (needs
+    `pip install 'httpx[http2]'`)
+
+    HTTP/2 is negotiated with TLS (ALPN) for https URLs; a plain-http PDP
+    must be told to speak HTTP/2 directly (`prior_knowledge=True`).
+    """
+
+    def __init__(self, base_url: str, ssl_context: Optional[ssl.SSLContext] = None,
+                 prior_knowledge: bool = False):
+        try:
+            import httpx
+        except ImportError:
+            raise ImportError("HTTP2Transport needs httpx with HTTP/2 support: pip install 'httpx[http2]'")
+        self._httpx = httpx
+        self._client = httpx.Client(base_url=base_url, http1=not prior_knowledge, http2=True,
+                                    verify=ssl_context if ssl_context is not None else True)
+        self.created = 1
+
+    def request(self, path: str, body: bytes, headers: Dict[str, str],
+                timeout: float) -> Tuple[int, Dict[str, str], bytes]:
+        """Same contract as HTTPTransport.request"""
+        try:
+            response = self._client.post(path, content=body, headers=headers, timeout=timeout)
+        except self._httpx.TimeoutException:
+            raise DeadlineExceeded(f"PDP did not answer within {timeout * 1000:.0f} ms")
+        except self._httpx.HTTPError as e:
+            raise PDPUnavailableError(str(e))
+        return response.status_code, {k.lower(): v for k, v in response.headers.items()}, response.content
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def _max_age(cache_control: Optional[str]) -> Optional[float]:
+    """Seconds a response may be cached per its Cache-Control header"""
+    if not cache_control:
+        return None
+    directives = [d.strip().lower() for d in cache_control.split(',')]
+    if 'no-store' in directives or 'no-cache' in directives:
+        return 0.0
+    for directive in directives:
+        if directive.startswith('max-age='):
+            try:
+                return float(directive[8:])
+            except ValueError:
+                return None
+    return None
+
+
+# =============================================================================
+# GRID Client
+# =============================================================================
+
+class GridClient:
+    """
+    Decision client for a GRID PDP, safe to share between threads
+
+    An idle client sends a check at once, from the caller's thread. While
+    requests are in flight, new checks queue up and up to `max_in_flight`
+    sender threads each take up to `max_batch` distinct queued checks as
+    one batch request, so the busier the client, the larger its batches.
+    Each caller waits only until its own deadline.
+
+    Args:
+        url: PDP base URL, 'http(s)://host:port', or 'unix:///path/to/pdp.sock'
+            for a sidecar on the same host
+        api: Wire format: GridAPI() (default) or OPAAPI(path); OPA has no
+            batch endpoint, so its checks are pipelined but not batched
+        http2: Multiplex over one HTTP/2 connection (see HTTP2Transport)
+        ssl_context: TLS settings for https URLs
+        max_connections: HTTP/1.1 connections kept alive
+        max_in_flight: Requests in flight at once (default: max_connections,
+            or 32 over HTTP/2)
+        max_batch: Most distinct checks per batch request
+        timeout: Default deadline of a check, in seconds
+        cache_size: Most decisions cached (0 disables the cache)
+        headers: Extra request headers, e.g. {'Authorization': 'Bearer ...'}
+    """
+
+    def __init__(self, url: str, api: Any = None, http2: bool = False,
+                 ssl_context: Optional[ssl.SSLContext] = None, max_connections: int = 8,
+                 max_in_flight: Optional[int] = None, max_batch: int = 64, timeout: float = 1.0,
+                 cache_size: int = 10_000, headers: Optional[Dict[str, str]] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.api = api or GridAPI()
+        if url.startswith('unix://'):
+            self.transport: Any = UnixSocketTransport(url[len('unix://'):], max_connections)
+        elif http2:
+            self.transport = HTTP2Transport(url, ssl_context)
+        else:
+            self.transport = HTTPTransport(url, ssl_context, max_connections)
+        self.max_in_flight = max_in_flight or (32 if http2 else max_connections)
+        self.max_batch = max_batch if self.api.batchable else 1
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self.headers = {'Content-Type': 'application/json', **(headers or {})}
+        self.clock = clock
+        self.stats = ClientStats()
+
+        self._cache: 'OrderedDict[str, Tuple[float, Decision]]' = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._pending: List[_Call] = []
+        self._senders = 0
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight,
+                                            thread_name_prefix='grid-client')
+
+    def check(self, principal_id: str, resource_id: str, action: str,
+              context: Optional[Dict[str, Any]] = None, timeout: Optional[float] = None) -> Decision:
+        """
+        Ask whether a principal may perform an action on a resource
+
+        Args:
+            timeout: Deadline in seconds (default: the client's)
+
+        Raises:
+            DeadlineExceeded: No decision in time
+            GridClientError: The PDP could not be reached or answered an error
+        """
+        request = {'principal_id': principal_id, 'resource_id': resource_id, 'action': action,
+                   'context': context or {}}
+        return self.check_many([request], timeout)[0]
+
+    def check_request(self, request: Dict[str, Any], timeout: Optional[float] = None) -> Decision:
+        """Ask for a decision on a request in the API's own shape (e.g. an OPA input)"""
+        return self.check_many([request], timeout)[0]
+
+    def check_many(self, requests: List[Dict[str, Any]],
+                   timeout: Optional[float] = None) -> List[Decision]:
+        """
+        Ask for decisions on several requests at once; they are batched
+        together (and with other callers' checks)
+
+        Raises:
+            DeadlineExceeded, GridClientError: For the first check that failed
+        """
+        now = self.clock()
+        deadline = now + (self.timeout if timeout is None else timeout)
+        decisions: List[Optional[Decision]] = [None] * len(requests)
+        calls: List[Tuple[int, _Call]] = []
+        for i, request in enumerate(requests):
+            key = self._cache_key(request)
+            cached = self._cached(key, now)
+            if cached is not None:
+                decisions[i] = cached
+            else:
+                calls.append((i, _Call(key, request, deadline)))
+        with self._cond:
+            self.stats.checks += len(requests)
+            self.stats.cache_hits += len(requests) - len(calls)
+        if calls:
+            self._wait([call for _, call in calls])
+            for i, call in calls:
+                if call.error is not None:
+                    raise call.error
+                decisions[i] = call.decision
+        return decisions
+
+    def invalidate(self) -> None:
+        """Drop every cached decision (e.g. after a policy change)"""
+        with self._cache_lock:
+            self._cache.clear()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self.transport.close()
+
+    def __enter__(self) -> 'GridClient':
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    # =========================================================================
+    # Cache
+    # =========================================================================
+
+    @staticmethod
+    def _cache_key(request: Dict[str, Any]) -> str:
+        context = request.get('context')
+        if isinstance(context, dict) and any(name in context for name in VOLATILE_CONTEXT):
+            request = {**request, 'context': {k: v for k, v in context.items() if k not in VOLATILE_CONTEXT}}
+        return json.dumps(request, sort_keys=True, separators=(',', ':'), default=str)
+
+    def _cached(self, key: str, now: float) -> Optional[Decision]:
+        if not self.cache_size:
+            return None
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= now:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+        return replace(entry[1], cached=True)
+
+    def _store(self, key: str, decision: Decision, now: float) -> None:
+        if not self.cache_size or not decision.ttl or decision.ttl <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = (now + decision.ttl, decision)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    # =========================================================================
+    # Batching
+    # =========================================================================
+
+    def _wait(self, calls: List[_Call]) -> None:
+        """Queue calls and wait until each is answered or past its deadline"""
+        with self._cond:
+            idle = not self._senders and not self._pending and len(calls) <= self.max_batch
+            self._pending.extend(calls)
+            if idle:
+                # Nothing in flight: send from this thread, without a handover
+                self._senders += 1
+                try:
+                    self._send_batch(self._take_batch())
+                finally:
+                    self._senders -= 1
+            if self._pending and self._senders < self.max_in_flight:
+                self._senders += 1
+                self._executor.submit(self._send_pending)
+            while True:
+                waiting = [c for c in calls if c.decision is None and c.error is None]
+                if not waiting:
+                    return
+                now = self.clock()
+                deadline = min(c.deadline for c in waiting)
+                if now >= deadline:
+                    for call in waiting:
+                        if call.deadline <= now:
+                            call.error = DeadlineExceeded(
+                                "No decision within the deadline" if call.sent else
+                                "No decision within the deadline (PDP requests were all busy)")
+                            self.stats.deadline_exceeded += 1
+                            if not call.sent:
+                                self._pending.remove(call)
+                    continue
+                self._cond.wait(deadline - now)
+
+    def _send_pending(self) -> None:
+        """Sender thread: send queued calls in batches until none are left"""
+        with self._cond:
+            try:
+                while self._pending:
+                    self._send_batch(self._take_batch())
+            finally:
+                self._senders -= 1
+
+    def _send_batch(self, batch: 'OrderedDict[str, List[_Call]]') -> None:
+        """Send one batch and hand out its results (caller holds the lock)"""
+        self._cond.release()
+        try:
+            results = self._exchange(batch)
+        except GridClientError as e:
+            results = {key: e for key in batch}
+        except Exception as e:  # A bug must not leave callers waiting
+            results = {key: GridClientError(f"Client error: {e!r}") for key in batch}
+        finally:
+            self._cond.acquire()
+        for key, calls in batch.items():
+            result = results[key]
+            for call in calls:
+                if call.decision is not None or call.error is not None:
+                    continue  # Gave up at its deadline
+                if isinstance(result, Exception):
+                    call.error = result
+                    if isinstance(result, DeadlineExceeded):
+                        self.stats.deadline_exceeded += 1
+                else:
+                    call.decision = result
+        self._cond.notify_all()
+
+    def _take_batch(self) -> 'OrderedDict[str, List[_Call]]':
+        """Take up to max_batch distinct checks off the queue (caller holds the lock)"""
+        batch: 'OrderedDict[str, List[_Call]]' = OrderedDict()
+        taken = 0
+        for call in self._pending:
+            if call.key not in batch:
+                if len(batch) == self.max_batch:
+                    break
+                batch[call.key] = []
+            else:
+                self.stats.deduplicated += 1
+            batch[call.key].append(call)
+            call.sent = True
+            taken += 1
+        del self._pending[:taken]
+        return batch
+
+    def _exchange(self, batch: 'OrderedDict[str, List[_Call]]') -> Dict[str, Any]:
+        """One request to the PDP; returns key → Decision"""
+        requests = [calls[0].request for calls in batch.values()]
+        start = self.clock()
+        timeout = max(call.deadline for calls in batch.values() for call in calls) - start
+        if timeout <= 0:
+            raise DeadlineExceeded("No decision within the deadline")
+        path, body = self.api.encode(requests)
+        headers = {**self.headers, DEADLINE_HEADER: str(max(1, int(timeout * 1000)))}
+        try:
+            status, response_headers, data = self.transport.request(
+                path, json.dumps(body).encode(), headers, timeout)
+        except GridClientError as e:
+            with self._cond:
+                self.stats.requests += 1
+                if not isinstance(e, DeadlineExceeded):
+                    self.stats.errors += 1
+            raise
+        with self._cond:
+            self.stats.requests += 1
+            self.stats.batched += len(requests) if len(requests) > 1 else 0
+
+        # The GRID Policy API answers a single deny with 403 and the decision
+        if status == 429:
+            retry_after = response_headers.get('retry-after')
+            raise PDPOverloadedError("PDP is overloaded",
+                                     float(retry_after) if retry_after and retry_after.isdigit() else None)
+        if status == 504:
+            raise DeadlineExceeded("The PDP dropped the check at its deadline")
+        if status not in (200, 403):
+            raise GridClientError(f"PDP answered HTTP {status}: {data[:200].decode(errors='replace')}")
+        try:
+            answers = self.api.decode(json.loads(data), len(requests))
+            max_age = _max_age(response_headers.get('cache-control'))
+            decisions = [Decision(allowed=answer['allowed'] is True, reason=answer.get('reason', ''),
+                                  policy_id=answer.get('policy_id'), audit_id=answer.get('audit_id'),
+                                  constraints=answer.get('constraints'), ttl=answer.get('ttl', max_age))
+                         for answer in answers]
+        except (ValueError, KeyError, TypeError) as e:
+            raise GridClientError(f"Invalid PDP response: {e}")
+        if len(decisions) != len(requests):
+            raise GridClientError(f"PDP answered {len(decisions)} decisions for {len(requests)} requests")
+
+        for key, decision in zip(batch, decisions):
+            self._store(key, decision, start)
+        return dict(zip(batch, decisions))
+
+
+# =============================================================================
+# Usage Example
+# =============================================================================
+
+if __name__ == '__main__':
+    import os
+
+    # A PDP speaking the GRID Policy API, e.g. a local sidecar
+    client = GridClient(os.environ.get('GRID_PDP_URL', 'http://localhost:8181'), timeout=0.25)
+
+    try:
+        decision = client.check('alice@company.com', 'jira-server', 'execute',
+                                context={'ip_address': '10.1.2.3'})
+        print(f"Allowed: {decision.allowed} ({decision.reason}), cacheable for {decision.ttl}s")
+    except DeadlineExceeded:
+        print("No decision in time: deny")
+    except GridClientError as e:
+        print(f"PDP unavailable ({e}): deny")
+    finally:
+        print(client.stats)
+        client.close()
@@ -0,0 +1,459 @@
+"""
+GRID Policy Engine: Admission Control and Priority Load Shedding
+
+This template demonstrates how a PDP protects policy evaluation from
+overload, one of the denial-of-service threats in spec §12.1. Rate
+limits alone admit work the PDP cannot finish in time: queues grow,
+every caller's deadline passes while its request waits, and the PDP
+spends its capacity on decisions nobody is waiting for anymore.
+
+Every request that misses the decision cache passes an admission
+controller before it is evaluated:
+
+- Deadlines: callers send the time they still wait (`X-Grid-Deadline-Ms`,
+  or the gRPC deadline). A request whose deadline has passed is dropped
+  before evaluation, and one that could not be evaluated before its
+  deadline even if admitted now is rejected at once
+- Adaptive concurrency limit: evaluations in flight are capped by a
+  limit that follows observed evaluation latency (gradient, or AIMD);
+  when latency rises above its baseline the limit shrinks, so excess
+  requests wait in the admission queue instead of slowing every
+  evaluation down
+- Queue-time budget: a request waits for a slot for at most
+  `max_queue_time`, and never so long that it cannot finish by its
+  deadline
+- Priority shedding: when the queue is full the lowest-priority request
+  is rejected first. Requests with a last known good decision in the
+  cache rank lowest and are answered from it (a degraded decision), then
+  low-sensitivity reads; writes on critical resources rank highest
+
+Rejected requests are answered with HTTP 429 (with `Retry-After`) or
+gRPC `RESOURCE_EXHAUSTED`; expired ones with 504 or `DEADLINE_EXCEEDED`.
+
+Use this template for:
+- Keeping PDP latency bounded under bursts and overload
+- Propagating caller deadlines from adapters into the PDP
+- Choosing what to drop first when capacity runs out
+"""
+
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from heapq import heapify, heappop, heappush
+from itertools import count
+from typing import Any, Callable, Dict, Iterator, List, Optional
+import math
+import threading
+import time
+
+# Assume these are imported from a GRID SDK
+from .http_adapter_template import Principal, Resource, Action, Context
+from .canonical_policy_engine import Policy, PolicyDecision, PolicyEngine
+from .decision_cache import DecisionCache, STALE_IF_ERROR
+from .grid_client import DEADLINE_HEADER
+
+
+# Operations that only read; with low sensitivity they are shed first
+READ_OPERATIONS = frozenset({'read', 'list', 'query', 'search'})
+
+SENSITIVITY_RANK = {'low': 0, 'medium': 1, 'high': 2, 'critical': 3}
+
+# Lowest priority: a last known good decision can answer the request
+CACHE_ANSWERABLE = -1
+
+# Rejection → (HTTP status, gRPC status code name)
+HTTP_STATUS = {'overloaded': 429, 'deadline_expired': 504}
+GRPC_STATUS = {'overloaded': 'RESOURCE_EXHAUSTED', 'deadline_expired': 'DEADLINE_EXCEEDED'}
+
+
+class AdmissionRejected(Exception):
+    """A request was not admitted for evaluation"""
+    kind = 'overloaded'
+
+    def __init__(self, reason: str, retry_after: float = 1.0):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class Overloaded(AdmissionRejected):
+    """Shed under overload, or would not finish before its deadline"""
+
+
+class DeadlineExpired(AdmissionRejected):
+    """The caller's deadline passed before evaluation"""
+    kind = 'deadline_expired'
+
+
+@dataclass
+class AdmissionStats:
+    """Admission outcomes"""
+    admitted: int = 0
+    queued: int = 0               # Admitted after waiting for a slot
+    expired: int = 0              # Deadline passed before evaluation
+    would_time_out: int = 0       # Rejected: could not finish before the deadline
+    shed: int = 0                 # Rejected: lower priority than the queue
+    queue_timeouts: int = 0       # Rejected: no slot within the queue-time budget
+    stale_served: int = 0         # Rejected, answered from the last known good decision
+    limit: float = 0.0            # Current concurrency limit
+
+
+def deadline_from_header(value: Optional[str], now: Optional[float] = None) -> Optional[float]:
+    """
+    Monotonic deadline from an `X-Grid-Deadline-Ms` header value
+
+    Raises:
+        ValueError: If the value is not a number of milliseconds
+    """
+    if value is None:
+        return None
+    remaining = float(value)
+    if math.isnan(remaining):
+        raise ValueError(f"Invalid {DEADLINE_HEADER}: {value!r}")
+    return (time.monotonic() if now is None else now) + remaining / 1000
+
+
+def priority(resource: Resource, action: Action, cache_answerable: bool = False) -> int:
+    """
+    Shedding priority of a request; lower is shed first
+
+    Cache-answerable requests rank lowest, then by sensitivity, reads
+    below other operations at the same sensitivity.
+    """
+    if cache_answerable:
+        return CACHE_ANSWERABLE
+    rank = SENSITIVITY_RANK.get(resource.sensitivity, SENSITIVITY_RANK['critical'])
+    return rank * 2 + (action.operation not in READ_OPERATIONS)
+
+
+# =============================================================================
+# Concurrency Limits
+# =============================================================================
+
+class AIMDLimit:
+    """
+    Additive increase, multiplicative decrease
+
+    A sample slower than `latency_threshold`, or a dropped request,
+    multiplies the limit by `backoff`; other samples taken while the
+    limit is in use add about one per limit's worth of samples.
+    """
+
+    def __init__(self, initial: float = 20, min_limit: float = 1, max_limit: float = 200,
+                 backoff: float = 0.9, latency_threshold: float = 0.05):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.backoff = backoff
+        self.latency_threshold = latency_threshold
+
+    def update(self, latency: float, inflight: int, dropped: bool = False) -> float:
+        if dropped or latency > self.latency_threshold:
+            self.limit = max(self.min_limit, self.limit * self.backoff)
+        elif inflight * 2 >= self.limit:
+            self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+        return self.limit
+
+
+class GradientLimit:
+    """
+    Gradient limit: compares the latency of recent samples with a baseline
+
+    new limit = limit * min(1, tolerance * baseline / recent) + queue_size,
+    smoothed. While recent latency stays within `tolerance` times the
+    baseline the limit grows by `queue_size` (√limit) per sample; when
+    evaluations slow down because too many run at once, the gradient
+    falls below 1 and the limit shrinks until latency recovers. The
+    baseline is the fastest latency seen, drifting towards recent
+    latency over `window` samples, so a lasting change in evaluation
+    cost (a bigger policy) becomes the new normal.
+    """
+
+    def __init__(self, initial: float = 20, min_limit: float = 1, max_limit: float = 200,
+                 tolerance: float = 1.5, smoothing: float = 0.2, window: int = 600):
+        self.limit = float(initial)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.window = window
+        self.baseline: Optional[float] = None
+        self.recent: Optional[float] = None
+
+    def update(self, latency: float, inflight: int, dropped: bool = False) -> float:
+        if self.baseline is None:
+            self.baseline = self.recent = latency
+        self.recent += (latency - self.recent) / 10
+        # The fastest latency seen, drifting up so a lasting change is adopted
+        self.baseline = min(latency, self.baseline + (self.recent - self.baseline) / self.window)
+        if dropped:
+            gradient = 0.5
+        else:
+            gradient = max(0.5, min(1.0, self.tolerance * self.baseline / self.recent))
+        if inflight * 2 < self.limit and gradient == 1.0:
+            return self.limit  # Not using the limit: no evidence it can grow
+        target = self.limit * gradient + math.sqrt(self.limit)
+        self.limit += self.smoothing * (target - self.limit)
+        self.limit = min(self.max_limit, max(self.min_limit, self.limit))
+        return self.limit
+
+
+# =============================================================================
+# Admission Controller
+# =============================================================================
+
+class _Waiter:
+    """A request waiting for a slot"""
+    __slots__ = ('priority', 'event', 'outcome')
+
+    def __init__(self, priority: int):
+        self.priority = priority
+        self.event = threading.Event()
+        self.outcome: Optional[str] = None  # 'admitted' or 'shed'
+
+
+class AdmissionController:
+    """
+    Caps evaluations in flight and decides which requests wait or are rejected
+
+    Args:
+        limit: Concurrency limit (default: GradientLimit())
+        max_queue: Requests waiting for a slot at most
+        max_queue_time: Longest wait for a slot, in seconds
+        clock: Monotonic clock in seconds; deadlines use the same clock
+    """
+
+    def __init__(self, limit: Optional[Any] = None, max_queue: int = 100,
+                 max_queue_time: float = 0.05, clock: Callable[[], float] = time.monotonic):
+        self.limit = limit if limit is not None else GradientLimit()
+        self.max_queue = max_queue
+        self.max_queue_time = max_queue_time
+        self.clock = clock
+        self.stats = AdmissionStats(limit=self.limit.limit)
+        self.inflight = 0
+        self._latency: Optional[float] = None  # Smoothed evaluation latency
+        self._queue: List[tuple] = []  # (-priority, seq, waiter): highest priority first
+        self._seq = count()
+        self._lock = threading.Lock()
+
+    def expected_latency(self) -> float:
+        """Smoothed evaluation latency in seconds (0 before the first sample)"""
+        return self._latency or 0.0
+
+    def acquire(self, priority: int = 0, deadline: Optional[float] = None) -> None:
+        """
+        Wait for an evaluation slot
+
+        Args:
+            priority: Shedding priority (see `priority()`); higher waits in front
+            deadline: When the caller stops waiting, on `clock`
+
+        Raises:
+            DeadlineExpired: If the deadline has passed
+            Overloaded: If shed, or no slot is free in time
+        """
+        with self._lock:
+            now = self.clock()
+            if deadline is not None and deadline <= now:
+                self.stats.expired += 1
+                raise DeadlineExpired("Deadline passed before evaluation")
+            if self.inflight < self.limit.limit and not self._queue:
+                self.inflight += 1
+                self.stats.admitted += 1
+                return
+
+            budget = self.max_queue_time
+            if deadline is not None:
+                budget = min(budget, deadline - now - self.expected_latency())
+            if budget <= 0:
+                self.stats.would_time_out += 1
+                raise Overloaded("Would not be evaluated before its deadline", self._retry_after())
+            if len(self._queue) >= self.max_queue:
+                lowest = max(self._queue, default=None)  # Lowest priority, latest arrival
+                if lowest is None or -lowest[0] >= priority:
+                    self.stats.shed += 1
+                    raise Overloaded("Shed under overload", self._retry_after())
+                self._queue.remove(lowest)
+                heapify(self._queue)
+                lowest[2].outcome = 'shed'
+                lowest[2].event.set()
+            waiter = _Waiter(priority)
+            heappush(self._queue, (-priority, next(self._seq), waiter))
+
+        waiter.event.wait(budget)
+        with self._lock:
+            if waiter.outcome is None:  # Timed out; still queued
+                self._queue = [entry for entry in self._queue if entry[2] is not waiter]
+                heapify(self._queue)
+                self.stats.queue_timeouts += 1
+                raise Overloaded("No evaluation slot within the queue-time budget", self._retry_after())
+            if waiter.outcome == 'shed':
+                self.stats.shed += 1
+                raise Overloaded("Shed under overload", self._retry_after())
+            self.stats.queued += 1
+            if deadline is not None and deadline <= self.clock():
+                self.inflight -= 1
+                self._grant()
+                self.stats.expired += 1
+                raise DeadlineExpired("Deadline passed while queued")
+
+    def release(self, latency: float, dropped: bool = False) -> None:
+        """Free a slot and feed the evaluation's latency to the limit"""
+        with self._lock:
+            self.inflight -= 1
+            self._latency = latency if self._latency is None else self._latency + (latency - self._latency) / 10
+            self.stats.limit = self.limit.update(latency, self.inflight + 1, dropped)
+            self._grant()
+
+    @contextmanager
+    def admit(self, priority: int = 0, deadline: Optional[float] = None) -> Iterator[None]:
+        """Hold a slot for the duration of the block (see `acquire`)"""
+        self.acquire(priority, deadline)
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.release(self.clock() - start)
+
+    def _grant(self) -> None:
+        """Hand free slots to the highest-priority waiters (caller holds the lock)"""
+        while self._queue and self.inflight < self.limit.limit:
+            _, _, waiter = heappop(self._queue)
+            waiter.outcome = 'admitted'
+            self.inflight += 1
+            self.stats.admitted += 1
+            waiter.event.set()
+
+    def _retry_after(self) -> float:
+        """Seconds a rejected caller should wait: about one queue's worth of evaluations"""
+        per_slot = self.expected_latency() / max(1.0, self.limit.limit)
+        return max(0.1, round(len(self._queue) * per_slot, 1))
+
+
+# =============================================================================
+# Admission-Controlled Policy Engine
+# =============================================================================
+
+class AdmittedPolicyEngine(PolicyEngine):
+    """
+    Wraps a PolicyEngine with a DecisionCache and an AdmissionController
+
+    Cache hits are answered without admission. A miss with a last known
+    good decision in the cache is admitted at the lowest priority and,
+    if rejected, answered with that decision (`degraded` mode `stale`,
+    cause `overload`); other rejections raise.
+
+    Args:
+        engine: Engine to protect
+        admission: Admission controller (default: AdmissionController())
+        cache: Decision cache; by default one with the STALE_IF_ERROR windows
+    """
+
+    def __init__(self, engine: PolicyEngine, admission: Optional[AdmissionController] = None,
+                 cache: Optional[DecisionCache] = None):
+        self.engine = engine
+        self.admission = admission if admission is not None else AdmissionController()
+        self.cache = cache if cache is not None else DecisionCache(stale_if_error=STALE_IF_ERROR)
+        self._lock = threading.Lock()
+
+    def evaluate(self, principal: Principal, resource: Resource, action: Action,
+                 context: Context, deadline: Optional[float] = None) -> PolicyDecision:
+        """
+        Evaluate unless shed
+
+        Args:
+            deadline: When the caller stops waiting, on the controller's clock
+
+        Raises:
+            Overloaded: Shed, and no last known good decision to answer with
+            DeadlineExpired: The deadline passed before evaluation
+        """
+        key = self.cache.key(principal, resource, action, context)
+        with self._lock:
+            decision = self.cache.get(key)
+            if decision is not None:
+                return decision
+            answerable = self.cache.has_stale(key)
+
+        try:
+            self.admission.acquire(priority(resource, action, answerable), deadline)
+        except Overloaded:
+            with self._lock:
+                stale = self.cache.get_stale(key) if answerable else None
+            if stale is None:
+                raise
+            self.admission.stats.stale_served += 1
+            decision, staleness = stale
+            return replace(decision, degraded={
+                'mode': 'stale', 'cause': 'overload', 'staleness_seconds': round(staleness, 3)})
+
+        start = time.perf_counter()
+        try:
+            decision = self.engine.evaluate(principal, resource, action, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.admission.release(elapsed)
+        with self._lock:
+            self.cache.put(key, decision, resource.sensitivity, context.timestamp, compute_time=elapsed)
+        return decision
+
+    def validate_policy(self, policy: str) -> bool:
+        return self.engine.validate_policy(policy)
+
+    def deploy_policy(self, policy: Policy) -> None:
+        self.engine.deploy_policy(policy)
+        with self._lock:
+            self.cache.clear()
+
+    def context_fields(self) -> set:
+        return self.engine.context_fields() if hasattr(self.engine, 'context_fields') else set()
+
+
+def rejection_response(error: AdmissionRejected) -> Dict[str, Any]:
+    """HTTP status, headers and body for a rejected request"""
+    return {
+        'status': HTTP_STATUS[error.kind],
+        'headers': {'Retry-After': str(max(1, math.ceil(error.retry_after)))} if error.kind == 'overloaded' else {},
+        'body': {'error': error.reason},
+    }
+
+
+# =============================================================================
+# Usage Example
+# =============================================================================
+
+if __name__ == '__main__':
+    import os
+    from concurrent.futures import ThreadPoolExecutor
+    from .canonical_policy_engine import CanonicalPolicyEngine, load_policy_file
+
+    class BusyEngine(CanonicalPolicyEngine):
+        """An engine that slows down with every evaluation running at once"""
+        running = 0
+
+        def evaluate(self, *args):
+            self.running += 1
+            time.sleep(0.001 * self.running)
+            self.running -= 1
+            return super().evaluate(*args)
+
+    policies = os.path.join(os.path.dirname(__file__), 'policies')
+    engine = AdmittedPolicyEngine(
+        BusyEngine([load_policy_file(os.path.join(policies, 'rbac-basic.yaml'))]),
+        AdmissionController(max_queue=20))
+    alice = Principal(id='alice@company.com', type='human', role='developer')
+    context = Context(timestamp='2025-11-27T10:00:00Z')
+
+    def call(i: int) -> str:
+        resource = Resource(id=f'res-{i}', type='tool', name=f'tool-{i}',
+                            sensitivity=('low', 'medium', 'high', 'critical')[i % 4])
+        try:
+            engine.evaluate(alice, resource, Action(operation='read' if i % 2 else 'write'), context,
+                            deadline=time.monotonic() + 0.1)
+            return 'ok'
+        except AdmissionRejected as e:
+            return f"{rejection_response(e)['status']}"
+
+    with ThreadPoolExecutor(max_workers=64) as pool:
+        outcomes = list(pool.map(call, range(5_000)))
+    print({outcome: outcomes.count(outcome) for outcome in sorted(set(outcomes))})
+    print(engine.admission.stats)
@@ -0,0 +1,410 @@
+"""
+GRID Policy Engine: Cache Warming and Prefetch from Audit History
+
+This template demonstrates the cache warming recommended in spec §12.3
+("cache misses can cascade, causing load spikes"). After a deploy or a
+policy change, an enforcement replica starts with an empty decision
+cache, and every request it serves goes to the engine until the cache
+fills up again; that is the p99 spike after each rollout.
+
+Warm-up reads the recent audit log from `/v1/audit`, one query per
+sensitivity tier, counts how often each (principal, resource, action)
+was decided, and pre-evaluates the top-K of each tier in batches. Until
+it has finished (or run out of its time budget), `health_check()`
+reports the replica as not ready, so the load balancer keeps traffic
+away from it (spec §9.1).
+
+Prefetch then keeps the hot entries warm: a background thread refreshes
+each one shortly before its sensitivity TTL (§5.4) expires, so hot
+requests do not miss every TTL either. The hot set is re-read from the
+audit log periodically, so it follows the traffic.
+
+Requests are rebuilt from §7.2 audit events (principal id, type, role,
+teams and attributes; resource id, type, name, sensitivity, owner and
+managers; operation; environment, IP address and user agent), evaluated
+at the current time. A key whose context fields are not in the audit
+events never matches a live request and is simply not used. Events
+written before owner and managers were recorded do not carry them; such
+an entry is not warmed while the deployed policies read the missing
+relation, since its decision would be cached under the key of the live
+request.
+
+Use this template for:
+- Warming enforcement replicas before they take traffic
+- Re-warming the cache after a policy deployment clears it
+- Keeping hot decisions cached across TTL expiry
+"""
+
+from collections import Counter
+from dataclasses import dataclass, replace
+from datetime import datetime, timezone
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlencode, urlparse
+import json
+import ssl
+import threading
+import time
+
+# Assume these are imported from a GRID SDK
+from .http_adapter_template import Principal, Resource, Action, Context
+from .canonical_policy_engine import Policy, PolicyDecision, matcher_key
+from .decision_cache import CachingPolicyEngine
+
+AUDIT_PATH = '/api/v1/audit'
+
+# Hottest (principal, resource, action) tuples warmed per sensitivity tier
+DEFAULT_TOP_K = {
+    'critical': 500,
+    'high': 1000,
+    'medium': 2000,
+    'low': 2000
+}
+
+# Resource relations that §7.2 events of older writers may lack
+RESOURCE_RELATIONS = ('owner', 'managers')
+
+Request = Tuple[Principal, Resource, Action, Context]
+AuditSource = Callable[[Dict[str, str]], List[Dict[str, Any]]]
+
+
+def http_audit_source(base_url: str, timeout: float = 10.0,
+                      ssl_context: Optional[ssl.SSLContext] = None,
+                      headers: Optional[Dict[str, str]] = None) -> AuditSource:
+    """
+    An audit source that queries `GET /api/v1/audit` on `base_url`
+
+    Raises (when called):
+        ConnectionError: The query could not be sent or did not return 200
+    """
+    parsed = urlparse(base_url)
+
+    def fetch(params: Dict[str, str]) -> List[Dict[str, Any]]:
+        connection = HTTPSConnection(parsed.hostname, parsed.port, timeout=timeout, context=ssl_context) \
+            if parsed.scheme == 'https' else HTTPConnection(parsed.hostname, parsed.port, timeout=timeout)
+        try:
+            connection.request('GET', f"{AUDIT_PATH}?{urlencode(params)}", headers=headers or {})
+            response = connection.getresponse()
+            body = response.read()
+        except (HTTPException, OSError) as e:
+            raise ConnectionError(f"{parsed.hostname}: {e}") from e
+        finally:
+            connection.close()
+        if response.status != 200:
+            raise ConnectionError(f"{parsed.hostname}: /v1/audit returned HTTP {response.status}")
+        return json.loads(body)
+
+    return fetch
+
+
+def request_from_event(event: Dict[str, Any], timestamp: Optional[str] = None) -> Request:
+    """Rebuild the request of a §7.2 audit event, at `timestamp`"""
+    principal = event.get('principal') or {}
+    resource = event.get('resource') or {}
+    context = event.get('context') or {}
+    attributes = dict(principal.get('attributes') or {})
+    return (
+        Principal(id=principal.get('id'), type=principal.get('type'), role=attributes.get('role'),
+                  teams=attributes.get('teams'), attributes=attributes),
+        Resource(id=resource.get('id'), type=resource.get('type'), name=resource.get('name'),
+                 sensitivity=resource.get('sensitivity'), owner=resource.get('owner'),
+                 managers=resource.get('managers')),
+        Action(operation=(event.get('action') or {}).get('operation')),
+        Context(timestamp=timestamp, ip_address=context.get('ip_address'),
+                user_agent=context.get('user_agent'), environment=context.get('environment'))
+    )
+
+
+def missing_relations(event: Dict[str, Any]) -> Tuple[str, ...]:
+    """The resource relations (owner, managers) a §7.2 audit event does not record"""
+    resource = event.get('resource') or {}
+    return tuple(key for key in RESOURCE_RELATIONS if key not in resource)
+
+
+def relations_read(policies: Iterable[Policy]) -> Set[str]:
+    """The resource relations (owner, managers) any rule of `policies` reads"""
+    keys: Set[str] = set()
+    for policy in policies:
+        for rule in policy.rules:
+            keys |= {matcher_key(m) for m in rule.resources}
+            keys |= {m.ref.partition('.')[2] for m in rule.principals + rule.actions
+                     if m.ref and m.ref.startswith('resource.')}
+    return keys & set(RESOURCE_RELATIONS)
+
+
+@dataclass
+class HotEntry:
+    """A frequently decided request and how often it was seen"""
+    request: Request
+    sensitivity: str
+    count: int
+    missing: Tuple[str, ...] = ()  # Relations its audit event does not record
+
+
+def hot_entries(events: List[Dict[str, Any]], key: Callable[..., Tuple], top_k: int) -> List[HotEntry]:
+    """
+    The `top_k` most frequent requests in `events`, most frequent first
+
+    Args:
+        events: Audit events, newest first (the newest of each key is kept)
+        key: Cache key function, e.g. `DecisionCache.key`
+        top_k: Number of entries to return
+    """
+    counts: Counter = Counter()
+    latest: Dict[Tuple, Tuple[Request, Tuple[str, ...]]] = {}
+    for event in events:
+        request = request_from_event(event)
+        k = key(*request)
+        counts[k] += 1
+        latest.setdefault(k, (request, missing_relations(event)))
+    return [HotEntry(latest[k][0], latest[k][0][1].sensitivity, count, latest[k][1])
+            for k, count in counts.most_common(top_k)]
+
+
+@dataclass
+class WarmupStats:
+    """Warm-up and prefetch counters"""
+    events_read: int = 0
+    hot_entries: int = 0
+    warmed: int = 0
+    warm_seconds: float = 0.0
+    budget_exceeded: bool = False
+    prefetched: int = 0
+    rescans: int = 0
+    fetch_errors: int = 0
+    evaluation_errors: int = 0
+    incomplete: int = 0  # Hot entries not warmed: their events lack relations the policies read
+
+
+# =============================================================================
+# Cache Warmer
+# =============================================================================
+
+class CacheWarmer:
+    """
+    Warms a CachingPolicyEngine from audit history and keeps hot entries cached
+
+    Args:
+        engine: The caching engine to warm
+        source: Audit source, called with `/v1/audit` query parameters
+            and returning events newest first (see `http_audit_source`)
+        top_k: Sensitivity tier to number of hot entries (default DEFAULT_TOP_K)
+        window: How far back to read the audit log (`last`, e.g. '1h')
+        events_per_tier: Most recent events read per tier
+        batch_size: Requests evaluated per batch (one `evaluate_batch`
+            call when the wrapped engine has one)
+        budget: Seconds warm-up may take before the replica reports ready
+            anyway; a replica must not stay out of rotation because the
+            audit log is slow
+        lead: Fraction of a tier's TTL before expiry at which prefetch
+            refreshes an entry
+        rescan_interval: Seconds between re-reads of the hot set by `start()`
+        now: Current time, the timestamp requests are evaluated at
+
+    Raises:
+        ValueError: If `lead` is not between 0 and 1
+    """
+
+    def __init__(self, engine: CachingPolicyEngine, source: AuditSource,
+                 top_k: Optional[Dict[str, int]] = None, window: str = '1h',
+                 events_per_tier: int = 10_000, batch_size: int = 256, budget: float = 30.0,
+                 lead: float = 0.2, rescan_interval: float = 300.0,
+                 now: Callable[[], datetime] = lambda: datetime.now(timezone.utc)):
+        if not 0.0 < lead < 1.0:
+            raise ValueError("lead must be between 0 and 1")
+        self.engine = engine
+        self.source = source
+        self.top_k = dict(top_k if top_k is not None else DEFAULT_TOP_K)
+        self.window = window
+        self.events_per_tier = events_per_tier
+        self.batch_size = batch_size
+        self.budget = budget
+        self.lead = lead
+        self.rescan_interval = rescan_interval
+        self.now = now
+        self.stats = WarmupStats()
+        self.hot: List[HotEntry] = []
+        self.ready = threading.Event()
+        self._lock = threading.RLock()  # One evaluation pass, or deploy and re-warm, at a time
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def warm(self) -> WarmupStats:
+        """Read the hot set and pre-evaluate it, hottest first; then report ready"""
+        started = time.monotonic()
+        self.refresh_hot_set()
+        with self._lock:
+            warmable = self._warmable(self.hot)
+            self.stats.incomplete = len(self.hot) - len(warmable)
+            self.stats.warmed += self._evaluate(warmable, deadline=started + self.budget)
+        self.stats.warm_seconds = time.monotonic() - started
+        self.stats.budget_exceeded = self.stats.warmed < len(warmable)
+        self.ready.set()
+        return self.stats
+
+    def health_check(self) -> bool:
+        """Whether warm-up has finished; combine with the adapter's own check"""
+        return self.ready.is_set()
+
+    def refresh_hot_set(self) -> List[HotEntry]:
+        """Re-read the top-K requests of each sensitivity tier from the audit log"""
+        hot: List[HotEntry] = []
+        for tier, k in self.top_k.items():
+            if k <= 0:
+                continue
+            try:
+                events = self.source({'sensitivity': tier, 'last': self.window, 'order': 'desc',
+                                      'limit': str(self.events_per_tier)})
+            except (ConnectionError, ValueError):
+                self.stats.fetch_errors += 1
+                continue
+            self.stats.events_read += len(events)
+            hot.extend(hot_entries(events, self.engine.cache.key, k))
+        hot.sort(key=lambda entry: -entry.count)
+        self.hot = hot
+        self.stats.hot_entries = len(hot)
+        self.stats.rescans += 1
+        return hot
+
+    def prefetch(self) -> int:
+        """Refresh the hot entries that are missing or within `lead` of expiry; returns how many"""
+        cache = self.engine.cache
+        shortest = min(cache.ttls.values())
+        due = []
+        with self.engine.lock:
+            for entry in self.hot:
+                remaining = cache.expires_in(cache.key(*entry.request))
+                if remaining is None or remaining < self.lead * cache.ttls.get(entry.sensitivity, shortest):
+                    due.append(entry)
+        refreshed = self._evaluate(due)
+        self.stats.prefetched += refreshed
+        return refreshed
+
+    def deploy_policy(self, policy: Policy) -> None:
+        """
+        Deploy through the caching engine (which clears the cache) and re-warm the hot set
+
+        Holds the evaluation lock throughout, so a prefetch pass cannot
+        write decisions of the old policy after the cache was cleared.
+        """
+        with self._lock:
+            self.engine.deploy_policy(policy)
+            warmable = self._warmable(self.hot)
+            self.stats.incomplete = len(self.hot) - len(warmable)
+            self._evaluate(warmable)
+
+    def start(self, interval: Optional[float] = None) -> None:
+        """
+        Prefetch in a background thread
+
+        Args:
+            interval: Seconds between prefetch passes (default: half the
+                lead time of the shortest TTL)
+        """
+        if interval is None:
+            interval = self.lead * min(self.engine.cache.ttls.values()) / 2
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(interval,), name='grid-prefetch', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    # =========================================================================
+    # Private Helper Methods
+    # =========================================================================
+
+    def _run(self, interval: float) -> None:
+        rescan_at = time.monotonic() + self.rescan_interval
+        while not self._stop.wait(interval):
+            if time.monotonic() >= rescan_at:
+                self.refresh_hot_set()
+                rescan_at = time.monotonic() + self.rescan_interval
+            self.prefetch()
+
+    def _warmable(self, entries: List[HotEntry]) -> List[HotEntry]:
+        """
+        The entries whose events record every relation the deployed policies
+        read (all relations count when the engine does not expose its policies)
+        """
+        policies = getattr(self.engine.engine, 'policies', None)
+        read = relations_read(policies.values()) if policies is not None else set(RESOURCE_RELATIONS)
+        return [entry for entry in entries if not read.intersection(entry.missing)]
+
+    def _evaluate(self, entries: List[HotEntry], deadline: Optional[float] = None) -> int:
+        """Evaluate the warmable `entries` in batches at the current time and cache the decisions"""
+        cache = self.engine.cache
+        inner = self.engine.engine
+        done = 0
+        with self._lock:
+            entries = self._warmable(entries)
+            for start in range(0, len(entries), self.batch_size):
+                if deadline is not None and time.monotonic() >= deadline:
+                    break
+                batch = entries[start:start + self.batch_size]
+                timestamp = self.now().isoformat().replace('+00:00', 'Z')
+                requests = [(p, r, a, replace(c, timestamp=timestamp)) for p, r, a, c in
+                            (entry.request for entry in batch)]
+                began = time.perf_counter()
+                try:
+                    if hasattr(inner, 'evaluate_batch'):
+                        decisions: List[PolicyDecision] = inner.evaluate_batch(requests)
+                    else:
+                        decisions = [inner.evaluate(*request) for request in requests]
+                except Exception:
+                    self.stats.evaluation_errors += len(batch)
+                    continue
+                compute_time = (time.perf_counter() - began) / len(batch)
+                with self.engine.lock:  # Shared with the request path
+                    for entry, request, decision in zip(batch, requests, decisions):
+                        cache.put(cache.key(*request), decision, entry.sensitivity, timestamp,
+                                  compute_time=compute_time)
+                done += len(batch)
+        return done
+
+
+# =============================================================================
+# Usage Example
+# =============================================================================
+
+if __name__ == '__main__':
+    import os
+    import random
+    from .canonical_policy_engine import CanonicalPolicyEngine, load_policy_file
+    from .decision_cache import DecisionCache
+    from .resilient_engine import audit_event
+
+    policy = load_policy_file(os.path.join(os.path.dirname(__file__), 'policies', 'rbac-basic.yaml'))
+    engine = CanonicalPolicyEngine([policy])
+
+    # Stand-in for /v1/audit: an hour of Zipf-distributed traffic
+    rng = random.Random(7)
+    principals = [Principal(id=f'user-{i}', type='human', role=rng.choice(['developer', 'viewer']))
+                  for i in range(200)]
+    resources = [Resource(id=f'res-{i}', type='tool', name='tool',
+                          sensitivity=rng.choice(['low', 'medium', 'high', 'critical'])) for i in range(100)]
+    weights = [1 / (i + 1) for i in range(len(principals))]
+    log = []
+    for _ in range(20_000):
+        request = (rng.choices(principals, weights)[0], rng.choices(resources, weights[:100])[0],
+                   Action(operation=rng.choice(['read', 'execute'])), Context(timestamp='2025-11-27T10:00:00Z'))
+        log.append(audit_event(*request, engine.evaluate(*request)))
+    log.reverse()  # Newest first, like order=desc
+
+    def source(params):
+        return [e for e in log if e['resource']['sensitivity'] == params['sensitivity']][:int(params['limit'])]
+
+    caching = CachingPolicyEngine(engine, DecisionCache())
+    warmer = CacheWarmer(caching, source, top_k={'critical': 100, 'high': 200, 'medium': 500, 'low': 500})
+    print('ready before warm-up:', warmer.health_check())
+    stats = warmer.warm()
+    print(f"warmed {stats.warmed} of {stats.hot_entries} hot entries from {stats.events_read} events "
+          f"in {stats.warm_seconds * 1000:.0f} ms; ready: {warmer.health_check()}")
+
+    for _ in range(5_000):
+        caching.evaluate(rng.choices(principals, weights)[0], rng.choices(resources, weights[:100])[0],
+                         Action(operation=rng.choice(['read', 'execute'])), Context(timestamp=None))
+    print(f"hit rate of the first 5,000 requests: {caching.cache.stats.hit_rate:.1%}")
@@ -0,0 +1,601 @@
+"""
+GRID Policy Engine: Canonical Policy Evaluator
+
+This template demonstrates an in-process policy engine for policies written
+in the GRID canonical exchange format (spec §8.1). It follows the
+deterministic evaluation order from spec §5.4:
+
+1. Match principal, resource and action
+2. Evaluate request-time conditions (time, context)
+3. Resolve conflicts: deny overrides allow, default deny
+
+Use this template for:
+- Embedding policy decisions in an adapter or sidecar without an OPA hop
+- Evaluating policies exported from another GRID implementation
+- Building optimizations on top of the matcher/condition split
+  (matchers depend only on principal, resource and action; conditions
+  depend on the request context)
+"""
+
+from abc import ABC, abstractmethod
+from bisect import insort
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+# Assume these are imported from a GRID SDK
+from .http_adapter_template import (
+    Principal, Resource, Action, Context, GridRequest, lazy_import
+)
+from .team_directory import TEAM_KEYS, TEAM_REFS, TeamDirectory, TeamView
+
+yaml = lazy_import('yaml')
+
+
+# =============================================================================
+# Canonical Policy Types (spec §2.4, §8.1)
+# =============================================================================
+
+@dataclass
+class Matcher:
+    """Matches one attribute of a principal, resource or action"""
+    type: str  # principal: exact, role, team, type, lead_teams, domain, attribute
+               # resource: exact, type, sensitivity, owner, managers, ...
+               # action: operation, exact, any
+    value: Any = None  # Literal value or list of values (set membership)
+    ref: Optional[str] = None  # Relational match, e.g. "principal.teams"
+    name: Optional[str] = None  # Attribute name when type == "attribute"
+    negate: bool = False
+
+
+@dataclass
+class Condition:
+    """Request-time condition evaluated against the GRID context"""
+    type: str  # time, context
+    operator: str  # business_hours, not_business_hours, equals, in, ...
+    value: Any = None
+    field: Optional[str] = None  # Context field when type == "context"
+
+
+@dataclass
+class Rule:
+    """A single policy rule"""
+    name: str
+    effect: str  # allow, deny
+    priority: int = 0
+    description: Optional[str] = None
+    principals: List[Matcher] = field(default_factory=list)
+    resources: List[Matcher] = field(default_factory=list)
+    actions: List[Matcher] = field(default_factory=list)
+    conditions: List[Condition] = field(default_factory=list)
+    constraints: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class Policy:
+    """A versioned set of rules"""
+    id: str
+    name: str
+    rules: List[Rule]
+    version: int = 1
+    status: str = 'active'  # active, draft, deprecated
+    type: str = 'authorization'
+
+
+@dataclass
+class PolicyDecision:
+    """Result of evaluating a request against the deployed policies"""
+    allowed: bool
+    reason: str
+    policy_id: Optional[str] = None
+    policy_version: Optional[int] = None
+    rule: Optional[str] = None
+    constraints: Optional[Dict[str, Any]] = None
+    valid_until: Optional[datetime] = None  # None: does not depend on time
+    degraded: Optional[Dict[str, Any]] = None  # Set when served without a fresh evaluation
+
+
+DEFAULT_DENY = PolicyDecision(
+    allowed=False,
+    reason='Access denied by default policy'
+)
+
+
+# =============================================================================
+# Policy Engine Interface (spec §10.1)
+# =============================================================================
+
+class PolicyEngine(ABC):
+    """Abstract policy evaluation engine"""
+
+    @abstractmethod
+    def evaluate(self, principal: Principal, resource: Resource,
+                 action: Action, context: Context) -> PolicyDecision:
+        """Evaluate policy and return decision"""
+        pass
+
+    @abstractmethod
+    def validate_policy(self, policy: str) -> bool:
+        """Validate policy syntax"""
+        pass
+
+    @abstractmethod
+    def deploy_policy(self, policy: Policy) -> None:
+        """Deploy policy to engine"""
+        pass
+
+
+# =============================================================================
+# Attribute Access
+# =============================================================================
+
+# Matcher types that are aliases for a plain attribute
+_KEY_ALIASES = {'exact': 'id', 'team': 'teams', 'operation': 'operation'}
+
+
+def matcher_key(matcher: Matcher) -> str:
+    """Return the attribute key a matcher reads, e.g. 'role' or 'attribute.department'"""
+    if matcher.type == 'attribute':
+        return f"attribute.{matcher.name}"
+    return _KEY_ALIASES.get(matcher.type, matcher.type)
+
+
+def principal_value(principal: Principal, key: str) -> Any:
+    """Read a principal attribute by key"""
+    if key == 'id':
+        return principal.id
+    if key == 'domain':
+        return principal.id.rpartition('@')[2] or None  # Federation home domain
+    if key == 'teams':
+        return principal.teams or []
+    if key == 'lead_teams':
+        leads = (principal.attributes or {}).get('is_team_lead') or {}
+        return [team for team in (principal.teams or []) if leads.get(team)]
+    if key.startswith('attribute.'):
+        return (principal.attributes or {}).get(key[len('attribute.'):])
+    return getattr(principal, key, None)
+
+
+def resource_value(resource: Resource, key: str) -> Any:
+    """Read a resource attribute by key"""
+    if key.startswith('attribute.'):
+        key = key[len('attribute.'):]
+    return getattr(resource, key, None)
+
+
+def _as_set(value: Any) -> frozenset:
+    """Normalize a scalar, list or None into a set for membership checks"""
+    if value is None:
+        return frozenset()
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return frozenset(value)
+    return frozenset([value])
+
+
+def _overlaps(actual: Any, expected: Any) -> bool:
+    """True if any of the actual values is among the expected values"""
+    if isinstance(actual, (list, tuple, set, frozenset)):
+        expected = _as_set(expected)
+        return any(item in expected for item in actual)
+    if isinstance(expected, (list, tuple, set, frozenset)):
+        return actual in expected
+    return actual is not None and actual == expected
+
+
+def _resolve_ref(ref: str, principal: Principal, resource: Resource) -> Any:
+    """Resolve a relational reference such as 'principal.teams'"""
+    side, _, key = ref.partition('.')
+    if side == 'principal':
+        return principal_value(principal, key)
+    if side == 'resource':
+        return resource_value(resource, key)
+    raise ValueError(f"Unknown reference: {ref}")
+
+
+def matches(matcher: Matcher, actual: Any, principal: Principal,
+            resource: Resource) -> bool:
+    """Check one matcher against the attribute value it reads"""
+    if matcher.type == 'any':
+        return not matcher.negate
+    if matcher.ref is not None:
+        result = _overlaps(actual, _resolve_ref(matcher.ref, principal, resource))
+    elif matcher.value is None:
+        result = bool(actual)  # Attribute is present and non-empty
+    else:
+        result = _overlaps(actual, matcher.value)
+    return result != matcher.negate
+
+
+def rule_matches(rule: Rule, principal: Principal, resource: Resource,
+                 operation: Optional[str], teams: Optional[TeamView] = None) -> bool:
+    """
+    Check the principal, resource and action matchers of a rule
+
+    With `teams`, team matchers and relational matchers against the
+    principal's teams are answered from the team directory's bitsets.
+    """
+    for m in rule.principals:
+        if teams is not None and m.ref is None and matcher_key(m) in TEAM_KEYS:
+            if teams.principal_matches(matcher_key(m), m.value) == m.negate:
+                return False
+        elif not matches(m, principal_value(principal, matcher_key(m)),
+                         principal, resource):
+            return False
+    for m in rule.resources:
+        if teams is not None and m.ref in TEAM_REFS:
+            if teams.overlaps(matcher_key(m), TEAM_REFS[m.ref]) == m.negate:
+                return False
+        elif not matches(m, resource_value(resource, matcher_key(m)),
+                         principal, resource):
+            return False
+    for m in rule.actions:
+        if not matches(m, operation, principal, resource):
+            return False
+    return True
+
+
+# =============================================================================
+# Condition Evaluation
+# =============================================================================
+
+BUSINESS_HOURS = (9, 18)  # 9 AM - 6 PM UTC, Monday-Friday
+
+
+def parse_timestamp(timestamp: Optional[str]) -> Optional[datetime]:
+    """Parse an RFC 3339 timestamp from the GRID context"""
+    if not timestamp:
+        return None
+    parsed = datetime.fromisoformat(timestamp.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc)
+
+
+def request_moment(context: Context) -> Optional[datetime]:
+    """The request time in UTC, or None if the timestamp is missing or malformed"""
+    try:
+        return parse_timestamp(context.timestamp)
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+def unknown_time_holds(effect: str) -> bool:
+    """
+    Value of a time condition when the request time is unknown: deny rules
+    fail closed (the condition holds), allow rules do not fire
+    """
+    return effect == 'deny'
+
+
+def is_business_hours(moment: datetime, hours: Tuple[int, int] = BUSINESS_HOURS) -> bool:
+    """Check if a UTC moment falls within business hours on a weekday"""
+    return moment.weekday() < 5 and hours[0] <= moment.hour < hours[1]
+
+
+def context_value(context: Context, name: str) -> Any:
+    """Read a context field, falling back to context metadata"""
+    if hasattr(context, name):
+        return getattr(context, name)
+    return (context.metadata or {}).get(name)
+
+
+def _next_business_hours_change(moment: datetime, hours: Tuple[int, int]) -> datetime:
+    """Next moment at which is_business_hours(moment, hours) flips"""
+    day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    if is_business_hours(moment, hours):
+        return day + timedelta(hours=hours[1])
+    if moment.weekday() < 5 and moment.hour < hours[0]:
+        return day + timedelta(hours=hours[0])
+    day += timedelta(days=1)
+    while day.weekday() >= 5:
+        day += timedelta(days=1)
+    return day + timedelta(hours=hours[0])
+
+
+def time_condition_holds(condition: Condition, moment: datetime) -> bool:
+    """Evaluate a time condition at a UTC moment"""
+    hours = tuple(condition.value) if condition.value else BUSINESS_HOURS
+    if condition.operator == 'business_hours':
+        return is_business_hours(moment, hours)
+    if condition.operator == 'not_business_hours':
+        return not is_business_hours(moment, hours)
+    if condition.operator == 'weekend':
+        return moment.weekday() >= 5
+    if condition.operator == 'between':
+        start, end = (parse_timestamp(t) for t in condition.value)
+        return start <= moment <= end
+    raise ValueError(f"Unknown time operator: {condition.operator}")
+
+
+def next_time_condition_change(condition: Condition, moment: datetime) -> Optional[datetime]:
+    """
+    Next moment at which a time condition may change its value
+
+    Returns:
+        A UTC datetime, or None if the value never changes after `moment`
+    """
+    if condition.operator in ('business_hours', 'not_business_hours'):
+        hours = tuple(condition.value) if condition.value else BUSINESS_HOURS
+        return _next_business_hours_change(moment, hours)
+    if condition.operator == 'weekend':
+        day = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+        days = 7 - moment.weekday() if moment.weekday() >= 5 else 5 - moment.weekday()
+        return day + timedelta(days=days)
+    if condition.operator == 'between':
+        start, end = (parse_timestamp(t) for t in condition.value)
+        if moment < start:
+            return start
+        if moment <= end:
+            return end + timedelta(microseconds=1)
+        return None
+    raise ValueError(f"Unknown time operator: {condition.operator}")
+
+
+def condition_holds(condition: Condition, context: Context, effect: str = 'allow') -> bool:
+    """
+    Evaluate a single condition against the request context
+
+    `effect` is that of the condition's rule; it decides a time condition
+    when the timestamp is missing or malformed (see `unknown_time_holds`).
+    """
+    if condition.type == 'time':
+        moment = request_moment(context)
+        if moment is None:
+            return unknown_time_holds(effect)
+        return time_condition_holds(condition, moment)
+
+    if condition.type == 'context':
+        actual = context_value(context, condition.field)
+        if condition.operator == 'equals':
+            return actual == condition.value
+        if condition.operator == 'not_equals':
+            return actual != condition.value
+        if condition.operator == 'in':
+            return actual in condition.value
+        if condition.operator == 'not_in':
+            return actual not in condition.value
+        if condition.operator == 'exists':
+            return actual is not None
+        raise ValueError(f"Unknown context operator: {condition.operator}")
+
+    raise ValueError(f"Unknown condition type: {condition.type}")
+
+
+def _earliest(a: Optional[datetime], b: Optional[datetime]) -> Optional[datetime]:
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a, b)
+
+
+# =============================================================================
+# Policy Loading (spec §8.1)
+# =============================================================================
+
+def _load_matchers(items: Optional[List[Dict[str, Any]]]) -> List[Matcher]:
+    return [Matcher(**item) for item in items or []]
+
+
+def load_policy(document: Dict[str, Any]) -> Policy:
+    """
+    Build a Policy from a canonical policy document
+
+    Args:
+        document: Parsed `apiVersion: grid.io/v1alpha1`, `kind: Policy` document
+
+    Returns:
+        Policy object
+    """
+    if document.get('kind') != 'Policy':
+        raise ValueError("Document is not a GRID policy")
+
+    metadata = document.get('metadata', {})
+    spec = document.get('spec', {})
+    rules = []
+    for item in spec.get('rules', []):
+        match = item.get('match', {})
+        if item.get('effect') not in ('allow', 'deny'):
+            raise ValueError(f"Rule {item.get('name')} has invalid effect")
+        rules.append(Rule(
+            name=item['name'],
+            effect=item['effect'],
+            priority=item.get('priority', 0),
+            description=item.get('description'),
+            principals=_load_matchers(match.get('principals')),
+            resources=_load_matchers(match.get('resources')),
+            actions=_load_matchers(match.get('actions')),
+            conditions=[Condition(**c) for c in match.get('conditions', [])],
+            constraints=item.get('constraints')
+        ))
+
+    return Policy(
+        id=metadata.get('id', metadata['name']),
+        name=metadata['name'],
+        version=metadata.get('version', 1),
+        status=spec.get('status', 'active'),
+        type=spec.get('type', 'authorization'),
+        rules=rules
+    )
+
+
+def load_policy_file(path: str) -> Policy:
+    """Load a canonical policy from a YAML file"""
+    with open(path) as f:
+        return load_policy(yaml.safe_load(f))
+
+
+# =============================================================================
+# Canonical Policy Engine
+# =============================================================================
+
+class CanonicalPolicyEngine(PolicyEngine):
+    """
+    In-process evaluator for canonical GRID policies
+
+    Rules from all active policies are kept in one list: deny rules
+    first, each group ordered by priority (highest first), then policy id.
+    The first rule whose matchers and conditions pass decides, so a deny
+    always overrides an allow; no match means default deny.
+
+    With a TeamDirectory, team membership checks are bitset operations,
+    and the directory's memberships replace the claims of the principals
+    it lists.
+    """
+
+    def __init__(self, policies: Optional[List[Policy]] = None,
+                 directory: Optional[TeamDirectory] = None):
+        self.policies: Dict[str, Policy] = {}
+        self.directory = directory
+        self._rules: List[Tuple[Policy, Rule]] = []
+        for policy in policies or []:
+            self.deploy_policy(policy)
+
+    def evaluate(self, principal: Principal, resource: Resource,
+                 action: Action, context: Context) -> PolicyDecision:
+        """
+        Evaluate a request against all active policies
+
+        Args:
+            principal: Who is making the request
+            resource: What is being accessed
+            action: Requested operation
+            context: Request context (timestamp, environment, ...)
+
+        Returns:
+            PolicyDecision. If a time condition took part in the decision,
+            `valid_until` is the earliest moment at which one of those
+            conditions can change its value; until then the same request
+            gets the same decision. Without a valid timestamp, time
+            conditions hold for deny rules and fail for allow rules, so an
+            unknown request time never grants access a time window denies.
+        """
+        operation = action.operation
+        moment = None
+        timed = False  # Whether the request time has been read
+        valid_until = None
+        teams = self.directory.view(principal, resource) if self.directory is not None else None
+        for policy, rule in self._rules:
+            if not rule_matches(rule, principal, resource, operation, teams):
+                continue
+            fires = True
+            for condition in rule.conditions:
+                if condition.type != 'time':
+                    fires = fires and condition_holds(condition, context)
+                    continue
+                if not timed:
+                    moment, timed = request_moment(context), True
+                if moment is None:
+                    fires = fires and unknown_time_holds(rule.effect)
+                    continue
+                fires = fires and time_condition_holds(condition, moment)
+                valid_until = _earliest(
+                    valid_until, next_time_condition_change(condition, moment))
+            if fires:
+                decision = self.decision_for(policy, rule)
+                return replace(decision, valid_until=valid_until) if valid_until else decision
+
+        return replace(DEFAULT_DENY, valid_until=valid_until) if valid_until else DEFAULT_DENY
+
+    def evaluate_request(self, grid_request: GridRequest) -> PolicyDecision:
+        """Evaluate a translated GridRequest"""
+        return self.evaluate(
+            grid_request.principal,
+            grid_request.resource,
+            grid_request.action,
+            grid_request.context
+        )
+
+    def validate_policy(self, policy: str) -> bool:
+        """Validate a canonical policy YAML document"""
+        try:
+            load_policy(yaml.safe_load(policy))
+            return True
+        except (yaml.YAMLError, ValueError, KeyError, TypeError):
+            return False
+
+    def deploy_policy(self, policy: Policy) -> None:
+        """Deploy or replace a policy by id"""
+        old = self.policies.get(policy.id)
+        self.policies[policy.id] = policy
+        self._replace_rules(old, policy)
+
+    def remove_policy(self, policy_id: str) -> Optional[Policy]:
+        """Remove a policy by id"""
+        policy = self.policies.pop(policy_id, None)
+        self._replace_rules(policy, None)
+        return policy
+
+    def context_fields(self) -> Set[str]:
+        """Context fields read by context conditions (the timestamp is not one)"""
+        return {
+            condition.field
+            for _, rule in self.ordered_rules()
+            for condition in rule.conditions if condition.type == 'context'
+        }
+
+    def ordered_rules(self) -> List[Tuple[Policy, Rule]]:
+        """All active rules in evaluation order (denies first)"""
+        return self._rules
+
+    @staticmethod
+    def decision_for(policy: Policy, rule: Rule) -> PolicyDecision:
+        """Build the decision produced when a rule fires"""
+        allowed = rule.effect == 'allow'
+        reason = rule.description or rule.name
+        return PolicyDecision(
+            allowed=allowed,
+            reason=reason if allowed else f"Access denied: {reason}",
+            policy_id=policy.id,
+            policy_version=policy.version,
+            rule=rule.name,
+            constraints=rule.constraints if allowed else None
+        )
+
+    # =========================================================================
+    # Private Helper Methods
+    # =========================================================================
+
+    @staticmethod
+    def _rule_order(policy_rule: Tuple[Policy, Rule]) -> Tuple[bool, int, str]:
+        """Sort key: denies first, then priority (highest first), then policy id"""
+        policy, rule = policy_rule
+        return (rule.effect != 'deny', -rule.priority, policy.id)
+
+    def _replace_rules(self, old: Optional[Policy], new: Optional[Policy]) -> None:
+        """
+        Swap one policy's rules in the ordered rule list
+
+        The other policies' rules keep their positions, so deploying one
+        policy does not re-sort the whole list. Rules of the same policy
+        keep their document order.
+        """
+        if old is not None and old.status == 'active':
+            self._rules = [pr for pr in self._rules if pr[0] is not old]
+        if new is not None and new.status == 'active':
+            for rule in new.rules:
+                insort(self._rules, (new, rule), key=self._rule_order)
+
+
+# =============================================================================
+# Usage Example
+# =============================================================================
+
+if __name__ == '__main__':
+    import os
+
+    policy_dir = os.path.join(os.path.dirname(__file__), 'policies')
+    engine = CanonicalPolicyEngine([
+        load_policy_file(os.path.join(policy_dir, 'rbac-basic.yaml'))
+    ])
+
+    principal = Principal(id='alice@company.com', type='human', role='developer')
+    resource = Resource(id='res-jira-query', type='tool', name='jira.search',
+                        sensitivity='medium')
+    context = Context(timestamp='2025-11-27T19:45:30Z', environment='production')
+
+    decision = engine.evaluate(principal, resource, Action(operation='execute'), context)
+    print(f"execute: allowed={decision.allowed} reason={decision.reason}")
+
+    decision = engine.evaluate(principal, resource, Action(operation='write'), context)
+    print(f"write:   allowed={decision.allowed} reason={decision.reason}")
@@ -0,0 +1,340 @@
+"""
+GRID Policy Engine: Time-Window-Aware Decision Cache
+
+This template demonstrates the decision cache from spec §5.4 step 5
+("Store decision with sensitivity-based TTL"), extended for policies whose
+outcome depends on the request timestamp (business hours, weekends,
+maintenance windows).
+
+Putting the raw timestamp into the cache key makes every request a miss.
+Instead, the engine reports how long a decision stays valid
+(`PolicyDecision.valid_until`, e.g. 18:00 today or 09:00 on the next
+weekday) and each entry expires at:
+
+    expiry = min(sensitivity TTL, valid_until - request time)
+
+The key is {principal_id}:{resource_id}:{action}:{context_hash}, where the
+context hash only covers the context fields the policies actually read.
+
+Two options help when the engine behind the cache is slow or down
+(spec §12.3, "cache misses can cascade"):
+
+- Stale-if-error: an expired entry is kept for a bounded window per
+  sensitivity tier, and `get_stale()` returns it when a fresh decision
+  cannot be had. Critical resources never get a window.
+- Early refresh: a hot entry is reported as a miss shortly before it
+  expires, with a probability that rises as expiry nears and with how
+  long the decision took to compute (probabilistic early expiration), so
+  one caller refreshes it instead of every caller at the same instant.
+
+Use this template for:
+- Caching decisions of time-conditioned policies
+- Wrapping any PolicyEngine with the §5.4 sensitivity TTLs
+- Keeping last-known-good decisions for degraded-mode serving
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+import math
+import random
+import threading
+import time
+
+# Assume these are imported from a GRID SDK
+from .http_adapter_template import Principal, Resource, Action, Context
+from .canonical_policy_engine import (
+    Policy, PolicyDecision, PolicyEngine, context_value, parse_timestamp
+)
+
+
+# Sensitivity-based TTLs in seconds (spec §5.4)
+SENSITIVITY_TTL = {
+    'low': 600,      # 10 minutes
+    'medium': 300,   # 5 minutes
+    'high': 60,      # 1 minute
+    'critical': 30   # 30 seconds
+}
+
+
+# Stale-if-error windows in seconds past expiry. Tiers not listed (and
+# always `critical`) are never served stale.
+STALE_IF_ERROR = {
+    'low': 3600,     # 1 hour
+    'medium': 900,   # 15 minutes
+    'high': 120      # 2 minutes
+}
+
+
+@dataclass
+class CacheEntry:
+    """A cached decision and its expiry on the cache clock"""
+    decision: PolicyDecision
+    expires_at: float
+    stale_until: float = 0.0     # Kept for get_stale() until then
+    compute_time: float = 0.0    # Seconds the decision took to compute
+
+
+@dataclass
+class CacheStats:
+    """Decision cache counters"""
+    hits: int = 0
+    misses: int = 0
+    expired: int = 0
+    evictions: int = 0
+    not_cached: int = 0  # Decisions whose validity had already run out
+    early_refreshes: int = 0
+    stale_hits: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+# =============================================================================
+# Decision Cache
+# =============================================================================
+
+class DecisionCache:
+    """
+    LRU decision cache with sensitivity TTLs and validity windows
+
+    Not thread-safe: the engines that share one across request threads
+    hold a lock around every call (`CachingPolicyEngine.lock`, and the
+    resilient, admission and tenant engines' own locks).
+
+    Args:
+        max_entries: Maximum number of cached decisions
+        context_fields: Context fields that are part of the key
+        ttls: Sensitivity to TTL (seconds) mapping
+        stale_if_error: Sensitivity to stale window (seconds past expiry);
+            None keeps no stale entries
+        early_refresh: Early refresh aggressiveness (beta; 0 disables,
+            1 is the usual choice)
+        clock: Monotonic clock in seconds (injectable for tests)
+        random: Uniform [0, 1) source (injectable for tests)
+
+    Raises:
+        ValueError: If a stale window is given for `critical`
+    """
+
+    def __init__(self, max_entries: int = 100_000,
+                 context_fields: Iterable[str] = (),
+                 ttls: Optional[dict] = None,
+                 stale_if_error: Optional[Dict[str, float]] = None,
+                 early_refresh: float = 0.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 random: Callable[[], float] = random.random):
+        if stale_if_error and stale_if_error.get('critical'):
+            raise ValueError("Decisions on critical resources are never served stale")
+        self.max_entries = max_entries
+        self.context_fields = tuple(sorted(context_fields))
+        self.ttls = ttls or SENSITIVITY_TTL
+        self.stale_if_error = dict(stale_if_error or {})
+        self.early_refresh = early_refresh
+        self.clock = clock
+        self.random = random
+        self.stats = CacheStats()
+        self._entries: 'OrderedDict[Tuple, CacheEntry]' = OrderedDict()
+
+    def key(self, principal: Principal, resource: Resource,
+            action: Action, context: Context) -> Tuple:
+        """Build the cache key; the raw timestamp is never part of it"""
+        context_hash = tuple(context_value(context, f) for f in self.context_fields)
+        return (principal.id, resource.id, action.operation, context_hash)
+
+    def get(self, key: Tuple) -> Optional[PolicyDecision]:
+        """
+        Return a live cached decision, or None
+
+        With early refresh on, a live entry close to expiry may be reported
+        as a miss; it stays in the cache, so `get_stale()` still finds it
+        if the refresh fails.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        now = self.clock()
+        if entry.expires_at <= now:
+            if entry.stale_until <= now:
+                del self._entries[key]
+            self.stats.expired += 1
+            self.stats.misses += 1
+            return None
+        if self.early_refresh and entry.compute_time and \
+                now - entry.compute_time * self.early_refresh * math.log(1.0 - self.random()) \
+                >= entry.expires_at:
+            self.stats.early_refreshes += 1
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry.decision
+
+    def get_stale(self, key: Tuple) -> Optional[Tuple[PolicyDecision, float]]:
+        """
+        Return the last known decision for `key` and how many seconds past
+        its expiry it is (0 while still live), or None if there is none or
+        its stale window has run out
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        now = self.clock()
+        if max(entry.expires_at, entry.stale_until) <= now:
+            del self._entries[key]
+            return None
+        self.stats.stale_hits += 1
+        return entry.decision, max(0.0, now - entry.expires_at)
+
+    def has_stale(self, key: Tuple) -> bool:
+        """Whether `get_stale()` would return a decision for `key` (counts nothing)"""
+        entry = self._entries.get(key)
+        return entry is not None and max(entry.expires_at, entry.stale_until) > self.clock()
+
+    def expires_in(self, key: Tuple) -> Optional[float]:
+        """Seconds until the entry for `key` expires (negative once expired), or None (counts nothing)"""
+        entry = self._entries.get(key)
+        return None if entry is None else entry.expires_at - self.clock()
+
+    def put(self, key: Tuple, decision: PolicyDecision, sensitivity: str,
+            request_time: Optional[str] = None, compute_time: float = 0.0) -> None:
+        """
+        Cache a decision
+
+        Args:
+            key: Key from `key()`
+            decision: Decision to cache
+            sensitivity: Resource sensitivity, selects the TTL and stale window
+            request_time: Context timestamp the decision was made for
+            compute_time: Seconds the decision took (drives early refresh)
+        """
+        # Unknown sensitivity gets the shortest TTL (fail safe)
+        ttl = self.ttls.get(sensitivity, min(self.ttls.values()))
+        # A time-conditioned decision is never stale-served past its window
+        stale = self.stale_if_error.get(sensitivity, 0) if decision.valid_until is None else 0
+
+        if decision.valid_until is not None:
+            moment = parse_timestamp(request_time)
+            if moment is None:
+                self.stats.not_cached += 1
+                return
+            ttl = min(ttl, (decision.valid_until - moment).total_seconds())
+            if ttl <= 0:
+                self.stats.not_cached += 1
+                return
+
+        expires_at = self.clock() + ttl
+        self._entries[key] = CacheEntry(decision, expires_at, expires_at + stale, compute_time)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries (e.g. after a policy change)"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# =============================================================================
+# Caching Policy Engine
+# =============================================================================
+
+class CachingPolicyEngine(PolicyEngine):
+    """
+    Wraps a PolicyEngine with a DecisionCache
+
+    The cache key includes the fields configured on the cache plus the
+    context fields the wrapped engine reports through `context_fields()`;
+    the cache is cleared on every policy deployment. `lock` guards the
+    cache; anything else that reads or writes it (e.g. a cache warmer)
+    must hold it too.
+    """
+
+    def __init__(self, engine: Any, cache: Optional[DecisionCache] = None):
+        self.engine = engine
+        self.cache = cache if cache is not None else DecisionCache()
+        self.lock = threading.Lock()
+        self._configured_fields = set(self.cache.context_fields)
+        self._refresh_context_fields()
+
+    def evaluate(self, principal: Principal, resource: Resource,
+                 action: Action, context: Context) -> PolicyDecision:
+        key = self.cache.key(principal, resource, action, context)
+        with self.lock:
+            decision = self.cache.get(key)
+        if decision is not None:
+            return decision
+
+        start = time.perf_counter()
+        decision = self.engine.evaluate(principal, resource, action, context)
+        with self.lock:
+            self.cache.put(key, decision, resource.sensitivity, context.timestamp,
+                           compute_time=time.perf_counter() - start)
+        return decision
+
+    def validate_policy(self, policy: str) -> bool:
+        return self.engine.validate_policy(policy)
+
+    def deploy_policy(self, policy: Policy) -> None:
+        self.engine.deploy_policy(policy)
+        with self.lock:
+            self.cache.clear()
+            self._refresh_context_fields()
+
+    def _refresh_context_fields(self) -> None:
+        if hasattr(self.engine, 'context_fields'):
+            fields = self._configured_fields | set(self.engine.context_fields())
+            self.cache.context_fields = tuple(sorted(fields))
+
+
+# =============================================================================
+# Usage Example
+# =============================================================================
+
+if __name__ == '__main__':
+    import os
+    import random
+    from datetime import datetime, timedelta, timezone
+    from .canonical_policy_engine import CanonicalPolicyEngine, load_policy_file
+
+    policy = load_policy_file(
+        os.path.join(os.path.dirname(__file__), 'policies', 'time-based-access.yaml'))
+
+    random.seed(7)
+    principals = [
+        Principal(id=f'user-{i}', type='human',
+                  attributes={'clearance': random.choice(['medium', 'high', 'critical'])})
+        for i in range(20)
+    ]
+    resources = [
+        Resource(id=f'res-{i}', type='tool', name=f'tool-{i}',
+                 sensitivity=random.choice(['low', 'medium', 'high', 'critical']))
+        for i in range(5)
+    ]
+
+    def simulate(cache: DecisionCache) -> CacheStats:
+        """One simulated day, one request per second of simulated time"""
+        now = [0.0]
+        cache.clock = lambda: now[0]
+        engine = CachingPolicyEngine(CanonicalPolicyEngine([policy]), cache)
+        traffic = random.Random(1)
+        start = datetime(2025, 11, 27, tzinfo=timezone.utc)
+        for tick in range(24 * 3600):
+            now[0] = float(tick)
+            moment = start + timedelta(seconds=now[0])
+            engine.evaluate(
+                traffic.choice(principals), traffic.choice(resources),
+                Action(operation='read'),
+                Context(timestamp=moment.isoformat().replace('+00:00', 'Z')))
+        return cache.stats
+
+    keyed = simulate(DecisionCache(context_fields=['timestamp']))
+    windowed = simulate(DecisionCache())
+    print(f"Timestamp in key: hit rate {keyed.hit_rate:.1%}")
+    print(f"Validity windows: hit rate {windowed.hit_rate:.1%}")
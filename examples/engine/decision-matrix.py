@@ -0,0 +1,470 @@
+"""
+GRID Policy Engine: Decision Precomputation
+
+This template demonstrates partial evaluation of canonical GRID policies
+against the known principals and the registered resource catalog.
+
+Most rules (see `rbac-basic.yaml`, `rbac-team-based.yaml`) only test
+principal role/teams and resource sensitivity/owner. Those attributes are
+known before any request arrives, so the outcome of every
+(principal class, operation, resource class) cell can be computed ahead of
+time. Only cells whose outcome depends on a request-time condition (time,
+environment) are left as *residual* and go through full evaluation.
+
+When the engine has a TeamDirectory, principals are classed and cells
+evaluated by the directory's memberships, as the engine does, and a
+membership change moves the affected principals to their new rows.
+
+Use this template for:
+- Answering the bulk of authorization checks with a dict lookup and a bit test
+- Listing everything a principal may do (`allowed_resources`)
+- Keeping a precomputed view in sync as principals, resources and
+  policies change
+"""
+
+from array import array
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+# Assume these are imported from a GRID SDK
+from .http_adapter_template import Principal, Resource, Action, Context
+from .canonical_policy_engine import (
+    CanonicalPolicyEngine, Policy, PolicyDecision, PolicyEngine, Rule,
+    DEFAULT_DENY, matcher_key, principal_value, resource_value, rule_matches
+)
+from .team_directory import TEAM_KEYS, TeamView
+
+
+# Cell outcomes
+ALLOW = 'allow'
+DENY = 'deny'
+RESIDUAL = 'residual'
+
+# Rule id used for cells decided by the default deny
+_DEFAULT_RULE = -1
+
+# Stand-in for any operation no action matcher mentions; all such
+# operations behave identically, so they share one matrix slice
+OTHER_OPERATION = None
+
+
+# =============================================================================
+# Matrix Cells
+# =============================================================================
+
+class _Cell:
+    """
+    Outcomes for one (principal class, operation) pair
+
+    Bit `i` of each bitset refers to resource class `i`. `rule_ids[i]` is
+    the index of the deciding rule for non-residual cells.
+    """
+    __slots__ = ('allow', 'deny', 'residual', 'rule_ids')
+
+    def __init__(self):
+        self.allow = 0
+        self.deny = 0
+        self.residual = 0
+        self.rule_ids = array('i')
+
+    def set(self, column: int, outcome: str, rule_id: int) -> None:
+        bit = 1 << column
+        self.allow &= ~bit
+        self.deny &= ~bit
+        self.residual &= ~bit
+        if outcome == ALLOW:
+            self.allow |= bit
+        elif outcome == DENY:
+            self.deny |= bit
+        else:
+            self.residual |= bit
+        while len(self.rule_ids) <= column:
+            self.rule_ids.append(_DEFAULT_RULE)
+        self.rule_ids[column] = rule_id
+
+
+@dataclass
+class MatrixStats:
+    """Counters for the precomputed fast path"""
+    hits: int = 0
+    residual: int = 0
+    unknown_class: int = 0
+    rebuilds: int = 0
+    membership_updates: int = 0  # Directory changes applied
+
+
+# =============================================================================
+# Decision Matrix
+# =============================================================================
+
+class DecisionMatrix:
+    """
+    Allow/deny/residual matrix over principal classes x operations x
+    resource classes
+
+    A principal (resource) class is the projection of a principal (resource)
+    onto the attributes the deployed policies actually test. Two principals
+    with the same role and teams are indistinguishable to the policies, so
+    they share a row; the same holds for resource columns. With a team
+    directory on the engine, a principal's teams and teams led are the
+    directory's (see `TeamDirectory.masks`).
+    """
+
+    def __init__(self, engine: CanonicalPolicyEngine):
+        self.engine = engine
+        self.directory = getattr(engine, 'directory', None)
+        self.stats = MatrixStats()
+        self._principals: Dict[str, Principal] = {}
+        self._resources: Dict[str, Resource] = {}
+        self._reset()
+        if self.directory is not None:
+            self.directory.subscribe(self.update_memberships)
+
+    # =========================================================================
+    # Hot Path
+    # =========================================================================
+
+    def lookup(self, principal: Principal, resource: Resource,
+               operation: str) -> Optional[PolicyDecision]:
+        """
+        Answer from the matrix
+
+        Returns:
+            The precomputed decision, or None if the cell is residual or
+            the principal/resource class has not been precomputed
+        """
+        row = self._rows.get(self._principal_key(principal))
+        column = self._columns.get(self._resource_key(resource))
+        if row is None or column is None:
+            self.stats.unknown_class += 1
+            return None
+
+        cell = self._cells[row][self._operations.get(operation, self._other)]
+        if cell.residual >> column & 1:
+            self.stats.residual += 1
+            return None
+
+        self.stats.hits += 1
+        return self._decisions[cell.rule_ids[column]]
+
+    def allowed_resources(self, principal: Principal, operation: str) -> List[Resource]:
+        """Registered resources the principal is definitely allowed to access"""
+        row = self._rows.get(self._principal_key(principal))
+        if row is None:
+            return []
+        allow = self._cells[row][self._operations.get(operation, self._other)].allow
+        return [
+            resource for resource in self._resources.values()
+            if allow >> self._columns[self._resource_key(resource)] & 1
+        ]
+
+    # =========================================================================
+    # Incremental Maintenance
+    # =========================================================================
+
+    def register_principal(self, principal: Principal) -> None:
+        """Add or update a principal; computes a new row if its class is new"""
+        self._principals[principal.id] = principal
+        self._add_row(principal)
+
+    def register_resource(self, resource: Resource) -> None:
+        """Add or update a resource; computes a new column if its class is new"""
+        self._resources[resource.id] = resource
+        self._add_column(resource)
+
+    def register_all(self, principals: Iterable[Principal] = (),
+                     resources: Iterable[Resource] = ()) -> None:
+        """Bulk registration (e.g. at startup)"""
+        for principal in principals:
+            self.register_principal(principal)
+        for resource in resources:
+            self.register_resource(resource)
+
+    def update_policy(self, old: Optional[Policy], new: Optional[Policy]) -> None:
+        """
+        Refresh the matrix after a policy was deployed, replaced or removed
+
+        If the set of attributes the policies test is unchanged, only cells
+        that one of the old or new rules can match are recomputed. Otherwise
+        the projections change and the matrix is rebuilt.
+        """
+        if self._projection_changed():
+            self.rebuild()
+            return
+
+        self._index_rules()
+        changed = [rule for policy in (old, new) if policy for rule in policy.rules]
+        for operation, op_index in self._operation_items():
+            for row, principal in enumerate(self._row_principals):
+                if principal is None:
+                    continue
+                cell = self._cells[row][op_index]
+                for column, resource in enumerate(self._column_resources):
+                    teams = self._teams(principal, resource)
+                    if any(rule_matches(rule, principal, resource, operation, teams)
+                           for rule in changed):
+                        cell.set(column, *self._partial_evaluate(
+                            principal, resource, operation))
+
+    def update_memberships(self, principal_ids: Iterable[str]) -> None:
+        """
+        Re-class principals whose directory memberships changed
+
+        Called by the team directory after a feed update. A row whose
+        representative changed no longer describes that principal's class:
+        it is dropped and the classes of all registered principals are
+        recomputed (new rows only where a class has none). Dropped rows are
+        reclaimed by a rebuild once they outnumber live ones.
+        """
+        self.stats.membership_updates += 1
+        changed = set(principal_ids)
+        stale = {row for row, principal in enumerate(self._row_principals)
+                 if principal is not None and principal.id in changed}
+        if not stale:
+            for principal_id in changed & self._principals.keys():
+                self._add_row(self._principals[principal_id])
+            return
+
+        for key in [key for key, row in self._rows.items() if row in stale]:
+            del self._rows[key]
+        for row in stale:
+            self._row_principals[row] = None
+            self._orphans += 1
+        if self._orphans > len(self._rows):
+            self.rebuild()
+            return
+        for principal in self._principals.values():
+            self._add_row(principal)
+
+    def rebuild(self) -> None:
+        """Recompute projections and every cell from scratch"""
+        self.stats.rebuilds += 1
+        self._reset()
+        for principal in self._principals.values():
+            self._add_row(principal)
+        for resource in self._resources.values():
+            self._add_column(resource)
+
+    # =========================================================================
+    # Private Helper Methods
+    # =========================================================================
+
+    def _reset(self) -> None:
+        """Derive projections and the operation axis from the deployed rules"""
+        self._principal_keys, self._resource_keys, operations = \
+            self._referenced_attributes()
+        self._principal_key = _projection(self._principal_value, self._principal_keys)
+        self._resource_key = _projection(resource_value, self._resource_keys)
+
+        self._operations = {op: i for i, op in enumerate(sorted(operations))}
+        self._other = len(self._operations)
+
+        self._rows: Dict[Tuple, int] = {}
+        self._row_principals: List[Optional[Principal]] = []  # None: row dropped
+        self._orphans = 0
+        self._columns: Dict[Tuple, int] = {}
+        self._column_resources: List[Resource] = []
+        self._cells: List[List[_Cell]] = []
+
+        self._rule_ids: Dict[int, int] = {}
+        self._rule_table: List[Rule] = []
+        self._decisions: List[PolicyDecision] = [DEFAULT_DENY]  # rule id -1
+        self._index_rules()
+
+    def _index_rules(self) -> None:
+        """
+        Assign rule ids and prebuild the decision each rule produces
+
+        Ids are append-only between rebuilds so cells that were not
+        recomputed after a policy update still point at the right decision.
+        The rule objects are kept alive in `_rule_table` so their `id()`
+        cannot be reused by a newer rule.
+        """
+        for policy, rule in self.engine.ordered_rules():
+            if id(rule) not in self._rule_ids:
+                self._rule_ids[id(rule)] = len(self._rule_table)
+                self._rule_table.append(rule)
+                self._decisions.insert(-1, self.engine.decision_for(policy, rule))
+
+    def _referenced_attributes(self) -> Tuple[Tuple[str, ...], Tuple[str, ...], Set[str]]:
+        """Collect the attributes and operations the active rules test"""
+        principal_keys: Set[str] = set()
+        resource_keys: Set[str] = set()
+        operations: Set[str] = set()
+
+        for _, rule in self.engine.ordered_rules():
+            for m in rule.principals:
+                principal_keys.add(matcher_key(m))
+            for m in rule.resources:
+                resource_keys.add(matcher_key(m))
+            for m in rule.principals + rule.resources:
+                if m.ref:
+                    side, _, key = m.ref.partition('.')
+                    (principal_keys if side == 'principal' else resource_keys).add(key)
+            for m in rule.actions:
+                if m.type != 'any':
+                    operations.update(m.value if isinstance(m.value, list) else [m.value])
+
+        return tuple(sorted(principal_keys)), tuple(sorted(resource_keys)), operations
+
+    def _principal_value(self, principal: Principal, key: str) -> Any:
+        """principal_value, with team keys read as directory bitsets"""
+        if self.directory is not None and key in TEAM_KEYS:
+            return self.directory.masks(principal)[TEAM_KEYS.index(key)]
+        return principal_value(principal, key)
+
+    def _teams(self, principal: Principal, resource: Resource) -> Optional[TeamView]:
+        return self.directory.view(principal, resource) if self.directory is not None else None
+
+    def _projection_changed(self) -> bool:
+        principal_keys, resource_keys, operations = self._referenced_attributes()
+        return (principal_keys != self._principal_keys
+                or resource_keys != self._resource_keys
+                or operations != set(self._operations))
+
+    def _operation_items(self) -> List[Tuple[Optional[str], int]]:
+        return list(self._operations.items()) + [(OTHER_OPERATION, self._other)]
+
+    def _add_row(self, principal: Principal) -> None:
+        key = self._principal_key(principal)
+        if key in self._rows:
+            return
+        self._rows[key] = len(self._row_principals)
+        self._row_principals.append(principal)
+
+        row = []
+        for operation, _ in self._operation_items():
+            cell = _Cell()
+            for column, resource in enumerate(self._column_resources):
+                cell.set(column, *self._partial_evaluate(principal, resource, operation))
+            row.append(cell)
+        self._cells.append(row)
+
+    def _add_column(self, resource: Resource) -> None:
+        key = self._resource_key(resource)
+        if key in self._columns:
+            return
+        column = len(self._column_resources)
+        self._columns[key] = column
+        self._column_resources.append(resource)
+
+        for principal, row in zip(self._row_principals, self._cells):
+            if principal is None:
+                continue
+            for operation, op_index in self._operation_items():
+                row[op_index].set(column, *self._partial_evaluate(
+                    principal, resource, operation))
+
+    def _partial_evaluate(self, principal: Principal, resource: Resource,
+                          operation: Optional[str]) -> Tuple[str, int]:
+        """
+        Evaluate a cell with the request context unknown
+
+        Mirrors CanonicalPolicyEngine.evaluate: the first matching deny
+        decides, then the first matching allow. A matching rule with
+        conditions makes the cell residual, because whether it fires (and
+        therefore which decision and reason are returned) is only known at
+        request time.
+        """
+        teams = self._teams(principal, resource)
+        for _, rule in self.engine.ordered_rules():
+            if not rule_matches(rule, principal, resource, operation, teams):
+                continue
+            if rule.conditions:
+                return RESIDUAL, _DEFAULT_RULE
+            return (ALLOW if rule.effect == 'allow' else DENY), self._rule_ids[id(rule)]
+        return DENY, _DEFAULT_RULE
+
+
+def _projection(read: Callable[[Any, str], Any],
+                keys: Tuple[str, ...]) -> Callable[[Any], Tuple]:
+    """Build a function mapping an object to its hashable class key"""
+    def key(obj: Any) -> Tuple:
+        values = []
+        for name in keys:
+            value = read(obj, name)
+            if isinstance(value, (list, set, tuple)):
+                value = frozenset(value)
+            elif isinstance(value, dict):
+                value = frozenset(value.items())
+            values.append(value)
+        return tuple(values)
+    return key
+
+
+# =============================================================================
+# Precomputed Policy Engine
+# =============================================================================
+
+class PrecomputedPolicyEngine(PolicyEngine):
+    """
+    Policy engine that answers from a DecisionMatrix and falls back to full
+    evaluation for residual cells and unknown principal/resource classes
+    """
+
+    def __init__(self, engine: CanonicalPolicyEngine,
+                 principals: Iterable[Principal] = (),
+                 resources: Iterable[Resource] = ()):
+        self.engine = engine
+        self.matrix = DecisionMatrix(engine)
+        self.matrix.register_all(principals, resources)
+
+    def evaluate(self, principal: Principal, resource: Resource,
+                 action: Action, context: Context) -> PolicyDecision:
+        decision = self.matrix.lookup(principal, resource, action.operation)
+        if decision is not None:
+            return decision
+        return self.engine.evaluate(principal, resource, action, context)
+
+    def validate_policy(self, policy: str) -> bool:
+        return self.engine.validate_policy(policy)
+
+    def deploy_policy(self, policy: Policy) -> None:
+        old = self.engine.policies.get(policy.id)
+        self.engine.deploy_policy(policy)
+        self.matrix.update_policy(old, policy)
+
+    def remove_policy(self, policy_id: str) -> None:
+        old = self.engine.remove_policy(policy_id)
+        self.matrix.update_policy(old, None)
+
+    def register_principal(self, principal: Principal) -> None:
+        self.matrix.register_principal(principal)
+
+    def register_resource(self, resource: Resource) -> None:
+        self.matrix.register_resource(resource)
+
+
+# =============================================================================
+# Usage Example
+# =============================================================================
+
+if __name__ == '__main__':
+    import os
+    from .canonical_policy_engine import load_policy_file
+
+    policy_dir = os.path.join(os.path.dirname(__file__), 'policies')
+    engine = CanonicalPolicyEngine([
+        load_policy_file(os.path.join(policy_dir, 'rbac-basic.yaml'))
+    ])
+
+    principals = [
+        Principal(id='alice@company.com', type='human', role='developer'),
+        Principal(id='bob@company.com', type='human', role='viewer'),
+        Principal(id='admin@company.com', type='human', role='admin'),
+    ]
+    resources = [
+        Resource(id=f'res-{s}', type='tool', name=f'{s}-tool', sensitivity=s)
+        for s in ('low', 'medium', 'high', 'critical')
+    ]
+    precomputed = PrecomputedPolicyEngine(engine, principals, resources)
+
+    context = Context(timestamp='2025-11-27T22:00:00Z', environment='dev')
+    for principal in principals:
+        for resource in resources:
+            decision = precomputed.evaluate(
+                principal, resource, Action(operation='execute'), context)
+            print(f"{principal.role:10} execute {resource.sensitivity:8} "
+                  f"-> {'allow' if decision.allowed else 'deny'}")
+
+    print(f"Matrix stats: {precomputed.matrix.stats}")
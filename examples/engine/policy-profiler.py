@@ -0,0 +1,603 @@
+"""
+GRID Policy Engine: Per-Rule Profiler and Explain Traces
+
+This template demonstrates finding out where policy evaluation time goes.
+With a few dozen allow and deny rules, one slow or misplaced rule can
+dominate evaluation, and a rule that never fires is invisible. The
+profiler evaluates requests the way CanonicalPolicyEngine does (same
+decisions, same `valid_until`) while recording, per rule:
+
+- Invocations: how often evaluation reached the rule
+- Match rates: how often its matchers passed and how often it fired,
+  and at which matcher side (principal, resource, action) or condition
+  it failed otherwise
+- Time spent in its matchers and in its conditions
+- How often it decided, and at which position in the rule list
+  evaluation stopped (the short-circuit position)
+
+The profile is exported as folded stacks (flamegraph.pl, speedscope) and
+as JSON from a stats endpoint, and yields rule reordering suggestions
+from the observed selectivity and cost. An explain trace lists every rule
+evaluated for one request and why it fired or failed; traces are
+produced on demand or for a sampled fraction of requests, and the
+unsampled path records counters only.
+
+Use this template for:
+- Finding the rules that dominate evaluation time
+- Finding rules that never fire
+- Answering "why was this request denied?" without a debugger
+"""
+
+from collections import Counter, deque
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+import json
+import random
+import threading
+import time
+
+# Assume these are imported from a GRID SDK
+from .http_adapter_template import Principal, Resource, Action, Context
+from .canonical_policy_engine import (
+    CanonicalPolicyEngine, Condition, DEFAULT_DENY, Matcher, Policy, PolicyDecision, PolicyEngine, Rule,
+    condition_holds, context_value, matcher_key, matches, next_time_condition_change,
+    principal_value, request_moment, resource_value, time_condition_holds, unknown_time_holds
+)
+from .team_directory import TEAM_KEYS, TEAM_REFS, TeamView
+
+
+PROFILE_PATH = '/api/v1/policy/profile'
+
+
+@dataclass
+class RuleProfile:
+    """Counters and time for one rule"""
+    policy_id: str
+    rule: str
+    effect: str
+    priority: int
+    invocations: int = 0
+    matched: int = 0  # Matchers passed
+    fired: int = 0  # Matchers and conditions passed
+    decided: int = 0  # First rule to fire
+    match_ns: int = 0
+    condition_ns: int = 0
+    failed_at: Counter = field(default_factory=Counter)  # principal, resource, action, condition -> count
+
+    @property
+    def time_ns(self) -> int:
+        return self.match_ns + self.condition_ns
+
+    @property
+    def match_rate(self) -> float:
+        return self.matched / self.invocations if self.invocations else 0.0
+
+    @property
+    def fire_rate(self) -> float:
+        return self.fired / self.invocations if self.invocations else 0.0
+
+    @property
+    def cost_ns(self) -> float:
+        """Mean time per invocation"""
+        return self.time_ns / self.invocations if self.invocations else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'policy_id': self.policy_id, 'rule': self.rule, 'effect': self.effect, 'priority': self.priority,
+            'invocations': self.invocations, 'matched': self.matched, 'fired': self.fired,
+            'decided': self.decided, 'match_rate': round(self.match_rate, 4),
+            'fire_rate': round(self.fire_rate, 4), 'time_us': round(self.time_ns / 1000, 1),
+            'cost_us': round(self.cost_ns / 1000, 3), 'failed_at': dict(self.failed_at),
+        }
+
+
+@dataclass
+class RuleTrace:
+    """One rule evaluated for an explained request"""
+    policy_id: str
+    rule: str
+    effect: str
+    result: str  # fired, no_match, condition_failed
+    detail: str
+    elapsed_us: float
+
+
+@dataclass
+class ExplainTrace:
+    """Why a request got its decision"""
+    request: Dict[str, Any]
+    allowed: bool
+    policy_id: Optional[str]
+    rule: Optional[str]
+    rules: List[RuleTrace]
+    not_evaluated: int  # Rules after the deciding one
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'request': self.request, 'allowed': self.allowed, 'policy_id': self.policy_id, 'rule': self.rule,
+            'rules': [vars(r) for r in self.rules], 'not_evaluated': self.not_evaluated,
+        }
+
+
+@dataclass
+class ReorderSuggestion:
+    """A new priority for a rule, with the expected effect on evaluation time"""
+    policy_id: str
+    rule: str
+    effect: str
+    priority: int
+    suggested_priority: int
+    fire_rate: float
+    cost_us: float
+    has_constraints: bool  # The rule's constraints may now be reported for other requests
+
+
+# =============================================================================
+# Matcher and Condition Checks
+# =============================================================================
+
+def first_mismatch(rule: Rule, principal: Principal, resource: Resource, operation: Optional[str],
+                   teams: Optional[TeamView] = None) -> Optional[Tuple[str, Matcher]]:
+    """
+    The first matcher of a rule that fails, with its side
+
+    Same checks as `rule_matches()`; None if every matcher passes.
+    """
+    for m in rule.principals:
+        if teams is not None and m.ref is None and matcher_key(m) in TEAM_KEYS:
+            if teams.principal_matches(matcher_key(m), m.value) == m.negate:
+                return 'principal', m
+        elif not matches(m, principal_value(principal, matcher_key(m)), principal, resource):
+            return 'principal', m
+    for m in rule.resources:
+        if teams is not None and m.ref in TEAM_REFS:
+            if teams.overlaps(matcher_key(m), TEAM_REFS[m.ref]) == m.negate:
+                return 'resource', m
+        elif not matches(m, resource_value(resource, matcher_key(m)), principal, resource):
+            return 'resource', m
+    for m in rule.actions:
+        if not matches(m, operation, principal, resource):
+            return 'action', m
+    return None
+
+
+def describe_mismatch(side: str, m: Matcher, principal: Principal, resource: Resource,
+                      operation: Optional[str]) -> str:
+    """Human-readable reason a matcher failed"""
+    key = matcher_key(m)
+    if side == 'principal':
+        actual = principal_value(principal, key)
+    elif side == 'resource':
+        actual = resource_value(resource, key)
+    else:
+        actual = operation
+    if m.ref is not None:
+        expected = m.ref
+    elif m.value is None:
+        expected = 'present'
+    else:
+        expected = repr(m.value)
+    return f"{side}.{key} is {actual!r}, expected {'not ' if m.negate else ''}{expected}"
+
+
+def describe_condition(condition: Condition, context: Context) -> str:
+    """Human-readable reason a condition failed"""
+    if condition.type == 'time':
+        return f"time {condition.operator} is false at {context.timestamp!r}"
+    return (f"context.{condition.field} is {context_value(context, condition.field)!r}, "
+            f"expected {condition.operator} {condition.value!r}")
+
+
+# =============================================================================
+# Profile
+# =============================================================================
+
+class PolicyProfile:
+    """
+    Per-rule counters and time, accumulated over profiled requests
+
+    Evaluations collect their samples locally and merge them under one
+    lock acquisition per request.
+    """
+
+    def __init__(self):
+        self.rules: Dict[Tuple[str, str], RuleProfile] = {}
+        self.requests = 0
+        self.default_denies = 0  # Requests no rule decided
+        self.positions: Counter = Counter()  # Rules evaluated per request -> requests
+        self._lock = threading.Lock()
+
+    def record(self, samples: List[Tuple[Policy, Rule, Optional[str], int, int]],
+               decided: bool) -> None:
+        """
+        Merge one request's samples
+
+        Args:
+            samples: (policy, rule, stage it failed at or None if it
+                fired, matcher ns, condition ns) per rule evaluated
+            decided: Whether the last sample's rule decided the request
+        """
+        with self._lock:
+            self.requests += 1
+            self.positions[len(samples)] += 1
+            for policy, rule, stage, match_ns, condition_ns in samples:
+                profile = self.rules.get((policy.id, rule.name))
+                if profile is None:
+                    profile = self.rules[(policy.id, rule.name)] = RuleProfile(
+                        policy.id, rule.name, rule.effect, rule.priority)
+                profile.invocations += 1
+                profile.match_ns += match_ns
+                profile.condition_ns += condition_ns
+                if stage is None:
+                    profile.matched += 1
+                    profile.fired += 1
+                else:
+                    profile.failed_at[stage] += 1
+                    if stage == 'condition':
+                        profile.matched += 1
+            if decided:
+                policy, rule = samples[-1][0], samples[-1][1]
+                self.rules[(policy.id, rule.name)].decided += 1
+            else:
+                self.default_denies += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.rules.clear()
+            self.requests = self.default_denies = 0
+            self.positions.clear()
+
+    def report(self, sort: str = 'time', limit: Optional[int] = None,
+               policy_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        JSON-ready profile
+
+        Args:
+            sort: time, cost, invocations, fired or decided (descending)
+            limit: Rules to include at most
+            policy_id: Only this policy's rules
+        """
+        keys = {'time': lambda r: r.time_ns, 'cost': lambda r: r.cost_ns,
+                'invocations': lambda r: r.invocations, 'fired': lambda r: r.fired,
+                'decided': lambda r: r.decided}
+        if sort not in keys:
+            raise ValueError(f"Unknown sort: {sort}")
+        with self._lock:
+            rules = [r for r in self.rules.values() if policy_id is None or r.policy_id == policy_id]
+            rules.sort(key=keys[sort], reverse=True)
+            evaluated = sum(n * count for n, count in self.positions.items())
+            return {
+                'requests': self.requests,
+                'default_denies': self.default_denies,
+                'mean_rules_evaluated': round(evaluated / self.requests, 2) if self.requests else 0.0,
+                'rules_evaluated': {str(n): count for n, count in sorted(self.positions.items())},
+                'total_time_us': round(sum(r.time_ns for r in self.rules.values()) / 1000, 1),
+                'rules': [r.to_dict() for r in rules[:limit]],
+            }
+
+    def folded(self, root: str = 'evaluate') -> str:
+        """
+        Folded stacks for flamegraph.pl or speedscope, in microseconds
+
+        One frame per policy, one per rule under it, and one each for the
+        rule's matchers and conditions.
+        """
+        lines = []
+        with self._lock:
+            for r in sorted(self.rules.values(), key=lambda r: (r.policy_id, r.rule)):
+                for part, ns in (('matchers', r.match_ns), ('conditions', r.condition_ns)):
+                    if ns >= 1000:
+                        lines.append(f"{root};{r.policy_id};{r.rule};{part} {ns // 1000}")
+        return '\n'.join(lines) + '\n'
+
+    def never_fired(self, ordered_rules: List[Tuple[Policy, Rule]]) -> List[str]:
+        """Active rules that have not fired in any profiled request"""
+        with self._lock:
+            return [f"{policy.id}/{rule.name}" for policy, rule in ordered_rules
+                    if (policy.id, rule.name) not in self.rules or not self.rules[(policy.id, rule.name)].fired]
+
+    def suggestions(self, ordered_rules: List[Tuple[Policy, Rule]],
+                    min_saving: float = 0.05) -> Tuple[List[ReorderSuggestion], float, float]:
+        """
+        Rule priorities that would shorten evaluation
+
+        Deny rules stay before allow rules. Within each group evaluation
+        stops at the first rule that fires, so the expected time is
+        lowest with the rules ordered by cost / fire rate: cheap rules
+        that fire often first, rules that never fire last. Rates are
+        those observed where evaluation reached each rule; rules never
+        reached keep their place at the end. Reordering a group does not
+        change whether a request is allowed, only which of several
+        matching rules is reported (with its reason and constraints).
+
+        Args:
+            ordered_rules: The engine's rules in evaluation order
+            min_saving: Suggest nothing unless the expected time drops
+                by at least this fraction
+
+        Returns:
+            (suggestions, expected µs per request now, expected µs with the suggestions)
+        """
+        with self._lock:
+            profiles = {key: replace(p, failed_at=Counter(p.failed_at)) for key, p in self.rules.items()}
+        suggestions = []
+        current_total = suggested_total = 0.0
+        for effect in ('deny', 'allow'):
+            group = [(policy, rule) for policy, rule in ordered_rules if rule.effect == effect]
+            reached = {(policy.id, rule.name) for policy, rule in group
+                       if (policy.id, rule.name) in profiles and profiles[(policy.id, rule.name)].invocations}
+            seen = [(policy, rule, profiles[(policy.id, rule.name)]) for policy, rule in group
+                    if (policy.id, rule.name) in reached]
+            unseen = [(policy, rule) for policy, rule in group if (policy.id, rule.name) not in reached]
+            best = sorted(seen, key=lambda item: item[2].cost_ns / item[2].fire_rate
+                          if item[2].fire_rate else float('inf'))
+            current_total += _expected_ns([item[2] for item in seen])
+            suggested_total += _expected_ns([item[2] for item in best])
+            if [item[:2] for item in best] == [item[:2] for item in seen]:
+                continue
+            top = max((rule.priority for _, rule in group), default=0) + len(group)
+            order = [item[:2] for item in best] + unseen
+            for position, (policy, rule) in enumerate(order):
+                suggested = top - position
+                profile = profiles.get((policy.id, rule.name))
+                suggestions.append(ReorderSuggestion(
+                    policy.id, rule.name, rule.effect, rule.priority, suggested,
+                    round(profile.fire_rate, 4) if profile else 0.0,
+                    round(profile.cost_ns / 1000, 3) if profile else 0.0,
+                    bool(rule.constraints)))
+        if current_total == 0 or (current_total - suggested_total) / current_total < min_saving:
+            return [], current_total / 1000, current_total / 1000
+        return suggestions, current_total / 1000, suggested_total / 1000
+
+
+def _expected_ns(profiles: List[RuleProfile]) -> float:
+    """Expected time through rules in this order, stopping at the first that fires"""
+    expected, reach = 0.0, 1.0
+    for profile in profiles:
+        expected += reach * profile.cost_ns
+        reach *= 1.0 - profile.fire_rate
+    return expected
+
+
+def apply_suggestions(policies: List[Policy], suggestions: List[ReorderSuggestion]) -> List[Policy]:
+    """Copies of the policies with the suggested rule priorities"""
+    priorities = {(s.policy_id, s.rule): s.suggested_priority for s in suggestions}
+    return [replace(policy, rules=[
+        replace(rule, priority=priorities.get((policy.id, rule.name), rule.priority)) for rule in policy.rules
+    ]) for policy in policies]
+
+
+# =============================================================================
+# Profiling Policy Engine
+# =============================================================================
+
+class ProfilingPolicyEngine(PolicyEngine):
+    """
+    Evaluates like a CanonicalPolicyEngine and records a per-rule profile
+
+    Args:
+        engine: The canonical engine whose rules (and team directory) to use
+        profile_rate: Fraction of requests profiled; the others go
+            straight to `engine.evaluate()`
+        explain_rate: Fraction of requests that also keep an explain
+            trace (`traces()`)
+        max_traces: Sampled traces kept, newest first out
+        rng: Random source for sampling
+    """
+
+    def __init__(self, engine: CanonicalPolicyEngine, profile_rate: float = 1.0,
+                 explain_rate: float = 0.0, max_traces: int = 100,
+                 rng: Optional[random.Random] = None):
+        self.engine = engine
+        self.profile_rate = profile_rate
+        self.explain_rate = explain_rate
+        self.profile = PolicyProfile()
+        self._traces: deque = deque(maxlen=max_traces)
+        self._random = (rng or random.Random()).random
+
+    def evaluate(self, principal: Principal, resource: Resource,
+                 action: Action, context: Context) -> PolicyDecision:
+        """Evaluate a request, profiling and explaining it when sampled"""
+        draw = self._random()
+        if draw < self.explain_rate:
+            decision, trace = self._evaluate(principal, resource, action, context, explain=True)
+            self._traces.append(trace)
+            return decision
+        if draw < self.profile_rate:
+            return self._evaluate(principal, resource, action, context)[0]
+        return self.engine.evaluate(principal, resource, action, context)
+
+    def explain(self, principal: Principal, resource: Resource,
+                action: Action, context: Context) -> ExplainTrace:
+        """Evaluate one request and return its explain trace"""
+        return self._evaluate(principal, resource, action, context, explain=True)[1]
+
+    def traces(self, limit: Optional[int] = None) -> List[ExplainTrace]:
+        """Sampled explain traces, newest first"""
+        traces = list(self._traces)[::-1]
+        return traces[:limit]
+
+    def report(self, sort: str = 'time', limit: Optional[int] = None,
+               policy_id: Optional[str] = None) -> Dict[str, Any]:
+        """The profile with never-fired rules and reordering suggestions"""
+        report = self.profile.report(sort, limit, policy_id)
+        ordered = self.engine.ordered_rules()
+        suggestions, current_us, suggested_us = self.profile.suggestions(ordered)
+        report['never_fired'] = self.profile.never_fired(ordered)
+        report['suggestions'] = {
+            'expected_us': round(current_us, 3),
+            'expected_us_reordered': round(suggested_us, 3),
+            'rules': [vars(s) for s in suggestions],
+        }
+        return report
+
+    def validate_policy(self, policy: str) -> bool:
+        return self.engine.validate_policy(policy)
+
+    def deploy_policy(self, policy: Policy) -> None:
+        self.engine.deploy_policy(policy)
+
+    def remove_policy(self, policy_id: str) -> Optional[Policy]:
+        return self.engine.remove_policy(policy_id)
+
+    # =========================================================================
+    # Private Helper Methods
+    # =========================================================================
+
+    def _evaluate(self, principal: Principal, resource: Resource, action: Action, context: Context,
+                  explain: bool = False) -> Tuple[PolicyDecision, Optional[ExplainTrace]]:
+        """CanonicalPolicyEngine.evaluate() with a clock around each rule's matchers and conditions"""
+        clock = time.perf_counter_ns
+        engine = self.engine
+        operation = action.operation
+        teams = engine.directory.view(principal, resource) if engine.directory is not None else None
+        ordered = engine.ordered_rules()
+        moment: Optional[datetime] = None
+        timed = False  # Whether the request time has been read
+        valid_until = None
+        samples = []
+        steps: List[RuleTrace] = []
+        decision = None
+        for policy, rule in ordered:
+            start = clock()
+            mismatch = first_mismatch(rule, principal, resource, operation, teams)
+            matched_at = clock()
+            if mismatch is not None:
+                samples.append((policy, rule, mismatch[0], matched_at - start, 0))
+                if explain:
+                    steps.append(RuleTrace(policy.id, rule.name, rule.effect, 'no_match',
+                                           describe_mismatch(mismatch[0], mismatch[1], principal, resource,
+                                                             operation), (matched_at - start) / 1000))
+                continue
+            failed = None
+            for condition in rule.conditions:
+                if condition.type != 'time':
+                    holds = condition_holds(condition, context)
+                else:
+                    if not timed:
+                        moment, timed = request_moment(context), True
+                    if moment is None:
+                        holds = unknown_time_holds(rule.effect)
+                    else:
+                        holds = time_condition_holds(condition, moment)
+                        change = next_time_condition_change(condition, moment)
+                        if change is not None and (valid_until is None or change < valid_until):
+                            valid_until = change
+                if not holds and failed is None:
+                    failed = condition
+            done = clock()
+            samples.append((policy, rule, None if failed is None else 'condition',
+                            matched_at - start, done - matched_at))
+            if explain:
+                steps.append(RuleTrace(
+                    policy.id, rule.name, rule.effect, 'fired' if failed is None else 'condition_failed',
+                    'all matchers and conditions hold' if failed is None else describe_condition(failed, context),
+                    (done - start) / 1000))
+            if failed is None:
+                decision = engine.decision_for(policy, rule)
+                break
+
+        self.profile.record(samples, decided=decision is not None)
+        if decision is None:
+            decision = DEFAULT_DENY
+        if valid_until:
+            decision = replace(decision, valid_until=valid_until)
+        trace = None
+        if explain:
+            trace = ExplainTrace(
+                request={'principal': principal.id, 'resource': resource.id, 'operation': operation,
+                         'timestamp': context.timestamp},
+                allowed=decision.allowed, policy_id=decision.policy_id, rule=decision.rule,
+                rules=steps, not_evaluated=len(ordered) - len(samples))
+        return decision, trace
+
+
+# =============================================================================
+# Stats Endpoint
+# =============================================================================
+
+def serve(profiler: ProfilingPolicyEngine, host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    """
+    Serve the profile in a background thread
+
+    - `GET /api/v1/policy/profile?sort=time&limit=10&policy=rbac-basic`: JSON report
+    - `GET /api/v1/policy/profile/flamegraph`: folded stacks
+    - `GET /api/v1/policy/profile/traces?limit=10`: sampled explain traces
+    - `POST /api/v1/policy/profile/reset`: clear the profile
+    """
+    httpd = ThreadingHTTPServer((host, port), _handler(profiler))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def _handler(profiler: ProfilingPolicyEngine):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep-alive
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            try:
+                limit = int(params['limit']) if 'limit' in params else None
+                if url.path == PROFILE_PATH:
+                    return self._send(200, profiler.report(params.get('sort', 'time'), limit,
+                                                           params.get('policy')))
+                if url.path == f"{PROFILE_PATH}/flamegraph":
+                    return self._send(200, profiler.profile.folded(), 'text/plain')
+                if url.path == f"{PROFILE_PATH}/traces":
+                    return self._send(200, {'traces': [t.to_dict() for t in profiler.traces(limit)]})
+            except ValueError as e:
+                return self._send(400, {'error': f"Invalid query: {e}"})
+            self._send(404, {'error': 'Not found'})
+
+        def do_POST(self):
+            if urlsplit(self.path).path == f"{PROFILE_PATH}/reset":
+                profiler.profile.reset()
+                return self._send(200, {'reset': True})
+            self._send(404, {'error': 'Not found'})
+
+        def _send(self, status: int, body: Any, content_type: str = 'application/json'):
+            data = (body if isinstance(body, str) else json.dumps(body)).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+# =============================================================================
+# Usage Example
+# =============================================================================
+
+if __name__ == '__main__':
+    import os
+    from .canonical_policy_engine import load_policy_file
+
+    policies_dir = os.path.join(os.path.dirname(__file__), 'policies')
+    engine = CanonicalPolicyEngine([load_policy_file(os.path.join(policies_dir, 'rbac-basic.yaml'))])
+    profiler = ProfilingPolicyEngine(engine, explain_rate=0.01)
+
+    rng = random.Random(7)
+    for i in range(50_000):
+        profiler.evaluate(
+            Principal(id=f'user-{i % 500}', type='human', role=rng.choice(['developer', 'developer', 'viewer'])),
+            Resource(id=f'res-{i % 50}', type='tool', name='tool',
+                     sensitivity=rng.choice(['low', 'medium', 'high', 'critical'])),
+            Action(operation=rng.choice(['read', 'read', 'execute', 'write'])),
+            Context(timestamp='2025-11-27T10:00:00Z', environment='dev'))
+
+    report = profiler.report(limit=5)
+    print(json.dumps(report, indent=2))
+    print(profiler.profile.folded())
+    trace = profiler.explain(Principal(id='bob', type='human', role='viewer'),
+                             Resource(id='vault', type='data', name='Vault', sensitivity='high'),
+                             Action(operation='read'), Context(timestamp='2025-11-27T10:00:00Z'))
+    print(json.dumps(trace.to_dict(), indent=2))
@@ -0,0 +1,261 @@
+"""
+GRID Policy Engine: Degraded-Mode Decision Serving
+
+This template demonstrates how adapters keep answering when the policy
+engine (or the PDP behind it) is slow or down. Without it, a slow engine
+blocks every adapter thread, and an engine error surfaces as an internal
+error (gRPC `INTERNAL`, HTTP 500) on every request (spec §12.3).
+
+Every evaluation that misses the decision cache goes to the engine under
+a deadline, behind a circuit breaker. When the engine fails, times out,
+or the circuit is open, the decision is served in degraded mode:
+
+- The last known good decision, for a bounded time past its TTL and only
+  for the sensitivity tiers the stale-if-error table lists (never
+  `critical`, never a time-conditioned decision past its window)
+- Otherwise a deny (fail closed)
+
+Degraded decisions carry `PolicyDecision.degraded`, and `audit_event()`
+flags them in their §7.2 audit event. The cache refreshes hot entries
+early with jitter, so they do not all expire (and hit the engine) at once.
+
+Use this template for:
+- Wrapping a remote or in-process engine in adapters and sidecars
+- Serving bounded-staleness decisions through PDP outages
+- Failing closed with an auditable reason instead of an internal error
+"""
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Optional
+import threading
+import time
+import uuid
+
+# Assume these are imported from a GRID SDK
+from .http_adapter_template import Principal, Resource, Action, Context
+from .canonical_policy_engine import Policy, PolicyDecision, PolicyEngine
+from .decision_cache import DecisionCache, STALE_IF_ERROR
+from .federation_client import CircuitBreaker
+
+
+STALE, FAIL_CLOSED = 'stale', 'fail_closed'
+
+
+@dataclass
+class ResilienceStats:
+    """Engine call outcomes and degraded decisions served"""
+    evaluations: int = 0
+    cache_hits: int = 0
+    engine_calls: int = 0
+    engine_errors: int = 0
+    timeouts: int = 0
+    short_circuited: int = 0  # Not sent to the engine: circuit open
+    stale_served: int = 0
+    failed_closed: int = 0
+
+
+# =============================================================================
+# Resilient Policy Engine
+# =============================================================================
+
+class ResilientPolicyEngine(PolicyEngine):
+    """
+    Wraps a PolicyEngine with a deadline, a circuit breaker and
+    stale-if-error serving from its DecisionCache
+
+    Engine calls run on a small worker pool so a call can be abandoned at
+    its deadline; an abandoned call keeps its worker until the engine
+    returns, and the breaker opens once enough calls fail, so a hung
+    engine cannot take more than `max_workers` threads.
+
+    Args:
+        engine: Engine to protect (in-process, or a client of a remote PDP)
+        cache: Decision cache; by default one with the STALE_IF_ERROR
+            windows and early refresh
+        timeout: Per-call deadline in seconds
+        breaker: Circuit breaker (default: open after 5 consecutive
+            failures, retry after 10 seconds)
+        max_workers: Engine calls in flight at most
+        on_degraded: Called with (principal, resource, action, context,
+            decision) for every degraded decision, e.g. to alert
+    """
+
+    def __init__(self, engine: PolicyEngine, cache: Optional[DecisionCache] = None,
+                 timeout: float = 0.25, breaker: Optional[CircuitBreaker] = None,
+                 max_workers: int = 8,
+                 on_degraded: Optional[Callable[..., None]] = None):
+        self.engine = engine
+        self.cache = cache if cache is not None else DecisionCache(
+            stale_if_error=STALE_IF_ERROR, early_refresh=1.0)
+        self.timeout = timeout
+        self.breaker = breaker if breaker is not None else CircuitBreaker(
+            failure_threshold=5, reset_timeout=10.0)
+        self.on_degraded = on_degraded
+        self.stats = ResilienceStats()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='grid-engine')
+        self._lock = threading.Lock()
+
+    def evaluate(self, principal: Principal, resource: Resource,
+                 action: Action, context: Context) -> PolicyDecision:
+        """Evaluate; never raises for engine failures (see degraded mode)"""
+        key = self.cache.key(principal, resource, action, context)
+        with self._lock:
+            self.stats.evaluations += 1
+            decision = self.cache.get(key)
+            if decision is not None:
+                self.stats.cache_hits += 1
+                return decision
+
+        if not self.breaker.allow_request():
+            with self._lock:
+                self.stats.short_circuited += 1
+            return self._degraded(key, principal, resource, action, context, 'circuit open')
+
+        start = time.perf_counter()
+        future = self._executor.submit(self.engine.evaluate, principal, resource, action, context)
+        try:
+            decision = future.result(timeout=self.timeout)
+        except FutureTimeout:
+            future.cancel()  # Only helps if it never started
+            self.breaker.record_failure()
+            with self._lock:
+                self.stats.engine_calls += 1
+                self.stats.timeouts += 1
+            return self._degraded(key, principal, resource, action, context,
+                                  f'no decision within {self.timeout * 1000:.0f} ms')
+        except Exception as e:
+            self.breaker.record_failure()
+            with self._lock:
+                self.stats.engine_calls += 1
+                self.stats.engine_errors += 1
+            return self._degraded(key, principal, resource, action, context,
+                                  f'engine error: {type(e).__name__}')
+
+        self.breaker.record_success()
+        with self._lock:
+            self.stats.engine_calls += 1
+            self.cache.put(key, decision, resource.sensitivity, context.timestamp,
+                           compute_time=time.perf_counter() - start)
+        return decision
+
+    def validate_policy(self, policy: str) -> bool:
+        return self.engine.validate_policy(policy)
+
+    def deploy_policy(self, policy: Policy) -> None:
+        """Deploy and drop cached decisions, including last known good ones"""
+        self.engine.deploy_policy(policy)
+        with self._lock:
+            self.cache.clear()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    def _degraded(self, key: Any, principal: Principal, resource: Resource,
+                  action: Action, context: Context, cause: str) -> PolicyDecision:
+        """The last known good decision if its tier allows it, else a deny"""
+        with self._lock:
+            stale = self.cache.get_stale(key)
+            if stale is not None:
+                decision, staleness = stale
+                if not staleness:
+                    return decision  # An early refresh failed; the entry is still live
+                self.stats.stale_served += 1
+                decision = replace(decision, degraded={
+                    'mode': STALE, 'cause': cause, 'staleness_seconds': round(staleness, 3)})
+            else:
+                self.stats.failed_closed += 1
+                decision = PolicyDecision(
+                    allowed=False,
+                    reason='Access denied: policy engine unavailable',
+                    degraded={'mode': FAIL_CLOSED, 'cause': cause})
+        if self.on_degraded is not None:
+            self.on_degraded(principal, resource, action, context, decision)
+        return decision
+
+
+# =============================================================================
+# Audit Events
+# =============================================================================
+
+def audit_event(principal: Principal, resource: Resource, action: Action, context: Context,
+                decision: PolicyDecision, latency_ms: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Build the §7.2 audit event for a decision
+
+    A degraded decision is flagged with `decision.degraded`: its mode
+    (`stale` or `fail_closed`), the cause, and for stale decisions how
+    many seconds past their TTL they were served. A request carrying a
+    federation trace id records it as `event.trace_id`. The resource's
+    `owner` and `managers` are always recorded, so relational rules can be
+    replayed from the event.
+    """
+    event_decision: Dict[str, Any] = {
+        'result': 'allow' if decision.allowed else 'deny',
+        'reason': decision.reason,
+        'policy_id': decision.policy_id,
+        'policy_version': decision.policy_version,
+    }
+    if decision.degraded is not None:
+        event_decision['degraded'] = decision.degraded
+    event = {
+        'event': {'id': f"event-{uuid.uuid4()}", 'timestamp': context.timestamp,
+                  'request_id': context.request_id},
+        'principal': {'id': principal.id, 'type': principal.type,
+                      'attributes': {**(principal.attributes or {}), 'role': principal.role,
+                                     'teams': principal.teams or []}},
+        'resource': {'id': resource.id, 'type': resource.type, 'name': resource.name,
+                     'sensitivity': resource.sensitivity, 'owner': resource.owner,
+                     'managers': resource.managers or []},
+        'action': {'operation': action.operation, 'parameters': action.parameters or {}},
+        'decision': event_decision,
+        'context': {'ip_address': context.ip_address, 'user_agent': context.user_agent,
+                    'environment': context.environment},
+    }
+    if context.trace_id is not None:
+        event['event']['trace_id'] = context.trace_id
+    if latency_ms is not None:
+        event['outcome'] = {'latency_ms': latency_ms}
+    return event
+
+
+# =============================================================================
+# Usage Example
+# =============================================================================
+
+if __name__ == '__main__':
+    import os
+    from datetime import datetime
+    from .canonical_policy_engine import CanonicalPolicyEngine, load_policy_file
+
+    class FlakyEngine(CanonicalPolicyEngine):
+        """An engine that hangs while `down` is set"""
+        down = False
+
+        def evaluate(self, *args):
+            if self.down:
+                time.sleep(5)
+            return super().evaluate(*args)
+
+    policies = os.path.join(os.path.dirname(__file__), 'policies')
+    flaky = FlakyEngine([load_policy_file(os.path.join(policies, 'rbac-basic.yaml'))])
+    now = [0.0]
+    engine = ResilientPolicyEngine(
+        flaky, DecisionCache(stale_if_error=STALE_IF_ERROR, clock=lambda: now[0]), timeout=0.05)
+
+    alice = Principal(id='alice@company.com', type='human', role='developer')
+    context = Context(timestamp=datetime.utcnow().isoformat() + 'Z')
+    resources = [Resource(id=f'res-{s}', type='tool', name=f'{s} tool', sensitivity=s)
+                 for s in ('low', 'medium', 'high', 'critical')]
+    for resource in resources:
+        engine.evaluate(alice, resource, Action(operation='read'), context)
+
+    flaky.down = True
+    now[0] = 400.0  # Past the medium TTL, within its stale window
+    for resource in resources:
+        decision = engine.evaluate(alice, resource, Action(operation='read'), context)
+        print(f"{resource.sensitivity:9} allowed={decision.allowed!s:5} "
+              f"degraded={decision.degraded and decision.degraded['mode']}")
+    print(engine.stats)
+    engine.close()
@@ -0,0 +1,373 @@
+"""
+GRID Policy Engine: Shadow Policy Evaluation
+
+This template demonstrates trying a candidate policy version on live
+traffic before promoting it with `PUT /v1/policies/{id}`, without
+changing what is enforced or how fast it is decided.
+
+The enforced engine answers every request as before. A sampled fraction
+of the requests is then put, with the enforced decision, on a bounded
+queue; putting never waits, and a request that finds the queue full is
+dropped from the shadow run and counted. A dispatcher thread takes the
+queued requests in batches to a separate pool of worker processes, which
+evaluate them against the candidate (shadow) policies, so shadow
+evaluation does not compete with the request path for the interpreter.
+Only disagreements are written, with both decisions and their reasons,
+to a dedicated audit stream (any callable taking a §7.2 audit event,
+e.g. `AuditForwarder.forward` or `AuditStore.append` of a separate
+store). Time conditions are evaluated at the request's own timestamp,
+so evaluating later does not change the shadow decision.
+
+Use this template for:
+- Validating a new policy version against production traffic
+- Measuring how many decisions a change flips, and in which direction
+- Promoting the shadow policies once they agree (or disagree as intended)
+"""
+
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import queue
+import random
+import threading
+import time
+
+# Assume these are imported from a GRID SDK
+from .http_adapter_template import Principal, Resource, Action, Context, GridRequest
+from .canonical_policy_engine import CanonicalPolicyEngine, Policy, PolicyDecision, PolicyEngine
+from .resilient_engine import audit_event
+
+
+# (allowed, reason, policy_id, policy_version, rule) of a shadow decision
+ShadowResult = Tuple[bool, str, Optional[str], Optional[int], Optional[str]]
+
+
+@dataclass
+class ShadowStats:
+    """Sampled requests and how the shadow policies decided them"""
+    sampled: int = 0
+    dropped: int = 0  # Queue full
+    evaluated: int = 0
+    agreed: int = 0
+    disagreed: int = 0
+    allow_to_deny: int = 0  # Enforced allow, shadow deny
+    deny_to_allow: int = 0
+    errors: int = 0
+    abandoned: int = 0  # Queued or in flight when the engine was closed
+
+    @property
+    def disagreement_rate(self) -> float:
+        return self.disagreed / self.evaluated if self.evaluated else 0.0
+
+
+def shadow_event(request: GridRequest, enforced: PolicyDecision, shadow: ShadowResult,
+                 policy_versions: Dict[str, int]) -> Dict[str, Any]:
+    """
+    The audit event for a disagreement
+
+    The §7.2 event of the enforced decision, with the shadow decision
+    under `shadow` and `event.stream: shadow`.
+    """
+    allowed, reason, policy_id, policy_version, rule = shadow
+    event = audit_event(request.principal, request.resource, request.action, request.context, enforced)
+    event['event']['stream'] = 'shadow'
+    event['decision']['rule'] = enforced.rule
+    event['shadow'] = {
+        'result': 'allow' if allowed else 'deny',
+        'reason': reason,
+        'policy_id': policy_id,
+        'policy_version': policy_version,
+        'rule': rule,
+        'policy_versions': policy_versions,
+    }
+    return event
+
+
+# =============================================================================
+# Shadow Workers
+# =============================================================================
+
+_shadow: Dict[str, Any] = {}
+
+
+def _init_worker(policies: List[Policy]) -> None:
+    _shadow['engine'] = CanonicalPolicyEngine(policies)
+
+
+def _evaluate_batch(requests: List[GridRequest], engine: Optional[PolicyEngine] = None) -> List[ShadowResult]:
+    """Shadow decisions for a batch (in a worker process, or with `engine` in this one)"""
+    engine = engine or _shadow['engine']
+    results = []
+    for request in requests:
+        d = engine.evaluate(request.principal, request.resource, request.action, request.context)
+        results.append((d.allowed, d.reason, d.policy_id, d.policy_version, d.rule))
+    return results
+
+
+# =============================================================================
+# Shadow Policy Engine
+# =============================================================================
+
+class ShadowPolicyEngine(PolicyEngine):
+    """
+    Enforces one engine's decisions and evaluates candidate policies in the shadow
+
+    Args:
+        engine: The enforced engine; its decisions are returned unchanged
+        shadow_policies: Candidate policies, evaluated by a CanonicalPolicyEngine
+        sink: Audit stream for disagreements, called with one event each
+        sample_rate: Fraction of requests evaluated in the shadow
+        max_queue: Sampled requests waiting at most; more are dropped
+        processes: Worker processes (0: evaluate on the dispatcher thread)
+        batch_size: Requests per worker task
+        disagrees: Whether an enforced decision and a shadow result
+            disagree (default: allowed differs)
+        rng: Random source for sampling
+    """
+
+    def __init__(self, engine: PolicyEngine, shadow_policies: List[Policy],
+                 sink: Callable[[Dict[str, Any]], Any], sample_rate: float = 0.01,
+                 max_queue: int = 10_000, processes: int = 1, batch_size: int = 256,
+                 disagrees: Optional[Callable[[PolicyDecision, ShadowResult], bool]] = None,
+                 rng: Optional[random.Random] = None):
+        if not 0.0 <= sample_rate <= 1.0:
+            raise ValueError("sample_rate must be between 0 and 1")
+        self.engine = engine
+        self.sink = sink
+        self.sample_rate = sample_rate
+        self.processes = processes
+        self.batch_size = batch_size
+        self.disagrees = disagrees or (lambda enforced, shadow: enforced.allowed != shadow[0])
+        self.stats = ShadowStats()
+        self._random = (rng or random.Random()).random
+        self._queue: 'queue.Queue[Tuple[GridRequest, PolicyDecision]]' = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._idle = threading.Condition(self._lock)
+        self._outstanding = 0  # Queued or being evaluated
+        self._closed = threading.Event()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._engine: Optional[CanonicalPolicyEngine] = None
+        self.set_shadow_policies(shadow_policies)
+        self._dispatcher = threading.Thread(target=self._dispatch, name='grid-shadow', daemon=True)
+        self._dispatcher.start()
+
+    def evaluate(self, principal: Principal, resource: Resource,
+                 action: Action, context: Context) -> PolicyDecision:
+        """Return the enforced decision; queue a sample for shadow evaluation"""
+        decision = self.engine.evaluate(principal, resource, action, context)
+        if self.sample_rate and self._random() < self.sample_rate:
+            self._offer(GridRequest(principal=principal, resource=resource, action=action, context=context),
+                        decision)
+        return decision
+
+    def evaluate_request(self, grid_request: GridRequest) -> PolicyDecision:
+        """Evaluate a translated GridRequest"""
+        decision = self.engine.evaluate(grid_request.principal, grid_request.resource,
+                                        grid_request.action, grid_request.context)
+        if self.sample_rate and self._random() < self.sample_rate:
+            self._offer(grid_request, decision)
+        return decision
+
+    def validate_policy(self, policy: str) -> bool:
+        return self.engine.validate_policy(policy)
+
+    def deploy_policy(self, policy: Policy) -> None:
+        """Deploy to the enforced engine (the shadow policies are set with set_shadow_policies)"""
+        self.engine.deploy_policy(policy)
+
+    def remove_policy(self, policy_id: str) -> Optional[Policy]:
+        return self.engine.remove_policy(policy_id)
+
+    def set_shadow_policies(self, policies: List[Policy]) -> None:
+        """
+        Replace the candidate policies
+
+        Requests already handed to the workers are evaluated against the
+        old candidates; the workers are replaced once they finish.
+        """
+        policies = list(policies)
+        old = self._pool
+        with self._lock:
+            self.shadow_policies = policies
+            self.policy_versions = {p.id: p.version for p in policies}
+            if self.processes:
+                self._pool = ProcessPoolExecutor(self.processes, initializer=_init_worker, initargs=(policies,))
+            else:
+                self._engine = CanonicalPolicyEngine(policies)
+        if old is not None:
+            old.shutdown(wait=False)
+
+    def promote(self) -> None:
+        """Deploy the shadow policies to the enforced engine (what `PUT /v1/policies/{id}` does)"""
+        for policy in self.shadow_policies:
+            self.engine.deploy_policy(policy)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued request has been evaluated; False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._idle:
+            while self._outstanding:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._idle.wait(remaining)
+        return True
+
+    def close(self) -> None:
+        """
+        Stop the dispatcher; requests still queued or in flight are not
+        evaluated and are counted as abandoned, so `flush()` returns
+        """
+        self._closed.set()
+        self._dispatcher.join()
+        left = 0
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+            left += 1
+        self._abandon(left)
+        if self._pool is not None:
+            self._pool.shutdown(cancel_futures=True)
+
+    # =========================================================================
+    # Private Helper Methods
+    # =========================================================================
+
+    def _offer(self, request: GridRequest, decision: PolicyDecision) -> None:
+        """Queue a sampled request without waiting"""
+        with self._lock:
+            self.stats.sampled += 1
+            if self._closed.is_set():
+                self.stats.dropped += 1
+                return
+            try:
+                self._queue.put_nowait((request, decision))
+            except queue.Full:
+                self.stats.dropped += 1
+                return
+            self._outstanding += 1
+
+    def _dispatch(self) -> None:
+        """Batch queued requests to the workers and record their results"""
+        pending: deque = deque()  # (future, batch, policy versions)
+        while not self._closed.is_set():
+            batch = self._take_batch(timeout=0.05 if not pending else 0.001)
+            if batch:
+                pending.append((*self._submit(batch), batch))
+            limit = max(2 * self.processes, 1)
+            while pending and (len(pending) > limit or pending[0][0].done() or not batch):
+                future, versions, done = pending.popleft()
+                self._record(done, future, versions)
+        for future, versions, batch in pending:
+            if future.done():
+                self._record(batch, future, versions)
+            else:
+                future.cancel()
+                self._abandon(len(batch))
+
+    def _take_batch(self, timeout: float) -> List[Tuple[GridRequest, PolicyDecision]]:
+        try:
+            batch = [self._queue.get(timeout=timeout)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _submit(self, batch: List[Tuple[GridRequest, PolicyDecision]]) -> Tuple[Future, Dict[str, int]]:
+        """Start a batch; returns its future and the versions of the candidates it runs against"""
+        requests = [request for request, _ in batch]
+        with self._lock:
+            pool, engine, versions = self._pool, self._engine, self.policy_versions
+        if self.processes:
+            return pool.submit(_evaluate_batch, requests), versions
+        future: Future = Future()
+        try:
+            future.set_result(_evaluate_batch(requests, engine))
+        except Exception as e:
+            future.set_exception(e)
+        return future, versions
+
+    def _abandon(self, count: int) -> None:
+        """Give up on sampled requests that will not be evaluated"""
+        with self._idle:
+            self.stats.abandoned += count
+            self._outstanding -= count
+            if not self._outstanding:
+                self._idle.notify_all()
+
+    def _record(self, batch: List[Tuple[GridRequest, PolicyDecision]], future: Future,
+                policy_versions: Dict[str, int]) -> None:
+        """Count a finished batch and write its disagreements to the sink"""
+        try:
+            results = future.result()
+        except Exception:
+            results = None
+        events = []
+        with self._lock:
+            if results is None:
+                self.stats.errors += len(batch)
+            else:
+                for (request, enforced), shadow in zip(batch, results):
+                    self.stats.evaluated += 1
+                    if not self.disagrees(enforced, shadow):
+                        self.stats.agreed += 1
+                        continue
+                    self.stats.disagreed += 1
+                    if enforced.allowed and not shadow[0]:
+                        self.stats.allow_to_deny += 1
+                    elif shadow[0] and not enforced.allowed:
+                        self.stats.deny_to_allow += 1
+                    events.append(shadow_event(request, enforced, shadow, policy_versions))
+        for event in events:
+            try:
+                self.sink(event)
+            except Exception:
+                with self._lock:
+                    self.stats.errors += 1
+        with self._idle:
+            self._outstanding -= len(batch)
+            if not self._outstanding:
+                self._idle.notify_all()
+
+
+# =============================================================================
+# Usage Example
+# =============================================================================
+
+if __name__ == '__main__':
+    import os
+    from dataclasses import replace
+    from .canonical_policy_engine import load_policy_file
+
+    policies_dir = os.path.join(os.path.dirname(__file__), 'policies')
+    current = load_policy_file(os.path.join(policies_dir, 'rbac-basic.yaml'))
+
+    # Candidate: developers may no longer execute medium sensitivity tools
+    candidate = replace(current, version=current.version + 1, rules=[
+        replace(r, resources=[replace(r.resources[0], value=['low'])])
+        if r.name == 'developer_execute_low_medium' else r
+        for r in current.rules
+    ])
+
+    disagreements = []
+    engine = ShadowPolicyEngine(CanonicalPolicyEngine([current]), [candidate], disagreements.append,
+                                sample_rate=0.1)
+    rng = random.Random(7)
+    for i in range(100_000):
+        engine.evaluate(
+            Principal(id=f'user-{i % 500}', type='human', role=rng.choice(['developer', 'viewer'])),
+            Resource(id=f'res-{i % 50}', type='tool', name='tool',
+                     sensitivity=rng.choice(['low', 'medium', 'high'])),
+            Action(operation=rng.choice(['read', 'execute'])),
+            Context(timestamp='2025-11-27T10:00:00Z'))
+    engine.flush()
+    engine.close()
+    print(engine.stats)
+    print(disagreements[0]['decision'], disagreements[0]['shadow'])
@@ -0,0 +1,382 @@
+"""
+GRID Policy Engine: Team Directory
+
+This template demonstrates team-membership checks as bit operations.
+Team-based policies (`rbac-team-based.yaml`) ask "does one of the
+principal's teams manage this resource?" on nearly every request; with
+principals in dozens of teams, comparing the two lists costs a set build
+and a loop per rule.
+
+The directory gives every team a dense integer id and keeps each
+principal's teams, and the teams they lead, as a bitset (a Python int).
+A resource's `managers` list is turned into a bitset once per distinct
+list. Overlap checks are then a single AND:
+
+    principal_teams & resource_managers != 0
+
+The directory is authoritative for the principals it lists and is kept
+current by an HR/LDAP export feed (`TeamFeed`, newline-delimited JSON
+records in a file); principals it does not list are evaluated from their
+own `teams` and `is_team_lead` claims. `CanonicalPolicyEngine(directory=...)`
+uses it for every team matcher and every relational matcher against
+`principal.teams` or `principal.lead_teams`.
+
+Use this template for:
+- Team-based authorization with large team counts
+- `is_team_lead` lookups without per-request claim parsing
+- Applying HR membership changes to a running engine
+"""
+
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import json
+import os
+import threading
+
+# Assume these are imported from a GRID SDK
+from .http_adapter_template import Principal, Resource
+
+# Principal attributes that matchers read as team sets
+TEAM_KEYS = ('teams', 'lead_teams')
+TEAM_REFS = {'principal.teams': 'teams', 'principal.lead_teams': 'lead_teams'}
+
+# Distinct team lists whose bitset is kept (resource managers, matcher values)
+MAX_CACHED_MASKS = 65_536
+
+
+@dataclass
+class FeedStats:
+    """Feed records applied and skipped"""
+    applied: int = 0
+    invalid: int = 0
+    reloads: int = 0
+
+
+# =============================================================================
+# Team Directory
+# =============================================================================
+
+class TeamDirectory:
+    """
+    Principals' team memberships and team leads as bitsets
+
+    Team ids are assigned on first sight and never reused, so a bitset
+    computed once stays valid. Reads take no lock; an update replaces a
+    principal's (teams, teams led) pair, which readers see atomically.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._ids: Dict[str, int] = {}
+        self._names: List[str] = []
+        self._principals: Dict[str, Tuple[int, int]] = {}  # Id → (teams, teams led)
+        self._masks: Dict[Tuple, int] = {}
+        self._listeners: List[Callable[[Set[str]], None]] = []
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._principals)
+
+    def __contains__(self, principal_id: object) -> bool:
+        return principal_id in self._principals
+
+    def team_id(self, team: str) -> int:
+        """Dense id of a team, assigned on first use"""
+        team_id = self._ids.get(team)
+        if team_id is None:
+            with self._lock:
+                team_id = self._ids.get(team)
+                if team_id is None:
+                    team_id = self._ids[team] = len(self._names)
+                    self._names.append(team)
+        return team_id
+
+    def mask(self, teams: Any) -> int:
+        """Bitset of a team name, or a list of them"""
+        if teams is None:
+            return 0
+        if not isinstance(teams, (list, tuple, set, frozenset)):
+            return 1 << self.team_id(teams)
+        key = tuple(teams)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = 0
+            for team in key:
+                mask |= 1 << self.team_id(team)
+            if len(self._masks) >= MAX_CACHED_MASKS:
+                self._masks.clear()
+            self._masks[key] = mask
+        return mask
+
+    def names(self, mask: int) -> List[str]:
+        """Team names in a bitset, in id order"""
+        names = []
+        while mask:
+            low = mask & -mask
+            names.append(self._names[low.bit_length() - 1])
+            mask ^= low
+        return names
+
+    # =========================================================================
+    # Lookups
+    # =========================================================================
+
+    def teams_of(self, principal_id: str) -> Optional[List[str]]:
+        """A listed principal's teams; None if the directory does not list them"""
+        masks = self._principals.get(principal_id)
+        return None if masks is None else self.names(masks[0])
+
+    def is_team_lead(self, principal_id: str, team: Optional[str] = None) -> bool:
+        """Whether a principal leads `team` (any team if None)"""
+        leads = self._principals.get(principal_id, (0, 0))[1]
+        if team is None:
+            return leads != 0
+        team_id = self._ids.get(team)
+        return team_id is not None and bool(leads >> team_id & 1)
+
+    def masks(self, principal: Principal) -> Tuple[int, int]:
+        """(teams, teams led) of a principal: the directory's, else from its claims"""
+        masks = self._principals.get(principal.id)
+        if masks is not None:
+            return masks
+        teams = principal.teams or []
+        leads = (principal.attributes or {}).get('is_team_lead') or {}
+        return self.mask(teams), self.mask([team for team in teams if leads.get(team)])
+
+    def view(self, principal: Principal, resource: Resource) -> 'TeamView':
+        """Team checks for one request"""
+        return TeamView(self, principal, resource)
+
+    def enrich(self, principal: Principal) -> Principal:
+        """
+        The principal with the directory's teams and `is_team_lead` flags,
+        for engines and caches that read them from the principal (OPA input)
+        """
+        masks = self._principals.get(principal.id)
+        if masks is None:
+            return principal
+        members, leads = masks
+        attributes = {**(principal.attributes or {}),
+                      'is_team_lead': {team: True for team in self.names(leads)}}
+        return replace(principal, teams=self.names(members), attributes=attributes)
+
+    # =========================================================================
+    # Updates
+    # =========================================================================
+
+    def set_principal(self, principal_id: str, teams: Iterable[str],
+                      lead_teams: Iterable[str] = ()) -> None:
+        """Add or replace a principal; leads of teams they are not in are ignored"""
+        self.apply([{'op': 'upsert', 'principal': principal_id,
+                     'teams': list(teams), 'leads': list(lead_teams)}])
+
+    def remove_principal(self, principal_id: str) -> None:
+        self.apply([{'op': 'delete', 'principal': principal_id}])
+
+    def apply(self, records: Iterable[Dict[str, Any]], reset: bool = False) -> int:
+        """
+        Apply feed records
+
+        Args:
+            records: `{"op": "upsert", "principal": id, "teams": [...],
+                "leads": [...]}` or `{"op": "delete", "principal": id}`
+            reset: The records are a full export: principals they do not
+                mention are removed
+
+        Returns:
+            Number of principals whose memberships changed
+
+        Raises:
+            ValueError: A malformed record; records before it are applied
+        """
+        changed: Set[str] = set()
+        seen: Set[str] = set()
+        try:
+            for record in records:
+                principal_id, op = record.get('principal'), record.get('op', 'upsert')
+                if not isinstance(principal_id, str):
+                    raise ValueError("record needs a principal id")
+                seen.add(principal_id)
+                if op == 'delete':
+                    if self._principals.pop(principal_id, None) is not None:
+                        changed.add(principal_id)
+                elif op == 'upsert':
+                    teams, leads = record.get('teams') or [], record.get('leads') or []
+                    if not (isinstance(teams, list) and isinstance(leads, list)):
+                        raise ValueError("teams and leads must be lists")
+                    members = self.mask(teams)
+                    masks = (members, self.mask(leads) & members)
+                    if self._principals.get(principal_id) != masks:
+                        self._principals[principal_id] = masks
+                        changed.add(principal_id)
+                else:
+                    raise ValueError(f"Unknown op: {op!r}")
+            if reset:
+                for principal_id in list(self._principals.keys() - seen):
+                    del self._principals[principal_id]
+                    changed.add(principal_id)
+        finally:
+            if changed:
+                self.version += 1
+                for listener in self._listeners:
+                    listener(changed)
+        return len(changed)
+
+    def subscribe(self, listener: Callable[[Set[str]], None]) -> None:
+        """
+        Call `listener(principal_ids)` after memberships change, e.g. to
+        drop those principals' cached decisions
+        """
+        self._listeners.append(listener)
+
+
+class TeamView:
+    """
+    Team checks for one request; each bitset is computed on first use
+    """
+    __slots__ = ('directory', 'principal', 'resource', '_teams', '_leads', '_resource_masks')
+
+    def __init__(self, directory: TeamDirectory, principal: Principal, resource: Resource):
+        self.directory = directory
+        self.principal = principal
+        self.resource = resource
+        self._teams: Optional[int] = None
+        self._leads = 0
+        self._resource_masks: Optional[Dict[str, int]] = None
+
+    def principal_mask(self, key: str) -> int:
+        """Bitset of the principal's `teams` or `lead_teams`"""
+        if self._teams is None:
+            self._teams, self._leads = self.directory.masks(self.principal)
+        return self._teams if key == 'teams' else self._leads
+
+    def resource_mask(self, key: str) -> int:
+        """Bitset of a resource attribute holding team names (`managers`, `owner`)"""
+        if self._resource_masks is None:
+            self._resource_masks = {}
+        mask = self._resource_masks.get(key)
+        if mask is None:
+            if key.startswith('attribute.'):
+                key = key[len('attribute.'):]
+            mask = self._resource_masks[key] = self.directory.mask(getattr(self.resource, key, None))
+        return mask
+
+    def principal_matches(self, key: str, value: Any) -> bool:
+        """A principal team matcher: in any of `value`, or in any team if None"""
+        teams = self.principal_mask(key)
+        return teams != 0 if value is None else teams & self.directory.mask(value) != 0
+
+    def overlaps(self, resource_key: str, principal_key: str) -> bool:
+        """A relational matcher: a resource attribute names one of the principal's teams"""
+        return self.resource_mask(resource_key) & self.principal_mask(principal_key) != 0
+
+
+# =============================================================================
+# HR / LDAP Feed
+# =============================================================================
+
+class TeamFeed:
+    """
+    Follows a file-based stand-in for an HR or LDAP membership export
+
+    The file holds one JSON record per line (see `TeamDirectory.apply`),
+    and the exporter appends changes to it. A file that was replaced
+    (rotated or rewritten as a full export) is re-read from the start as
+    a full export. Invalid lines are counted in `stats.invalid` and
+    skipped.
+
+    Args:
+        path: Feed file
+        directory: Directory to update
+    """
+
+    def __init__(self, path: str, directory: TeamDirectory):
+        self.path = path
+        self.directory = directory
+        self.stats = FeedStats()
+        self._offset = 0
+        self._inode: Optional[int] = None
+        self._partial = b''
+
+    def poll(self) -> int:
+        """
+        Apply the records appended since the last poll
+
+        Returns:
+            Number of principals whose memberships changed
+        """
+        try:
+            with open(self.path, 'rb') as f:
+                status = os.fstat(f.fileno())
+                reset = status.st_ino != self._inode or status.st_size < self._offset
+                if reset:
+                    self._offset, self._partial, self._inode = 0, b'', status.st_ino
+                    self.stats.reloads += 1
+                f.seek(self._offset)
+                data = self._partial + f.read()
+                self._offset = f.tell()
+        except FileNotFoundError:
+            return 0
+        lines = data.split(b'\n')
+        self._partial = lines.pop()  # Incomplete until its newline is written
+        return self.directory.apply(self._records(lines), reset=reset)
+
+    def watch(self, stop: threading.Event, interval: float = 5.0) -> None:
+        """Poll until `stop` is set"""
+        while not stop.is_set():
+            self.poll()
+            stop.wait(interval)
+
+    def _records(self, lines: List[bytes]) -> Iterable[Dict[str, Any]]:
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                if not isinstance(record, dict) or not isinstance(record.get('principal'), str) or \
+                        record.get('op', 'upsert') not in ('upsert', 'delete') or \
+                        not isinstance(record.get('teams', []), list) or \
+                        not isinstance(record.get('leads', []), list):
+                    raise ValueError("malformed record")
+            except ValueError:
+                self.stats.invalid += 1
+                continue
+            self.stats.applied += 1
+            yield record
+
+
+# =============================================================================
+# Usage Example
+# =============================================================================
+
+if __name__ == '__main__':
+    import tempfile
+    from .http_adapter_template import Action, Context
+    from .canonical_policy_engine import CanonicalPolicyEngine, load_policy_file
+
+    directory = TeamDirectory()
+    feed_path = os.path.join(tempfile.mkdtemp(), 'hr-feed.ndjson')
+    with open(feed_path, 'w') as f:
+        f.write(json.dumps({'principal': 'alice@company.com', 'teams': ['payments', 'platform'],
+                            'leads': ['payments']}) + '\n')
+        f.write(json.dumps({'principal': 'bob@company.com', 'teams': ['search']}) + '\n')
+    feed = TeamFeed(feed_path, directory)
+    print(f"feed: {feed.poll()} principals, alice leads payments: "
+          f"{directory.is_team_lead('alice@company.com', 'payments')}")
+
+    policy = load_policy_file(os.path.join(os.path.dirname(__file__), 'policies', 'rbac-team-based.yaml'))
+    engine = CanonicalPolicyEngine([policy], directory=directory)
+    ledger = Resource(id='ledger', type='service', name='Ledger', sensitivity='high',
+                      managers=['payments'])
+    context = Context(timestamp='2025-11-27T10:00:00Z')
+    for who in ('alice@company.com', 'bob@company.com'):
+        decision = engine.evaluate(Principal(id=who, type='human', role='developer'), ledger,
+                                   Action(operation='manage'), context)
+        print(f"{who} manage ledger: {decision.allowed} ({decision.reason})")
+
+    with open(feed_path, 'a') as f:  # Bob moves to payments
+        f.write(json.dumps({'principal': 'bob@company.com', 'teams': ['payments']}) + '\n')
+    feed.poll()
+    decision = engine.evaluate(Principal(id='bob@company.com', type='human', role='developer'),
+                               ledger, Action(operation='read'), context)
+    print(f"bob read ledger after the move: {decision.allowed}; {feed.stats}")
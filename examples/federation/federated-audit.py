@@ -0,0 +1,243 @@
+"""
+GRID Federation: Federated Audit Trace Assembly
+
+This template demonstrates spec §8.3 step 4, audit correlation: an event
+in Node A that references a principal from Node B must have an "audit
+trail that includes the full path across federation".
+
+Every request a node sends to a peer carries a federation trace id
+(`Context.trace_id`, see federation-client.py), the origin records it in
+its own audit event, and each peer records it in the event of its
+evaluation (federation-node.py with an audit sink). The audit store
+answers `trace_id` queries from its indexes (see audit-store.py), so one
+node's part of a trace is a single indexed lookup.
+
+`FederatedAudit.trace()` assembles the whole trail: it queries the local
+store and every peer's `/v1/audit?trace_id=...` concurrently, merges the
+results by timestamp and yields them as a stream, labelled with the node
+they came from. The fan-out has one deadline: a peer that has not
+answered by then (or failed) is left out, and the stream ends with a
+marker saying which nodes are missing and why, so a slow peer bounds how
+late the trail arrives rather than whether it arrives.
+
+Use this template for:
+- Investigating a federated decision end to end
+- Serving `GET /api/v1/audit/trace/{trace_id}` as newline-delimited JSON
+- Correlating audit logs across organizations without a shared store
+"""
+
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from dataclasses import asdict, dataclass
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlencode, urlsplit
+import heapq
+import json
+import ssl
+import threading
+import time
+
+# Assume these are imported from a GRID SDK
+from .canonical_policy_engine import parse_timestamp
+
+TRACE_PATH = '/api/v1/audit/trace'
+TRACE_LIMIT = 10000  # The most events one node returns for a trace (the /v1/audit maximum)
+
+
+@dataclass
+class NodeResult:
+    """What one node contributed to a trace"""
+    node: str
+    status: str                         # 'ok', 'timeout' or 'error'
+    events: int = 0
+    elapsed_ms: Optional[float] = None  # None: no answer by the deadline
+    error: Optional[str] = None
+
+
+def _millis(event: Dict[str, Any]) -> float:
+    moment = parse_timestamp((event.get('event') or {}).get('timestamp') or event.get('timestamp'))
+    return moment.timestamp() * 1000 if moment is not None else float('-inf')
+
+
+# =============================================================================
+# Federated Audit
+# =============================================================================
+
+class FederatedAudit:
+    """
+    Assembles audit trails across federation peers
+
+    Args:
+        node_id: This node's id (labels local events)
+        local: Returns this node's events for a trace id, e.g.
+            `lambda t: store.query(AuditQuery(trace_id=t, limit=MAX_LIMIT))`
+        peers: Peer node id → audit endpoint URL (`endpoints.audit` of the
+            peer's discovery document)
+        timeout: Seconds a trace waits for peers before it is returned
+            without them
+        ssl_context: mTLS context for peers (see `mtls_context`); None for
+            plain HTTP (development only)
+        max_workers: Peer queries in flight at once
+    """
+
+    def __init__(self, node_id: str, local: Optional[Callable[[str], List[Dict[str, Any]]]],
+                 peers: Dict[str, str], timeout: float = 2.0,
+                 ssl_context: Optional[ssl.SSLContext] = None, max_workers: int = 16):
+        self.node_id = node_id
+        self.local = local
+        self.peers = dict(peers)
+        self.timeout = timeout
+        self.ssl_context = ssl_context
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='grid-audit-fanout')
+
+    def trace(self, trace_id: str, timeout: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Start the fan-out for one trace and return its stream
+
+        The stream yields `{'node': ..., 'event': ...}` records in
+        timestamp order, then one marker `{'trace_id': ..., 'complete':
+        bool, 'nodes': [...]}` with each node's NodeResult. The queries are
+        sent when this is called, not when the stream is first read.
+
+        Args:
+            timeout: Overrides the instance deadline (seconds)
+        """
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        futures: Dict[str, Future] = {}
+        if self.local is not None:
+            futures[self.node_id] = self._executor.submit(self._timed, self.local, trace_id)
+        for node, url in self.peers.items():
+            futures[node] = self._executor.submit(self._timed, self._query_peer, url, trace_id, timeout)
+        return self._stream(trace_id, futures, started + timeout)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False)
+
+    # =========================================================================
+    # Private Helper Methods
+    # =========================================================================
+
+    def _stream(self, trace_id: str, futures: Dict[str, Future],
+                deadline: float) -> Iterator[Dict[str, Any]]:
+        wait(futures.values(), timeout=max(0.0, deadline - time.monotonic()))
+        results, sources = [], []
+        for node, future in futures.items():
+            if not future.done():
+                future.cancel()
+                results.append(NodeResult(node, 'timeout'))
+                continue
+            # Headers are already sent: any failure of one node is reported in its result
+            try:
+                events, elapsed = future.result()
+                if not isinstance(events, list) or not all(isinstance(event, dict) for event in events):
+                    raise ValueError("audit reply is not a list of events")
+                events = sorted(events, key=_millis)
+            except Exception as e:
+                results.append(NodeResult(node, 'error', error=str(e) or type(e).__name__))
+                continue
+            results.append(NodeResult(node, 'ok', len(events), round(elapsed * 1000, 1)))
+            sources.append([(_millis(event), n, node, event) for n, event in enumerate(events)])
+
+        for _, _, node, event in heapq.merge(*sources, key=lambda item: (item[0], item[2], item[1])):
+            yield {'node': node, 'event': event}
+        yield {'trace_id': trace_id, 'complete': all(r.status == 'ok' for r in results),
+               'nodes': [asdict(r) for r in results]}
+
+    @staticmethod
+    def _timed(query: Callable[..., List[Dict[str, Any]]], *args: Any) -> Tuple[List[Dict[str, Any]], float]:
+        started = time.monotonic()
+        return query(*args), time.monotonic() - started
+
+    def _query_peer(self, url: str, trace_id: str, timeout: float) -> List[Dict[str, Any]]:
+        """
+        Raises:
+            ConnectionError: The peer could not be reached or did not return 200
+        """
+        parsed = urlsplit(url)
+        connection = HTTPSConnection(parsed.hostname, parsed.port, timeout=timeout, context=self.ssl_context) \
+            if parsed.scheme == 'https' else HTTPConnection(parsed.hostname, parsed.port, timeout=timeout)
+        query = urlencode({'trace_id': trace_id, 'limit': TRACE_LIMIT, 'order': 'asc'})
+        try:
+            connection.request('GET', f"{parsed.path}?{query}")
+            response = connection.getresponse()
+            body = response.read()
+        except (HTTPException, OSError) as e:
+            raise ConnectionError(f"{parsed.hostname}: {e}") from e
+        finally:
+            connection.close()
+        if response.status != 200:
+            raise ConnectionError(f"{parsed.hostname}: /v1/audit returned HTTP {response.status}")
+        return json.loads(body)
+
+
+# =============================================================================
+# Trace API
+# =============================================================================
+
+def serve(audit: FederatedAudit, host: str = '127.0.0.1', port: int = 0) -> ThreadingHTTPServer:
+    """Serve `GET /api/v1/audit/trace/{trace_id}[?timeout_ms=...]` in a background thread"""
+    httpd = ThreadingHTTPServer((host, port), _handler(audit))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
+
+
+def _handler(audit: FederatedAudit):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep-alive
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            prefix = TRACE_PATH + '/'
+            if not url.path.startswith(prefix) or len(url.path) == len(prefix):
+                return self._send(404, {'error': 'Not found'})
+            try:
+                params = parse_qs(url.query)
+                timeout = float(params['timeout_ms'][-1]) / 1000 if 'timeout_ms' in params else None
+            except ValueError as e:
+                return self._send(400, {'error': f"Invalid timeout_ms: {e}"})
+            stream = audit.trace(unquote(url.path[len(prefix):]), timeout)
+
+            # One JSON record per line, sent as the merge produces them
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/x-ndjson')
+            self.send_header('Transfer-Encoding', 'chunked')
+            self.end_headers()
+            for record in stream:
+                data = json.dumps(record).encode() + b'\n'
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+            self.wfile.write(b'0\r\n\r\n')
+
+        def _send(self, status: int, body: Any):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+# =============================================================================
+# Usage Example
+# =============================================================================
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Assemble a federated audit trail')
+    parser.add_argument('trace_id')
+    parser.add_argument('--peer', action='append', default=[], metavar='NODE=AUDIT_URL',
+                        help='e.g. grid-b.org-b.com=https://grid-b.org-b.com/api/v1/audit')
+    parser.add_argument('--timeout', type=float, default=2.0)
+    args = parser.parse_args()
+
+    audit = FederatedAudit('local', None, dict(peer.split('=', 1) for peer in args.peer), timeout=args.timeout)
+    for record in audit.trace(args.trace_id):
+        print(json.dumps(record))
+    audit.close()
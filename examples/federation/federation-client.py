@@ -0,0 +1,584 @@
+"""
+GRID Federation: Decision Proxy Client
+
+This template demonstrates the client side of spec §8.3 principal
+resolution ("Is alice@org-b.com authorized?") without putting a cross-org
+round trip on every request:
+
+- Discovery documents (`/.well-known/grid`) are cached per peer
+- Each peer gets a pool of keep-alive mTLS connections
+- Requests are sent to each peer in one batch; cached decisions are not
+  sent at all
+- Peers answer with signed, short-lived decision tokens, verified against
+  the peer's certificate and cached locally until they expire
+- A circuit breaker per peer stops calling a degraded peer and, by
+  default, fails closed (deny)
+- Every request sent to a peer carries a federation trace id
+  (`Context.trace_id`, assigned here when the caller has none), which the
+  peer records in its audit events (spec §8.3 step 4, audit correlation)
+
+Use this template for:
+- Cross-organization policy evaluation
+- B2B and partner access where the principal belongs to another node
+"""
+
+from dataclasses import asdict, dataclass
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+import json
+import queue
+import ssl
+import threading
+import time
+import uuid
+
+# Assume these are imported from a GRID SDK
+from .http_adapter_template import Principal, Resource, Action, Context, lazy_import
+from .canonical_policy_engine import Policy, PolicyDecision, PolicyEngine, context_value
+
+# Imported on first token verification: modules that only reuse the
+# circuit breaker or connection pool never pay for jwt
+jwt = lazy_import('jwt')
+
+
+WELL_KNOWN_PATH = '/.well-known/grid'
+TOKEN_ALGORITHM = 'ES256'
+
+
+class FederationError(Exception):
+    """A peer returned an invalid response"""
+
+
+class PeerUnavailableError(FederationError):
+    """A peer could not be reached or its circuit is open"""
+
+
+def ensure_trace_id(context: Context) -> str:
+    """
+    Return the request's federation trace id, assigning one if it has none
+
+    The id is set on `context` itself, so the caller's own audit event
+    carries the same id as the events of every peer the request reaches.
+    """
+    if context.trace_id is None:
+        context.trace_id = uuid.uuid4().hex
+    return context.trace_id
+
+
+# =============================================================================
+# Federation Types
+# =============================================================================
+
+@dataclass
+class DiscoveryDocument:
+    """A peer's `/.well-known/grid` document"""
+    node_id: str
+    version: str
+    endpoints: Dict[str, str]
+    cert: str  # PEM certificate that signs decision tokens
+    key_id: str
+    public_key: Any
+    expires_at: float  # Local clock
+
+
+@dataclass
+class DecisionToken:
+    """A verified decision token issued by a peer"""
+    token: str  # Raw JWT, kept for audit correlation
+    claims: Dict[str, Any]
+
+    @property
+    def expires_at(self) -> float:
+        return self.claims['exp']
+
+    @property
+    def decision(self) -> PolicyDecision:
+        return PolicyDecision(
+            allowed=self.claims['allowed'],
+            reason=self.claims['reason'],
+            policy_id=self.claims.get('policy_id'),
+            policy_version=self.claims.get('policy_version'),
+            rule=self.claims.get('rule'),
+            constraints=self.claims.get('constraints')
+        )
+
+    def matches(self, context: Context) -> bool:
+        """Check the context fields the peer's decision depended on"""
+        return all(
+            context_value(context, name) == value
+            for name, value in self.claims.get('context', {}).items()
+        )
+
+
+@dataclass
+class FederationStats:
+    """Federation client counters"""
+    token_hits: int = 0
+    remote_requests: int = 0  # Decisions requested from peers
+    round_trips: int = 0      # HTTP requests to peers
+    discovery_fetches: int = 0
+    failed_closed: int = 0
+
+
+# =============================================================================
+# Circuit Breaker
+# =============================================================================
+
+class CircuitBreaker:
+    """
+    Per-peer circuit breaker
+
+    closed → open after `failure_threshold` consecutive failures; after
+    `reset_timeout` seconds one trial request is let through (half-open),
+    and its outcome closes or re-opens the circuit.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and self.clock() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False  # Open, or half-open with a trial already in flight
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = self.clock()
+
+
+# =============================================================================
+# Connection Pool
+# =============================================================================
+
+class ConnectionPool:
+    """
+    Keep-alive connections to one peer
+
+    Connections are reused LIFO so the warmest connection is picked first;
+    a reused connection that turns out to be closed by the peer is retried
+    once on a fresh connection.
+    """
+
+    def __init__(self, base_url: str, ssl_context: Optional[ssl.SSLContext] = None,
+                 max_size: int = 8, timeout: float = 2.0):
+        parsed = urlparse(base_url)
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.ssl_context = ssl_context
+        self.timeout = timeout
+        self.created = 0
+        self._idle: 'queue.LifoQueue[HTTPConnection]' = queue.LifoQueue(max_size)
+
+    def request(self, method: str, path: str,
+                body: Optional[Dict[str, Any]] = None) -> Tuple[int, Dict[str, Any], Optional[bytes]]:
+        """
+        Send one request
+
+        Returns:
+            (status, decoded JSON body, DER certificate presented by the peer)
+        """
+        payload = json.dumps(body).encode() if body is not None else None
+        headers = {'Content-Type': 'application/json'} if payload else {}
+
+        for attempt in range(2):
+            connection, reused = self._acquire()
+            try:
+                connection.request(method, path, body=payload, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+            except (HTTPException, ConnectionError) as e:
+                connection.close()
+                if reused and attempt == 0:
+                    continue
+                raise PeerUnavailableError(f"{self.host}: {e}")
+            except OSError as e:
+                connection.close()
+                raise PeerUnavailableError(f"{self.host}: {e}")
+
+            peer_cert = connection.sock.getpeercert(binary_form=True) \
+                if isinstance(connection.sock, ssl.SSLSocket) else None
+            if response.will_close:
+                connection.close()
+            else:
+                self._release(connection)
+            try:
+                return response.status, json.loads(data) if data else {}, peer_cert
+            except json.JSONDecodeError:
+                raise FederationError(f"{self.host}: response is not JSON")
+
+        raise PeerUnavailableError(f"{self.host}: connection closed")
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def _acquire(self) -> Tuple[HTTPConnection, bool]:
+        try:
+            return self._idle.get_nowait(), True
+        except queue.Empty:
+            pass
+        self.created += 1
+        if self.scheme == 'https':
+            return HTTPSConnection(self.host, self.port, timeout=self.timeout,
+                                   context=self.ssl_context), False
+        return HTTPConnection(self.host, self.port, timeout=self.timeout), False
+
+    def _release(self, connection: HTTPConnection) -> None:
+        try:
+            self._idle.put_nowait(connection)
+        except queue.Full:
+            connection.close()
+
+
+def mtls_context(cert_file: str, key_file: str, ca_file: str) -> ssl.SSLContext:
+    """Client SSL context presenting this node's certificate (mutual TLS)"""
+    context = ssl.create_default_context(ssl.Purpose.SERVER_AUTH, cafile=ca_file)
+    context.load_cert_chain(cert_file, key_file)
+    return context
+
+
+# =============================================================================
+# Federation Client
+# =============================================================================
+
+class FederationClient:
+    """
+    Evaluates requests for principals that belong to peer nodes
+
+    Args:
+        node_id: This node's id; peers issue decision tokens to it (`aud`)
+        peers: Principal domain → peer base URL, e.g.
+            {'org-b.com': 'https://grid-b.org-b.com'}
+        ssl_context: mTLS context (see `mtls_context`); None for plain HTTP
+            (development only)
+        discovery_ttl: Seconds to cache discovery documents
+        fail_closed: Deny when a peer is unavailable instead of raising
+            PeerUnavailableError
+        clock_skew: Seconds a token is considered expired before its `exp`
+    """
+
+    def __init__(self, node_id: str, peers: Dict[str, str],
+                 ssl_context: Optional[ssl.SSLContext] = None,
+                 discovery_ttl: float = 3600.0, max_connections: int = 8,
+                 timeout: float = 2.0, failure_threshold: int = 5,
+                 reset_timeout: float = 30.0, fail_closed: bool = True,
+                 clock_skew: float = 1.0, max_cached_tokens: int = 100_000,
+                 clock: Callable[[], float] = time.time):
+        self.node_id = node_id
+        self.peers = peers
+        self.discovery_ttl = discovery_ttl
+        self.fail_closed = fail_closed
+        self.clock_skew = clock_skew
+        self.max_cached_tokens = max_cached_tokens
+        self.clock = clock
+        self.stats = FederationStats()
+        self.pools = {
+            domain: ConnectionPool(url, ssl_context, max_connections, timeout)
+            for domain, url in peers.items()
+        }
+        self.breakers = {
+            domain: CircuitBreaker(failure_threshold, reset_timeout)
+            for domain in peers
+        }
+        self._discovery: Dict[str, DiscoveryDocument] = {}
+        self._tokens: Dict[Tuple[str, str, str], DecisionToken] = {}
+        self._lock = threading.Lock()
+
+    def peer_for(self, principal: Principal) -> Optional[str]:
+        """Return the peer domain a principal belongs to, if any"""
+        _, _, domain = principal.id.rpartition('@')
+        return domain if domain in self.peers else None
+
+    def discover(self, domain: str) -> DiscoveryDocument:
+        """Return the peer's discovery document, fetching it when stale"""
+        document = self._discovery.get(domain)
+        if document is not None and document.expires_at > self.clock():
+            return document
+
+        status, body, _ = self.pools[domain].request('GET', WELL_KNOWN_PATH)
+        self.stats.discovery_fetches += 1
+        if status != 200:
+            raise FederationError(f"{domain}: discovery returned HTTP {status}")
+        try:
+            if not isinstance(body['endpoints']['policy'], str):
+                raise ValueError("endpoints.policy is not a URL")
+            document = DiscoveryDocument(
+                node_id=body['node_id'],
+                version=body['version'],
+                endpoints=body['endpoints'],
+                cert=body['trust']['cert'],
+                key_id=body['trust']['key_id'],
+                public_key=_public_key(body['trust']['cert']),
+                expires_at=self.clock() + self.discovery_ttl
+            )
+        except (KeyError, TypeError, ValueError) as e:
+            raise FederationError(f"{domain}: invalid discovery document: {e}")
+        self._discovery[domain] = document
+        return document
+
+    def evaluate(self, principal: Principal, resource: Resource,
+                 action: Action, context: Context) -> PolicyDecision:
+        """Evaluate one request on the principal's home node"""
+        return self.evaluate_batch([(principal, resource, action, context)])[0]
+
+    def evaluate_batch(self, requests: List[Tuple[Principal, Resource, Action, Context]]
+                       ) -> List[PolicyDecision]:
+        """
+        Evaluate requests on their principals' home nodes
+
+        Cached tokens answer what they can; the rest is deduplicated and
+        sent to each peer in a single request. A request answered from a
+        cached token, or deduplicated into another, leaves no event on the
+        peer; its trace is the local event alone.
+
+        Returns:
+            Decisions in request order
+        """
+        results: List[Optional[PolicyDecision]] = [None] * len(requests)
+        pending: Dict[str, Dict[Tuple[str, str, str], List[int]]] = {}
+
+        for index, (principal, resource, action, context) in enumerate(requests):
+            domain = self.peer_for(principal)
+            if domain is None:
+                raise ValueError(f"No federation peer for principal: {principal.id}")
+            ensure_trace_id(context)
+            key = (principal.id, resource.id, action.operation)
+            token = self._cached_token(key, context)
+            if token is not None:
+                self.stats.token_hits += 1
+                results[index] = token.decision
+            else:
+                pending.setdefault(domain, {}).setdefault(key, []).append(index)
+
+        for domain, keys in pending.items():
+            self._evaluate_remote(domain, keys, requests, results)
+
+        return results
+
+    def invalidate(self, domain: Optional[str] = None) -> None:
+        """Drop cached discovery documents and tokens (all peers or one)"""
+        with self._lock:
+            for peer in [domain] if domain else list(self._discovery):
+                self._discovery.pop(peer, None)
+            self._tokens = {
+                key: token for key, token in self._tokens.items()
+                if domain is not None and not key[0].endswith('@' + domain)
+            }
+
+    def close(self) -> None:
+        for pool in self.pools.values():
+            pool.close()
+
+    # =========================================================================
+    # Private Helper Methods
+    # =========================================================================
+
+    def _evaluate_remote(self, domain: str, keys: Dict[Tuple[str, str, str], List[int]],
+                         requests: List[Tuple[Principal, Resource, Action, Context]],
+                         results: List[Optional[PolicyDecision]]) -> None:
+        """Send one batch to a peer and fill in the results"""
+        breaker = self.breakers[domain]
+        if not breaker.allow_request():
+            return self._peer_unavailable(domain, keys, results, "circuit open")
+
+        batch = []
+        for indexes in keys.values():
+            principal, resource, action, context = requests[indexes[0]]
+            batch.append({
+                'principal_id': principal.id,
+                'resource': asdict(resource),
+                'action': action.operation,
+                'parameters': action.parameters,
+                'context': asdict(context)
+            })
+
+        try:
+            document = self.discover(domain)
+            status, body, peer_cert = self.pools[domain].request(
+                'POST', urlparse(document.endpoints['policy']).path + '/evaluate/batch',
+                {'requester': self.node_id, 'requests': batch})
+            self.stats.round_trips += 1
+            if status != 200:
+                raise FederationError(f"{domain}: evaluation returned HTTP {status}")
+            if peer_cert is not None and peer_cert != ssl.PEM_cert_to_DER_cert(document.cert):
+                raise FederationError(f"{domain}: token certificate does not match TLS peer")
+            tokens = body.get('decision_tokens') if isinstance(body, dict) else None
+            if not isinstance(tokens, list):
+                raise FederationError(f"{domain}: response has no decision_tokens list")
+            if len(tokens) != len(batch):
+                raise FederationError(f"{domain}: expected {len(batch)} tokens, got {len(tokens)}")
+            verified = [
+                self._verify(raw, document, key)
+                for raw, key in zip(tokens, keys)
+            ]
+        except (FederationError, KeyError, TypeError, ValueError) as e:
+            # A rotated key or certificate shows up here; rediscover next time.
+            # Any malformed reply is a failure too, so a half-open trial
+            # always closes or re-opens the breaker.
+            self._discovery.pop(domain, None)
+            breaker.record_failure()
+            return self._peer_unavailable(domain, keys, results, str(e))
+
+        breaker.record_success()
+        self.stats.remote_requests += len(batch)
+        for token, (key, indexes) in zip(verified, keys.items()):
+            self._store_token(key, token)
+            for index in indexes:
+                results[index] = token.decision
+
+    def _verify(self, raw: str, document: DiscoveryDocument,
+                key: Tuple[str, str, str]) -> DecisionToken:
+        """Verify a decision token's signature, audience and subject"""
+        try:
+            kid = jwt.get_unverified_header(raw).get('kid')
+            if kid != document.key_id:
+                raise FederationError(f"Unknown token key id: {kid}")
+            claims = jwt.decode(
+                raw, document.public_key, algorithms=[TOKEN_ALGORITHM],
+                audience=self.node_id, issuer=document.node_id,
+                options={'require': ['exp', 'iat', 'iss', 'aud', 'sub']}
+            )
+        except jwt.InvalidTokenError as e:
+            raise FederationError(f"Invalid decision token: {e}")
+
+        if (claims['sub'], claims.get('resource'), claims.get('action')) != key:
+            raise FederationError("Decision token does not match the request")
+        if not isinstance(claims.get('allowed'), bool) or not isinstance(claims.get('reason'), str):
+            raise FederationError("Decision token carries no decision")
+        return DecisionToken(token=raw, claims=claims)
+
+    def _cached_token(self, key: Tuple[str, str, str], context: Context) -> Optional[DecisionToken]:
+        token = self._tokens.get(key)
+        if token is None:
+            return None
+        if token.expires_at - self.clock_skew <= self.clock():
+            self._tokens.pop(key, None)
+            return None
+        return token if token.matches(context) else None
+
+    def _store_token(self, key: Tuple[str, str, str], token: DecisionToken) -> None:
+        if token.expires_at - self.clock_skew <= self.clock():
+            return
+        with self._lock:
+            if len(self._tokens) >= self.max_cached_tokens:
+                now = self.clock()
+                self._tokens = {k: t for k, t in self._tokens.items() if t.expires_at > now}
+                if len(self._tokens) >= self.max_cached_tokens:
+                    return
+            self._tokens[key] = token
+
+    def _peer_unavailable(self, domain: str, keys: Dict[Tuple[str, str, str], List[int]],
+                          results: List[Optional[PolicyDecision]], detail: str) -> None:
+        if not self.fail_closed:
+            raise PeerUnavailableError(f"Federation peer {domain} unavailable: {detail}")
+        decision = PolicyDecision(
+            allowed=False,
+            reason=f"Access denied: federation peer {domain} unavailable"
+        )
+        for indexes in keys.values():
+            self.stats.failed_closed += len(indexes)
+            for index in indexes:
+                results[index] = decision
+
+
+def _public_key(cert_pem: str) -> Any:
+    """Extract the public key from a PEM certificate"""
+    from cryptography.x509 import load_pem_x509_certificate
+    return load_pem_x509_certificate(cert_pem.encode()).public_key()
+
+
+# =============================================================================
+# Federated Policy Engine
+# =============================================================================
+
+class FederatedPolicyEngine(PolicyEngine):
+    """
+    Routes each evaluation to the principal's home node
+
+    Local principals are evaluated by the local engine; principals whose
+    domain is a configured peer are evaluated remotely through the
+    FederationClient.
+    """
+
+    def __init__(self, engine: PolicyEngine, client: FederationClient):
+        self.engine = engine
+        self.client = client
+
+    def evaluate(self, principal: Principal, resource: Resource,
+                 action: Action, context: Context) -> PolicyDecision:
+        if self.client.peer_for(principal) is None:
+            return self.engine.evaluate(principal, resource, action, context)
+        return self.client.evaluate(principal, resource, action, context)
+
+    def evaluate_batch(self, requests: List[Tuple[Principal, Resource, Action, Context]]
+                       ) -> List[PolicyDecision]:
+        """Evaluate local requests in-process and remote ones in per-peer batches"""
+        results: List[Optional[PolicyDecision]] = [None] * len(requests)
+        remote = []
+        for index, request in enumerate(requests):
+            if self.client.peer_for(request[0]) is None:
+                results[index] = self.engine.evaluate(*request)
+            else:
+                remote.append(index)
+        if remote:
+            decisions = self.client.evaluate_batch([requests[i] for i in remote])
+            for index, decision in zip(remote, decisions):
+                results[index] = decision
+        return results
+
+    def validate_policy(self, policy: str) -> bool:
+        return self.engine.validate_policy(policy)
+
+    def deploy_policy(self, policy: Policy) -> None:
+        self.engine.deploy_policy(policy)
+
+
+# =============================================================================
+# Usage Example
+# =============================================================================
+
+if __name__ == '__main__':
+    import os
+    from datetime import datetime
+
+    client = FederationClient(
+        node_id='grid-a.org-a.com',
+        peers={'org-b.com': os.environ.get('GRID_PEER_URL', 'https://localhost:8443')},
+        ssl_context=mtls_context(
+            os.environ['GRID_NODE_CERT'], os.environ['GRID_NODE_KEY'], os.environ['GRID_CA_CERT'])
+    )
+
+    alice = Principal(id='alice@org-b.com', type='human')
+    resource = Resource(id='reports-api', type='service', name='Reports API', sensitivity='medium')
+    context = Context(timestamp=datetime.utcnow().isoformat() + 'Z')
+
+    for _ in range(3):
+        decision = client.evaluate(alice, resource, Action(operation='read'), context)
+        print(f"{decision.allowed}: {decision.reason}")
+    print(client.stats)
@@ -0,0 +1,325 @@
+"""
+GRID Federation: Node Evaluation Endpoint
+
+This template demonstrates the serving side of spec §8.3: a GRID node that
+answers principal resolution requests from federated peers.
+
+- `GET /.well-known/grid` returns the discovery document, including the
+  certificate that signs decision tokens
+- `POST /api/v1/policy/evaluate` and `/api/v1/policy/evaluate/batch`
+  evaluate requests for this node's principals and return signed,
+  short-lived decision tokens (ES256 JWTs)
+- With a PolicyPublisher attached, the policy sync endpoints from
+  policy-sync.py are served as well
+- Connections are kept alive (HTTP/1.1) and, with a CA configured, peers
+  must present a client certificate (mTLS)
+- With an AdmissionController attached, a request is dropped once its
+  `X-Grid-Deadline-Ms` has passed and shed under overload (HTTP 429 with
+  `Retry-After`)
+- With an audit sink attached, every evaluation is recorded as a §7.2
+  event with the requester's federation trace id and a `federation`
+  section (this node, the requesting node), so federated-audit.py can
+  assemble the trail across nodes
+
+A token's lifetime is the shortest of the node's maximum, the §5.4
+sensitivity TTL and the decision's time validity window, so a peer can
+cache it without outliving the decision.
+
+Use this template for:
+- Running a local federation peer for integration tests
+- Exposing a node's principals to partner organizations
+"""
+
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Optional
+import json
+import ssl
+import threading
+import time
+
+# Assume these are imported from a GRID SDK
+from .http_adapter_template import Principal, Resource, Action, Context, lazy_import
+from .canonical_policy_engine import PolicyDecision, PolicyEngine, context_value
+from .decision_cache import SENSITIVITY_TTL
+from .resilient_engine import audit_event
+from .federation_client import TOKEN_ALGORITHM, WELL_KNOWN_PATH
+from .policy_sync import PolicyPublisher, handle_sync_request
+from .admission_control import (
+    AdmissionController, AdmissionRejected, DEADLINE_HEADER, deadline_from_header,
+    priority, rejection_response
+)
+
+# Imported when the node first signs a decision token
+jwt = lazy_import('jwt')
+
+POLICY_PATH = '/api/v1/policy'
+
+
+@dataclass
+class NodeIdentity:
+    """A node's id, base URL and token signing material"""
+    node_id: str
+    base_url: str
+    cert_pem: str  # Also the TLS server certificate
+    key_pem: str
+    key_id: str
+
+
+# =============================================================================
+# Federation Node
+# =============================================================================
+
+class FederationNode:
+    """
+    Evaluates federated requests for this node's principals
+
+    Args:
+        identity: Node id, URL and signing key
+        engine: Policy engine for this node's policies
+        principals: Directory of this node's principals by id
+        max_token_ttl: Upper bound on decision token lifetime (seconds)
+        publisher: Policies offered to peers for sync (optional)
+        admission: Admission controller evaluations pass through (optional)
+        audit: Called with the audit event of each evaluation, e.g.
+            `AuditStore.append` (optional)
+    """
+
+    def __init__(self, identity: NodeIdentity, engine: PolicyEngine,
+                 principals: Dict[str, Principal], max_token_ttl: int = 60,
+                 publisher: Optional[PolicyPublisher] = None,
+                 admission: Optional[AdmissionController] = None,
+                 audit: Optional[Callable[[Dict[str, Any]], Any]] = None):
+        self.identity = identity
+        self.engine = engine
+        self.principals = principals
+        self.max_token_ttl = max_token_ttl
+        self.publisher = publisher
+        self.admission = admission
+        self.audit = audit
+        self.evaluations = 0
+
+    def discovery_document(self) -> Dict[str, Any]:
+        base = self.identity.base_url.rstrip('/')
+        return {
+            'version': '0.1',
+            'node_id': self.identity.node_id,
+            'endpoints': {
+                'policy': f"{base}{POLICY_PATH}",
+                'audit': f"{base}/api/v1/audit",
+                'principals': f"{base}/api/v1/principals"
+            },
+            'trust': {
+                'cert': self.identity.cert_pem,
+                'key_id': self.identity.key_id
+            }
+        }
+
+    def evaluate_batch(self, requests: List[Dict[str, Any]], requester: str,
+                       deadline: Optional[float] = None) -> List[str]:
+        """
+        Evaluate serialized requests and return one signed token per request
+
+        Unknown principals are denied; the denial is signed like any other
+        decision. With an admission controller, the batch is admitted as one
+        request at the priority of its most important request.
+
+        Args:
+            deadline: When the requester stops waiting (time.monotonic())
+
+        Raises:
+            AdmissionRejected: Shed, or past its deadline
+        """
+        parsed = [(request, Resource(**request['resource']),
+                   Action(operation=request['action'], parameters=request.get('parameters')),
+                   Context(**request['context'])) for request in requests]
+        if self.admission is None:
+            return self._evaluate_parsed(parsed, requester)
+        with self.admission.admit(max((priority(r, a) for _, r, a, _ in parsed), default=0), deadline):
+            return self._evaluate_parsed(parsed, requester)
+
+    def _evaluate_parsed(self, parsed: List[tuple], requester: str) -> List[str]:
+        now = time.time()
+        tokens = []
+        for request, resource, action, context in parsed:
+            principal = self.principals.get(request['principal_id'])
+
+            self.evaluations += 1
+            if principal is None:
+                decision = PolicyDecision(allowed=False, reason='Access denied: unknown principal')
+            else:
+                decision = self.engine.evaluate(principal, resource, action, context)
+            if self.audit is not None:
+                event = audit_event(principal or Principal(id=request['principal_id'], type='unknown'),
+                                    resource, action, context, decision)
+                event['federation'] = {'node': self.identity.node_id, 'requester': requester}
+                self.audit(event)
+            tokens.append(self.issue_token(
+                request['principal_id'], resource, action, context, decision, requester, now))
+        return tokens
+
+    def issue_token(self, principal_id: str, resource: Resource, action: Action,
+                    context: Context, decision: PolicyDecision, requester: str,
+                    now: Optional[float] = None) -> str:
+        """Sign a decision for `requester`"""
+        now = time.time() if now is None else now
+        ttl = min(self.max_token_ttl,
+                  SENSITIVITY_TTL.get(resource.sensitivity, min(SENSITIVITY_TTL.values())))
+        if decision.valid_until is not None:
+            remaining = decision.valid_until.timestamp() - now
+            ttl = max(0, min(ttl, int(remaining)))
+
+        fields = self.engine.context_fields() if hasattr(self.engine, 'context_fields') else ()
+        claims = {
+            'iss': self.identity.node_id,
+            'aud': requester,
+            'sub': principal_id,
+            'iat': int(now),
+            'exp': int(now) + ttl,
+            'resource': resource.id,
+            'action': action.operation,
+            'allowed': decision.allowed,
+            'reason': decision.reason,
+            'policy_id': decision.policy_id,
+            'policy_version': decision.policy_version,
+            'rule': decision.rule,
+            'constraints': decision.constraints,
+            # Context the decision depended on; peers reuse the token only
+            # for requests with the same values
+            'context': {name: context_value(context, name) for name in sorted(fields)}
+        }
+        return jwt.encode(claims, self.identity.key_pem, algorithm=TOKEN_ALGORITHM,
+                          headers={'kid': self.identity.key_id})
+
+    def serve(self, host: str = '127.0.0.1', port: int = 0,
+              ssl_context: Optional[ssl.SSLContext] = None) -> ThreadingHTTPServer:
+        """
+        Start serving in a background thread
+
+        Args:
+            ssl_context: Server context (see `server_mtls_context`); None for
+                plain HTTP (development only)
+        """
+        httpd = ThreadingHTTPServer((host, port), _handler(self))
+        if ssl_context is not None:
+            httpd.socket = ssl_context.wrap_socket(httpd.socket, server_side=True)
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        return httpd
+
+
+def server_mtls_context(cert_file: str, key_file: str, ca_file: str) -> ssl.SSLContext:
+    """Server SSL context that requires a client certificate signed by the CA"""
+    context = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH, cafile=ca_file)
+    context.load_cert_chain(cert_file, key_file)
+    context.verify_mode = ssl.CERT_REQUIRED
+    return context
+
+
+def _requester(handler: BaseHTTPRequestHandler, body: Dict[str, Any]) -> str:
+    """With mTLS the requester is the client certificate's CN, never the body"""
+    connection = handler.connection
+    if isinstance(connection, ssl.SSLSocket):
+        cert = connection.getpeercert() or {}
+        for rdn in cert.get('subject', ()):
+            for name, value in rdn:
+                if name == 'commonName':
+                    return value
+        raise ValueError("Client certificate has no common name")
+    return body['requester']
+
+
+def _handler(node: FederationNode):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # Keep-alive
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if node.publisher and handle_sync_request(node.publisher, self, 'GET'):
+                return
+            if self.path == WELL_KNOWN_PATH:
+                return self._send(200, node.discovery_document())
+            self._send(404, {'error': 'Not found'})
+
+        def do_POST(self):
+            if node.publisher and handle_sync_request(node.publisher, self, 'POST'):
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+                requester = _requester(self, body)
+                deadline = deadline_from_header(self.headers.get(DEADLINE_HEADER))
+                if self.path == f"{POLICY_PATH}/evaluate/batch":
+                    tokens = node.evaluate_batch(body['requests'], requester, deadline)
+                    return self._send(200, {'decision_tokens': tokens})
+                if self.path == f"{POLICY_PATH}/evaluate":
+                    token = node.evaluate_batch([body], requester, deadline)[0]
+                    return self._send(200, {'decision_token': token})
+                self._send(404, {'error': 'Not found'})
+            except AdmissionRejected as e:
+                response = rejection_response(e)
+                self._send(response['status'], response['body'], response['headers'])
+            except (ValueError, KeyError, TypeError) as e:
+                self._send(400, {'error': f"Invalid request: {e}"})
+
+        def _send(self, status: int, body: Dict[str, Any], headers: Optional[Dict[str, str]] = None):
+            data = json.dumps(body).encode()
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+# =============================================================================
+# Usage Example
+# =============================================================================
+
+if __name__ == '__main__':
+    import argparse
+    from .canonical_policy_engine import CanonicalPolicyEngine, load_policy_file
+
+    parser = argparse.ArgumentParser(description='Run a local GRID federation node')
+    parser.add_argument('--node-id', required=True)
+    parser.add_argument('--port', type=int, default=0)
+    parser.add_argument('--policy', action='append', required=True, help='Canonical policy YAML')
+    parser.add_argument('--principals', required=True, help='JSON list of principals')
+    parser.add_argument('--cert', required=True)
+    parser.add_argument('--key', required=True)
+    parser.add_argument('--ca', help='CA for client certificates; enables mTLS')
+    parser.add_argument('--max-token-ttl', type=int, default=60)
+    parser.add_argument('--publish', action='store_true', help='Offer the policies for sync')
+    args = parser.parse_args()
+
+    with open(args.principals) as f:
+        principals = {p['id']: Principal(**p) for p in json.load(f)}
+    with open(args.cert) as f:
+        cert_pem = f.read()
+    with open(args.key) as f:
+        key_pem = f.read()
+
+    publisher = None
+    if args.publish:
+        publisher = PolicyPublisher()
+        for path in args.policy:
+            with open(path) as f:
+                publisher.publish(f.read())
+
+    context = server_mtls_context(args.cert, args.key, args.ca) if args.ca else None
+    scheme = 'https' if context else 'http'
+    node = FederationNode(
+        identity=NodeIdentity(args.node_id, '', cert_pem, key_pem, key_id=f"{args.node_id}-1"),
+        engine=CanonicalPolicyEngine([load_policy_file(p) for p in args.policy]),
+        principals=principals,
+        max_token_ttl=args.max_token_ttl,
+        publisher=publisher
+    )
+    httpd = node.serve(port=args.port, ssl_context=context)
+    port = httpd.server_address[1]
+    node.identity.base_url = f"{scheme}://localhost:{port}"
+    print(f"listening on {port}", flush=True)
+    threading.Event().wait()
@@ -0,0 +1,473 @@
+"""
+GRID Federation: Incremental Policy Sync
+
+This template demonstrates step 2 of spec §8.3 trust establishment
+("Node A: Downloads policies of interest") without repeated full
+downloads:
+
+- Publisher and subscriber exchange content-hash manifests
+  ({policy id: sha256 of the canonical YAML document})
+- Only changed documents are transferred, each compressed as a delta:
+  zlib with the subscriber's previous version as preset dictionary, so a
+  one-line edit costs a few dozen bytes
+- The subscriber redeploys only the changed policies, so the engine
+  only re-indexes the affected rules (with PrecomputedPolicyEngine, only
+  the affected matrix cells)
+- Mirrored rules only apply to the peer's own principals
+  (`{id}@{namespace}`), so a peer's allow rule never grants anything to a
+  local principal
+- Subscribers wait for changes on a long-poll or server-sent event stream
+  instead of polling
+
+Use this template for:
+- Mirroring a peer's policies for local evaluation
+- Distributing policies from a central node to edge nodes
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set
+from urllib.parse import urlparse
+import base64
+import hashlib
+import json
+import ssl
+import threading
+import zlib
+
+# Assume these are imported from a GRID SDK
+from .http_adapter_template import lazy_import
+from .canonical_policy_engine import Matcher, Policy, PolicyEngine, load_policy
+from .federation_client import ConnectionPool, FederationError, PeerUnavailableError
+
+# Imported on first publish or sync
+yaml = lazy_import('yaml')
+
+SYNC_PATH = '/api/v1/policy'
+
+# Socket timeout of a long poll beyond the wait it asks the publisher for
+POLL_GRACE = 5.0
+
+
+def content_hash(document: str) -> str:
+    """Content hash of a canonical policy document"""
+    return 'sha256:' + hashlib.sha256(document.encode()).hexdigest()
+
+
+def compress_delta(document: str, base: Optional[str] = None) -> bytes:
+    """Compress a document, using the previous version as dictionary if known"""
+    compressor = zlib.compressobj(9, zdict=base.encode()) if base else zlib.compressobj(9)
+    return compressor.compress(document.encode()) + compressor.flush()
+
+
+def decompress_delta(data: bytes, base: Optional[str] = None) -> str:
+    decompressor = zlib.decompressobj(zdict=base.encode()) if base else zlib.decompressobj()
+    return (decompressor.decompress(data) + decompressor.flush()).decode()
+
+
+@dataclass
+class SyncStats:
+    """Policy sync counters"""
+    syncs: int = 0
+    policies_updated: int = 0
+    policies_removed: int = 0
+    bytes_received: int = 0  # Compressed delta bytes
+    bytes_full: int = 0      # Size the changed documents would have had uncompressed
+
+
+# =============================================================================
+# Publisher
+# =============================================================================
+
+class PolicyPublisher:
+    """
+    Versioned store of canonical policy documents
+
+    Every change bumps `revision`. Previous document versions are kept by
+    content hash (up to `max_versions`) so deltas can be computed against
+    whatever version a subscriber has.
+    """
+
+    def __init__(self, max_versions: int = 1000, max_history: int = 1000):
+        self.revision = 0
+        self.documents: Dict[str, str] = {}
+        self.hashes: Dict[str, str] = {}
+        self.max_versions = max_versions
+        self.max_history = max_history
+        self._versions: 'OrderedDict[str, str]' = OrderedDict()  # hash → document
+        self._history: List[tuple] = []  # (revision, changed policy ids)
+        self._changed = threading.Condition()
+
+    def publish(self, document: str) -> Optional[int]:
+        """
+        Add or replace a policy document
+
+        Returns:
+            The new revision, or None if the document is unchanged
+        """
+        policy = load_policy(yaml.safe_load(document))
+        digest = content_hash(document)
+        with self._changed:
+            if self.hashes.get(policy.id) == digest:
+                return None
+            self.documents[policy.id] = document
+            self.hashes[policy.id] = digest
+            self._remember(digest, document)
+            return self._bump({policy.id})
+
+    def withdraw(self, policy_id: str) -> Optional[int]:
+        """Remove a policy; returns the new revision, or None if it was unknown"""
+        with self._changed:
+            if self.documents.pop(policy_id, None) is None:
+                return None
+            del self.hashes[policy_id]
+            return self._bump({policy_id})
+
+    def manifest(self) -> Dict[str, Any]:
+        with self._changed:
+            return {
+                'revision': self.revision,
+                'policies': dict(self.hashes)
+            }
+
+    def delta(self, have: Dict[str, str], want: Optional[List[str]] = None) -> Dict[str, Any]:
+        """
+        Compute what a subscriber needs to catch up
+
+        Args:
+            have: The subscriber's manifest ({policy id: content hash})
+            want: Restrict to these policy ids (None: all)
+
+        Returns:
+            {'revision', 'upserts': {id: {hash, base, delta}}, 'removed': [ids]}
+        """
+        with self._changed:
+            ids = set(self.documents) if want is None else set(want) & set(self.documents)
+            upserts = {}
+            for policy_id in sorted(ids):
+                document = self.documents[policy_id]
+                digest = self.hashes[policy_id]
+                if have.get(policy_id) == digest:
+                    continue
+                base_hash = have.get(policy_id)
+                base = self._versions.get(base_hash) if base_hash else None
+                upserts[policy_id] = {
+                    'hash': digest,
+                    'base': base_hash if base is not None else None,
+                    'delta': base64.b64encode(compress_delta(document, base)).decode()
+                }
+            scope = set(have) if want is None else set(have) & set(want)
+            return {
+                'revision': self.revision,
+                'upserts': upserts,
+                'removed': sorted(pid for pid in scope if pid not in self.documents)
+            }
+
+    def wait_for_change(self, since: int, timeout: float) -> Dict[str, Any]:
+        """
+        Block until the revision is past `since` or the timeout elapses
+
+        Returns:
+            {'revision', 'changed': policy ids changed after `since`, or
+            None if the history no longer reaches back that far}
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: self.revision > since, timeout)
+            return {'revision': self.revision, 'changed': self._changed_since(since)}
+
+    # =========================================================================
+    # Private Helper Methods
+    # =========================================================================
+
+    def _bump(self, changed: Set[str]) -> int:
+        self.revision += 1
+        self._history.append((self.revision, changed))
+        del self._history[:-self.max_history]
+        self._changed.notify_all()
+        return self.revision
+
+    def _remember(self, digest: str, document: str) -> None:
+        self._versions[digest] = document
+        self._versions.move_to_end(digest)
+        while len(self._versions) > self.max_versions:
+            self._versions.popitem(last=False)
+
+    def _changed_since(self, since: int) -> Optional[List[str]]:
+        if since >= self.revision:
+            return []
+        if not self._history or self._history[0][0] > since + 1:
+            return None
+        changed = set()
+        for revision, ids in self._history:
+            if revision > since:
+                changed |= ids
+        return sorted(changed)
+
+
+# =============================================================================
+# Subscriber
+# =============================================================================
+
+class PolicySubscriber:
+    """
+    Keeps a local engine in sync with a peer's published policies
+
+    Args:
+        pool: Connection pool to the peer (see federation-client.py)
+        engine: Engine to deploy into (e.g. CanonicalPolicyEngine or
+            PrecomputedPolicyEngine); needs `deploy_policy` and
+            `remove_policy`
+        namespace: The peer's domain. Prefixes local policy ids, so a peer's
+            policies cannot replace local ones (`{namespace}/{policy id}`),
+            and limits every mirrored rule to principals `...@{namespace}`
+        want: Policy ids of interest (None: all)
+    """
+
+    def __init__(self, pool: ConnectionPool, engine: PolicyEngine, namespace: str,
+                 want: Optional[List[str]] = None):
+        self.pool = pool
+        self.engine = engine
+        self.namespace = namespace
+        self.want = want
+        self.revision = 0
+        self.documents: Dict[str, str] = {}  # Peer policy id → document
+        self.stats = SyncStats()
+        self.on_change: Optional[Callable[[List[str]], None]] = None
+
+    def sync(self) -> List[str]:
+        """
+        Fetch and apply everything that changed since the last sync
+
+        Returns:
+            Peer policy ids that were updated or removed
+        """
+        have = {pid: content_hash(doc) for pid, doc in self.documents.items()}
+        status, delta, _ = self.pool.request(
+            'POST', f"{SYNC_PATH}/sync", {'have': have, 'want': self.want})
+        if status != 200:
+            raise FederationError(f"Policy sync returned HTTP {status}")
+
+        updates = {}
+        for policy_id, entry in delta['upserts'].items():
+            base = self.documents.get(policy_id) if entry['base'] else None
+            if entry['base'] and have.get(policy_id) != entry['base']:
+                raise FederationError(f"Delta for {policy_id} is against an unknown base")
+            data = base64.b64decode(entry['delta'])
+            document = decompress_delta(data, base)
+            if content_hash(document) != entry['hash']:
+                raise FederationError(f"Content hash mismatch for {policy_id}")
+            updates[policy_id] = (document, load_policy(yaml.safe_load(document)))
+            self.stats.bytes_received += len(data)
+            self.stats.bytes_full += len(document.encode())
+
+        # Everything is parsed and verified before anything is deployed
+        for policy_id, (document, policy) in updates.items():
+            self.engine.deploy_policy(self._scoped(policy_id, policy))
+            self.documents[policy_id] = document
+        for policy_id in delta['removed']:
+            self.engine.remove_policy(self._local_id(policy_id))
+            self.documents.pop(policy_id, None)
+
+        self.revision = delta['revision']
+        self.stats.syncs += 1
+        self.stats.policies_updated += len(updates)
+        self.stats.policies_removed += len(delta['removed'])
+        changed = sorted(updates) + list(delta['removed'])
+        if changed and self.on_change:
+            self.on_change(changed)
+        return changed
+
+    def long_poll(self, timeout: float = 30.0) -> List[str]:
+        """
+        Wait for the next change (or the timeout), then sync
+
+        The poll holds a connection of its own, like `events()`: the pool's
+        socket timeout is far shorter than the wait.
+
+        Raises:
+            PeerUnavailableError: The peer could not be reached
+            FederationError: The peer did not answer with 200 and JSON
+        """
+        connection = self._connection(timeout + POLL_GRACE)
+        try:
+            connection.request('GET', f"{SYNC_PATH}/changes?since={self.revision}&timeout={timeout}")
+            response = connection.getresponse()
+            data = response.read()
+        except (HTTPException, OSError) as e:
+            raise PeerUnavailableError(f"{self.pool.host}: {e}") from e
+        finally:
+            connection.close()
+        if response.status != 200:
+            raise FederationError(f"Change poll returned HTTP {response.status}")
+        try:
+            body = json.loads(data)
+        except ValueError:
+            raise FederationError(f"{self.pool.host}: change poll response is not JSON")
+        if body['revision'] == self.revision:
+            return []
+        if body['changed'] is not None and self.want is not None \
+                and not set(body['changed']) & set(self.want):
+            self.revision = body['revision']
+            return []
+        return self.sync()
+
+    def watch(self, stop: threading.Event, ssl_context: Optional[ssl.SSLContext] = None,
+              use_sse: bool = True, timeout: float = 30.0) -> None:
+        """
+        Sync until `stop` is set
+
+        With `use_sse` the subscriber holds one server-sent event stream
+        open and syncs on each `policy-change` event; otherwise it long-polls.
+        """
+        self.sync()
+        while not stop.is_set():
+            if not use_sse:
+                self.long_poll(timeout)
+                continue
+            for event in self.events(ssl_context, timeout):
+                if stop.is_set():
+                    return
+                if event.get('revision', 0) > self.revision:
+                    self.sync()
+
+    def events(self, ssl_context: Optional[ssl.SSLContext] = None,
+               timeout: float = 30.0) -> Iterator[Dict[str, Any]]:
+        """Yield `policy-change` events from the peer's event stream"""
+        connection = self._connection(timeout, ssl_context)
+        try:
+            connection.request('GET', f"{SYNC_PATH}/events?since={self.revision}",
+                               headers={'Accept': 'text/event-stream'})
+            response = connection.getresponse()
+            if response.status != 200:
+                raise FederationError(f"Event stream returned HTTP {response.status}")
+            data = []
+            while True:
+                line = response.readline()
+                if not line:
+                    return
+                line = line.decode().rstrip('\r\n')
+                if line.startswith('data:'):
+                    data.append(line[5:].strip())
+                elif not line and data:
+                    yield json.loads('\n'.join(data))
+                    data = []
+        except TimeoutError:
+            return  # No heartbeat within the timeout; reconnect
+        finally:
+            connection.close()
+
+    def _connection(self, timeout: float, ssl_context: Optional[ssl.SSLContext] = None) -> HTTPConnection:
+        """A connection to the peer outside the pool, for requests that wait"""
+        scheme, host, port = self.pool.scheme, self.pool.host, self.pool.port
+        context = ssl_context or self.pool.ssl_context
+        return HTTPSConnection(host, port, timeout=timeout, context=context) \
+            if scheme == 'https' else HTTPConnection(host, port, timeout=timeout)
+
+    def _local_id(self, policy_id: str) -> str:
+        return f"{self.namespace}/{policy_id}"
+
+    def _scoped(self, policy_id: str, policy: Policy) -> Policy:
+        """The peer's policy under its local id, each rule limited to the peer's principals"""
+        domain = Matcher(type='domain', value=self.namespace)
+        rules = [replace(rule, principals=[domain] + rule.principals) for rule in policy.rules]
+        return replace(policy, id=self._local_id(policy_id), rules=rules)
+
+
+# =============================================================================
+# HTTP Endpoints
+# =============================================================================
+
+def handle_sync_request(publisher: PolicyPublisher, handler: Any, method: str) -> bool:
+    """
+    Serve the policy sync endpoints from a BaseHTTPRequestHandler
+
+    - GET  /api/v1/policy/manifest
+    - POST /api/v1/policy/sync      body: {"have": {...}, "want": [...]}
+    - GET  /api/v1/policy/changes?since=N&timeout=S   (long poll)
+    - GET  /api/v1/policy/events?since=N               (server-sent events)
+
+    A malformed body or query parameter is answered with 400.
+
+    Returns:
+        True if the request was handled
+    """
+    parsed = urlparse(handler.path)
+    query = dict(part.split('=', 1) for part in parsed.query.split('&') if '=' in part)
+
+    path = parsed.path[len(SYNC_PATH):] if parsed.path.startswith(SYNC_PATH) else None
+    if (method, path) not in {('GET', '/manifest'), ('POST', '/sync'),
+                              ('GET', '/changes'), ('GET', '/events')}:
+        return False
+    try:
+        since = int(query.get('since', 0))
+        timeout = max(0.0, min(float(query.get('timeout', 30)), 60.0))
+        if path == '/sync':
+            body = json.loads(handler.rfile.read(int(handler.headers.get('Content-Length', 0))))
+            have, want = body.get('have', {}), body.get('want')
+            if not isinstance(have, dict) or not (want is None or isinstance(want, list)):
+                raise ValueError("'have' must be an object and 'want' a list")
+    except (AttributeError, ValueError) as e:  # Not JSON, not an object, or not a number
+        _send_json(handler, 400, {'error': f"Invalid sync request: {e}"})
+        return True
+
+    if path == '/manifest':
+        _send_json(handler, 200, publisher.manifest())
+    elif path == '/sync':
+        _send_json(handler, 200, publisher.delta(have, want))
+    elif path == '/changes':
+        _send_json(handler, 200, publisher.wait_for_change(since, timeout))
+    else:
+        _stream_events(publisher, handler, since)
+    return True
+
+
+def _send_json(handler: Any, status: int, body: Dict[str, Any]) -> None:
+    data = json.dumps(body).encode()
+    handler.send_response(status)
+    handler.send_header('Content-Type', 'application/json')
+    handler.send_header('Content-Length', str(len(data)))
+    handler.end_headers()
+    handler.wfile.write(data)
+
+
+def _stream_events(publisher: PolicyPublisher, handler: Any, since: int,
+                   heartbeat: float = 15.0) -> None:
+    """Send a `policy-change` event per revision until the client disconnects"""
+    handler.send_response(200)
+    handler.send_header('Content-Type', 'text/event-stream')
+    handler.send_header('Cache-Control', 'no-cache')
+    handler.send_header('Connection', 'close')
+    handler.end_headers()
+    handler.close_connection = True
+    try:
+        while True:
+            change = publisher.wait_for_change(since, heartbeat)
+            if change['revision'] > since:
+                since = change['revision']
+                handler.wfile.write(
+                    f"event: policy-change\nid: {since}\ndata: {json.dumps(change)}\n\n".encode())
+            else:
+                handler.wfile.write(b": heartbeat\n\n")
+            handler.wfile.flush()
+    except (BrokenPipeError, ConnectionResetError):
+        return
+
+
+# =============================================================================
+# Usage Example
+# =============================================================================
+
+if __name__ == '__main__':
+    import os
+    from .canonical_policy_engine import CanonicalPolicyEngine
+    from .federation_client import mtls_context
+
+    context = mtls_context(
+        os.environ['GRID_NODE_CERT'], os.environ['GRID_NODE_KEY'], os.environ['GRID_CA_CERT'])
+    pool = ConnectionPool(os.environ.get('GRID_PEER_URL', 'https://localhost:8443'), context)
+    engine = CanonicalPolicyEngine()
+    subscriber = PolicySubscriber(pool, engine, namespace='org-b.com')
+    subscriber.on_change = lambda ids: print(f"revision {subscriber.revision}: {ids}")
+
+    subscriber.watch(threading.Event(), ssl_context=context)
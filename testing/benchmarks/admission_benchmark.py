@@ -0,0 +1,137 @@
+"""
+PDP overload: evaluating everything vs. admission control with adaptive concurrency limits.
+
+Sends an open-loop stream of requests at a multiple of the PDP's
+capacity, each with a 100 ms deadline, to a stand-in engine that slows
+down with every evaluation running at once (like a PDP sharing a few
+cores). Without admission control every request is evaluated and queues
+grow until almost every decision arrives after its caller gave up; with
+it, the PDP keeps the evaluations in flight near what its cores can run,
+rejects the rest early (lowest priority first), and answers the admitted
+requests in time.
+
+    python admission_benchmark.py --overload 2 --seconds 3
+"""
+
+import argparse
+import pathlib
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "integration-examples"))
+import conftest  # noqa: E402,F401  (makes grid_examples importable)
+
+from grid_examples.admission_control import (  # noqa: E402
+    AIMDLimit, AdmissionController, AdmissionRejected, AdmittedPolicyEngine, GradientLimit, priority,
+)
+from grid_examples.canonical_policy_engine import CanonicalPolicyEngine, load_policy_file  # noqa: E402
+from grid_examples.http_adapter_template import Action, Context, Principal, Resource  # noqa: E402
+
+POLICY = pathlib.Path(__file__).resolve().parents[2] / "examples" / "engine" / "policies" / "rbac-basic.yaml"
+CONTEXT = Context(timestamp="2025-11-27T10:00:00Z")
+SENSITIVITIES = ["low", "medium", "high", "critical"]
+OPERATIONS = ["read", "write"]
+
+
+class SharedCoresEngine(CanonicalPolicyEngine):
+    """Each evaluation needs `cost` seconds of one of `cores` cores, shared by all running evaluations"""
+
+    def __init__(self, policies, cores, cost):
+        super().__init__(policies)
+        self.cores, self.cost = cores, cost
+        self.running = 0
+        self._lock = threading.Lock()
+
+    def evaluate(self, *args):
+        with self._lock:
+            self.running += 1
+            slowdown = max(1.0, self.running / self.cores)
+        time.sleep(self.cost * slowdown)
+        with self._lock:
+            self.running -= 1
+        return super().evaluate(*args)
+
+
+class Unprotected:
+    """Evaluates every request, whatever its deadline"""
+
+    def __init__(self, engine):
+        self.engine = engine
+
+    def evaluate(self, principal, resource, action, context, deadline=None):
+        return self.engine.evaluate(principal, resource, action, context)
+
+
+def run(engine, rate, seconds, deadline_ms):
+    """Open-loop arrivals; returns (outcome, priority, latency) per request"""
+    results = []
+    lock = threading.Lock()
+
+    def call(i, arrival):
+        resource = Resource(id=f"res-{i}", type="tool", name=f"Tool {i}", sensitivity=SENSITIVITIES[i % 4])
+        action = Action(operation=OPERATIONS[i // 4 % 2])
+        level = priority(resource, action)
+        try:
+            engine.evaluate(Principal(id=f"user-{i}", type="human", role="developer"), resource, action, CONTEXT,
+                            deadline=arrival + deadline_ms / 1000)
+            latency = time.monotonic() - arrival
+            outcome = "in time" if latency <= deadline_ms / 1000 else "late"
+        except AdmissionRejected as e:
+            latency, outcome = time.monotonic() - arrival, e.kind
+        with lock:
+            results.append((outcome, level, latency))
+
+    with ThreadPoolExecutor(max_workers=512) as pool:
+        start = time.monotonic()
+        for i in range(int(rate * seconds)):
+            arrival = start + i / rate
+            delay = arrival - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(call, i, arrival)
+    return results
+
+
+def report(label, results, deadline_ms):
+    total = len(results)
+    in_time = [r for r in results if r[0] == "in time"]
+    rejected = [r for r in results if r[0] not in ("in time", "late")]
+    answered = sorted(r[2] for r in results if r[0] != "late")
+    p99 = answered[int(len(answered) * 0.99) - 1] * 1000 if answered else float("nan")
+    by_priority = []
+    for level in (0, 7):
+        mine = [r for r in results if r[1] == level]
+        by_priority.append(sum(r[0] == "in time" for r in mine) / len(mine))
+    print(f"{label:22} {len(in_time) / total:6.1%} in time   {len(rejected) / total:6.1%} rejected   "
+          f"p99 of answers {p99:7.1f} ms   in time: low reads {by_priority[0]:6.1%}, "
+          f"critical writes {by_priority[1]:6.1%}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--cores", type=int, default=4)
+    parser.add_argument("--cost-ms", type=float, default=2.0, help="Evaluation time on an idle core")
+    parser.add_argument("--overload", type=float, default=2.0, help="Offered load as a multiple of capacity")
+    parser.add_argument("--deadline-ms", type=float, default=100.0)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    policies = [load_policy_file(str(POLICY))]
+    capacity = args.cores / (args.cost_ms / 1000)
+    rate = capacity * args.overload
+    print(f"Capacity {capacity:,.0f}/s, offered {rate:,.0f}/s with {args.deadline_ms:.0f} ms deadlines")
+    setups = [
+        ("no admission control", lambda engine: Unprotected(engine)),
+        ("AIMD limit", lambda engine: AdmittedPolicyEngine(
+            engine, AdmissionController(AIMDLimit(latency_threshold=2 * args.cost_ms / 1000)))),
+        ("gradient limit", lambda engine: AdmittedPolicyEngine(engine, AdmissionController(GradientLimit()))),
+    ]
+    for label, wrap in setups:
+        engine = wrap(SharedCoresEngine(policies, args.cores, args.cost_ms / 1000))
+        report(label, run(engine, rate, args.seconds, args.deadline_ms), args.deadline_ms)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Audit search index build cost vs. ingest throughput.
+
+Appends synthetic §7.2 events to an audit store, then builds the search
+index for the same events and compares the two rates. Finally times two
+searches with and without the index: a selective one (`jql AND denied`,
+one principal, last day) and a text-only phrase search.
+
+    python audit_index_benchmark.py --events 200000
+"""
+
+import argparse
+import os
+import pathlib
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "integration-examples"))
+import conftest  # noqa: E402,F401  (makes grid_examples importable)
+
+from grid_examples.audit_search import write_index  # noqa: E402
+from grid_examples.audit_store import AuditQuery, AuditStore  # noqa: E402
+
+TOOLS = [
+    ("jira", {"jql": "project = PROJ-{n} AND status = Open"}),
+    ("postgres", {"query": "SELECT * FROM customers WHERE region = 'r{n}'"}),
+    ("github", {"repository": "infra-{n}", "branch": "main"}),
+]
+REASONS = ["Access denied: outside business hours", "Role-based access",
+           "Access denied: insufficient clearance", "Team lead override"]
+
+
+def synthetic_events(count, seed=3):
+    """One event per second, ending at 2025-11-30T00:00:00Z"""
+    rng = random.Random(seed)
+    start = 1764460800 - count
+    events = []
+    for i in range(count):
+        tool, parameters = rng.choice(TOOLS)
+        n = rng.randrange(500)
+        moment = time.gmtime(start + i)
+        events.append({
+            "event": {"id": f"evt-{i}", "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", moment),
+                      "request_id": f"req-{i}"},
+            "principal": {"id": f"user-{rng.randrange(2000)}@company.com", "type": "human",
+                          "attributes": {"role": rng.choice(["developer", "viewer", "admin"]),
+                                         "teams": [rng.choice(["backend", "frontend", "data"])]}},
+            "resource": {"id": tool, "type": "tool", "name": tool.title(),
+                         "sensitivity": rng.choice(["low", "medium", "high"])},
+            "action": {"operation": "execute",
+                       "parameters": {k: v.format(n=n) for k, v in parameters.items()}},
+            "decision": {"result": rng.choice(["allow", "deny"]), "reason": rng.choice(REASONS),
+                         "policy_id": "rbac-basic"},
+            "context": {"ip_address": f"10.0.{rng.randrange(256)}.{rng.randrange(256)}",
+                        "user_agent": "grid-cli/1.2", "environment": "prod"},
+            "outcome": {"success": True, "latency_ms": rng.randrange(1, 2000)},
+        })
+    return events
+
+
+def timed(function, *args):
+    started = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--segment-events", type=int, default=50_000)
+    args = parser.parse_args()
+
+    events = synthetic_events(args.events)
+    directory = tempfile.mkdtemp(prefix="grid-audit-")
+
+    plain = AuditStore(os.path.join(directory, "plain"), max_segment_events=args.segment_events,
+                       full_text_index=False)
+    _, ingest = timed(lambda: [plain.append(e) for e in events])
+    summary, build = timed(write_index, os.path.join(directory, "all.idx"), events)
+    row_bytes = sum(s.bytes for s in plain.segments() if s.sealed)
+
+    print(f"Ingest:       {args.events / ingest:10,.0f} events/s")
+    print(f"Index build:  {args.events / build:10,.0f} events/s "
+          f"({build / ingest:.2f}x the ingest time)")
+    print(f"Index size:   {summary.bytes / 1e6:10.1f} MB for {summary.terms:,} terms "
+          f"({summary.bytes / max(row_bytes, 1):.0%} of the row JSON)")
+
+    indexed = AuditStore(os.path.join(directory, "indexed"), max_segment_events=args.segment_events)
+    for event in events:
+        indexed.append(event)
+    indexed.compact()
+    plain.compact()
+
+    searches = {
+        "jql AND denied, one principal, last day": AuditQuery(
+            text="jql AND denied", principal_id=events[-1]["principal"]["id"],
+            from_timestamp="2025-11-29T00:00:00Z", fields=["event.id"]),
+        '"proj 42" AND denied, all events': AuditQuery(
+            text='"proj 42" AND denied', fields=["event.id", "decision.reason"]),
+    }
+    for name, query in searches.items():
+        hits, with_index = timed(indexed.query, query)
+        misses, without_index = timed(plain.query, query)
+        assert hits == misses
+        print(f"Search:       {with_index * 1000:10.1f} ms with the index, "
+              f"{without_index * 1000:.1f} ms scanning ({len(hits)} hits; {name})")
+
+
+if __name__ == "__main__":
+    main()
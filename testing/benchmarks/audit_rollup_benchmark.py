@@ -0,0 +1,82 @@
+"""
+Audit rollup cost at ingest vs. dashboard query latency.
+
+Appends synthetic §7.2 events to audit stores with and without rollups and
+compares ingest rates. Then answers two dashboard questions, "denies per
+resource per hour" and "top principals by high-sensitivity access", from
+rollups and by scanning the compacted cold segments, and checks that both
+give the same counts.
+
+The synthetic events have about one rollup cell per event (2,000 principals,
+one event per second), the worst case for ingest cost.
+
+    python audit_rollup_benchmark.py --events 200000
+"""
+
+import argparse
+import os
+import pathlib
+import sys
+import tempfile
+from collections import Counter
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "integration-examples"))
+import conftest  # noqa: E402,F401  (makes grid_examples importable)
+
+from audit_index_benchmark import synthetic_events, timed  # noqa: E402
+from grid_examples.audit_cold_tier import ColdSegment, Predicate  # noqa: E402
+from grid_examples.audit_store import AggregateQuery, AuditStore  # noqa: E402
+
+
+def scan(store, predicates, fields):
+    """Every matching event of every cold segment, projected"""
+    return [event for segment in store.segments("cold")
+            for _, event in ColdSegment(os.path.join(store.directory, segment.file)).scan(predicates, fields)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--events", type=int, default=200_000)
+    parser.add_argument("--segment-events", type=int, default=50_000)
+    args = parser.parse_args()
+
+    events = synthetic_events(args.events)
+    directory = tempfile.mkdtemp(prefix="grid-audit-")
+    rates = {}
+    for rollups in (False, True):
+        store = AuditStore(os.path.join(directory, str(rollups)), max_segment_events=args.segment_events,
+                           full_text_index=False, rollups=rollups)
+        _, elapsed = timed(lambda: [store.append(e) for e in events])
+        store.seal()
+        store.wait_for_indexes()
+        rates[rollups] = args.events / elapsed
+    print(f"Ingest:       {rates[False]:10,.0f} events/s without rollups, "
+          f"{rates[True]:,.0f} with ({rates[False] / rates[True] - 1:.0%} slower)")
+    store.compact()
+    size = sum(os.path.getsize(os.path.join(directory, "True", s.rollup)) for s in store.segments())
+    print(f"Rollup files: {size / 1e6:10.1f} MB")
+
+    hourly = AggregateQuery(decision="deny", granularity="hour", group_by=["bucket", "resource"],
+                            limit=10000)
+    top = AggregateQuery(sensitivity="high", group_by=["principal"], limit=10)
+    for name, query, raw, same in [
+        ("denies per resource per hour", hourly,
+         lambda: Counter((e["event"]["timestamp"][:13], e["resource"]["id"]) for e in scan(
+             store, [Predicate("decision.result", "in", ["deny"])], ["event.timestamp", "resource.id"])),
+         lambda groups, counts: {(g["bucket"][:13], g["resource"]): g["count"] for g in groups} == counts),
+        ("top 10 principals by high-sensitivity access", top,
+         lambda: Counter(e["principal"]["id"] for e in scan(
+             store, [Predicate("resource.sensitivity", "in", ["high"])], ["principal.id"])),
+         lambda groups, counts: all(counts[g["principal"]] == g["count"] for g in groups)
+         and [g["count"] for g in groups] == [c for _, c in counts.most_common(len(groups))]),
+    ]:
+        store.aggregate(query)  # Warm-up: dashboards repeat the same queries
+        result, from_rollups = timed(store.aggregate, query)
+        counts, scanning = timed(raw)
+        assert same(result["groups"], counts)
+        print(f"Aggregate:    {from_rollups * 1000:10.1f} ms from rollups, "
+              f"{scanning * 1000:.1f} ms scanning cold segments ({name})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+PDP check latency: a request per check vs. the pooled GRID client.
+
+Runs a stand-in PDP (GRID Policy API, with a batch endpoint) in a separate
+process and times authorization checks made the way the Docker
+integration example used to make them, one `requests.post`-style request
+on a new connection per check (urllib, as `requests.post` without a
+session does the same), against GridClient: keep-alive connections,
+micro-batching of concurrent checks, and decisions cached for the PDP's
+TTL. Sequential checks, checks from many threads at once, and a Unix
+domain socket sidecar are measured.
+
+    python client_benchmark.py --checks 5000 --threads 32
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import pathlib
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "integration-examples"))
+import conftest  # noqa: E402,F401  (makes grid_examples importable)
+
+from grid_examples.grid_client import GridClient  # noqa: E402
+
+
+def serve(address, ready, ttl):
+    """Stand-in PDP: admins are allowed; decisions carry `ttl`"""
+    import socketserver
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        wbufsize = 64 * 1024  # One send per response: headers then body would stall on Nagle + delayed ACK
+
+        def log_message(self, *args):
+            pass
+
+        def do_POST(self):
+            body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+            requests = body["requests"] if self.path.endswith("/batch") else [body]
+            decisions = [{"allowed": r["principal_id"].startswith("admin"), "reason": "stub", "ttl": ttl}
+                         for r in requests]
+            data = json.dumps({"decisions": decisions} if self.path.endswith("/batch") else decisions[0]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    if isinstance(address, str):
+        server_class = type("UnixServer", (socketserver.ThreadingMixIn, socketserver.UnixStreamServer),
+                            {"daemon_threads": True, "request_queue_size": 1024})
+    else:
+        server_class = type("Server", (ThreadingHTTPServer,), {"request_queue_size": 1024})
+    server = server_class(address, Handler)
+    ready.put(server.server_address if not isinstance(address, str) else address)
+    server.serve_forever()
+
+
+def start(address, ttl=0):
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(address, ready, ttl), daemon=True)
+    process.start()
+    return process, ready.get(timeout=10)
+
+
+def post_per_check(url):
+    """A check the way the Docker example made it: a new connection per request"""
+    def check(i):
+        body = json.dumps({"principal_id": f"user-{i % 100}", "resource_id": "protected-resource",
+                           "action": "access", "context": {}}).encode()
+        request = urllib.request.Request(f"{url}/api/v1/policy/evaluate", data=body,
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=5) as response:
+            return json.loads(response.read())["allowed"]
+    return check
+
+
+def client_check(client):
+    return lambda i: client.check(f"user-{i % 100}", "protected-resource", "access").allowed
+
+
+def run(check, checks, threads):
+    """Latencies (µs) of `checks` checks spread over `threads` threads, and the wall time"""
+    latencies = []
+    lock = threading.Lock()
+
+    def worker(offset):
+        mine = []
+        for i in range(offset, checks, threads):
+            start = time.perf_counter()
+            check(i)
+            mine.append((time.perf_counter() - start) * 1e6)
+        with lock:
+            latencies.extend(mine)
+
+    start = time.perf_counter()
+    workers = [threading.Thread(target=worker, args=(t,)) for t in range(threads)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    return sorted(latencies), time.perf_counter() - start
+
+
+def report(name, latencies, elapsed):
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"  {name:34} p50 {statistics.median(latencies):8.0f} µs   p99 {p99:8.0f} µs   "
+          f"{len(latencies) / elapsed:8,.0f} checks/s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--checks", type=int, default=5000)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    process, (host, port) = start(("127.0.0.1", 0))
+    url = f"http://{host}:{port}"
+    for threads in (1, args.threads):
+        print(f"{threads} thread{'s' if threads > 1 else ''}, decisions not cacheable (TTL 0):")
+        report("request per check (before)", *run(post_per_check(url), args.checks, threads))
+        with GridClient(url, timeout=5) as client:
+            report("GridClient (after)", *run(client_check(client), args.checks, threads))
+            if threads > 1:
+                print(f"  {'':34} {client.stats.checks:,} checks in {client.stats.requests:,} requests")
+    process.terminate()
+
+    directory = tempfile.mkdtemp(prefix="grid-client-")
+    sidecar, path = start(os.path.join(directory, "pdp.sock"))
+    print("1 thread, sidecar PDP on the same host:")
+    with GridClient(f"unix://{path}", timeout=5) as client:
+        report("GridClient over a Unix socket", *run(client_check(client), args.checks, 1))
+    sidecar.terminate()
+
+    cached, (host, port) = start(("127.0.0.1", 0), ttl=60)
+    print("1 thread, decisions cacheable for 60 s (100 distinct checks):")
+    with GridClient(f"http://{host}:{port}", timeout=5) as client:
+        report("GridClient with its decision cache", *run(client_check(client), args.checks, 1))
+    cached.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+HTTP adapter request translation: per-route translators vs. per-request work.
+
+Translates HTTP requests against a registry of exact routes and wildcard
+routes, once the way translate_request used to (every helper run for every
+request: registry lookup or scan, method table, UTC timestamp, Host
+checks) and once through the adapter's per-route translators, and checks
+that both give the same GRID requests apart from timestamp precision.
+
+Three kinds of traffic: requests for registered routes, requests whose
+path carries an id and matches a wildcard route (ids repeat), and paths
+never seen before (every translator is compiled on the spot).
+
+    python http_translate_benchmark.py --routes 200 --requests 200000
+"""
+
+import argparse
+import pathlib
+import random
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "integration-examples"))
+import conftest  # noqa: E402,F401  (makes grid_examples importable)
+
+from grid_examples.http_adapter_template import (  # noqa: E402
+    Action, Context, GridRequest, HTTPAdapter, HTTPRequest, Resource,
+)
+
+
+def per_request_translate(adapter, http_request):
+    """translate_request before per-route translators, helper by helper"""
+    path, registry = http_request.path, adapter.resource_registry
+    if path in registry:
+        resource = registry[path]
+    else:
+        resource = next((r for pattern, r in registry.items() if pattern.replace('*', '') in path), None) \
+            or Resource(id=f"http-{path}", type='service', name=path, sensitivity='medium')
+    method_map = {'GET': 'read', 'HEAD': 'read', 'POST': 'write', 'PUT': 'write', 'PATCH': 'write',
+                  'DELETE': 'write', 'OPTIONS': 'read'}
+    body = http_request.body
+    action = Action(operation=method_map.get(http_request.method.upper(), 'execute'),
+                    parameters=body if isinstance(body, dict) else {})
+    host = http_request.headers.get('Host', '')
+    if 'localhost' in host or '127.0.0.1' in host:
+        environment = 'dev'
+    elif 'staging' in host:
+        environment = 'staging'
+    else:
+        environment = 'production'
+    return GridRequest(
+        principal=adapter.get_principal(http_request),
+        resource=resource,
+        action=action,
+        context=Context(
+            timestamp=datetime.utcnow().isoformat() + 'Z',
+            ip_address=http_request.remote_addr,
+            user_agent=http_request.headers.get('User-Agent'),
+            environment=environment,
+            request_id=http_request.headers.get('X-Request-ID'),
+            metadata={'protocol': 'http', 'method': http_request.method, 'path': path,
+                      'query_params': http_request.query_params},
+        ),
+    )
+
+
+def registry(routes):
+    """Exact routes, with one wildcard route in five"""
+    return {(f"/api/orders-{i}/*" if i % 5 == 4 else f"/api/service-{i}"):
+            Resource(id=f"route-{i}", type="service", name=f"Route {i}", sensitivity="medium")
+            for i in range(routes)}
+
+
+def requests(paths, count, seed=7):
+    rng = random.Random(seed)
+    methods = ["GET", "GET", "GET", "POST", "DELETE"]
+    return [HTTPRequest(method=rng.choice(methods), path=path,
+                        headers={"Authorization": f"ApiKey key-{rng.randrange(50):05d}",
+                                 "Host": rng.choice(["api.example.com", "api.staging.example.com"]),
+                                 "User-Agent": "bench/1.0", "X-Request-ID": f"req-{i}"},
+                        body={"n": i} if i % 5 == 3 else None, query_params={"page": "1"}, remote_addr="10.0.0.1")
+            for i, path in enumerate(paths[i % len(paths)] for i in range(count))]
+
+
+def rate(translate, batch):
+    start = time.perf_counter()
+    for http_request in batch:
+        translate(http_request)
+    return (time.perf_counter() - start) / len(batch) * 1e6
+
+
+def same(a, b):
+    a.context.timestamp = b.context.timestamp = None
+    return a == b
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--routes", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=200_000)
+    args = parser.parse_args()
+
+    routes = registry(args.routes)
+    exact = [p for p in routes if not p.endswith("*")]
+    wildcard = [p[:-1] for p in routes if p.endswith("*")]
+    rng = random.Random(3)
+    traffic = {
+        "registered routes": requests(exact, args.requests),
+        "wildcard routes, ids repeat": requests([f"{rng.choice(wildcard)}{rng.randrange(1000)}"
+                                                 for _ in range(5000)], args.requests),
+        "first-seen paths": requests([f"{rng.choice(wildcard)}{i}" for i in range(args.requests // 10)],
+                                     args.requests // 10),
+    }
+    print(f"{len(exact)} exact and {len(wildcard)} wildcard routes")
+    for name, batch in traffic.items():
+        before, after = HTTPAdapter("secret", dict(routes)), HTTPAdapter("secret", dict(routes))
+        assert all(same(per_request_translate(before, r), after.translate_request(r)) for r in batch[:2000])
+        before, after = HTTPAdapter("secret", dict(routes)), HTTPAdapter("secret", dict(routes))
+        slow = rate(lambda r: per_request_translate(before, r), batch)
+        fast = rate(after.translate_request, batch)
+        print(f"{name:28} {slow:7.2f} µs/request per-request, {fast:6.2f} µs with translators "
+              f"({slow / fast:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
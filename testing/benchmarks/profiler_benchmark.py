@@ -0,0 +1,135 @@
+"""
+Per-rule profiling: its overhead, and evaluation time before and after its reordering suggestions.
+
+Builds an ABAC-style policy of 25 rules (3 deny, 22 allow on clearance,
+department and sensitivity, like examples/policies/abac-sensitivity.rego)
+in which the rules that decide most requests come last, and evaluates a
+request mix against it:
+
+- overhead: mean evaluation time without the profiler, with every
+  request profiled, and with 1% profiled and 0.1% explained
+- reorder: mean rules evaluated per request and evaluation time, before
+  and after applying the profile's reordering suggestions; the allow/deny
+  outcome of every request is unchanged
+
+    python profiler_benchmark.py --requests 50000
+"""
+
+import argparse
+import pathlib
+import random
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "integration-examples"))
+import conftest  # noqa: E402,F401  (makes grid_examples importable)
+
+from grid_examples.canonical_policy_engine import CanonicalPolicyEngine, load_policy  # noqa: E402
+from grid_examples.http_adapter_template import Action, Context, Principal, Resource  # noqa: E402
+from grid_examples.policy_profiler import ProfilingPolicyEngine, apply_suggestions  # noqa: E402
+
+CLEARANCES = ["low", "medium", "high", "critical"]
+SENSITIVITIES = ["low", "medium", "high", "critical"]
+DEPARTMENTS = [f"dept-{i}" for i in range(18)]
+
+
+def rule(name, effect, priority, principals=(), resources=(), actions=(), conditions=()):
+    return {"name": name, "effect": effect, "priority": priority,
+            "match": {"principals": list(principals), "resources": list(resources),
+                      "actions": list(actions), "conditions": list(conditions)}}
+
+
+def clearance(*levels):
+    return {"type": "attribute", "name": "clearance", "value": list(levels)}
+
+
+def abac_policy():
+    """25 rules; the broad read rules that decide most requests have the lowest priority"""
+    rules = [
+        rule("deny_critical_outside_hours", "deny", 150, resources=[{"type": "sensitivity", "value": "critical"}],
+             conditions=[{"type": "time", "operator": "not_business_hours"}]),
+        rule("deny_untrusted_network", "deny", 150, resources=[{"type": "sensitivity", "value": ["high", "critical"]}],
+             conditions=[{"type": "context", "field": "network_zone", "operator": "equals", "value": "untrusted"}]),
+        rule("deny_production_writes", "deny", 150, actions=[{"type": "operation", "value": "write"}],
+             conditions=[{"type": "context", "field": "environment", "operator": "equals", "value": "production"}]),
+    ]
+    for i, department in enumerate(DEPARTMENTS):
+        rules.append(rule(f"{department}_manage_own", "allow", 60,
+                          principals=[{"type": "attribute", "name": "department", "value": department}],
+                          resources=[{"type": "owner", "ref": "principal.id"}],
+                          actions=[{"type": "operation", "value": ["manage", "write"]}]))
+    rules += [
+        rule("critical_read", "allow", 30, principals=[clearance("critical")],
+             actions=[{"type": "operation", "value": ["read", "execute"]}]),
+        rule("high_read", "allow", 20, principals=[clearance("high", "critical")],
+             resources=[{"type": "sensitivity", "value": ["low", "medium", "high"]}],
+             actions=[{"type": "operation", "value": ["read", "execute"]}]),
+        rule("medium_read", "allow", 10, principals=[clearance("medium", "high", "critical")],
+             resources=[{"type": "sensitivity", "value": ["low", "medium"]}],
+             actions=[{"type": "operation", "value": ["read", "execute"]}]),
+        rule("low_read", "allow", 5, resources=[{"type": "sensitivity", "value": "low"}],
+             actions=[{"type": "operation", "value": "read"}]),
+    ]
+    return load_policy({"kind": "Policy", "metadata": {"name": "abac-sensitivity"}, "spec": {"rules": rules}})
+
+
+def requests(n, seed=7):
+    rng = random.Random(seed)
+    result = []
+    for i in range(n):
+        principal = Principal(id=f"user-{i % 300}", type="human",
+                              attributes={"clearance": rng.choices(CLEARANCES, [4, 3, 2, 1])[0],
+                                          "department": rng.choice(DEPARTMENTS)})
+        resource = Resource(id=f"res-{i % 80}", type="data", name="Data",
+                            sensitivity=rng.choices(SENSITIVITIES, [5, 3, 1, 1])[0],
+                            owner=f"user-{rng.randrange(300)}")
+        action = Action(operation=rng.choices(["read", "execute", "write", "manage"], [8, 2, 1, 1])[0])
+        context = Context(timestamp="2025-11-27T10:00:00Z", environment=rng.choice(["dev", "production"]),
+                          metadata={"network_zone": rng.choice(["corporate", "vpn", "untrusted"])})
+        result.append((principal, resource, action, context))
+    return result
+
+
+def mean_us(engine, batch):
+    start = time.perf_counter()
+    for request in batch:
+        engine.evaluate(*request)
+    return (time.perf_counter() - start) / len(batch) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=50_000)
+    args = parser.parse_args()
+
+    policy = abac_policy()
+    batch = requests(args.requests)
+    engine = CanonicalPolicyEngine([policy])
+    print(f"{len(policy.rules)} rules, {len(batch)} requests")
+
+    plain = mean_us(engine, batch)
+    profiled = mean_us(ProfilingPolicyEngine(engine), batch)
+    sampled = mean_us(ProfilingPolicyEngine(engine, profile_rate=0.01, explain_rate=0.001), batch)
+    print(f"overhead  not profiled {plain:6.1f} µs   all profiled {profiled:6.1f} µs   "
+          f"1% profiled, 0.1% explained {sampled:6.1f} µs")
+
+    profiler = ProfilingPolicyEngine(engine)
+    for request in batch:
+        profiler.evaluate(*request)
+    report = profiler.report()
+    suggestions = report["suggestions"]
+    reordered = CanonicalPolicyEngine(apply_suggestions([policy], profiler.profile.suggestions(
+        engine.ordered_rules())[0]))
+    check = ProfilingPolicyEngine(reordered)
+    for request in batch:
+        check.evaluate(*request)
+    changed = sum(engine.evaluate(*r).allowed != reordered.evaluate(*r).allowed for r in batch)
+    print(f"reorder   before {report['mean_rules_evaluated']:5.1f} rules/request {plain:6.1f} µs   "
+          f"after {check.report()['mean_rules_evaluated']:5.1f} rules/request {mean_us(reordered, batch):6.1f} µs   "
+          f"(predicted {suggestions['expected_us']:.1f} → {suggestions['expected_us_reordered']:.1f} µs profiled, "
+          f"{changed} outcomes changed)")
+    print("never fired:", ", ".join(report["never_fired"]) or "none")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Shadow policy evaluation: enforced-path latency with and without a shadow run.
+
+Evaluates a request mix against rbac-basic.yaml, enforced by a
+CanonicalPolicyEngine, with a candidate version of the policy in the
+shadow:
+
+- latency: p50/p99 of the enforced evaluation alone, and with 1% and
+  100% of requests sampled into the shadow queue
+- shadow: how many sampled requests the worker processes evaluated and
+  how many were dropped because the queue was full
+
+    python shadow_benchmark.py --requests 100000
+"""
+
+import argparse
+import pathlib
+import random
+import sys
+import time
+from dataclasses import replace
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "integration-examples"))
+import conftest  # noqa: E402,F401  (makes grid_examples importable)
+
+from grid_examples.canonical_policy_engine import CanonicalPolicyEngine, load_policy_file  # noqa: E402
+from grid_examples.http_adapter_template import Action, Context, Principal, Resource  # noqa: E402
+from grid_examples.shadow_engine import ShadowPolicyEngine  # noqa: E402
+
+POLICY = pathlib.Path(__file__).resolve().parents[2] / "examples" / "engine" / "policies" / "rbac-basic.yaml"
+
+
+def candidate(policy):
+    """The next version: developers may only execute low sensitivity tools"""
+    return replace(policy, version=policy.version + 1, rules=[
+        replace(r, resources=[replace(r.resources[0], value=["low"])])
+        if r.name == "developer_execute_low_medium" else r
+        for r in policy.rules
+    ])
+
+
+def requests(n, seed=1):
+    rng = random.Random(seed)
+    return [(Principal(id=f"user-{i % 500}", type="human", role=rng.choice(["admin", "developer", "viewer"])),
+             Resource(id=f"res-{i % 50}", type="tool", name="Tool",
+                      sensitivity=rng.choice(["low", "medium", "high", "critical"])),
+             Action(operation=rng.choice(["read", "write", "execute"])),
+             Context(timestamp=f"2025-11-27T{rng.randrange(24):02d}:00:00Z",
+                     environment=rng.choice(["production", "staging"]))) for i in range(n)]
+
+
+def latencies(engine, mix):
+    times = []
+    for request in mix:
+        started = time.perf_counter()
+        engine.evaluate(*request)
+        times.append(time.perf_counter() - started)
+    times.sort()
+    return times[len(times) // 2] * 1e6, times[int(len(times) * 0.99)] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=100_000)
+    parser.add_argument("--processes", type=int, default=1)
+    parser.add_argument("--max-queue", type=int, default=10_000)
+    args = parser.parse_args()
+
+    policy = load_policy_file(str(POLICY))
+    mix = requests(args.requests)
+    p50, p99 = latencies(CanonicalPolicyEngine([policy]), mix)
+    print(f"{'no shadow':>14}: p50 {p50:6.1f} µs  p99 {p99:6.1f} µs")
+    for rate in (0.01, 1.0):
+        disagreements = []
+        engine = ShadowPolicyEngine(CanonicalPolicyEngine([policy]), [candidate(policy)], disagreements.append,
+                                    sample_rate=rate, max_queue=args.max_queue, processes=args.processes)
+        p50, p99 = latencies(engine, mix)
+        engine.flush()
+        engine.close()
+        stats = engine.stats
+        print(f"{f'shadow {rate:.0%}':>14}: p50 {p50:6.1f} µs  p99 {p99:6.1f} µs  "
+              f"sampled {stats.sampled}  evaluated {stats.evaluated}  dropped {stats.dropped}  "
+              f"disagreed {stats.disagreed} ({stats.disagreement_rate:.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""
+Adapter cold start: import time and boot time.
+
+Imports each adapter template in a fresh interpreter under
+`python -X importtime` and reports its cumulative import time, next to
+what the optional dependencies it now imports lazily (jwt, yaml) cost.
+Then boots an HTTP adapter with the example policies and a registry of
+synthetic routes in a fresh interpreter, once from YAML and once from a
+memory-mapped snapshot.
+
+    python startup_benchmark.py --routes 10000 --runs 5
+"""
+
+import argparse
+import os
+import pathlib
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+INTEGRATION = pathlib.Path(__file__).resolve().parents[1] / "integration-examples"
+POLICIES = pathlib.Path(__file__).resolve().parents[2] / "examples" / "engine" / "policies"
+sys.path.insert(0, str(INTEGRATION))
+import conftest  # noqa: E402,F401  (makes grid_examples importable)
+
+from grid_examples.adapter_snapshot import AdapterState, source_digest, write_snapshot  # noqa: E402
+from grid_examples.canonical_policy_engine import load_policy_file  # noqa: E402
+from grid_examples.http_adapter_template import Resource  # noqa: E402
+
+TEMPLATES = ["http_adapter_template", "grpc_adapter_template", "mcp_adapter_template",
+             "canonical_policy_engine"]
+PRELUDE = f"import sys, time; sys.path.insert(0, {str(INTEGRATION)!r}); import conftest\n"
+
+BOOT_FROM_YAML = """
+start = time.perf_counter()
+import yaml
+from grid_examples.canonical_policy_engine import CanonicalPolicyEngine, load_policy_file
+from grid_examples.http_adapter_template import HTTPAdapter, Resource
+engine = CanonicalPolicyEngine([load_policy_file(p) for p in {policies!r}])
+with open({routes!r}) as f:
+    registry = {{path: Resource(**r) for path, r in yaml.safe_load(f).items()}}
+adapter = HTTPAdapter('secret', registry)
+adapter._get_resource_from_path('/api/service-7')
+print((time.perf_counter() - start) * 1000)
+"""
+
+BOOT_FROM_SNAPSHOT = """
+start = time.perf_counter()
+from grid_examples.adapter_snapshot import Snapshot
+from grid_examples.canonical_policy_engine import CanonicalPolicyEngine
+from grid_examples.http_adapter_template import HTTPAdapter
+snapshot = Snapshot({snapshot!r})
+engine = CanonicalPolicyEngine(snapshot.policies)
+adapter = HTTPAdapter('secret', snapshot.resource_registry)
+adapter._get_resource_from_path('/api/service-7')
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def import_times(statement):
+    """Cumulative import time (ms) per module of a fresh interpreter running `statement`"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", PRELUDE + statement],
+                            capture_output=True, text=True, check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative) / 1000
+    return times
+
+
+def boot(script, runs):
+    """Median in-process boot time and whole-process wall time (ms)"""
+    inside, wall = [], []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", PRELUDE + script], capture_output=True, text=True,
+                                check=True)
+        wall.append((time.perf_counter() - start) * 1000)
+        inside.append(float(result.stdout))
+    return statistics.median(inside), statistics.median(wall)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--routes", type=int, default=10_000)
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    dependencies = [import_times("import jwt, yaml") for _ in range(args.runs)]
+    for name in ("jwt", "yaml"):
+        print(f"Import {name:28} {statistics.median(t[name] for t in dependencies):8.1f} ms "
+              f"(no longer imported at start-up)")
+    for template in TEMPLATES:
+        runs = [import_times(f"import grid_examples.{template}") for _ in range(args.runs)]
+        print(f"Import {template:28} {statistics.median(t[f'grid_examples.{template}'] for t in runs):8.1f} ms")
+
+    directory = tempfile.mkdtemp(prefix="grid-startup-")
+    policies = sorted(str(p) for p in POLICIES.glob("*.yaml"))
+    routes = os.path.join(directory, "routes.yaml")
+    registry = {f"/api/service-{i}": Resource(id=f"service-{i}", type="service", name=f"Service {i}",
+                                              sensitivity="medium", owner=f"team-{i % 40}")
+                for i in range(args.routes)}
+    with open(routes, "w") as f:
+        for path, resource in registry.items():
+            f.write(f"{path}:\n  id: {resource.id}\n  type: service\n  name: {resource.name}\n"
+                    f"  sensitivity: medium\n  owner: {resource.owner}\n")
+    snapshot = os.path.join(directory, "adapter.snapshot")
+    write_snapshot(snapshot, AdapterState([load_policy_file(p) for p in policies], registry),
+                   source_digest(policies + [routes]))
+
+    for name, script in [("from YAML", BOOT_FROM_YAML.format(policies=policies, routes=routes)),
+                         ("from snapshot", BOOT_FROM_SNAPSHOT.format(snapshot=snapshot))]:
+        inside, wall = boot(script, args.runs)
+        print(f"Boot {name:15} {inside:8.1f} ms in process, {wall:8.1f} ms process wall time "
+              f"({len(policies)} policies, {args.routes:,} routes)")
+
+
+if __name__ == "__main__":
+    main()
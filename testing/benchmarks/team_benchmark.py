@@ -0,0 +1,86 @@
+"""
+Team-based policy evaluation: list comparisons vs. team directory bitsets.
+
+Evaluates `rbac-team-based.yaml` for principals in dozens of teams against
+resources managed by a few teams, with the canonical engine comparing the
+team lists, and with a TeamDirectory listing every principal (overlap
+checks become one AND of two bitsets). Checks that both give the same
+decisions, then times the overlap check ("one of the principal's teams
+manages the resource") on its own.
+
+    python team_benchmark.py --principals 2000 --teams-per-principal 40
+"""
+
+import argparse
+import pathlib
+import random
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "integration-examples"))
+import conftest  # noqa: E402,F401  (makes grid_examples importable)
+
+from grid_examples.canonical_policy_engine import (  # noqa: E402
+    CanonicalPolicyEngine, _overlaps, load_policy_file,
+)
+from grid_examples.http_adapter_template import Action, Context, Principal, Resource  # noqa: E402
+from grid_examples.team_directory import TeamDirectory  # noqa: E402
+
+POLICY = pathlib.Path(__file__).resolve().parents[2] / "examples" / "engine" / "policies" / "rbac-team-based.yaml"
+OPERATIONS = ["read", "write", "execute", "manage", "delete"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--principals", type=int, default=2000)
+    parser.add_argument("--teams", type=int, default=500)
+    parser.add_argument("--teams-per-principal", type=int, default=40)
+    parser.add_argument("--resources", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=100_000)
+    args = parser.parse_args()
+
+    rng = random.Random(11)
+    teams = [f"team-{i}" for i in range(args.teams)]
+    principals = []
+    for i in range(args.principals):
+        member = rng.sample(teams, args.teams_per_principal)
+        principals.append(Principal(id=f"user-{i}@company.com", type="human", role="developer", teams=member,
+                                    attributes={"is_team_lead": {t: True for t in member[:2]}}))
+    resources = [Resource(id=f"res-{i}", type="service", name=f"Resource {i}",
+                          sensitivity=rng.choice(["low", "medium", "high"]), managers=rng.sample(teams, 3))
+                 for i in range(args.resources)]
+    requests = [(rng.choice(principals), rng.choice(resources), Action(operation=rng.choice(OPERATIONS)))
+                for _ in range(args.requests)]
+    context = Context(timestamp="2025-11-27T10:00:00Z")
+
+    policy = load_policy_file(str(POLICY))
+    directory = TeamDirectory()
+    for p in principals:
+        directory.set_principal(p.id, p.teams, [t for t, lead in p.attributes["is_team_lead"].items() if lead])
+
+    results = {}
+    for label, engine in (("team lists", CanonicalPolicyEngine([policy])),
+                          ("directory bitsets", CanonicalPolicyEngine([policy], directory=directory))):
+        start = time.perf_counter()
+        decisions = [engine.evaluate(p, r, a, context) for p, r, a in requests]
+        elapsed = time.perf_counter() - start
+        results[label] = decisions
+        allowed = sum(d.allowed for d in decisions)
+        print(f"{label:18} {elapsed / args.requests * 1e6:6.2f} µs/evaluation "
+              f"({args.requests / elapsed:9,.0f}/s, {allowed / args.requests:.0%} allowed)")
+    assert results["team lists"] == results["directory bitsets"]
+
+    pairs = [(p, r) for p, r, _ in requests]
+    start = time.perf_counter()
+    for p, r in pairs:
+        _overlaps(r.managers, p.teams)
+    lists = (time.perf_counter() - start) / len(pairs)
+    start = time.perf_counter()
+    for p, r in pairs:
+        directory.view(p, r).overlaps("managers", "teams")
+    bitsets = (time.perf_counter() - start) / len(pairs)
+    print(f"Team overlap check: {lists * 1e6:.2f} µs comparing lists, {bitsets * 1e6:.2f} µs with bitsets")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Multi-tenant isolation: one shared namespace vs. per-tenant partitions and fair queuing.
+
+Two scenarios, each run against one PDP configured as today (every
+tenant in one namespace, one decision cache, one FIFO queue) and as
+tenant namespaces (a cache partition per tenant under a quota, weighted
+fair queuing between tenants):
+
+- cache: a quiet tenant re-reads a small working set while a noisy
+  tenant scans ten times as many distinct decisions; reports the quiet
+  tenant's hit rate
+- burst: a noisy tenant floods the PDP with cache misses from many
+  threads while a quiet tenant sends a steady trickle; reports the quiet
+  tenant's p50/p99 latency. `--engine-ms` adds that much waiting to each
+  evaluation, as with an engine out of process (OPA); at 0 the
+  evaluations compete with the client threads for the interpreter lock
+
+    python tenant_benchmark.py --noisy-threads 32 --seconds 3
+"""
+
+import argparse
+import pathlib
+import statistics
+import sys
+import threading
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "integration-examples"))
+import conftest  # noqa: E402,F401  (makes grid_examples importable)
+
+from grid_examples.canonical_policy_engine import CanonicalPolicyEngine, load_policy_file  # noqa: E402
+from grid_examples.http_adapter_template import Action, Context, Principal, Resource  # noqa: E402
+from grid_examples.tenant_engine import TenantConfig, TenantPolicyEngine  # noqa: E402
+
+POLICIES = pathlib.Path(__file__).resolve().parents[2] / "examples" / "engine" / "policies"
+CONTEXT = Context(timestamp="2025-11-27T10:00:00Z")
+READ = Action(operation="read")
+
+
+class RemoteEngine(CanonicalPolicyEngine):
+    """Canonical engine that also waits `delay` seconds per evaluation, like a call to an OPA sidecar"""
+    delay = 0.0
+
+    def evaluate(self, *args):
+        time.sleep(self.delay)
+        return super().evaluate(*args)
+
+
+def build(shared, capacity, workers, engine_ms=0.0):
+    """Today's single namespace, or one namespace per tenant with a quarter of the capacity for the quiet one"""
+    policies = [load_policy_file(str(POLICIES / name)) for name in ("rbac-basic.yaml", "rbac-team-based.yaml")]
+
+    def factory(namespace_policies):
+        engine = RemoteEngine(namespace_policies)
+        engine.delay = engine_ms / 1000
+        return engine
+
+    if shared:
+        return TenantPolicyEngine([TenantConfig("shared", cache_entries=capacity)], shared_policies=policies,
+                                  workers=workers, tenant_of=lambda principal: "shared", engine_factory=factory)
+    return TenantPolicyEngine([TenantConfig("quiet", cache_entries=capacity // 4),
+                               TenantConfig("noisy", cache_entries=capacity - capacity // 4)],
+                              shared_policies=policies, workers=workers, engine_factory=factory)
+
+
+def principal(tenant, i):
+    return Principal(id=f"user-{i}@{tenant}.com", type="human", role="developer", teams=[f"team-{i % 20}"],
+                     attributes={"tenant": tenant})
+
+
+def resource(tenant, i):
+    return Resource(id=f"{tenant}-res-{i}", type="service", name=f"Resource {i}", sensitivity="medium",
+                    managers=[f"team-{i % 20}"])
+
+
+def cache_scenario(engine, working_set, requests):
+    """Quiet tenant's hit rate while the noisy tenant scans"""
+    quiet = [principal("quiet", i) for i in range(50)]
+    noisy = [principal("noisy", i) for i in range(50)]
+    hits = total = 0
+    scan = 0
+    for n in range(requests):
+        i = n % working_set
+        p = quiet[i % 50]
+        cached = engine.cache(engine.tenant_of(p))
+        before = cached.stats.hits
+        engine.evaluate(p, resource("quiet", i), READ, CONTEXT)
+        if n >= working_set:  # Past the first pass
+            total += 1
+            hits += cached.stats.hits > before
+        for _ in range(10):
+            engine.evaluate(noisy[scan % 50], resource("noisy", scan), READ, CONTEXT)
+            scan += 1
+    return hits / total if total else 0.0
+
+
+def burst_scenario(engine, noisy_threads, seconds):
+    """Quiet tenant's latencies (µs) while the noisy tenant floods the PDP with misses"""
+    stop = threading.Event()
+    counter = iter(range(10 ** 12))
+
+    def noisy():
+        while not stop.is_set():
+            i = next(counter)
+            engine.evaluate(principal("noisy", i % 1000), resource("noisy", i), READ, CONTEXT)
+
+    latencies = []
+
+    def quiet():
+        while not stop.is_set():
+            i = next(counter)
+            start = time.perf_counter()
+            engine.evaluate(principal("quiet", i % 1000), resource("quiet", i), READ, CONTEXT)
+            latencies.append((time.perf_counter() - start) * 1e6)
+            time.sleep(0.001)
+
+    threads = [threading.Thread(target=noisy) for _ in range(noisy_threads)]
+    threads += [threading.Thread(target=quiet) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    latencies.sort()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--capacity", type=int, default=20_000, help="Decision cache entries in total")
+    parser.add_argument("--working-set", type=int, default=2_000, help="Distinct decisions the quiet tenant reads")
+    parser.add_argument("--requests", type=int, default=10_000, help="Quiet tenant requests in the cache scenario")
+    parser.add_argument("--noisy-threads", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--engine-ms", type=float, default=0.5, help="Extra wait per evaluation (out-of-process engine)")
+    parser.add_argument("--seconds", type=float, default=3.0)
+    args = parser.parse_args()
+
+    for label, shared in (("shared namespace", True), ("tenant namespaces", False)):
+        engine = build(shared, args.capacity, args.workers)
+        hit_rate = cache_scenario(engine, args.working_set, args.requests)
+        engine.close()
+        print(f"cache  {label:18} quiet tenant hit rate {hit_rate:6.1%}")
+
+    for label, shared in (("shared namespace", True), ("tenant namespaces", False)):
+        engine = build(shared, args.capacity, args.workers, args.engine_ms)
+        latencies = burst_scenario(engine, args.noisy_threads, args.seconds)
+        engine.close()
+        p99 = latencies[int(len(latencies) * 0.99) - 1]
+        print(f"burst  {label:18} quiet tenant p50 {statistics.median(latencies):8.0f} µs   "
+              f"p99 {p99:8.0f} µs   ({len(latencies)} requests)")
+
+
+if __name__ == "__main__":
+    main()
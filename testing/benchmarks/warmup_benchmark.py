@@ -0,0 +1,154 @@
+"""
+Cache warming: latency right after a deploy, cold vs. warmed from audit history, and with prefetch.
+
+Sends Zipf-distributed traffic over `rbac-team-based.yaml` to a
+CachingPolicyEngine whose engine takes `--engine-ms` per evaluation (an
+out-of-process PDP). The audit log of the traffic before the deploy is
+the warm-up source.
+
+- deploy: latency of the first requests a new replica serves with a cold
+  cache, with a cache warmed from the audit log, and in steady state
+- ttl: latency over several critical-tier TTLs (simulated clock), with
+  and without prefetch refreshing hot entries before they expire
+
+    python warmup_benchmark.py --requests 5000 --engine-ms 0.5
+"""
+
+import argparse
+import pathlib
+import random
+import sys
+import time
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1] / "integration-examples"))
+import conftest  # noqa: E402,F401  (makes grid_examples importable)
+
+from grid_examples.cache_warmer import CacheWarmer  # noqa: E402
+from grid_examples.canonical_policy_engine import CanonicalPolicyEngine, load_policy_file  # noqa: E402
+from grid_examples.decision_cache import CachingPolicyEngine, DecisionCache  # noqa: E402
+from grid_examples.http_adapter_template import Action, Context, Principal, Resource  # noqa: E402
+from grid_examples.resilient_engine import audit_event  # noqa: E402
+
+POLICY = pathlib.Path(__file__).resolve().parents[2] / "examples" / "engine" / "policies" / "rbac-team-based.yaml"
+SENSITIVITIES = ["low", "medium", "high", "critical"]
+TEAMS = [f"team-{i}" for i in range(30)]
+
+
+class RemoteEngine:
+    """The canonical engine plus a fixed round trip"""
+
+    def __init__(self, engine, seconds):
+        self.engine = engine
+        self.seconds = seconds
+
+    def evaluate(self, *request):
+        time.sleep(self.seconds)
+        return self.engine.evaluate(*request)
+
+    def validate_policy(self, policy):
+        return self.engine.validate_policy(policy)
+
+    def deploy_policy(self, policy):
+        self.engine.deploy_policy(policy)
+
+
+class Traffic:
+    """Zipf-distributed (principal, resource, operation) requests"""
+
+    def __init__(self, principals=2_000, resources=500, exponent=1.3, seed=1):
+        rng = random.Random(seed)
+        self.rng = random.Random(seed + 1)
+        self.principals = [Principal(id=f"user-{i}", type="human",
+                                     role=rng.choice(["developer", "developer", "viewer", "admin"]),
+                                     teams=rng.sample(TEAMS, 2)) for i in range(principals)]
+        self.resources = [Resource(id=f"res-{i}", type="tool", name="Tool", sensitivity=rng.choice(SENSITIVITIES),
+                                   managers=rng.sample(TEAMS, 2)) for i in range(resources)]
+        self.principal_weights = [(i + 1) ** -exponent for i in range(principals)]
+        self.resource_weights = [(i + 1) ** -exponent for i in range(resources)]
+
+    def next(self, timestamp="2025-11-27T10:00:00Z"):
+        return (self.rng.choices(self.principals, self.principal_weights)[0],
+                self.rng.choices(self.resources, self.resource_weights)[0],
+                Action(operation=self.rng.choice(["read", "read", "read", "write"])),
+                Context(timestamp=timestamp, environment="production"))
+
+
+def percentiles(times):
+    times = sorted(times)
+    return sum(times) / len(times) * 1e3, times[int(len(times) * 0.9)] * 1e3, times[int(len(times) * 0.99)] * 1e3
+
+
+def serve(engine, traffic, count, tick=None):
+    times = []
+    for _ in range(count):
+        if tick is not None:
+            tick()
+        started = time.perf_counter()
+        engine.evaluate(*traffic.next())
+        times.append(time.perf_counter() - started)
+    return percentiles(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=5_000, help="Requests measured per phase")
+    parser.add_argument("--engine-ms", type=float, default=0.5)
+    parser.add_argument("--history", type=int, default=50_000, help="Audit events before the deploy")
+    args = parser.parse_args()
+
+    policy = load_policy_file(str(POLICY))
+    canonical = CanonicalPolicyEngine([policy])
+    traffic = Traffic()
+    log = []
+    for _ in range(args.history):
+        request = traffic.next()
+        log.append(audit_event(*request, canonical.evaluate(*request)))
+    log.reverse()  # Newest first, like order=desc
+
+    def source(params):
+        return [e for e in log if e["resource"]["sensitivity"] == params["sensitivity"]][:int(params["limit"])]
+
+    def replica():
+        return CachingPolicyEngine(RemoteEngine(canonical, args.engine_ms / 1000),
+                                   DecisionCache(context_fields=["environment"]))
+
+    engine = replica()
+    mean, p90, p99 = serve(engine, traffic, args.requests)
+    print(f"{'cold':>16}: mean {mean:5.2f}  p90 {p90:5.2f}  p99 {p99:5.2f} ms  hit rate {engine.cache.stats.hit_rate:.1%}")
+
+    engine = replica()
+    warmer = CacheWarmer(engine, source)
+    stats = warmer.warm()
+    mean, p90, p99 = serve(engine, traffic, args.requests)
+    print(f"{'warmed':>16}: mean {mean:5.2f}  p90 {p90:5.2f}  p99 {p99:5.2f} ms  hit rate {engine.cache.stats.hit_rate:.1%}  "
+          f"({stats.warmed} entries in {stats.warm_seconds:.1f} s)")
+
+    serve(engine, traffic, 5 * args.requests)
+    engine.cache.stats.hits = engine.cache.stats.misses = 0
+    mean, p90, p99 = serve(engine, traffic, args.requests)
+    print(f"{'steady state':>16}: mean {mean:5.2f}  p90 {p90:5.2f}  p99 {p99:5.2f} ms  hit rate {engine.cache.stats.hit_rate:.1%}")
+
+    # Over four critical-tier TTLs of simulated time, prefetching every 3 simulated seconds
+    for prefetch in (False, True):
+        now = [0.0]
+        engine = replica()
+        engine.cache.clock = lambda: now[0]
+        warmer = CacheWarmer(engine, source)
+        warmer.warm()
+        step = 120.0 / args.requests
+        next_prefetch = [3.0]
+
+        def tick():
+            now[0] += step
+            if prefetch and now[0] >= next_prefetch[0]:
+                warmer.prefetch()
+                next_prefetch[0] += 3.0
+
+        mean, p90, p99 = serve(engine, traffic, args.requests, tick)
+        label = "ttl, prefetch" if prefetch else "ttl, no prefetch"
+        print(f"{label:>16}: mean {mean:5.2f}  p90 {p90:5.2f}  p99 {p99:5.2f} ms  hit rate {engine.cache.stats.hit_rate:.1%}  "
+              f"(prefetched {warmer.stats.prefetched})")
+
+
+if __name__ == "__main__":
+    main()
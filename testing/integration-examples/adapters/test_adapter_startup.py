@@ -0,0 +1,106 @@
+import pathlib
+import subprocess
+import sys
+
+from grid_examples.adapter_snapshot import AdapterState, Snapshot, load_snapshot, write_snapshot
+from grid_examples.canonical_policy_engine import CanonicalPolicyEngine, load_policy_file
+from grid_examples.http_adapter_template import Action, Context, HTTPAdapter, Principal, Resource
+from grid_examples.mcp_adapter_template import MCPServer, MCPTool
+
+INTEGRATION = pathlib.Path(__file__).resolve().parents[1]
+POLICIES = sorted(str(p) for p in (INTEGRATION.parents[1] / "examples" / "engine" / "policies").glob("*.yaml"))
+
+
+def adapter_state(routes=500):
+    registry = {f"/api/service-{i}": Resource(id=f"service-{i}", type="service", name=f"Service {i}",
+                                              sensitivity=["low", "medium", "high"][i % 3], owner=f"team-{i % 7}",
+                                              managers=["carol@company.com"] if i % 2 else None)
+                for i in range(routes)}
+    registry["/api/café"] = Resource(id="cafe", type="service", name="Café", sensitivity="low")
+    tools = [MCPTool(name="query", description="Run a query", sensitivity_level="high",
+                     parameters={"type": "object", "properties": {"sql": {"type": "string"}}, "required": ["sql"]})]
+    return AdapterState(policies=[load_policy_file(p) for p in POLICIES], resource_registry=registry,
+                        mcp_servers=[MCPServer(name="db", tools=tools, owner="data-team")])
+
+
+def test_templates_import_without_heavy_dependencies():
+    """
+    Tests that importing the adapter templates and engine executes neither jwt nor yaml, nor needs grpc,
+    and that the gRPC template leaves admission control and the GRID client unloaded.
+    """
+    # A lazily imported package is in sys.modules but has not run, so none of its submodules are
+    script = (f"import sys; sys.path.insert(0, {str(INTEGRATION)!r}); import conftest\n"
+              "import grid_examples.http_adapter_template, grid_examples.mcp_adapter_template\n"
+              "import grid_examples.grpc_adapter_template, grid_examples.canonical_policy_engine\n"
+              "print(sorted(m for m in sys.modules if m.startswith(('jwt.', 'yaml.', 'grpc.'))\n"
+              "             or m in ('grid_examples.admission_control', 'grid_examples.grid_client')))")
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == "[]"
+
+
+def test_snapshot_round_trips_adapter_state(tmp_path):
+    """
+    Tests that policies, the resource registry and MCP tool schemas read back from a snapshot unchanged.
+    """
+    state = adapter_state()
+    path = str(tmp_path / "adapter.snapshot")
+    write_snapshot(path, state, digest="abc")
+    with Snapshot(path) as snapshot:
+        assert snapshot.digest == "abc"
+        assert snapshot.policies == state.policies
+        assert snapshot.mcp_servers == state.mcp_servers
+        registry = snapshot.resource_registry
+        assert len(registry) == len(state.resource_registry)
+        assert dict(registry) == state.resource_registry
+        assert registry["/api/café"].name == "Café"
+        assert "/api/service-499" in registry and "/api/service-500" not in registry
+        assert registry.get("/api/nope") is None
+
+        principal = Principal(id="alice", type="human", role="admin", teams=["team-3"])
+        context = Context(timestamp="2025-11-27T14:00:00Z")
+        expected, actual = CanonicalPolicyEngine(state.policies), CanonicalPolicyEngine(snapshot.policies)
+        for key in ("/api/service-1", "/api/service-2", "/api/service-3"):
+            for operation in ("read", "write", "delete"):
+                args = (principal, registry[key], Action(operation=operation), context)
+                assert actual.evaluate(*args) == expected.evaluate(*args)
+
+
+def test_load_snapshot_rebuilds_stale_or_damaged_files(tmp_path):
+    """
+    Tests that load_snapshot builds once, reuses the file, and rebuilds when a source changes or it is damaged.
+    """
+    source = tmp_path / "routes.yaml"
+    source.write_text("/api/a: service-a\n")
+    path = str(tmp_path / "adapter.snapshot")
+    builds = []
+
+    def build():
+        builds.append(1)
+        return adapter_state(routes=10)
+
+    for _ in range(2):
+        load_snapshot(path, [str(source)], build).close()
+    assert len(builds) == 1
+
+    source.write_text("/api/a: service-b\n")
+    load_snapshot(path, [str(source)], build).close()
+    assert len(builds) == 2
+
+    with open(path, "r+b") as f:
+        f.write(b"garbage!")
+    with load_snapshot(path, [str(source)], build) as snapshot:
+        assert len(snapshot.resource_registry) == 11
+    assert len(builds) == 3
+
+
+def test_http_adapter_serves_from_snapshot_registry(tmp_path):
+    """
+    Tests that the HTTP adapter resolves resources from a memory-mapped registry like from a dict.
+    """
+    state = adapter_state()
+    path = str(tmp_path / "adapter.snapshot")
+    write_snapshot(path, state)
+    with Snapshot(path) as snapshot:
+        adapter = HTTPAdapter(jwt_secret="secret", resource_registry=snapshot.resource_registry)
+        for key in ("/api/service-0", "/api/service-250", "/api/café"):
+            assert adapter._get_resource_from_path(key) == state.resource_registry[key]
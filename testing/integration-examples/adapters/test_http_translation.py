@@ -0,0 +1,118 @@
+from grid_examples import http_adapter_template
+from grid_examples.http_adapter_template import (
+    Context, CoarseClock, GridRequest, HTTPAdapter, HTTPRequest, Resource,
+)
+
+START = 1764460800.0  # 2025-11-30T00:00:00Z
+
+
+def routes():
+    return {
+        "/api/users": Resource(id="users-api", type="service", name="Users API", sensitivity="medium"),
+        "/api/admin/*": Resource(id="admin-api", type="service", name="Admin API", sensitivity="critical"),
+        "/api/orders/*": Resource(id="orders-api", type="service", name="Orders API", sensitivity="high"),
+    }
+
+
+def request(method="GET", path="/api/users", host="api.example.com", body=None, key="abcdefghijkl"):
+    return HTTPRequest(method=method, path=path, body=body, query_params={"page": "2"}, remote_addr="10.1.2.3",
+                       headers={"Authorization": f"ApiKey {key}", "Host": host, "User-Agent": "MyApp/1.0",
+                                "X-Request-ID": "req-123"})
+
+
+def step_by_step(adapter, http_request):
+    """What translate_request computes, helper by helper"""
+    return GridRequest(
+        principal=adapter.get_principal(http_request),
+        resource=adapter._get_resource_from_path(http_request.path),
+        action=adapter._map_http_method_to_action(http_request.method, http_request.body),
+        context=Context(timestamp=adapter.clock(), ip_address=http_request.remote_addr,
+                        user_agent="MyApp/1.0", environment=adapter._detect_environment(http_request),
+                        request_id="req-123",
+                        metadata={"protocol": "http", "method": http_request.method, "path": http_request.path,
+                                  "query_params": {"page": "2"}}),
+    )
+
+
+def test_translators_match_the_step_by_step_translation():
+    """
+    Tests that per-route translators give the same GRID request as the helpers, for every kind of route.
+    """
+    adapter = HTTPAdapter("secret", routes(), clock=CoarseClock(clock=lambda: START))
+    cases = [
+        request(), request("post", body={"name": "x"}), request("DELETE", "/api/admin/users/7"),
+        request("PROPFIND", "/api/orders/42", body=["not", "a", "dict"]), request(path="/api/unknown"),
+        request(host="localhost:8080"), request(host="api.staging.example.com", key="zyxwvutsrqpo"),
+    ]
+    for http_request in cases + cases:  # Second pass: cached translators
+        assert adapter.translate_request(http_request) == step_by_step(adapter, http_request)
+    translated = adapter.translate_request(request("PROPFIND", "/api/orders/42"))
+    assert (translated.resource.id, translated.action.operation) == ("orders-api", "execute")
+    assert translated.context.timestamp == "2025-11-30T00:00:00Z"
+
+
+def test_paths_share_their_routes_translator(monkeypatch):
+    """
+    Tests that paths matching one route share its translator and that the per-path cache is bounded.
+    """
+    monkeypatch.setattr(http_adapter_template, "MAX_TRANSLATORS", 100)
+    adapter = HTTPAdapter("secret", routes())
+    for i in range(250):
+        assert adapter.translate_request(request(path=f"/api/orders/{i}")).resource.id == "orders-api"
+    assert len(adapter._translators) <= 100
+    assert adapter._translators["/api/orders/249"] is adapter._translators["/api/orders/248"]
+    assert len(adapter._route_translators) == 1
+
+    first, second = (adapter.translate_request(request(path="/api/orders/1")) for _ in range(2))
+    assert first.action is not second.action and first.context.metadata is not second.context.metadata
+
+
+def test_register_route_updates_translations():
+    """
+    Tests that adding or replacing a route changes how already-seen paths translate.
+    """
+    adapter = HTTPAdapter("secret", routes())
+    assert adapter.translate_request(request(path="/api/reports/q3")).resource.id == "http-/api/reports/q3"
+    adapter.register_route("/api/reports/*", Resource(id="reports", type="service", name="Reports",
+                                                      sensitivity="high"))
+    assert adapter.translate_request(request(path="/api/reports/q3")).resource.id == "reports"
+    adapter.register_route("/api/users", Resource(id="users-v2", type="service", name="Users",
+                                                  sensitivity="low"))
+    assert adapter.translate_request(request()).resource.id == "users-v2"
+    assert adapter.resource_registry["/api/users"].id == "users-v2"
+
+
+def test_overlapping_patterns_resolve_to_the_most_specific():
+    """
+    Tests that the longest literal prefix wins among matching patterns, whatever the registry order.
+    """
+    admin = Resource(id="admin", type="service", name="Admin", sensitivity="critical")
+    public = Resource(id="public", type="service", name="Public", sensitivity="low")
+    for registry in [{"/api/admin/*": admin, "/api/*/public": public},
+                     {"/api/*/public": public, "/api/admin/*": admin}]:
+        adapter = HTTPAdapter("secret", registry)
+        assert adapter.translate_request(request(path="/api/admin/public")).resource.sensitivity == "critical"
+        assert adapter.translate_request(request(path="/api/shop/public")).resource.sensitivity == "low"
+
+    users = Resource(id="users", type="service", name="Users", sensitivity="low")
+    keys = Resource(id="keys", type="service", name="Keys", sensitivity="critical")
+    adapter = HTTPAdapter("secret", {"/v2/users": users, "/v2/users/*/keys": keys})
+    assert adapter.translate_request(request(path="/v2/users/alice/keys")).resource.id == "keys"
+    assert adapter.translate_request(request(path="/v2/users/alice")).resource.id == "users"
+
+
+def test_coarse_clock_formats_once_per_tick():
+    """
+    Tests that the coarse clock keeps its timestamp until the next tick, at second or millisecond precision.
+    """
+    now = [START + 0.25]
+    clock = CoarseClock(clock=lambda: now[0])
+    assert clock() == "2025-11-30T00:00:00Z"
+    now[0] = START + 0.99
+    assert clock() == "2025-11-30T00:00:00Z"
+    now[0] = START + 61.0
+    assert clock() == "2025-11-30T00:01:01Z"
+
+    fine = CoarseClock(resolution=0.1, clock=lambda: now[0])
+    now[0] = START + 1.25
+    assert fine() == "2025-11-30T00:00:01.200Z"
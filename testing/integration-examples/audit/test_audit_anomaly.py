@@ -0,0 +1,130 @@
+import random
+
+import numpy as np
+
+from grid_examples.audit_anomaly import (
+    DETECTOR_ID, AnomalyDetector, DecayedCountMin, DetectorConfig, DistinctSketch, RateLimitedEngine,
+    RateLimiter,
+)
+from grid_examples.audit_store import AuditQuery, AuditStore
+from grid_examples.canonical_policy_engine import PolicyDecision, PolicyEngine
+from grid_examples.http_adapter_template import Action, Context, Principal, Resource
+
+START = 1764460800000  # 2025-11-30T00:00:00Z
+
+
+class AllowAll(PolicyEngine):
+    def evaluate(self, principal, resource, action, context):
+        return PolicyDecision(allowed=True, reason="Access granted", policy_id="allow-all")
+
+    def validate_policy(self, policy):
+        return True
+
+    def deploy_policy(self, policy):
+        pass
+
+
+def steady_events(seconds, principals=500, per_second=5, seed=3):
+    """Allowed requests spread evenly over many principals and 50 resources"""
+    rng = random.Random(seed)
+    for i in range(seconds * per_second):
+        yield ({"event": {"id": f"evt-{i}"},
+                "principal": {"id": f"user-{rng.randrange(principals)}@company.com"},
+                "resource": {"id": f"res-{rng.randrange(50)}"},
+                "decision": {"result": "allow"}}, START + i * 1000 // per_second)
+
+
+def test_sketches_never_underestimate():
+    """
+    Tests that count-min counts only overestimate and HyperLogLog estimates stay close to the truth.
+    """
+    sketch = DecayedCountMin([1e9], width=64, depth=4)
+    rng = random.Random(1)
+    truth = {}
+    for _ in range(5000):
+        key = f"key-{int(rng.paretovariate(1.2)) % 500}"
+        truth[key] = truth.get(key, 0) + 1
+        sketch.add(sketch.cells(key), np.array([1.0]), 0.0)
+    for key, count in truth.items():
+        assert sketch.estimate(sketch.cells(key), 0.0)[0] >= count - 1e-6
+
+    distinct = DistinctSketch(window=60, precision=8, width=16, depth=4)
+    cells = DecayedCountMin([60.0], width=16, depth=4).cells("alice")
+    for n in range(1, 2001):
+        distinct.add(cells, f"res-{n}", 0.0)
+        if n in (10, 100, 2000):
+            assert abs(distinct.estimate(cells) - n) <= max(2, 0.15 * n)
+    distinct.add(cells, "res-1", 130.0)  # Two windows later: everything else has expired
+    assert distinct.estimate(cells) < 3
+
+
+def test_steady_traffic_raises_no_alerts():
+    """
+    Tests that evenly spread traffic past the warm-up never alerts.
+    """
+    detector = AnomalyDetector(DetectorConfig(width=1024, warmup=600))
+    for event, millis in steady_events(1800):
+        assert detector.observe(event, millis) == []
+    assert detector.stats.alerts == {} and detector.stats.events == 9000
+
+
+def test_alerts_are_audit_events_in_the_store(tmp_path):
+    """
+    Tests that a scanning, denied principal raises alerts that are appended to the same store.
+    """
+    store = AuditStore(str(tmp_path), max_segment_events=5000, full_text_index=False, rollups=False)
+    detector = AnomalyDetector(DetectorConfig(width=1024, warmup=600), emit=store.append)
+    store.on_append.append(detector.observe)
+    end = START
+    for event, millis in steady_events(900):
+        event["event"]["timestamp"] = f"2025-11-30T00:{millis // 60000 % 60:02d}:{millis // 1000 % 60:02d}Z"
+        store.append(event)
+        end = millis
+    for i in range(200):
+        seconds = end // 1000 + 1 + i // 4
+        store.append({"event": {"id": f"scan-{i}",
+                                "timestamp": f"2025-11-30T00:{seconds // 60 % 60:02d}:{seconds % 60:02d}Z"},
+                      "principal": {"id": "mallory@company.com"}, "resource": {"id": f"secret-{i}"},
+                      "decision": {"result": "deny"}})
+
+    alerts = store.query(AuditQuery(resource_id=DETECTOR_ID))
+    kinds = {e["action"]["parameters"]["anomaly"] for e in alerts}
+    assert kinds == {"deny_spike", "resource_scan", "request_spike"}
+    assert {e["principal"]["id"] for e in alerts} == {"mallory@company.com"}
+    assert len(alerts) == 3  # Cooldown: one alert of each kind
+    store.close()
+
+
+def test_memory_is_fixed_by_configuration():
+    """
+    Tests that sketch memory does not grow with the number of principals.
+    """
+    detector = AnomalyDetector(DetectorConfig(width=256, depth=2))
+    before = detector.memory_bytes()
+    for i in range(20000):
+        detector.observe({"principal": {"id": f"user-{i}"}, "resource": {"id": f"res-{i}"}}, START + i)
+    assert detector.memory_bytes() == before == 256 * 2 * 4 * 8 + 2 * 2 * 256 * 64
+
+
+def test_rate_limited_engine_throttles_flagged_principals():
+    """
+    Tests that a detector-imposed limit adds a rate_limit constraint, denies once used up and expires.
+    """
+    now = [1000.0]
+    limiter = RateLimiter(clock=lambda: now[0])
+    engine = RateLimitedEngine(AllowAll(), limiter)
+    request = (Resource(id="db", type="data", name="DB", sensitivity="high"), Action(operation="read"),
+               Context(timestamp="2025-11-30T00:00:00Z"))
+
+    assert engine.evaluate(Principal(id="bob", type="human"), *request).constraints is None
+    limiter.impose("bob", limit=2, window=60, duration=300)
+    decisions = [engine.evaluate(Principal(id="bob", type="human"), *request) for _ in range(3)]
+    assert [d.allowed for d in decisions] == [True, True, False]
+    assert decisions[0].constraints["rate_limit"] == {"limit": 2, "remaining": 1, "reset": 1060}
+    assert decisions[2].reason == "Access denied: rate limit exceeded (anomaly)"
+
+    now[0] += 60
+    assert engine.evaluate(Principal(id="bob", type="human"), *request).allowed
+    now[0] += 300
+    assert engine.evaluate(Principal(id="bob", type="human"), *request).constraints is None
+    assert len(limiter) == 0
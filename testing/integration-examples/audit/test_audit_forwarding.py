@@ -0,0 +1,295 @@
+import gzip
+import json
+import os
+import socketserver
+import struct
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from grid_examples.audit_forwarding import (
+    AuditForwarder, DatadogBackend, KafkaBackend, SinkConfig, SplunkBackend, crc32c,
+)
+
+
+class HTTPSink:
+    """Stand-in Splunk HEC / Datadog intake recording decoded events"""
+
+    def __init__(self, fail_first=0, reject=None):
+        self.requests = []
+        self.events = []
+        self.fail_first = fail_first
+        self.reject = reject  # Events containing this string get 400
+        sink = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                self._reply(200, {"text": "HEC is healthy", "code": 17})
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                if self.headers.get("Content-Encoding") == "gzip":
+                    body = gzip.decompress(body)
+                sink.requests.append((self.path, dict(self.headers), body))
+                if sink.fail_first > 0:
+                    sink.fail_first -= 1
+                    return self._reply(503, {"text": "Server is busy", "code": 9})
+                if sink.reject and sink.reject.encode() in body:
+                    return self._reply(400, {"text": "Invalid data format", "code": 6})
+                if self.path == "/api/v2/logs":
+                    sink.events += [json.loads(log["message"]) for log in json.loads(body)]
+                else:
+                    decoder, text, offset = json.JSONDecoder(), body.decode(), 0
+                    while offset < len(text):
+                        item, offset = decoder.raw_decode(text, offset)
+                        sink.events.append(item["event"])
+                self._reply(200 if self.path != "/api/v2/logs" else 202, {"text": "Success", "code": 0})
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def _read_varint(data, offset):
+    value = shift = 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return (value >> 1) ^ -(value & 1), offset
+
+
+def decode_batch(batch):
+    """(key, value) pairs of a v2 record batch, checking its CRC"""
+    _, length, _, magic, crc = struct.unpack_from(">qiibI", batch)
+    assert magic == 2 and length == len(batch) - 12 and crc == crc32c(batch[21:])
+    attributes, _, _, _, _, _, _, count = struct.unpack_from(">hiqqqhii", batch, 21)
+    records = batch[61:]
+    if attributes & 7 == 1:
+        records = gzip.decompress(records)
+    pairs, offset = [], 0
+    for _ in range(count):
+        _, offset = _read_varint(records, offset)
+        offset += 1  # Attributes
+        _, offset = _read_varint(records, offset)
+        _, offset = _read_varint(records, offset)
+        size, offset = _read_varint(records, offset)
+        key = records[offset:offset + size] if size >= 0 else None
+        offset += max(size, 0)
+        size, offset = _read_varint(records, offset)
+        value = records[offset:offset + size]
+        offset += size
+        _, offset = _read_varint(records, offset)  # Headers
+        pairs.append((key, value))
+    return pairs
+
+
+class KafkaSink:
+    """Stand-in Kafka broker answering ApiVersions v0 and Produce v3"""
+
+    def __init__(self):
+        self.records = []  # (partition, key, value)
+        sink = self
+
+        class Handler(socketserver.BaseRequestHandler):
+            def handle(self):
+                stream = self.request.makefile("rb")
+                while True:
+                    header = stream.read(4)
+                    if len(header) < 4:
+                        return
+                    request = stream.read(struct.unpack(">i", header)[0])
+                    api_key, version, correlation, client_length = struct.unpack_from(">hhih", request)
+                    offset = 10 + client_length
+                    if api_key == 18:
+                        body = struct.pack(">hi", 0, 1) + struct.pack(">hhh", 0, 3, 3)
+                    else:
+                        assert (api_key, version) == (0, 3)
+                        offset += 2 + 2 + 4 + 4  # transactional_id, acks, timeout, one topic
+                        (length,) = struct.unpack_from(">h", request, offset)
+                        topic = request[offset + 2:offset + 2 + length]
+                        offset += 2 + length
+                        (count,) = struct.unpack_from(">i", request, offset)
+                        offset += 4
+                        results = b""
+                        for _ in range(count):
+                            partition, size = struct.unpack_from(">ii", request, offset)
+                            offset += 8
+                            for key, value in decode_batch(request[offset:offset + size]):
+                                sink.records.append((partition, key, json.loads(value)))
+                            offset += size
+                            results += struct.pack(">ihqq", partition, 0, len(sink.records), -1)
+                        body = struct.pack(">ih", 1, len(topic)) + topic + struct.pack(">i", count) \
+                            + results + struct.pack(">i", 0)
+                    response = struct.pack(">i", correlation) + body
+                    self.request.sendall(struct.pack(">i", len(response)) + response)
+
+        self.server = socketserver.ThreadingTCPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.address = f"127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def audit_events(count, start=0):
+    return [{"event": {"id": f"evt-{i}", "timestamp": f"2025-11-27T19:{i // 60 % 60:02d}:{i % 60:02d}Z"},
+             "principal": {"id": f"user-{i % 7}@company.com"},
+             "resource": {"id": f"res-{i % 5}", "sensitivity": "medium"},
+             "decision": {"result": "allow"}} for i in range(start, start + count)]
+
+
+def ids(events):
+    return sorted(e["event"]["id"] for e in events)
+
+
+def test_fans_out_compressed_batches_to_every_sink(tmp_path):
+    """
+    Tests that Splunk, Datadog and Kafka sinks each receive every event, batched, compressed and stamped.
+    """
+    splunk, datadog, kafka = HTTPSink(), HTTPSink(), KafkaSink()
+    forwarder = AuditForwarder(str(tmp_path), [
+        SplunkBackend(splunk.url, token="hec-token"),
+        DatadogBackend("dd-key", base_url=datadog.url, tags=["env:test"]),
+        KafkaBackend(kafka.address, topic="grid-audit", partitions=3),
+    ], config=SinkConfig(batch_events=200, max_delay=0.05))
+    events = audit_events(1000)
+    for event in events:
+        forwarder.forward(event)
+    assert forwarder.flush(timeout=10)
+
+    assert ids(splunk.events) == ids(datadog.events) == ids(e for _, _, e in kafka.records) == ids(events)
+    assert all(e["compliance"]["forwarded_to_siem"].endswith("Z") for e in splunk.events)
+    path, headers, _ = splunk.requests[0]
+    assert (path, headers["Authorization"], headers["Content-Encoding"]) == \
+        ("/services/collector/event", "Splunk hec-token", "gzip")
+    assert datadog.requests[0][1]["DD-API-KEY"] == "dd-key"
+    assert len(splunk.requests) <= 10 and len(datadog.requests) <= 10
+    by_principal = {}
+    for partition, key, event in kafka.records:
+        assert key.decode() == event["principal"]["id"]
+        by_principal.setdefault(key, set()).add(partition)
+    assert all(len(partitions) == 1 for partitions in by_principal.values())
+
+    health = forwarder.health()
+    assert all(h["healthy"] and h["pending_bytes"] == 0 for h in health.values())
+    assert health["splunk"]["events"] == 1000
+    forwarder.close()
+    for sink in (splunk, datadog, kafka):
+        sink.close()
+
+
+def test_failing_sink_retries_without_blocking_others(tmp_path):
+    """
+    Tests that a sink answering 503 is retried with backoff while a healthy sink keeps receiving.
+    """
+    busy, healthy = HTTPSink(fail_first=3), HTTPSink()
+    forwarder = AuditForwarder(str(tmp_path), [
+        SplunkBackend(busy.url, token="t"),
+        DatadogBackend("k", base_url=healthy.url),
+    ], config=SinkConfig(batch_events=50, max_delay=0.01, backoff=0.05, max_backoff=0.2))
+    events = audit_events(120)
+    for event in events:
+        forwarder.forward(event)
+    assert forwarder.flush(timeout=10)
+    assert ids(busy.events) == ids(healthy.events) == ids(events)
+    assert forwarder.sinks["splunk"].stats.failures == 3
+    assert forwarder.sinks["datadog"].stats.failures == 0
+    forwarder.close()
+    busy.close()
+    healthy.close()
+
+
+def test_spool_survives_restart(tmp_path):
+    """
+    Tests that events spooled while a sink is unreachable are delivered after a restart, once.
+    """
+    sink = HTTPSink()
+    port = sink.server.server_address[1]
+    sink.close()  # Nothing listening yet
+    config = SinkConfig(batch_events=100, max_delay=0.01, backoff=0.05, max_backoff=0.1)
+    forwarder = AuditForwarder(str(tmp_path), [SplunkBackend(f"http://127.0.0.1:{port}", token="t", timeout=1)],
+                               config=config, segment_bytes=10_000)
+    events = audit_events(300)
+    for event in events:
+        forwarder.forward(event)
+    assert not forwarder.flush(timeout=0.3)
+    assert forwarder.health()["splunk"]["pending_bytes"] > 0
+    forwarder.close(timeout=2)
+    assert len(os.listdir(tmp_path / "spool")) > 1
+
+    sink = HTTPSink()
+    restarted = AuditForwarder(str(tmp_path), [SplunkBackend(sink.url, token="t")], config=config,
+                               segment_bytes=10_000)
+    more = audit_events(50, start=300)
+    for event in more:
+        restarted.forward(event)
+    assert restarted.flush(timeout=10)
+    assert ids(sink.events) == ids(events + more)
+    assert len(os.listdir(tmp_path / "spool")) == 1  # Sent segments are deleted
+    restarted.close()
+    sink.close()
+
+
+def test_rejected_events_are_isolated_and_dead_lettered(tmp_path):
+    """
+    Tests that a 400 batch is split until only the rejected event is left, which is dead-lettered.
+    """
+    sink = HTTPSink(reject="evt-37\"")
+    forwarder = AuditForwarder(str(tmp_path), [SplunkBackend(sink.url, token="t", compression=None)],
+                               config=SinkConfig(batch_events=100, max_delay=0.01))
+    events = audit_events(100)
+    for event in events:
+        forwarder.forward(event)
+    assert forwarder.flush(timeout=10)
+    assert ids(sink.events) == ids(e for e in events if e["event"]["id"] != "evt-37")
+    with open(tmp_path / "dead-letter" / "splunk.ndjson") as f:
+        (dead,) = [json.loads(line) for line in f]
+    assert dead["event"]["event"]["id"] == "evt-37" and "HTTP 400" in dead["error"]
+    assert forwarder.sinks["splunk"].stats.dead_lettered == 1
+    forwarder.close()
+    sink.close()
+
+
+def test_critical_denies_take_the_expedited_lane(tmp_path):
+    """
+    Tests that a critical deny is sent at once while ordinary events wait for their batch, and only once.
+    """
+    sink = HTTPSink()
+    forwarder = AuditForwarder(str(tmp_path), [SplunkBackend(sink.url, token="t")],
+                               config=SinkConfig(batch_events=1000, max_delay=30))
+    forwarder.forward(audit_events(1)[0])
+    critical = {"event": {"id": "evt-critical", "timestamp": "2025-11-27T19:45:31Z"},
+                "principal": {"id": "mallory@company.com"},
+                "resource": {"id": "prod-db", "sensitivity": "critical"},
+                "decision": {"result": "deny"}}
+    forwarder.forward(critical)
+    deadline = time.monotonic() + 5
+    while not sink.events and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert ids(sink.events) == ["evt-critical"]
+
+    forwarder.close()  # Sends the partial batch
+    assert ids(sink.events) == ["evt-0", "evt-critical"]
+    assert forwarder.sinks["splunk"].stats.expedited == 1
+    sink.close()
@@ -0,0 +1,135 @@
+import json
+import os
+import random
+import urllib.error
+import urllib.request
+from collections import Counter
+
+import pytest
+
+from grid_examples.audit_rollups import RollupTable, aggregate
+from grid_examples.audit_store import AggregateQuery, AuditQuery, AuditStore, serve
+
+
+def rollup_events(count, seed=5):
+    """Events one every 90 seconds from 2025-11-01, spanning several days"""
+    rng = random.Random(seed)
+    events = []
+    for i in range(count):
+        seconds = i * 90
+        events.append({
+            "event": {"id": f"evt-{i}",
+                      "timestamp": f"2025-11-{1 + seconds // 86400:02d}T{seconds % 86400 // 3600:02d}:"
+                                   f"{seconds % 3600 // 60:02d}:{seconds % 60:02d}Z"},
+            "principal": {"id": f"user-{rng.randrange(12)}@company.com", "type": "human"},
+            "resource": {"id": f"res-{rng.randrange(6)}", "type": "tool",
+                         "sensitivity": rng.choice(["low", "medium", "high", "critical"])},
+            "action": {"operation": rng.choice(["read", "write"])},
+            "decision": {"result": rng.choice(["allow", "deny"])},
+            "outcome": {"success": True, "latency_ms": rng.randrange(1, 3000)},
+        })
+    return events
+
+
+def fill(store, events):
+    for event in events:
+        store.append(event)
+    store.wait_for_indexes()
+    return store
+
+
+def test_denies_per_resource_per_hour_match_raw_events(tmp_path):
+    """
+    Tests that an hourly breakdown over hot, cold and active segments equals counting raw events.
+    """
+    store = fill(AuditStore(str(tmp_path), max_segment_events=1000), rollup_events(4500))
+    store.compact()
+    query = AggregateQuery(decision="deny", granularity="hour", group_by=["bucket", "resource"],
+                           from_timestamp="2025-11-02T00:00:00Z", to_timestamp="2025-11-04T00:00:00Z",
+                           limit=10000)
+    result = store.aggregate(query)
+
+    raw = store.query(AuditQuery(decision="deny", from_timestamp="2025-11-02T00:00:00Z",
+                                 to_timestamp="2025-11-03T23:59:59.999Z", limit=10000))
+    expected = Counter((e["event"]["timestamp"][:13] + ":00:00Z", e["resource"]["id"]) for e in raw)
+    assert {(g["bucket"], g["resource"]): g["count"] for g in result["groups"]} == expected
+    assert [g["bucket"] for g in result["groups"]] == sorted(g["bucket"] for g in result["groups"])
+    assert result["from_timestamp"] == "2025-11-02T00:00:00Z"
+    assert result["to_timestamp"] == "2025-11-04T00:00:00Z"
+
+
+def test_top_principals_by_critical_access(tmp_path):
+    """
+    Tests that a top-K by count picks the coarsest granularity that fits the range.
+    """
+    events = rollup_events(3000)
+    store = fill(AuditStore(str(tmp_path), max_segment_events=700), events)
+    result = store.aggregate(AggregateQuery(sensitivity="critical", group_by=["principal"], limit=3,
+                                            from_timestamp="2025-11-01T00:00:00Z"))
+    counts = Counter(e["principal"]["id"] for e in events if e["resource"]["sensitivity"] == "critical")
+    top = sorted(counts.items(), key=lambda item: (-item[1], str((item[0],))))[:3]
+    assert result["granularity"] == "day"
+    assert [(g["principal"], g["count"]) for g in result["groups"]] == top
+
+
+def test_latency_histogram_and_percentiles(tmp_path):
+    """
+    Tests that latency sums and histogram-based percentiles are kept per cell.
+    """
+    table = RollupTable()
+    for i, latency in enumerate([3, 7, 40, 40, 90, 400, 800, 20000, None, "n/a"]):
+        event = {"principal": {"id": "alice"}, "resource": {"id": "db"},
+                 "outcome": {"latency_ms": latency}}
+        table.add(event, 1762000000000 + i)
+    (group,) = aggregate([table], (None, None))["groups"]
+    assert group["count"] == 10
+    latency = group["latency_ms"]
+    assert latency["count"] == 8 and latency["sum"] == 21380
+    assert (latency["p50"], latency["p95"], latency["p99"]) == (50, None, None)
+    assert sum(latency["histogram"]) == 8 and latency["histogram"][-1] == 1
+
+
+def test_rollups_survive_restart_and_are_rebuilt_from_segments(tmp_path):
+    """
+    Tests that saved rollups reload on restart and missing ones are rebuilt from raw segments.
+    """
+    query = AggregateQuery(group_by=["decision", "sensitivity"], granularity="minute")
+    store = fill(AuditStore(str(tmp_path), max_segment_events=500), rollup_events(1800))
+    store.compact()
+    expected = store.aggregate(query)
+    store.close()
+
+    reopened = AuditStore(str(tmp_path), max_segment_events=500)
+    assert reopened.aggregate(query) == expected
+    assert reopened.rebuild_rollups() == 1800
+    assert reopened.aggregate(query) == expected
+    reopened.close()
+
+    for name in os.listdir(tmp_path / "rollups"):
+        os.remove(tmp_path / "rollups" / name)
+    rebuilt = AuditStore(str(tmp_path), max_segment_events=500)
+    assert rebuilt.aggregate(query) == expected
+    assert len(os.listdir(tmp_path / "rollups")) == 3
+    rebuilt.close()
+
+
+def test_aggregate_api(tmp_path):
+    """
+    Tests that GET /api/v1/audit/aggregate answers from rollups and rejects bad parameters with 400.
+    """
+    store = fill(AuditStore(str(tmp_path), max_segment_events=400), rollup_events(1000))
+    httpd = serve(store)
+    base = f"http://127.0.0.1:{httpd.server_address[1]}/api/v1/audit/aggregate"
+    try:
+        with urllib.request.urlopen(f"{base}?decision=deny&group_by=resource&limit=2") as response:
+            body = json.load(response)
+        assert body == store.aggregate(AggregateQuery(decision="deny", group_by=["resource"], limit=2))
+        assert len(body["groups"]) == 2
+
+        for params in ("group_by=colour", "granularity=week", "order=bucket", "colour=blue"):
+            with pytest.raises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(f"{base}?{params}")
+            assert error.value.code == 400
+    finally:
+        httpd.shutdown()
+        store.close()
@@ -0,0 +1,159 @@
+import json
+import urllib.error
+import urllib.request
+
+import numpy as np
+import pytest
+
+from grid_examples.audit_search import (
+    SegmentIndex, decode_varints, encode_varints, event_terms, parse_query, search, write_index
+)
+from grid_examples.audit_store import AuditQuery, AuditStore, serve
+
+REASONS = [
+    "Access denied: outside business hours",
+    "Access denied: insufficient role",
+    "Role-based access",
+    "Team lead override",
+]
+TOOLS = [
+    ("jira", "jql", ["project = PROJ-{n}", "assignee = currentUser()", "status = Open"]),
+    ("postgres", "query", ["SELECT * FROM customers", "SELECT id FROM orders WHERE id = {n}"]),
+    ("github", "repository", ["grid-protocol", "infra-{n}"]),
+]
+
+
+def search_events(count):
+    """Events with searchable reasons and parameters, one per minute from 2025-11-01"""
+    events = []
+    for i in range(count):
+        tool, parameter, values = TOOLS[i % len(TOOLS)]
+        reason = REASONS[(i // 3) % len(REASONS)]
+        minutes = i
+        events.append({
+            "event": {"id": f"evt-{i}",
+                      "timestamp": f"2025-11-{1 + minutes // 1440:02d}T{minutes % 1440 // 60:02d}:"
+                                   f"{minutes % 60:02d}:00Z"},
+            "principal": {"id": f"user-{i % 7}@company.com", "type": "human",
+                          "attributes": {"role": "developer", "teams": ["backend"] if i % 2 else []}},
+            "resource": {"id": tool, "type": "tool", "sensitivity": "medium"},
+            "action": {"operation": "execute",
+                       "parameters": {parameter: values[i % len(values)].format(n=i % 11)}},
+            "decision": {"result": "deny" if "denied" in reason else "allow", "reason": reason},
+            "context": {"environment": "prod", "user_agent": "grid-cli/1.2"},
+        })
+    return events
+
+
+QUERIES = [
+    "jql AND denied",
+    "jql denied",
+    '"business hours" OR customers',
+    '"access denied" NOT "insufficient role"',
+    "(postgres OR github) AND lead",
+    "PROJ-3",
+    '"project proj 3"',
+    "NOT prod",
+    "orders",
+    "nonexistent",
+]
+
+
+@pytest.fixture(scope="module")
+def events():
+    return search_events(5000)
+
+
+@pytest.fixture(scope="module")
+def index(events, tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("index") / "segment.idx")
+    write_index(path, events)
+    return SegmentIndex(path)
+
+
+def test_varints_round_trip():
+    """
+    Tests that LEB128 posting encoding round-trips small and large values.
+    """
+    values = np.array([0, 1, 127, 128, 300, 16383, 16384, 2 ** 31, 2 ** 40], dtype=np.int64)
+    assert decode_varints(encode_varints(values)).tolist() == values.tolist()
+
+
+@pytest.mark.parametrize("text", QUERIES)
+def test_index_matches_row_by_row_evaluation(events, index, text):
+    """
+    Tests that every query selects the same events from postings as from the events themselves.
+    """
+    expression = parse_query(text)
+    expected = [i for i, event in enumerate(events) if expression.matches(event_terms(event))]
+    assert search(index, expression).tolist() == expected
+
+
+def test_keywords_and_time_range_narrow_postings(events, index):
+    """
+    Tests that principal and time filters are answered from the index as well.
+    """
+    low, high = 1762000000000, 1762100000000
+    docs = search(index, parse_query("jql AND denied"),
+                  keywords=[("principal.id", "user-3@company.com")], time_range=(low, high))
+    expected = [
+        i for i, event in enumerate(events)
+        if event["principal"]["id"] == "user-3@company.com"
+        and "jql" in event["action"]["parameters"] and "denied" in event["decision"]["reason"]
+        and low <= index.timestamps()[i] <= high
+    ]
+    assert docs.tolist() == expected and expected
+
+
+@pytest.mark.parametrize("text", ["", "AND", "(jql", "jql OR", "NOT", "jql )"])
+def test_malformed_queries_are_rejected(text):
+    """
+    Tests that malformed search queries raise ValueError.
+    """
+    with pytest.raises(ValueError):
+        parse_query(text)
+
+
+def test_store_search_reads_only_candidate_rows(tmp_path, events):
+    """
+    Tests that a store search uses the index on both tiers and returns what a scan would.
+    """
+    store = AuditStore(str(tmp_path), max_segment_events=1000)
+    for event in events:
+        store.append(event)
+    query = AuditQuery(text="jql AND denied", principal_id="user-3@company.com",
+                       from_timestamp="2025-11-02T00:00:00Z", fields=["event.id"])
+    store.wait_for_indexes()
+    hot = store.query(query)
+
+    store.compact()
+    assert store.query(query) == hot
+    # Only row groups holding candidate rows were decompressed
+    assert store.cold_stats.rows_matched == len(hot)
+
+    unindexed = AuditStore(str(tmp_path / "plain"), max_segment_events=1000, full_text_index=False)
+    for event in events:
+        unindexed.append(event)
+    assert unindexed.query(query) == hot and hot
+    store.close()
+
+
+def test_audit_api_rejects_malformed_search(tmp_path):
+    """
+    Tests that GET /api/v1/audit answers searches and rejects malformed ones with 400.
+    """
+    store = AuditStore(str(tmp_path), max_segment_events=100)
+    for event in search_events(300):
+        store.append(event)
+    store.wait_for_indexes()
+    httpd = serve(store)
+    base = f"http://127.0.0.1:{httpd.server_address[1]}/api/v1/audit"
+    try:
+        with urllib.request.urlopen(f"{base}?q=%22business+hours%22&fields=event.id") as response:
+            assert len(json.load(response)) == 75
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{base}?q=%28jql")
+        assert error.value.code == 400
+    finally:
+        httpd.shutdown()
+        store.close()
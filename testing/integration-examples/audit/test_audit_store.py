@@ -0,0 +1,188 @@
+import json
+import random
+import urllib.error
+import urllib.request
+
+import pytest
+
+from grid_examples.audit_cold_tier import ColdSegment, Predicate, write_segment
+from grid_examples.audit_store import MAX_LIMIT, AuditQuery, AuditStore, serve
+
+TEAMS = ["backend", "frontend", "security", "data"]
+
+
+def synthetic_events(count, seed=11):
+    """Time-ordered §7.2 events, one every 30 seconds from 2025-11-01"""
+    rng = random.Random(seed)
+    events = []
+    for i in range(count):
+        seconds = i * 30
+        millis = rng.choice(["", f".{rng.randrange(1000):03d}"])
+        timestamp = (f"2025-11-{1 + seconds // 86400:02d}T{seconds % 86400 // 3600:02d}:"
+                     f"{seconds % 3600 // 60:02d}:{seconds % 60:02d}{millis}Z")
+        events.append({
+            "event": {"id": f"evt-{i}", "timestamp": timestamp, "request_id": f"req-{i}"},
+            "principal": {"id": f"user-{rng.randrange(40)}@company.com", "type": "human",
+                          "attributes": {"role": rng.choice(["admin", "developer", "viewer"]),
+                                         "teams": rng.sample(TEAMS, rng.randint(0, 2))}},
+            "resource": {"id": f"res-{rng.randrange(15)}", "type": rng.choice(["tool", "data"]),
+                         "sensitivity": rng.choice(["low", "medium", "high", "critical"])},
+            "action": {"operation": rng.choice(["read", "write", "execute"]),
+                       "parameters": {"query": f"project = P{rng.randrange(5)}"}},
+            "decision": {"result": rng.choice(["allow", "deny"]), "reason": "Role-based access",
+                         "policy_id": "rbac-basic"},
+            "outcome": {"success": rng.random() < 0.9, "error": None,
+                        "latency_ms": rng.choice([rng.randrange(2000), round(rng.uniform(0, 2000), 2)])},
+        })
+    return events
+
+
+QUERIES = [
+    AuditQuery(),
+    AuditQuery(min_latency_ms=1000, fields=["event.id", "outcome.latency_ms"]),
+    AuditQuery(from_timestamp="2025-11-01T06:00:00Z", to_timestamp="2025-11-01T09:00:00Z",
+               principal_id="user-3@company.com"),
+    AuditQuery(team="security", sensitivity="critical", decision="deny"),
+    AuditQuery(role="admin", operation="write", resource_type="data"),
+    AuditQuery(text="project = p3", min_latency_ms=500, fields=["event.id", "action"]),
+    AuditQuery(decision="allow", limit=25, order="desc"),
+    AuditQuery(principal_id="nobody@company.com"),
+]
+
+
+def test_cold_segment_round_trips_events_exactly(tmp_path):
+    """
+    Tests that compaction to the columnar format reconstructs every event exactly.
+    """
+    events = synthetic_events(3000)
+    events.append({"id": "flat-1", "timestamp": "2025-11-02T10:00:00+00:00",
+                   "principal": {"id": "svc"}, "resource": {"id": "db"},
+                   "action": {"operation": "read"}, "decision": {"result": "allow"},
+                   "outcome": {"success": None, "latency_ms": "n/a"}})
+    write_segment(str(tmp_path / "segment.col"), events, row_group_size=500)
+    segment = ColdSegment(str(tmp_path / "segment.col"))
+    assert [event for _, event in segment.scan()] == events
+
+
+def test_hot_and_cold_tiers_answer_queries_identically(tmp_path):
+    """
+    Tests that every query returns the same results before and after compaction.
+    """
+    store = AuditStore(str(tmp_path), max_segment_events=1000)
+    for event in synthetic_events(4500):
+        store.append(event)
+    before = [store.query(query) for query in QUERIES]
+    assert len(store.segments("hot")) == 5
+
+    assert len(store.compact()) == 4
+    assert [s.tier for s in store.segments()] == ["cold"] * 4 + ["hot"]
+    assert [store.query(query) for query in QUERIES] == before
+    assert all(before[:-1]) and before[-1] == []
+
+
+def test_latency_query_reads_only_needed_columns(tmp_path):
+    """
+    Tests that predicate pushdown and projection limit what a cold query decompresses.
+    """
+    path = str(tmp_path / "segment.col")
+    write_segment(path, synthetic_events(20000), row_group_size=2000)
+    segment = ColdSegment(path)
+
+    slow = list(segment.scan([Predicate("outcome.latency_ms", "range", (1000, None))],
+                             fields=["event.id", "outcome.latency_ms"]))
+    assert slow and all(event["outcome"]["latency_ms"] >= 1000 for _, event in slow)
+    # Per row group: timestamp, latency and event id, never the row JSON or other columns
+    assert segment.stats.chunks_read == 3 * len(segment.row_groups)
+
+    segment.stats.chunks_read = 0
+    window = [Predicate("event.timestamp", "range", (1761955200000, 1761955200000 + 3600_000))]
+    assert len(list(segment.scan(window, fields=["event.id"]))) == 120
+    assert segment.stats.row_groups_skipped == len(segment.row_groups) - 1
+
+
+def test_store_reopens_active_segment(tmp_path):
+    """
+    Tests that unsealed events survive a restart and the store keeps appending to them.
+    """
+    events = synthetic_events(30)
+    store = AuditStore(str(tmp_path), max_segment_events=50)
+    for event in events[:20]:
+        store.append(event)
+    store.close()
+
+    reopened = AuditStore(str(tmp_path), max_segment_events=50)
+    for event in events[20:]:
+        reopened.append(event)
+    assert reopened.query(AuditQuery()) == events
+    assert len(reopened.segments()) == 1
+
+
+def test_segments_seal_by_age(tmp_path):
+    """
+    Tests that an old active segment is sealed before the next append.
+    """
+    now = [0.0]
+    sealed = []
+    store = AuditStore(str(tmp_path), max_segment_age=60, clock=lambda: now[0])
+    store.on_seal.append(lambda segment, events: sealed.append((segment.id, len(events))))
+    events = synthetic_events(3)
+    store.append(events[0])
+    store.append(events[1])
+    now[0] = 61
+    store.append(events[2])
+    assert sealed == [(1, 2)]
+
+
+def test_audit_api_serves_both_tiers(tmp_path):
+    """
+    Tests that GET /api/v1/audit merges hot and cold results and rejects unknown parameters.
+    """
+    store = AuditStore(str(tmp_path), max_segment_events=500)
+    for event in synthetic_events(1200):
+        store.append(event)
+    store.compact()
+    httpd = serve(store)
+    base = f"http://127.0.0.1:{httpd.server_address[1]}/api/v1/audit"
+    try:
+        with urllib.request.urlopen(f"{base}?decision=deny&from_timestamp=2025-11-01T04:00:00Z"
+                                    f"&fields=event.id,decision&limit=2000") as response:
+            events = json.load(response)
+        expected = store.query(AuditQuery(decision="deny", from_timestamp="2025-11-01T04:00:00Z",
+                                          fields=["event.id", "decision"], limit=2000))
+        assert events == expected
+        assert store.stats.segments_scanned == {"hot": 2, "cold": 4}
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"{base}?colour=blue")
+        assert error.value.code == 400
+    finally:
+        httpd.shutdown()
+
+
+def test_trace_lookup_across_tiers(tmp_path):
+    """
+    Tests that a trace_id query finds a trace's events in cold, sealed and active segments, with and without indexes.
+    """
+    events = synthetic_events(2500)
+    for i, event in enumerate(events):
+        if i % 7 == 0:
+            event["event"]["trace_id"] = f"trace-{i % 5}"
+    expected = [e for e in events if e["event"].get("trace_id") == "trace-3"]
+
+    for full_text_index in (True, False):
+        store = AuditStore(str(tmp_path / str(full_text_index)), max_segment_events=600,
+                           full_text_index=full_text_index)
+        for event in events[:1200]:
+            store.append(event)
+        store.compact()
+        for event in events[1200:]:
+            store.append(event)
+        store.wait_for_indexes()
+        assert [s.tier for s in store.segments()] == ["cold", "cold", "hot", "hot", "hot"]
+
+        assert store.query(AuditQuery(trace_id="trace-3", limit=MAX_LIMIT)) == expected
+        assert store.query(AuditQuery(trace_id="trace-3", decision="deny", fields=["event.id"],
+                                      order="desc", limit=MAX_LIMIT)) == \
+            [{"event": {"id": e["event"]["id"]}} for e in reversed(expected) if e["decision"]["result"] == "deny"]
+        assert store.query(AuditQuery(trace_id="trace-9")) == []
+        store.close()
@@ -0,0 +1,122 @@
+import pathlib
+import random
+from dataclasses import replace
+
+import numpy as np
+import pytest
+
+from grid_examples.canonical_policy_engine import CanonicalPolicyEngine, load_policy_file
+from grid_examples.policy_replay import AuditColumns, PolicyReplay
+
+POLICIES = pathlib.Path(__file__).resolve().parents[3] / "examples" / "engine" / "policies"
+TEAMS = ["backend", "frontend", "security", "data"]
+
+
+def synthetic_events(count, seed=5):
+    rng = random.Random(seed)
+    events = []
+    for i in range(count):
+        teams = rng.sample(TEAMS, rng.randint(0, 2))
+        timestamp = f"2025-11-{rng.randint(1, 30):02d}T{rng.randrange(24):02d}:{rng.randrange(60):02d}:00Z"
+        events.append({
+            "event": {"id": f"event-{i}", "timestamp": timestamp},
+            "principal": {"id": f"user-{rng.randrange(50)}", "type": "human", "attributes": {
+                "role": rng.choice(["admin", "developer", "viewer", "service"]),
+                "teams": teams,
+                "clearance": rng.choice(["medium", "high", "critical"]),
+                "is_team_lead": {team: rng.random() < 0.3 for team in teams},
+            }},
+            "resource": {"id": f"res-{rng.randrange(20)}", "type": rng.choice(["tool", "data"]),
+                         "name": "resource",
+                         "sensitivity": rng.choice(["low", "medium", "high", "critical"])},
+            "action": {"operation": rng.choice(["read", "write", "execute", "manage"])},
+            "decision": {"result": rng.choice(["allow", "deny"])},
+            "context": {"environment": rng.choice(["production", "dev"])},
+        })
+    return events
+
+
+@pytest.fixture(scope="module")
+def columns():
+    return AuditColumns.from_events(synthetic_events(5000))
+
+
+@pytest.mark.parametrize("name", ["rbac-basic", "rbac-team-based", "time-based-access"])
+def test_vectorized_replay_matches_engine(columns, name):
+    """
+    Tests that vectorized replay decides every event like the canonical engine.
+    """
+    engine = CanonicalPolicyEngine([load_policy_file(str(POLICIES / f"{name}.yaml"))])
+    vectorized = PolicyReplay(columns).evaluate(engine)
+    expected = np.array([engine.evaluate(*columns.row(i)).allowed for i in range(columns.size)])
+    assert np.array_equal(vectorized, expected)
+
+
+def test_what_if_reports_flips_by_principal_and_resource(columns):
+    """
+    Tests that narrowing an allow rule reports only allow-to-deny flips, grouped correctly.
+    """
+    current = load_policy_file(str(POLICIES / "rbac-basic.yaml"))
+    candidate = replace(current, rules=[
+        replace(r, resources=[replace(r.resources[0], value=["low"])])
+        if r.name == "developer_execute_low_medium" else r
+        for r in current.rules
+    ])
+
+    report = PolicyReplay(columns).what_if([current], [candidate], baseline="replayed")
+    assert report.deny_to_allow == 0
+    assert report.allow_to_deny > 0
+    assert sum(c.allow_to_deny for c in report.by_principal.values()) == report.allow_to_deny
+    assert sum(c.allow_to_deny for c in report.by_resource.values()) == report.allow_to_deny
+
+    flipped = [i for i in range(columns.size)
+               if columns.value("principal.role", i) == "developer"
+               and columns.value("action.operation", i) == "execute"
+               and columns.value("resource.sensitivity", i) == "medium"]
+    assert report.allow_to_deny == len(flipped)
+
+
+def test_relational_rules_replay_from_recorded_fields():
+    """
+    Tests that owner/managers in events are replayed, and rows without them are not compared.
+    """
+    engine = CanonicalPolicyEngine([load_policy_file(str(POLICIES / "rbac-team-based.yaml"))])
+    events = synthetic_events(2000)
+    rng = random.Random(3)
+    for event in events:
+        event["resource"]["managers"] = rng.sample(TEAMS, rng.randint(0, 2))
+        event["resource"]["owner"] = rng.choice([None, event["principal"]["id"]])
+    recorded = AuditColumns.from_events(events)
+    for i, event in enumerate(events):
+        event["decision"]["result"] = "allow" if engine.evaluate(*recorded.row(i)).allowed else "deny"
+
+    policies = list(engine.policies.values())
+    report = PolicyReplay(AuditColumns.from_events(events)).what_if(policies, [])
+    assert (report.compared, report.allow_to_deny, report.not_comparable) == (len(events), 0, 0)
+
+    for event in events:
+        del event["resource"]["managers"], event["resource"]["owner"]
+    report = PolicyReplay(AuditColumns.from_events(events)).what_if(policies, [])
+    assert report.allow_to_deny == 0
+    assert report.not_comparable > 0
+    assert report.compared + report.not_comparable == len(events)
+
+
+@pytest.mark.parametrize("name", ["rbac-basic", "time-based-access"])
+def test_events_without_a_valid_timestamp_replay_fail_closed(name):
+    """
+    Tests that rows with a missing or malformed timestamp replay like the engine: time-windowed denies fire.
+    """
+    events = synthetic_events(400, seed=9)
+    for i, event in enumerate(events):
+        event["event"]["timestamp"] = [None, "yesterday", "2025-13-45T99:00:00Z", event["event"]["timestamp"]][i % 4]
+    columns = AuditColumns.from_events(events)
+    assert np.isnat(columns.timestamps).sum() == 300
+    engine = CanonicalPolicyEngine([load_policy_file(str(POLICIES / f"{name}.yaml"))])
+    vectorized = PolicyReplay(columns).evaluate(engine)
+    expected = np.array([engine.evaluate(*columns.row(i)).allowed for i in range(columns.size)])
+    assert np.array_equal(vectorized, expected)
+    if name == "rbac-basic":
+        critical = [i for i, e in enumerate(events) if i % 4 != 3 and e["resource"]["sensitivity"] == "critical"
+                    and e["principal"]["attributes"]["role"] != "admin"]
+        assert critical and not vectorized[critical].any()
@@ -0,0 +1,165 @@
+import json
+import random
+import threading
+
+import pytest
+
+from grid_examples.federation_client import ConnectionPool
+from grid_examples.http_adapter_template import HTTPAdapter, Resource
+from grid_examples.resource_catalog import (
+    CatalogError, CatalogMirror, ResourceCatalog, RevisionConflict, serve,
+)
+
+
+def resource(i, sensitivity=None, owner=None):
+    return Resource(id=f"res-{i:05d}", type=["tool", "service"][i % 2], name=f"Resource {i}",
+                    sensitivity=sensitivity or ["low", "medium", "high", "critical"][i % 4],
+                    owner=owner or f"team-{i % 5}", managers=[f"lead-{i % 3}@company.com"])
+
+
+def line(r):
+    return json.dumps({k: v for k, v in r.__dict__.items() if v is not None})
+
+
+def listing(catalog, limit, **filters):
+    ids, cursor = [], None
+    while True:
+        page = catalog.list(limit=limit, cursor=cursor, **filters)
+        ids += [r.id for r in page.resources]
+        if page.next_cursor is None:
+            return ids
+        cursor = page.next_cursor
+
+
+def test_filtered_listing_matches_a_scan():
+    """
+    Tests that indexed, paginated listings return exactly what filtering every resource would.
+    """
+    catalog = ResourceCatalog()
+    resources = [resource(i) for i in range(2000)]
+    catalog.register_many(resources)
+    rng = random.Random(1)
+    for i in rng.sample(range(2000), 300):  # Re-register some with other attributes
+        catalog.register(resource(i, sensitivity="critical", owner="team-x"))
+        resources[i] = resource(i, sensitivity="critical", owner="team-x")
+
+    for filters in [{}, {"sensitivity": "critical"}, {"owner": "team-x", "type": "tool"},
+                    {"manager": "lead-1@company.com", "sensitivity": "low"}, {"owner": "nobody"}]:
+        expected = sorted(r.id for r in resources
+                          if all(v in r.managers if k == "manager" else getattr(r, k) == v
+                                 for k, v in filters.items()))
+        assert listing(catalog, 37, **filters) == expected
+    assert catalog.count(owner="team-x") == 300
+
+    with pytest.raises(ValueError):
+        catalog.list(limit=10, cursor=catalog.list(limit=10).next_cursor, owner="team-x")
+
+
+def test_cursor_pagination_is_stable_under_concurrent_changes():
+    """
+    Tests that resources present for the whole listing are returned exactly once while others come and go.
+    """
+    catalog = ResourceCatalog()
+    catalog.register_many(resource(i) for i in range(0, 3000, 2))
+    stable = {f"res-{i:05d}" for i in range(0, 3000, 2)}
+    seen, cursor, step = [], None, 1
+    while True:
+        page = catalog.list(limit=100, cursor=cursor)
+        seen += [r.id for r in page.resources]
+        # Between pages: add odd ids, remove and re-add some of them
+        catalog.bulk_register([line(resource(i)) for i in range(step, 3000, 40)] +
+                              [json.dumps({"op": "delete", "id": f"res-{i:05d}"}) for i in range(step, 3000, 80)])
+        step += 2
+        if page.next_cursor is None:
+            break
+        cursor = page.next_cursor
+    assert len(seen) == len(set(seen))
+    assert stable <= set(seen)
+
+
+def test_bulk_registration_is_all_or_nothing():
+    """
+    Tests that one invalid line rejects the whole transaction and that expected_revision guards it.
+    """
+    catalog = ResourceCatalog()
+    catalog.register(resource(1))
+    lines = [line(resource(2)), json.dumps({"id": "bad", "type": "spaceship", "name": "x", "sensitivity": "low"}),
+             json.dumps({"op": "delete", "id": "res-00001"}), "{not json"]
+    with pytest.raises(CatalogError) as error:
+        catalog.bulk_register(lines)
+    assert [e["line"] for e in error.value.errors] == [2, 4]
+    assert catalog.revision == 1 and len(catalog) == 1 and catalog.get("res-00002") is None
+
+    with pytest.raises(RevisionConflict):
+        catalog.bulk_register([line(resource(2))], expected_revision=0)
+    result = catalog.bulk_register([line(resource(2)), json.dumps({"op": "delete", "id": "res-00001"}),
+                                    line(resource(3))], expected_revision=1)
+    assert (result.revision, result.upserted, result.deleted) == (2, 2, 1)
+    assert listing(catalog, 10) == ["res-00002", "res-00003"]
+    assert catalog.bulk_register([line(resource(2))]).unchanged == 1  # No new revision
+    assert catalog.revision == 2
+
+
+def test_mirror_applies_changes_incrementally():
+    """
+    Tests that a mirrored registry follows upserts, moves and deletes, and reloads when history runs out.
+    """
+    catalog = ResourceCatalog(max_history=3)
+    catalog.register_many(resource(i) for i in range(100))
+    registry = {}
+    mirror = CatalogMirror(registry)
+    assert mirror.sync_local(catalog) == 100 and len(registry) == 100
+
+    catalog.register(resource(5, sensitivity="critical"))
+    catalog.bulk_register([json.dumps({"op": "delete", "id": "res-00007"})])
+    assert mirror.sync_local(catalog) == 2
+    assert registry["res-00005"].sensitivity == "critical" and "res-00007" not in registry
+
+    for i in range(5):  # More transactions than the history keeps
+        catalog.register(resource(200 + i))
+    catalog.bulk_register([json.dumps({"op": "delete", "id": "res-00008"})])
+    mirror.sync_local(catalog)
+    assert mirror.reloads == 1
+    assert set(registry) == {r.id for r in catalog.list(limit=1000).resources}
+
+
+def test_http_endpoints_and_remote_mirror():
+    """
+    Tests bulk NDJSON registration, paginated listing and the long-polled change feed over HTTP.
+    """
+    catalog = ResourceCatalog()
+    httpd = serve(catalog)
+    pool = ConnectionPool(f"http://127.0.0.1:{httpd.server_address[1]}")
+    connection = pool._acquire()[0]
+    body = "\n".join(line(resource(i)) for i in range(250)).encode()
+    connection.request("POST", "/api/v1/resources/bulk", body=body,
+                       headers={"Content-Type": "application/x-ndjson"})
+    response = connection.getresponse()
+    assert response.status == 200 and json.loads(response.read())["upserted"] == 250
+    connection.request("POST", "/api/v1/resources/bulk?expected_revision=0", body=body)
+    response = connection.getresponse()
+    assert response.status == 409
+    response.read()
+    connection.close()
+
+    status, page, _ = pool.request("GET", "/api/v1/resources?sensitivity=high&limit=20")
+    assert status == 200 and len(page["resources"]) == 20 and page["next_cursor"]
+    status, error, _ = pool.request("GET", "/api/v1/resources?colour=red")
+    assert status == 400
+
+    # An HTTP adapter keeps its routes in step: resource ids name the routes here
+    adapter = HTTPAdapter("secret", {})
+    mirror = CatalogMirror(adapter.resource_registry, key=lambda r: f"/api/{r.id}",
+                           upsert=adapter.register_route, remove=adapter.unregister_route)
+    mirror.sync(pool)
+    assert len(adapter.resource_registry) == 250
+
+    waiter = threading.Thread(target=mirror.sync, args=(pool, 5.0))
+    waiter.start()
+    catalog.bulk_register([json.dumps({"op": "delete", "id": "res-00003"})])
+    waiter.join(5)
+    assert not waiter.is_alive()
+    assert "/api/res-00003" not in adapter.resource_registry
+    assert adapter._get_resource_from_path("/api/res-00003").id == "http-/api/res-00003"
+    pool.close()
+    httpd.shutdown()
@@ -0,0 +1,143 @@
+import json
+import pathlib
+
+import pytest
+
+from grid_examples.http_adapter_template import HTTPAdapter, HTTPRequest
+from grid_examples.resource_catalog import ResourceCatalog, parse_resource
+from grid_examples.resource_import import (
+    import_descriptor_set, import_openapi, import_resources, load_catalog,
+)
+
+SCHEMAS = pathlib.Path(__file__).resolve().parents[3] / "schemas"
+
+DOCUMENT = {
+    "openapi": "3.0.3",
+    "info": {"title": "Users", "version": "1", "contact": {"email": "identity-team@company.com"}},
+    "servers": [{"url": "https://users.internal/v2"}],
+    "x-grid-sensitivity": "medium",
+    "paths": {
+        "/users": {"get": {"operationId": "listUsers", "x-grid-sensitivity": "low",
+                           "parameters": [{"$ref": "#/components/parameters/Limit"}]}},
+        "/users/{id}/keys": {
+            "parameters": [{"name": "id", "in": "path", "required": True, "schema": {"type": "string"}}],
+            "get": {"operationId": "listKeys"},
+            "delete": {"operationId": "revokeKeys", "x-grid-sensitivity": "critical",
+                       "x-grid-requires-approval": True,
+                       "requestBody": {"content": {"application/json": {
+                           "schema": {"$ref": "#/components/schemas/Revocation"}}}}},
+        },
+    },
+    "components": {
+        "parameters": {"Limit": {"name": "limit", "in": "query", "schema": {"type": "integer"}}},
+        "schemas": {"Revocation": {"type": "object", "properties": {"reason": {"type": "string"}}}},
+    },
+}
+
+
+def varint(n):
+    out = bytearray()
+    while n > 0x7f:
+        out.append(n & 0x7f | 0x80)
+        n >>= 7
+    return bytes(out + bytes([n]))
+
+
+def field(number, value):
+    """One protobuf field: ints and bools as varints, str and bytes length-delimited"""
+    if isinstance(value, int):
+        return varint(number << 3) + varint(int(value))
+    if isinstance(value, str):
+        value = value.encode()
+    return varint(number << 3 | 2) + varint(len(value)) + value
+
+
+def descriptor_set():
+    """billing.proto annotated with grid-options.proto, compiled to a FileDescriptorSet"""
+    refund_request = (field(1, "RefundRequest")
+                      + field(2, field(1, "invoice_id") + field(3, 1) + field(4, 1) + field(5, 9)
+                              + field(10, "invoiceId"))
+                      + field(2, field(1, "amounts") + field(3, 2) + field(4, 3) + field(5, 1)))
+    methods = (field(2, field(1, "GetInvoice") + field(2, ".billing.GetInvoiceRequest"))
+               + field(2, field(1, "Refund") + field(2, ".billing.RefundRequest")
+                       + field(4, field(33, False) + field(51701, "critical") + field(51702, True))))
+    service = field(1, "Billing") + methods + field(3, field(51701, "high") + field(51703, "payments-team"))
+    file = field(1, "billing.proto") + field(2, "billing") + field(4, refund_request) + field(6, service)
+    return field(1, file)
+
+
+def test_openapi_paths_become_resources_with_capabilities():
+    """
+    Tests that every path becomes a route with one §6.2 capability per operation.
+    """
+    registry = import_openapi(DOCUMENT)
+    assert set(registry) == {"/v2/users", "/v2/users/*/keys"}
+    keys = registry["/v2/users/*/keys"]
+    assert (keys.id, keys.sensitivity, keys.owner) == ("http-/v2/users/*/keys", "critical",
+                                                       "identity-team@company.com")
+    get, delete = keys.capabilities
+    assert (get["name"], get["method"], get["sensitivity_level"]) == ("listKeys", "GET", "medium")
+    assert get["parameters"]["required"] == ["id"]
+    assert delete["requires_approval"] and delete["parameters"]["properties"] == {"reason": {"type": "string"}}
+    assert registry["/v2/users"].capabilities[0]["parameters"]["properties"] == {"limit": {"type": "integer"}}
+    # Imported resources are valid catalog resources
+    assert parse_resource(json.loads(json.dumps(keys.__dict__))) == keys
+
+    with pytest.raises(ValueError):
+        import_openapi({**DOCUMENT, "x-grid-sensitivity": "secret"})
+    with pytest.raises(ValueError):
+        import_openapi({"swagger": "2.0"})
+    dangling = {**DOCUMENT, "components": {"parameters": {}}}
+    with pytest.raises(ValueError, match="#/components/parameters/Limit"):
+        import_openapi(dangling)
+
+
+def test_descriptor_set_methods_become_resources():
+    """
+    Tests that every gRPC method becomes a resource with its grid options.
+    """
+    registry = import_descriptor_set(descriptor_set(), owner="platform-team")
+    assert set(registry) == {"grpc-billing.Billing/GetInvoice", "grpc-billing.Billing/Refund"}
+    get_invoice, refund = registry["grpc-billing.Billing/GetInvoice"], registry["grpc-billing.Billing/Refund"]
+    assert (get_invoice.sensitivity, get_invoice.owner) == ("high", "payments-team")
+    assert "parameters" not in get_invoice.capabilities[0]  # Request type not in the set
+    assert refund.sensitivity == "critical" and refund.capabilities[0]["requires_approval"]
+    assert refund.capabilities[0]["parameters"]["properties"] == {
+        "invoiceId": {"type": "string"}, "amounts": {"type": "array", "items": {"type": "number"}}}
+
+    with pytest.raises(ValueError):
+        import_descriptor_set(descriptor_set()[:-3])
+
+
+def test_catalog_snapshot_serves_the_http_adapter(tmp_path):
+    """
+    Tests that adapters boot from the imported snapshot and evaluate each method with its capability's sensitivity.
+    """
+    sources = [str(tmp_path / "users.json"), str(tmp_path / "billing.pb"), str(SCHEMAS / "openapi.yaml")]
+    (tmp_path / "users.json").write_text(json.dumps(DOCUMENT))
+    (tmp_path / "billing.pb").write_bytes(descriptor_set())
+    path = str(tmp_path / "catalog.snapshot")
+
+    snapshot = load_catalog(path, sources)
+    assert len(snapshot.resource_registry) == 2 + 2 + 5
+    assert snapshot.resource_registry["/api/v1/resources"].capabilities[1]["sensitivity_level"] == "high"
+    adapter = HTTPAdapter("secret", snapshot.resource_registry)
+    headers = {"Authorization": "Basic YWxpY2U6eA=="}
+    read = adapter.translate_request(HTTPRequest("GET", "/v2/users/alice/keys", headers))
+    revoke = adapter.translate_request(HTTPRequest("DELETE", "/v2/users/alice/keys", headers))
+    assert (read.resource.id, read.resource.sensitivity) == ("http-/v2/users/*/keys", "medium")
+    assert revoke.resource.sensitivity == "critical"
+    assert adapter.translate_request(HTTPRequest("GET", "/v2/users/a/b/keys", headers)).resource.id == \
+        "http-/v2/users"  # '*' stands for one segment
+    created = snapshot.created_at
+    snapshot.close()
+
+    with load_catalog(path, sources) as snapshot:
+        assert snapshot.created_at == created  # Reused
+    (tmp_path / "users.json").write_text(json.dumps({**DOCUMENT, "paths": {"/health": {"get": {}}}}))
+    with load_catalog(path, sources) as snapshot:
+        assert "/v2/health" in snapshot.resource_registry and "/v2/users" not in snapshot.resource_registry
+
+    catalog = ResourceCatalog()
+    catalog.register_many(import_resources(sources).values())
+    assert catalog.count(sensitivity="critical") == 1
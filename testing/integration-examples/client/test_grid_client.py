@@ -0,0 +1,171 @@
+import json
+import os
+import socketserver
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from grid_examples.grid_client import DEADLINE_HEADER, DeadlineExceeded, GridClient, OPAAPI, PDPUnavailableError
+
+
+class StubPDP:
+    """Stand-in PDP speaking the GRID Policy API: admins are allowed, decisions carry a TTL"""
+
+    def __init__(self, delay=0.0, ttl=60, unix=False):
+        self.delay = delay
+        self.ttl = ttl
+        self.connections = 0
+        self.batches = []  # Checks per request
+        self.deadlines = []
+        pdp = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            wbufsize = 64 * 1024  # One send per response
+
+            def log_message(self, *args):
+                pass
+
+            def setup(self):
+                super().setup()
+                pdp.connections += 1
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                pdp.deadlines.append(int(self.headers[DEADLINE_HEADER]))
+                time.sleep(pdp.delay)
+                if self.path == "/v1/data/grid/authz/allow":
+                    pdp.batches.append(1)
+                    return self._send(200, {"result": body["input"]["principal"]["role"] == "admin"})
+                requests = body["requests"] if self.path.endswith("/batch") else [body]
+                pdp.batches.append(len(requests))
+                decisions = [{"allowed": r["principal_id"].startswith("admin"), "reason": "stub",
+                              "policy_id": "rbac", "ttl": pdp.ttl} for r in requests]
+                if self.path.endswith("/batch"):
+                    return self._send(200, {"decisions": decisions})
+                self._send(200 if decisions[0]["allowed"] else 403, decisions[0])
+
+            def _send(self, status, body):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        if unix:
+            self.path = os.path.join(tempfile.mkdtemp(), "pdp.sock")
+            server_class = type("UnixServer", (socketserver.ThreadingMixIn, socketserver.UnixStreamServer),
+                                {"daemon_threads": True})
+            self.server = server_class(self.path, Handler)
+            self.url = f"unix://{self.path}"
+        else:
+            self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+            self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def test_connections_are_reused_and_decisions_decoded():
+    """
+    Tests that sequential checks share one keep-alive connection and that 403 denies decode as decisions.
+    """
+    pdp = StubPDP(ttl=0)
+    with GridClient(pdp.url) as client:
+        decisions = [client.check(f"{who}@company.com", "jira", "read") for who in ["admin", "bob"] * 10]
+        assert [d.allowed for d in decisions] == [True, False] * 10
+        assert decisions[1].reason == "stub" and decisions[1].policy_id == "rbac"
+        assert pdp.connections == 1 and client.stats.requests == 20
+        assert 0 < max(pdp.deadlines) <= 1000
+    pdp.close()
+
+
+def test_decisions_are_cached_for_the_servers_ttl():
+    """
+    Tests that decisions are cached until their TTL runs out, keyed without volatile context fields.
+    """
+    now = [100.0]
+    pdp = StubPDP(ttl=30)
+    with GridClient(pdp.url, clock=lambda: now[0]) as client:
+        first = client.check("admin@company.com", "jira", "read", context={"timestamp": "2025-11-27T10:00:00Z"})
+        second = client.check("admin@company.com", "jira", "read", context={"timestamp": "2025-11-27T10:00:05Z"})
+        assert first.allowed and not first.cached and second.cached
+        client.check("admin@company.com", "jira", "write")
+        assert client.stats.requests == 2 and client.stats.cache_hits == 1
+
+        now[0] += 31
+        assert not client.check("admin@company.com", "jira", "read").cached
+        assert client.stats.requests == 3
+    pdp.close()
+
+    uncached = StubPDP(ttl=0)
+    with GridClient(uncached.url) as client:
+        for _ in range(3):
+            client.check("admin@company.com", "jira", "read")
+        assert client.stats.cache_hits == 0 and client.stats.requests == 3
+    uncached.close()
+
+
+def test_concurrent_checks_are_batched_and_deduplicated():
+    """
+    Tests that checks made while requests are in flight go out in batches, and identical checks once.
+    """
+    pdp = StubPDP(delay=0.05, ttl=0)
+    with GridClient(pdp.url, max_connections=2, timeout=5) as client:
+        results = {}
+
+        def check(i):
+            results[i] = client.check(f"{'admin' if i % 2 else 'bob'}-{i % 40}", "jira", "read").allowed
+
+        threads = [threading.Thread(target=check, args=(i,)) for i in range(200)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert results == {i: bool(i % 2) for i in range(200)}
+        assert client.stats.requests < 20 and max(pdp.batches) > 1
+        assert sum(pdp.batches) + client.stats.deduplicated == 200
+        assert client.stats.deduplicated > 0
+    pdp.close()
+
+
+def test_deadlines_bound_every_check():
+    """
+    Tests that a slow PDP fails a check at its deadline, and an unreachable one fails fast.
+    """
+    pdp = StubPDP(delay=0.5)
+    with GridClient(pdp.url) as client:
+        start = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            client.check("admin@company.com", "jira", "read", timeout=0.1)
+        assert time.monotonic() - start < 0.3
+        assert client.stats.deadline_exceeded == 1
+    pdp.close()
+
+    port = pdp.server.server_address[1]
+    with GridClient(f"http://127.0.0.1:{port}") as client:
+        with pytest.raises(PDPUnavailableError):
+            client.check("admin@company.com", "jira", "read")
+
+
+def test_unix_socket_transport_and_opa_api():
+    """
+    Tests that a sidecar PDP is reachable over a Unix domain socket, and that OPA results decode.
+    """
+    pdp = StubPDP(unix=True)
+    with GridClient(pdp.url) as client:
+        assert client.check("admin@company.com", "jira", "read").allowed
+        assert not client.check("bob@company.com", "jira", "read").allowed
+        assert pdp.connections == 1
+    with GridClient(pdp.url, api=OPAAPI()) as client:
+        for role in ("admin", "viewer"):
+            decision = client.check_request({"principal": {"role": role}, "action": {"operation": "access"},
+                                             "resource": {"id": "protected-resource"}})
+            assert decision.allowed == (role == "admin") and decision.ttl is None
+    pdp.close()
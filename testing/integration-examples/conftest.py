@@ -0,0 +1,35 @@
+"""
+Make the reference templates under examples/ importable in tests.
+
+The templates use hyphenated file names and import each other as siblings
+of a GRID SDK package (`from .http_adapter_template import ...`). This
+exposes every examples/**/*.py file as `grid_examples.<name>`, with hyphens
+replaced by underscores, e.g. `grid_examples.mcp_adapter_template`.
+"""
+
+import importlib.abc
+import importlib.util
+import pathlib
+import sys
+import types
+
+EXAMPLES = pathlib.Path(__file__).resolve().parents[2] / "examples"
+PACKAGE = "grid_examples"
+
+
+class _ExamplesFinder(importlib.abc.MetaPathFinder):
+    def __init__(self):
+        self.files = {p.stem.replace("-", "_"): p for p in EXAMPLES.rglob("*.py")}
+
+    def find_spec(self, name, path=None, target=None):
+        package, _, module = name.partition(".")
+        if package == PACKAGE and module in self.files:
+            return importlib.util.spec_from_file_location(name, self.files[module])
+        return None
+
+
+if PACKAGE not in sys.modules:
+    _package = types.ModuleType(PACKAGE)
+    _package.__path__ = []
+    sys.modules[PACKAGE] = _package
+    sys.meta_path.insert(0, _ExamplesFinder())
@@ -1,32 +1,34 @@
 import os
-import requests
 from flask import Flask, request, jsonify
 
+from grid_client import GridClient, GridClientError, OPAAPI
+
 app = Flask(__name__)
 
 GRID_SERVER_URL = os.environ.get("GRID_SERVER_URL")
+GRID_DECISION_PATH = os.environ.get("GRID_DECISION_PATH", "/v1/data/grid/authz/allow")
+GRID_TIMEOUT = float(os.environ.get("GRID_TIMEOUT", "1.0"))
+
+# One client per process: its keep-alive connections are shared by every request
+grid = GridClient(GRID_SERVER_URL, api=OPAAPI(GRID_DECISION_PATH), timeout=GRID_TIMEOUT)
 
 @app.route("/resource", methods=["POST"])
 def access_resource():
     auth_request = {
-        "input": {
-            "principal": request.json.get("principal"),
-            "action": {"operation": "access"},
-            "resource": {"id": "protected-resource"}
-        }
+        "principal": request.json.get("principal"),
+        "action": {"operation": "access"},
+        "resource": {"id": "protected-resource"}
     }
 
     try:
-        response = requests.post(GRID_SERVER_URL, json=auth_request)
-        response.raise_for_status()
-        decision = response.json()
-    except requests.exceptions.RequestException as e:
+        decision = grid.check_request(auth_request)
+    except GridClientError as e:
         return jsonify({"error": str(e)}), 500
 
-    if decision.get("result", False):
+    if decision.allowed:
         return jsonify({"message": "Access granted"}), 200
     else:
         return jsonify({"message": "Access denied"}), 403
 
 if __name__ == "__main__":
-    app.run(host="0.0.0.0", port=5000)
\ No newline at end of file
+    app.run(host="0.0.0.0", port=5000)
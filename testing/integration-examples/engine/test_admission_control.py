@@ -0,0 +1,170 @@
+import json
+import pathlib
+import threading
+import time
+from http.client import HTTPConnection
+
+import pytest
+
+from grid_examples.admission_control import (
+    AIMDLimit, AdmissionController, AdmittedPolicyEngine, DeadlineExpired, GradientLimit, Overloaded,
+    priority,
+)
+from grid_examples.canonical_policy_engine import CanonicalPolicyEngine, load_policy_file
+from grid_examples.decision_cache import DecisionCache, STALE_IF_ERROR
+from grid_examples.federation_node import FederationNode, NodeIdentity
+from grid_examples.grid_client import GridClient, PDPOverloadedError
+from grid_examples.http_adapter_template import Action, Context, Principal, Resource
+
+POLICY = pathlib.Path(__file__).resolve().parents[3] / "examples" / "engine" / "policies" / "rbac-basic.yaml"
+CONTEXT = Context(timestamp="2025-11-27T10:00:00Z")
+ALICE = Principal(id="alice@company.com", type="human", role="developer")
+
+
+class CountingEngine(CanonicalPolicyEngine):
+    calls = 0
+
+    def evaluate(self, *args):
+        self.calls += 1
+        return super().evaluate(*args)
+
+
+def single_slot(**options):
+    """A controller with one evaluation slot, taken"""
+    controller = AdmissionController(limit=AIMDLimit(initial=1, max_limit=1), **options)
+    controller.acquire()
+    return controller
+
+
+def test_deadlines_are_checked_before_evaluation():
+    """
+    Tests that expired requests are dropped and requests that would time out in the queue are rejected at once.
+    """
+    engine = CountingEngine([load_policy_file(str(POLICY))])
+    admitted = AdmittedPolicyEngine(engine)
+    resource = Resource(id="wiki", type="data", name="Wiki", sensitivity="low")
+    with pytest.raises(DeadlineExpired):
+        admitted.evaluate(ALICE, resource, Action(operation="read"), CONTEXT, deadline=time.monotonic() - 0.001)
+    assert engine.calls == 0 and admitted.admission.stats.expired == 1
+    assert admitted.evaluate(ALICE, resource, Action(operation="read"), CONTEXT,
+                             deadline=time.monotonic() + 1).allowed
+    assert engine.calls == 1
+
+    controller = single_slot(max_queue_time=1.0)
+    controller.release(0.2)  # Evaluations take about 200 ms
+    controller.acquire()
+    start = time.monotonic()
+    with pytest.raises(Overloaded):
+        controller.acquire(deadline=time.monotonic() + 0.1)
+    assert time.monotonic() - start < 0.05 and controller.stats.would_time_out == 1
+
+
+def test_full_queue_sheds_the_lowest_priority_first():
+    """
+    Tests that a higher-priority request displaces a queued lower-priority one and gets the next free slot.
+    """
+    low = Resource(id="wiki", type="data", name="Wiki", sensitivity="low")
+    critical = Resource(id="vault", type="data", name="Vault", sensitivity="critical")
+    read, write = Action(operation="read"), Action(operation="write")
+    assert priority(low, read, cache_answerable=True) < priority(low, read) < priority(low, write) \
+        < priority(critical, read) < priority(critical, write)
+
+    controller = single_slot(max_queue=1, max_queue_time=2.0)
+    outcomes = {}
+
+    def request(name, level):
+        try:
+            controller.acquire(level)
+            outcomes[name] = "admitted"
+        except Overloaded as e:
+            outcomes[name] = e.reason
+
+    queued = threading.Thread(target=request, args=("read", priority(low, read)))
+    queued.start()
+    while not controller._queue:
+        time.sleep(0.001)
+    request("stale", priority(low, read, cache_answerable=True))  # Lower than the queue: rejected
+    urgent = threading.Thread(target=request, args=("write", priority(critical, write)))
+    urgent.start()
+    queued.join(timeout=2)
+    assert outcomes == {"stale": "Shed under overload", "read": "Shed under overload"}
+    controller.release(0.001)
+    urgent.join(timeout=2)
+    assert outcomes["write"] == "admitted" and controller.inflight == 1
+    assert controller.stats.shed == 2 and controller.stats.queued == 1
+
+
+def test_shed_requests_are_answered_from_the_last_known_good_decision():
+    """
+    Tests that a shed request with a stale cache entry gets a degraded decision and one without is rejected.
+    """
+    now = [0.0]
+    cache = DecisionCache(stale_if_error=STALE_IF_ERROR, clock=lambda: now[0])
+    controller = AdmissionController(limit=AIMDLimit(initial=1, max_limit=1), max_queue=0, clock=lambda: now[0])
+    engine = AdmittedPolicyEngine(CanonicalPolicyEngine([load_policy_file(str(POLICY))]), controller, cache)
+    medium = Resource(id="reports", type="tool", name="Reports", sensitivity="medium")
+    fresh = engine.evaluate(ALICE, medium, Action(operation="execute"), CONTEXT)
+    assert fresh.allowed and fresh.degraded is None
+
+    now[0] = 400.0  # Past the medium TTL, within its stale window
+    controller.acquire()
+    decision = engine.evaluate(ALICE, medium, Action(operation="execute"), CONTEXT)
+    assert decision.allowed and decision.degraded == {
+        "mode": "stale", "cause": "overload", "staleness_seconds": 100.0}
+    with pytest.raises(Overloaded):
+        engine.evaluate(ALICE, medium, Action(operation="read"), CONTEXT)
+    assert controller.stats.stale_served == 1
+
+
+def test_limits_follow_evaluation_latency():
+    """
+    Tests that the gradient and AIMD limits grow while latency holds and shrink when it rises.
+    """
+    gradient = GradientLimit(initial=10)
+    gradient.update(0.001, inflight=0)
+    assert gradient.limit == 10  # An unused limit does not grow
+    for _ in range(50):
+        gradient.update(0.001, inflight=int(gradient.limit))
+    grown = gradient.limit
+    assert grown > 20
+    for _ in range(50):
+        gradient.update(0.004, inflight=int(gradient.limit))
+    assert gradient.limit < grown / 2
+
+    aimd = AIMDLimit(initial=10, latency_threshold=0.01)
+    for _ in range(100):
+        aimd.update(0.001, inflight=10)
+    assert 15 < aimd.limit < 20
+    aimd.update(0.02, inflight=10)
+    assert aimd.limit == pytest.approx(0.9 * 18, abs=2)
+
+
+def test_pdp_answers_rejections_with_http_status():
+    """
+    Tests that the node answers 504 past the caller's deadline and 429 with Retry-After when shed.
+    """
+    controller = single_slot(max_queue=0)
+    node = FederationNode(NodeIdentity("grid-a", "http://localhost", "", "", "k1"),
+                          CanonicalPolicyEngine([load_policy_file(str(POLICY))]), {}, admission=controller)
+    server = node.serve()
+    port = server.server_address[1]
+    body = json.dumps({"requester": "grid-b", "principal_id": "alice@company.com", "action": "read",
+                       "resource": {"id": "wiki", "type": "data", "name": "Wiki", "sensitivity": "low"},
+                       "context": {"timestamp": "2025-11-27T10:00:00Z"}})
+    try:
+        connection = HTTPConnection("127.0.0.1", port, timeout=5)
+        connection.request("POST", "/api/v1/policy/evaluate", body, {"X-Grid-Deadline-Ms": "0"})
+        response = connection.getresponse()
+        assert response.status == 504 and "Deadline" in json.loads(response.read())["error"]
+        connection.request("POST", "/api/v1/policy/evaluate", body, {"X-Grid-Deadline-Ms": "250"})
+        response = connection.getresponse()
+        assert response.status == 429 and int(response.getheader("Retry-After")) >= 1
+        response.read()
+        connection.close()
+
+        with GridClient(f"http://127.0.0.1:{port}", timeout=1.0) as client:
+            with pytest.raises(PDPOverloadedError) as error:
+                client.check_request(json.loads(body))
+            assert error.value.retry_after >= 1
+    finally:
+        server.shutdown()
@@ -0,0 +1,187 @@
+import pathlib
+import random
+import sys
+import threading
+from datetime import datetime, timedelta, timezone
+
+from grid_examples.audit_store import AuditStore, serve
+from grid_examples.cache_warmer import CacheWarmer, http_audit_source, request_from_event
+from grid_examples.canonical_policy_engine import CanonicalPolicyEngine, load_policy_file
+from grid_examples.decision_cache import CachingPolicyEngine, DecisionCache
+from grid_examples.http_adapter_template import Action, Context, Principal, Resource
+from grid_examples.resilient_engine import audit_event
+
+POLICIES = pathlib.Path(__file__).resolve().parents[3] / "examples" / "engine" / "policies"
+SENSITIVITIES = ["low", "medium", "high", "critical"]
+
+
+def recent_events(count, seed=5):
+    """§7.2 events from the last half hour; user-0 on res-0 is the most frequent pair"""
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    engine = CanonicalPolicyEngine([load_policy_file(str(POLICIES / "rbac-basic.yaml"))])
+    events = []
+    for i in range(count):
+        n = min(int(rng.paretovariate(1.2)) - 1, 39)
+        principal = Principal(id=f"user-{n}", type="human", role=["developer", "viewer", "admin"][n % 3])
+        resource = Resource(id=f"res-{n % 20}", type="tool", name="Tool", sensitivity=SENSITIVITIES[n % 20 % 4])
+        action = Action(operation="read")
+        moment = now - timedelta(seconds=(count - i) * 1800 / count)
+        context = Context(timestamp=moment.isoformat().replace("+00:00", "Z"), environment="production")
+        events.append(audit_event(principal, resource, action, context,
+                                  engine.evaluate(principal, resource, action, context)))
+    return events
+
+
+def caching_engine(clock=None):
+    engine = CanonicalPolicyEngine([load_policy_file(str(POLICIES / "rbac-basic.yaml"))])
+    cache = DecisionCache(context_fields=["environment"])
+    if clock is not None:
+        cache.clock = clock
+    return CachingPolicyEngine(engine, cache)
+
+
+def test_warm_up_reads_top_k_per_tier_from_the_audit_api(tmp_path):
+    """
+    Tests that warm-up pre-evaluates the hottest requests of each tier from /v1/audit before reporting ready.
+    """
+    store = AuditStore(str(tmp_path))
+    events = recent_events(3_000)
+    for event in events:
+        store.append(event)
+    httpd = serve(store)
+    try:
+        engine = caching_engine()
+        warmer = CacheWarmer(engine, http_audit_source(f"http://127.0.0.1:{httpd.server_address[1]}"),
+                             top_k={"critical": 2, "high": 3, "medium": 3, "low": 3}, batch_size=4)
+        assert not warmer.health_check()
+        stats = warmer.warm()
+    finally:
+        httpd.shutdown()
+
+    assert warmer.health_check() and stats.fetch_errors == 0 and stats.events_read == 3_000
+    assert stats.warmed == stats.hot_entries == len(warmer.hot) == 11 and len(engine.cache) == 11
+    counts = [entry.count for entry in warmer.hot]
+    assert counts == sorted(counts, reverse=True)
+    assert warmer.hot[0].request[0].id == "user-0" and warmer.hot[0].sensitivity == "low"
+    assert sorted(entry.sensitivity for entry in warmer.hot).count("critical") == 2
+
+    hottest = next(e for e in reversed(events) if e["principal"]["id"] == "user-0" and e["resource"]["id"] == "res-0")
+    request = request_from_event(hottest, "2025-11-27T10:00:00Z")
+    assert engine.evaluate(*request) == engine.engine.evaluate(*request)
+    assert engine.cache.stats.hits == 1
+
+def test_prefetch_refreshes_hot_entries_before_they_expire():
+    """
+    Tests that prefetch refreshes only entries within the lead time of their TTL, and re-warms after a deployment.
+    """
+    now = [0.0]
+    engine = caching_engine(clock=lambda: now[0])
+    events = recent_events(2_000)
+    warmer = CacheWarmer(engine, lambda params: [e for e in reversed(events)
+                                                 if e["resource"]["sensitivity"] == params["sensitivity"]],
+                         top_k={"critical": 5, "low": 5}, lead=0.2)
+    warmer.warm()
+    assert warmer.prefetch() == 0
+
+    now[0] = 25.0  # Critical entries (30 s TTL) are within 20% of expiry, low ones (600 s) are not
+    assert warmer.prefetch() == 5
+    keys = {tier: [engine.cache.key(*e.request) for e in warmer.hot if e.sensitivity == tier]
+            for tier in ("critical", "low")}
+    assert all(engine.cache.expires_in(k) == 30.0 for k in keys["critical"])
+    assert all(engine.cache.expires_in(k) == 575.0 for k in keys["low"])
+
+    now[0] = 1_000.0  # All expired
+    assert warmer.prefetch() == 10 and warmer.stats.prefetched == 15
+    hits = engine.cache.stats.hits
+    for entry in warmer.hot:
+        engine.evaluate(*entry.request)
+    assert engine.cache.stats.hits == hits + 10
+
+    warmer.deploy_policy(engine.engine.policies["rbac-basic"])
+    assert len(engine.cache) == 10
+
+
+def test_unreachable_audit_log_or_budget_does_not_block_readiness():
+    """
+    Tests that a failing audit source or an exhausted budget still lets the replica report ready.
+    """
+    def unreachable(params):
+        raise ConnectionError("audit store down")
+
+    warmer = CacheWarmer(caching_engine(), unreachable)
+    stats = warmer.warm()
+    assert warmer.health_check() and stats.fetch_errors == 4 and stats.warmed == 0
+
+    events = recent_events(500)
+    warmer = CacheWarmer(caching_engine(), lambda params: events, budget=0.0)
+    stats = warmer.warm()
+    assert warmer.health_check() and stats.budget_exceeded and stats.warmed == 0 and stats.hot_entries > 0
+
+
+def test_entries_without_the_relations_the_policies_read_are_not_warmed():
+    """
+    Tests that a team-managed resource is warmed with the live decision, and not at all from an event without managers.
+    """
+    engine = CanonicalPolicyEngine([load_policy_file(str(POLICIES / "rbac-team-based.yaml"))])
+    bob = Principal(id="bob", type="human", role="developer", teams=["payments"])
+    ledger = Resource(id="ledger", type="data", name="Ledger", sensitivity="medium", managers=["payments"])
+    live = (bob, ledger, Action(operation="read"), Context(timestamp=None))
+    assert engine.evaluate(*live).rule == "team_member_read_execute"
+
+    event = audit_event(*live, engine.evaluate(*live))
+    older = dict(event, resource={k: v for k, v in event["resource"].items() if k not in ("owner", "managers")})
+    for events, warmed in (([event], 1), ([older], 0)):
+        caching = CachingPolicyEngine(engine, DecisionCache())
+        warmer = CacheWarmer(caching, lambda params: [e for e in events
+                                                      if e["resource"]["sensitivity"] == params["sensitivity"]])
+        stats = warmer.warm()
+        assert stats.warmed == len(caching.cache) == warmed and stats.incomplete == 1 - warmed
+        assert not stats.budget_exceeded
+        assert caching.evaluate(*live).rule == "team_member_read_execute"
+        assert caching.cache.stats.hits == warmed
+
+
+def test_prefetch_and_requests_share_the_cache_safely():
+    """
+    Tests that prefetch passes running next to request threads on a small cache do not break either side.
+    """
+    events = recent_events(2_000)
+    engine = CachingPolicyEngine(CanonicalPolicyEngine([load_policy_file(str(POLICIES / "rbac-basic.yaml"))]),
+                                 DecisionCache(max_entries=4, context_fields=["environment"]))
+    warmer = CacheWarmer(engine, lambda params: [e for e in reversed(events)
+                                                 if e["resource"]["sensitivity"] == params["sensitivity"]],
+                         top_k={tier: 10 for tier in SENSITIVITIES}, batch_size=1)
+    warmer.warm()
+    errors, stop = [], threading.Event()
+
+    def prefetch():
+        try:
+            while not stop.is_set():
+                warmer.prefetch()
+        except Exception as e:
+            errors.append(e)
+
+    def requests():
+        try:
+            for i in range(100_000):  # Mostly hits on three keys, which prefetch keeps evicting
+                request = warmer.hot[i % 3].request
+                engine.evaluate(*request[:3], Context(timestamp=None, environment="production"))
+        except Exception as e:
+            errors.append(e)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads often, so unlocked access would interleave
+    try:
+        prefetcher = threading.Thread(target=prefetch)
+        prefetcher.start()
+        threads = [threading.Thread(target=requests) for _ in range(2)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stop.set()
+        prefetcher.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert not errors and len(engine.cache) == 4 and warmer.stats.prefetched > 0
@@ -0,0 +1,76 @@
+import pathlib
+import random
+import sys
+import threading
+
+from grid_examples.canonical_policy_engine import CanonicalPolicyEngine, load_policy_file
+from grid_examples.decision_cache import CachingPolicyEngine, DecisionCache
+from grid_examples.http_adapter_template import Action, Context, Principal, Resource
+
+POLICIES = pathlib.Path(__file__).resolve().parents[3] / "examples" / "engine" / "policies"
+PRINCIPAL = Principal(id="alice", type="human", attributes={"clearance": "critical"})
+CRITICAL = Resource(id="vault", type="tool", name="Vault", sensitivity="critical")
+CORE_HOURS = "2025-11-26T11:00:00Z"  # Wednesday
+
+
+def test_critical_access_needs_approval():
+    """Tests that critical resources are denied in core hours without an approval"""
+    engine = CachingPolicyEngine(CanonicalPolicyEngine([load_policy_file(str(POLICIES / "time-based-access.yaml"))]),
+                                 DecisionCache())
+
+    denied = engine.evaluate(PRINCIPAL, CRITICAL, Action(operation="read"), Context(timestamp=CORE_HOURS))
+    assert not denied.allowed
+
+    approved = engine.evaluate(PRINCIPAL, CRITICAL, Action(operation="read"),
+                               Context(timestamp=CORE_HOURS, metadata={"approval": "apr-1"}))
+    assert approved.allowed
+    assert approved.rule == "critical_sensitivity_core_hours"
+    assert "approval" in engine.cache.context_fields
+
+
+def test_unknown_request_time_fails_closed():
+    """Tests that a missing or malformed timestamp trips time-windowed denies instead of allowing or raising"""
+    engine = CanonicalPolicyEngine([load_policy_file(str(POLICIES / "rbac-basic.yaml"))])
+    developer = Principal(id="dev", type="human", role="developer")
+    low = Resource(id="wiki", type="tool", name="Wiki", sensitivity="low")
+    for timestamp in (None, "", "yesterday", "2025-13-45T99:00:00Z"):
+        context = Context(timestamp=timestamp)
+        denied = engine.evaluate(developer, CRITICAL, Action(operation="read"), context)
+        assert not denied.allowed and denied.rule == "deny_critical_outside_business_hours"
+        assert engine.evaluate(developer, low, Action(operation="read"), context).rule == "developer_read_any"
+
+    timed = CanonicalPolicyEngine([load_policy_file(str(POLICIES / "time-based-access.yaml"))])
+    approval = Context(timestamp="yesterday", metadata={"approval": "apr-1"})
+    assert not timed.evaluate(PRINCIPAL, CRITICAL, Action(operation="read"), approval).allowed
+
+
+def test_caching_engine_is_safe_across_request_threads():
+    """Tests that concurrent requests through a small cache neither raise nor lose entries to races"""
+    engine = CachingPolicyEngine(CanonicalPolicyEngine([load_policy_file(str(POLICIES / "rbac-basic.yaml"))]),
+                                 DecisionCache(max_entries=100))
+    errors = []
+
+    def requests(seed):
+        rng = random.Random(seed)
+        try:
+            for _ in range(20_000):
+                engine.evaluate(Principal(id=f"user-{rng.randrange(300)}", type="human", role="developer"),
+                                Resource(id="wiki", type="tool", name="Wiki", sensitivity="low"),
+                                Action(operation="read"), Context(timestamp=CORE_HOURS))
+        except Exception as e:
+            errors.append(e)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)  # Switch threads often, so unlocked access would interleave
+    try:
+        threads = [threading.Thread(target=requests, args=(seed,)) for seed in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+    assert not errors
+    assert len(engine.cache) == 100
+    stats = engine.cache.stats
+    assert stats.hits + stats.misses == 80_000
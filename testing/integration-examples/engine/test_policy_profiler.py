@@ -0,0 +1,158 @@
+import json
+import pathlib
+import random
+from http.client import HTTPConnection
+
+from grid_examples.canonical_policy_engine import CanonicalPolicyEngine, load_policy, load_policy_file
+from grid_examples.http_adapter_template import Action, Context, Principal, Resource
+from grid_examples.policy_profiler import ProfilingPolicyEngine, apply_suggestions, serve
+
+POLICIES = pathlib.Path(__file__).resolve().parents[3] / "examples" / "engine" / "policies"
+CONTEXT = Context(timestamp="2025-11-27T10:00:00Z")
+
+
+def random_requests(n, seed=3):
+    rng = random.Random(seed)
+    requests = []
+    for i in range(n):
+        principal = Principal(id=f"user-{i % 7}", type="human",
+                              role=rng.choice(["admin", "developer", "viewer", "service", None]),
+                              teams=rng.sample(["a", "b", "c"], rng.randint(0, 2)),
+                              attributes={"is_team_lead": {"a": True}})
+        resource = Resource(id=f"res-{i % 5}", type="tool", name="Tool",
+                            sensitivity=rng.choice(["low", "medium", "high", "critical"]),
+                            owner=f"user-{rng.randrange(7)}", managers=rng.sample(["a", "b", "c"], rng.randint(0, 2)))
+        action = Action(operation=rng.choice(["read", "write", "execute", "manage"]))
+        timestamp = f"2025-11-{rng.randint(20, 30)}T{rng.randrange(24):02d}:00:00Z" if rng.random() < 0.9 else None
+        requests.append((principal, resource, action, Context(timestamp=timestamp,
+                                                              environment=rng.choice(["production", "dev"]))))
+    return requests
+
+
+def hot_rule_last_policy():
+    """Ten rare allow rules ahead of the rule that decides most requests"""
+    rules = [{"name": f"rare_{i}", "effect": "allow", "priority": 50,
+              "match": {"principals": [{"type": "attribute", "name": "department", "value": f"dept-{i}"}],
+                        "actions": [{"type": "operation", "value": "manage"}]}} for i in range(10)]
+    rules.append({"name": "read_low", "effect": "allow", "priority": 1,
+                  "match": {"resources": [{"type": "sensitivity", "value": "low"}],
+                            "actions": [{"type": "operation", "value": "read"}]}})
+    return load_policy({"kind": "Policy", "metadata": {"name": "abac"}, "spec": {"rules": rules}})
+
+
+def test_profiled_decisions_match_the_engine():
+    """
+    Tests that profiled evaluation returns the engine's decisions and that the counters add up.
+    """
+    engine = CanonicalPolicyEngine([load_policy_file(str(POLICIES / name)) for name in
+                                    ("rbac-basic.yaml", "rbac-team-based.yaml", "time-based-access.yaml")])
+    profiler = ProfilingPolicyEngine(engine)
+    requests = random_requests(3_000)
+    for request in requests:
+        assert profiler.evaluate(*request) == engine.evaluate(*request)
+
+    report = profiler.report()
+    assert report["requests"] == 3_000
+    decided = sum(rule["decided"] for rule in report["rules"])
+    assert decided + report["default_denies"] == 3_000
+    for rule in report["rules"]:
+        failed = sum(rule["failed_at"].values())
+        assert rule["invocations"] == rule["fired"] + failed
+        assert rule["matched"] == rule["fired"] + rule["failed_at"].get("condition", 0)
+    evaluated = sum(int(n) * count for n, count in report["rules_evaluated"].items())
+    assert evaluated == sum(rule["invocations"] for rule in report["rules"])
+    assert "rbac-team-based/deny_archived" in report["never_fired"]
+
+
+def test_explain_traces_are_on_demand_or_sampled():
+    """
+    Tests that an explain trace gives each evaluated rule's outcome and reason, and that only sampled requests keep one.
+    """
+    engine = CanonicalPolicyEngine([load_policy_file(str(POLICIES / "rbac-basic.yaml"))])
+    profiler = ProfilingPolicyEngine(engine, profile_rate=0.0)
+    viewer = Principal(id="bob", type="human", role="viewer")
+    vault = Resource(id="vault", type="data", name="Vault", sensitivity="critical")
+    night = Context(timestamp="2025-11-27T22:00:00Z")
+
+    trace = profiler.explain(viewer, vault, Action(operation="read"), night)
+    assert not trace.allowed and trace.rule == "deny_critical_outside_business_hours"
+    assert [step.result for step in trace.rules] == ["fired"] and trace.not_evaluated == 8
+
+    trace = profiler.explain(viewer, vault, Action(operation="read"), CONTEXT)
+    assert not trace.allowed and trace.rule is None and trace.not_evaluated == 0
+    first, second = trace.rules[:2]
+    assert first.result == "condition_failed" and "not_business_hours" in first.detail
+    assert second.result == "no_match" and second.detail == "action.operation is 'read', expected 'write'"
+    viewer_rule = next(step for step in trace.rules if step.rule == "viewer_read_low")
+    assert viewer_rule.detail == "resource.sensitivity is 'critical', expected 'low'"
+
+    profiler.evaluate(viewer, vault, Action(operation="read"), CONTEXT)
+    assert profiler.traces() == [] and profiler.profile.requests == 2  # Explained requests are profiled
+    profiler.explain_rate = 1.0
+    profiler.evaluate(viewer, vault, Action(operation="write"), CONTEXT)
+    assert [t.request["operation"] for t in profiler.traces()] == ["write"]
+
+
+def test_reordering_suggestions_move_selective_rules_first():
+    """
+    Tests that the rule deciding most requests is moved ahead of rare ones without changing any outcome.
+    """
+    policy = hot_rule_last_policy()
+    engine = CanonicalPolicyEngine([policy])
+    profiler = ProfilingPolicyEngine(engine)
+    rng = random.Random(5)
+    requests = [(Principal(id="u", type="human", attributes={"department": f"dept-{rng.randrange(20)}"}),
+                 Resource(id="r", type="data", name="R", sensitivity=rng.choice(["low", "low", "high"])),
+                 Action(operation=rng.choice(["read", "read", "read", "manage"])), CONTEXT) for _ in range(2_000)]
+    for request in requests:
+        profiler.evaluate(*request)
+
+    suggestions, current_us, reordered_us = profiler.profile.suggestions(engine.ordered_rules())
+    assert reordered_us < current_us * 0.6
+    first = max(suggestions, key=lambda s: s.suggested_priority)
+    assert first.rule == "read_low" and first.suggested_priority > 50
+    assert profiler.report()["suggestions"]["rules"][0]["rule"] in {s.rule for s in suggestions}
+
+    reordered = ProfilingPolicyEngine(CanonicalPolicyEngine(apply_suggestions([policy], suggestions)))
+    for request in requests:
+        assert reordered.evaluate(*request).allowed == engine.evaluate(*request).allowed
+    assert reordered.report()["mean_rules_evaluated"] < profiler.report()["mean_rules_evaluated"] * 0.6
+    assert reordered.profile.suggestions(reordered.engine.ordered_rules())[0] == []
+
+
+def test_stats_endpoint_serves_report_flamegraph_and_traces():
+    """
+    Tests the JSON report with sorting and limits, folded stacks, sampled traces and reset.
+    """
+    engine = CanonicalPolicyEngine([load_policy_file(str(POLICIES / "rbac-basic.yaml"))])
+    profiler = ProfilingPolicyEngine(engine, explain_rate=0.5, rng=random.Random(1))
+    for request in random_requests(500):
+        profiler.evaluate(*request)
+    server = serve(profiler)
+    try:
+        connection = HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+
+        def get(path, method="GET"):
+            connection.request(method, path)
+            response = connection.getresponse()
+            return response.status, response.getheader("Content-Type"), response.read().decode()
+
+        status, _, body = get("/api/v1/policy/profile?sort=invocations&limit=2&policy=rbac-basic")
+        report = json.loads(body)
+        assert status == 200 and report["requests"] == 500 and len(report["rules"]) == 2
+        assert report["rules"][0]["invocations"] >= report["rules"][1]["invocations"]
+
+        status, content_type, body = get("/api/v1/policy/profile/flamegraph")
+        assert status == 200 and content_type == "text/plain"
+        stack, _, value = body.splitlines()[0].rpartition(" ")
+        assert stack.startswith("evaluate;rbac-basic;") and int(value) > 0
+
+        status, _, body = get("/api/v1/policy/profile/traces?limit=3")
+        assert status == 200 and len(json.loads(body)["traces"]) == 3
+
+        assert get("/api/v1/policy/profile?sort=speed")[0] == 400
+        assert get("/api/v1/policy/profile/reset", "POST")[0] == 200
+        assert json.loads(get("/api/v1/policy/profile")[2])["requests"] == 0
+        connection.close()
+    finally:
+        server.shutdown()
@@ -0,0 +1,130 @@
+import pathlib
+import shutil
+from dataclasses import replace
+
+import pytest
+
+from grid_examples.canonical_policy_engine import CanonicalPolicyEngine, load_policy_file
+from grid_examples.http_adapter_template import Action, Context, Principal, Resource
+
+from grid_examples.policy_test_runner import (
+    InputSpace, OPAEvaluator, PolicyTestRunner, fired_rules, generate_inputs, load_rego_tests, load_test_suite,
+    parse_rego_tests,
+)
+
+FRAMEWORK = pathlib.Path(__file__).resolve().parents[2] / "policy-framework"
+SUITE = FRAMEWORK / "rbac-basic_test.yaml"
+
+
+class StubOPA:
+    """Answers like a Rego policy in which deny never fires"""
+    checked = 0
+
+    def available(self):
+        return True
+
+    def evaluate(self, inputs):
+        self.checked += len(inputs)
+        return [{"allow": (document["principal"].get("role") == "admin"), "deny": False} for document in inputs]
+
+
+def test_rego_tests_are_loaded_as_cases():
+    """
+    Tests that `with input as` tests become cases with local variables substituted, and others are reported.
+    """
+    cases, unsupported = load_rego_tests(str(FRAMEWORK / "rbac-basic_test.rego"))
+    assert len(cases) == 11 and unsupported == []
+    by_name = {case.name: case for case in cases}
+    assert by_name["test_developer_cannot_write_high_sensitivity"].expect == {"allow": False}
+    deny = by_name["test_deny_critical_outside_business_hours"]
+    assert deny.expect == {"deny": True}
+    assert deny.input["context"] == {"timestamp": "2025-11-28T20:00:00Z"}
+
+    cases, unsupported = parse_rego_tests('''
+package grid.authorization
+
+test_helper if {
+    count(deny) == 0 with input as {"principal": {"role": "admin"}}
+}
+
+test_trailing_comma if {
+    # a comment with { braces }
+    allow with input as {"principal": {"role": "admin",},}
+}
+''')
+    assert [case.name for case in cases] == ["test_trailing_comma"] and unsupported == ["test_helper"]
+
+
+def test_suite_passes_with_generated_inputs_on_a_process_pool():
+    """
+    Tests that the shipped suite passes, generated inputs cover every rule, and a run is reproducible.
+    """
+    suite = load_test_suite(str(SUITE))
+    report = PolicyTestRunner(suite, workers=2, opa=OPAEvaluator([], binary="missing-opa")).run(
+        generated=6_000, chunk=1_000)
+    assert report.passed, report.summary()
+    assert report.cases == 15 and report.generated == 6_000 and report.opa_checked == 0
+    assert report.uncovered() == []
+    assert all(rule.generated > 0 for rule in report.coverage.values())
+
+    again = PolicyTestRunner(suite, workers=0, opa=OPAEvaluator([])).run(generated=6_000, chunk=1_000)
+    assert {key: rule.generated for key, rule in again.coverage.items()} == \
+        {key: rule.generated for key, rule in report.coverage.items()}
+
+    space = InputSpace.from_policies(suite.policies, required=["principal.role"])
+    documents = list(generate_inputs(space, 1, 500))
+    assert all(document["principal"].get("role") and document["context"].get("timestamp")
+               for document in documents)
+    assert any(document["resource"].get("owner") == document["principal"]["id"] for document in documents)
+
+
+def test_broken_policy_fails_cases_and_properties():
+    """
+    Tests that removing a deny rule is caught by the explicit case and by the property on generated inputs.
+    """
+    suite = load_test_suite(str(SUITE))
+    policy = suite.policies[0]
+    suite.policies = [replace(policy, rules=[r for r in policy.rules if r.name != "deny_production_writes"])]
+    report = PolicyTestRunner(suite, workers=0, opa=OPAEvaluator([])).run(generated=5_000)
+    assert not report.passed
+    failed = {(failure.kind, failure.name) for failure in report.failures}
+    assert ("case", "developer_cannot_write_production") in failed
+    assert ("property", "non_admins_never_write_production") in failed
+    assert "FAIL" in report.summary()
+
+
+def test_differences_from_opa_are_reported():
+    """
+    Tests that the cases and a sample of generated inputs are cross-checked and disagreements recorded.
+    """
+    opa = StubOPA()
+    report = PolicyTestRunner(load_test_suite(str(SUITE)), workers=0, opa=opa).run(
+        generated=2_000, opa_sample=300)
+    assert report.opa_checked == opa.checked == 15 + 300
+    assert report.differences and not report.passed
+    assert all(difference.canonical != difference.opa for difference in report.differences)
+    assert "test_deny_critical_outside_business_hours" in {d.name for d in report.differences}
+
+
+@pytest.mark.skipif(shutil.which("opa") is None, reason="opa is not installed")
+def test_rbac_basic_agrees_with_opa():
+    """
+    Tests that the canonical rbac-basic policy and its Rego original agree on the cases and generated inputs.
+    """
+    report = PolicyTestRunner(load_test_suite(str(SUITE)), workers=0).run(generated=2_000, opa_sample=2_000)
+    assert report.opa_checked == 15 + 2_000
+    assert report.differences == [], report.summary()
+
+
+def test_fired_rules_fail_closed_without_a_valid_timestamp():
+    """
+    Tests that time-windowed deny rules fire, and nothing raises, when the timestamp is missing or malformed.
+    """
+    engine = CanonicalPolicyEngine([load_policy_file(str(FRAMEWORK.parents[1] / "examples" / "engine" / "policies"
+                                                         / "rbac-basic.yaml"))])
+    developer = Principal(id="dev", type="human", role="developer")
+    vault = Resource(id="vault", type="tool", name="Vault", sensitivity="critical")
+    for timestamp in (None, "yesterday"):
+        fired = [rule.name for _, rule in fired_rules(engine, developer, vault, Action(operation="read"),
+                                                      Context(timestamp=timestamp))]
+        assert fired[0] == "deny_critical_outside_business_hours" and "developer_read_any" in fired
@@ -0,0 +1,123 @@
+import threading
+import time
+
+import pytest
+
+from grid_examples.canonical_policy_engine import PolicyDecision
+from grid_examples.decision_cache import STALE_IF_ERROR, DecisionCache
+from grid_examples.federation_client import CircuitBreaker
+from grid_examples.http_adapter_template import Action, Context, Principal, Resource
+from grid_examples.resilient_engine import ResilientPolicyEngine, audit_event
+
+ALICE = Principal(id="alice@company.com", type="human", role="developer")
+READ = Action(operation="read")
+CONTEXT = Context(timestamp="2025-11-27T10:00:00Z", request_id="req-1")
+
+
+class StubEngine:
+    """Allows everything; hangs while `hang` is set, raises while `fail` is set"""
+
+    def __init__(self):
+        self.calls = 0
+        self.hang = threading.Event()
+        self.release = threading.Event()
+        self.fail = False
+
+    def evaluate(self, principal, resource, action, context):
+        self.calls += 1
+        if self.hang.is_set():
+            self.release.wait(5)
+        if self.fail:
+            raise ConnectionError("PDP unreachable")
+        return PolicyDecision(allowed=True, reason="Developers may read", policy_id="pol-rbac")
+
+
+def resource(sensitivity):
+    return Resource(id=f"res-{sensitivity}", type="tool", name=sensitivity, sensitivity=sensitivity)
+
+
+def resilient(engine, now, **kwargs):
+    cache = DecisionCache(stale_if_error=STALE_IF_ERROR, clock=lambda: now[0])
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30.0, clock=lambda: now[0])
+    return ResilientPolicyEngine(engine, cache, timeout=0.05, breaker=breaker, **kwargs)
+
+
+def test_slow_engine_serves_last_known_good_within_tier_windows():
+    """
+    Tests that a hung engine is abandoned at the deadline, and only tiers with a stale window get stale decisions.
+    """
+    stub, now, degraded = StubEngine(), [0.0], []
+    engine = resilient(stub, now, on_degraded=lambda *args: degraded.append(args[-1]))
+    tiers = [resource(s) for s in ("low", "medium", "high", "critical")]
+    for r in tiers:
+        assert engine.evaluate(ALICE, r, READ, CONTEXT).degraded is None
+
+    stub.hang.set()
+    now[0] = 700.0  # Past every TTL; within the low and medium stale windows only
+    start = time.monotonic()
+    decisions = {r.sensitivity: engine.evaluate(ALICE, r, READ, CONTEXT) for r in tiers}
+    assert time.monotonic() - start < 1.0
+    stub.release.set()
+
+    assert decisions["low"].allowed and decisions["low"].degraded["mode"] == "stale"
+    assert decisions["low"].degraded["staleness_seconds"] == 100.0
+    assert decisions["medium"].allowed and decisions["medium"].degraded["mode"] == "stale"
+    for tier in ("high", "critical"):
+        assert not decisions[tier].allowed and decisions[tier].degraded["mode"] == "fail_closed"
+    assert engine.stats.timeouts == 3 and engine.stats.short_circuited == 1  # The breaker opened at 3 failures
+    assert engine.stats.stale_served == 2 and engine.stats.failed_closed == 2
+    assert len(degraded) == 4
+
+    event = audit_event(ALICE, tiers[1], READ, CONTEXT, decisions["medium"], latency_ms=50)
+    assert event["decision"]["result"] == "allow"
+    assert event["decision"]["degraded"]["mode"] == "stale"
+    assert "degraded" not in audit_event(ALICE, tiers[1], READ, CONTEXT, PolicyDecision(True, "ok"))["decision"]
+    engine.close()
+
+
+def test_critical_resources_are_never_served_stale():
+    """
+    Tests that a stale window for critical resources is rejected.
+    """
+    with pytest.raises(ValueError):
+        DecisionCache(stale_if_error={"low": 60, "critical": 10})
+
+
+def test_circuit_breaker_short_circuits_a_failing_engine():
+    """
+    Tests that the breaker stops calling a failing engine and closes again after a successful trial.
+    """
+    stub, now = StubEngine(), [0.0]
+    engine = resilient(stub, now)
+    stub.fail = True
+    for i in range(5):
+        decision = engine.evaluate(ALICE, resource("critical"), READ, CONTEXT)
+        assert not decision.allowed and decision.degraded["mode"] == "fail_closed"
+    assert stub.calls == 3
+    assert engine.stats.engine_errors == 3 and engine.stats.short_circuited == 2
+    assert engine.breaker.state == CircuitBreaker.OPEN
+
+    stub.fail = False
+    now[0] = 31.0
+    assert engine.evaluate(ALICE, resource("critical"), READ, CONTEXT).degraded is None
+    assert engine.breaker.state == CircuitBreaker.CLOSED
+    engine.close()
+
+
+def test_early_refresh_spreads_expiry_of_hot_entries():
+    """
+    Tests that an entry close to expiry is refreshed early with a probability that depends on the draw.
+    """
+    now = [0.0]
+    draw = [0.5]
+    cache = DecisionCache(stale_if_error=STALE_IF_ERROR, early_refresh=1.0,
+                          clock=lambda: now[0], random=lambda: draw[0])
+    key = ("alice", "res", "read", ())
+    cache.put(key, PolicyDecision(True, "ok"), "high", compute_time=2.0)  # Expires at 60
+
+    now[0] = 50.0
+    assert cache.get(key) is not None  # 50 + 2 * ln 2 < 60
+    draw[0] = 0.999
+    assert cache.get(key) is None  # 50 + 2 * ln 1000 > 60: refresh now
+    assert cache.stats.early_refreshes == 1
+    assert cache.get_stale(key) == (PolicyDecision(True, "ok"), 0.0)  # Still there if the refresh fails
@@ -0,0 +1,154 @@
+import pathlib
+import random
+import threading
+import time
+from dataclasses import replace
+
+from grid_examples.canonical_policy_engine import CanonicalPolicyEngine, load_policy_file
+from grid_examples.http_adapter_template import Action, Context, Principal, Resource
+from grid_examples import shadow_engine
+from grid_examples.shadow_engine import ShadowPolicyEngine
+
+POLICIES = pathlib.Path(__file__).resolve().parents[3] / "examples" / "engine" / "policies"
+CONTEXT = Context(timestamp="2025-11-27T10:00:00Z")
+
+
+def current_and_candidate():
+    """rbac-basic, and a version in which developers may only execute low sensitivity tools"""
+    current = load_policy_file(str(POLICIES / "rbac-basic.yaml"))
+    candidate = replace(current, version=current.version + 1, rules=[
+        replace(r, resources=[replace(r.resources[0], value=["low"])])
+        if r.name == "developer_execute_low_medium" else r
+        for r in current.rules
+    ])
+    return current, candidate
+
+
+def random_requests(n, seed=3):
+    rng = random.Random(seed)
+    return [(Principal(id=f"user-{i % 7}", type="human", role=rng.choice(["developer", "viewer", "admin"])),
+             Resource(id=f"res-{i % 5}", type="tool", name="Tool", sensitivity=rng.choice(["low", "medium", "high"])),
+             Action(operation=rng.choice(["read", "execute"])), CONTEXT) for i in range(n)]
+
+
+def test_only_disagreements_are_written_with_both_decisions():
+    """
+    Tests that the enforced decisions are unchanged and each disagreement is written with both decisions and reasons.
+    """
+    current, candidate = current_and_candidate()
+    engine = CanonicalPolicyEngine([current])
+    events = []
+    shadow = ShadowPolicyEngine(CanonicalPolicyEngine([current]), [candidate], events.append,
+                                sample_rate=1.0, processes=1, batch_size=64)
+    requests = random_requests(2_000)
+    try:
+        for request in requests:
+            assert shadow.evaluate(*request) == engine.evaluate(*request)
+        assert shadow.flush(timeout=30)
+    finally:
+        shadow.close()
+
+    expected = [r for r in requests if r[0].role == "developer" and r[1].sensitivity == "medium"
+                and r[2].operation == "execute"]
+    assert shadow.stats.evaluated == 2_000 and shadow.stats.errors == 0
+    assert shadow.stats.disagreed == shadow.stats.allow_to_deny == len(expected) == len(events)
+    assert shadow.stats.agreed == 2_000 - len(expected)
+    event = events[0]
+    assert event["event"]["stream"] == "shadow"
+    assert event["decision"]["result"] == "allow" and event["decision"]["rule"] == "developer_execute_low_medium"
+    assert event["shadow"]["result"] == "deny" and event["shadow"]["reason"] == "Access denied by default policy"
+    assert event["shadow"]["policy_versions"] == {"rbac-basic": 2}
+
+    shadow.promote()
+    assert shadow.evaluate(*expected[0]).allowed is False
+
+
+def test_full_queue_drops_samples_without_blocking():
+    """
+    Tests that when the shadow side is stalled, sampled requests beyond the queue bound are dropped, not waited for.
+    """
+    current, candidate = current_and_candidate()
+    release = threading.Event()
+    shadow = ShadowPolicyEngine(CanonicalPolicyEngine([current]), [candidate], lambda event: release.wait(),
+                                sample_rate=1.0, max_queue=10, processes=0, batch_size=1,
+                                disagrees=lambda enforced, shadow: True)
+    try:
+        started = time.perf_counter()
+        for request in random_requests(1_000):
+            shadow.evaluate(*request)
+        assert time.perf_counter() - started < 5
+        assert shadow.stats.sampled == 1_000
+        assert shadow.stats.dropped >= 1_000 - 10 - 2  # Queue bound, and the batches taken before the stall
+    finally:
+        release.set()
+        assert shadow.flush(timeout=30)
+        shadow.close()
+    assert shadow.stats.evaluated + shadow.stats.dropped == 1_000
+
+
+def test_sample_rate_controls_shadow_evaluations():
+    """
+    Tests that roughly the configured fraction of requests is evaluated in the shadow, and none at rate zero.
+    """
+    current, candidate = current_and_candidate()
+    shadow = ShadowPolicyEngine(CanonicalPolicyEngine([current]), [candidate], lambda event: None,
+                                sample_rate=0.1, processes=0, rng=random.Random(1))
+    for request in random_requests(5_000):
+        shadow.evaluate(*request)
+    shadow.sample_rate = 0.0
+    for request in random_requests(1_000):
+        shadow.evaluate(*request)
+    assert shadow.flush(timeout=30)
+    shadow.close()
+    assert 400 <= shadow.stats.evaluated == shadow.stats.sampled <= 600
+
+
+def test_close_releases_unevaluated_samples():
+    """
+    Tests that samples still queued when the engine is closed are counted as abandoned, so a later flush returns.
+    """
+    current, candidate = current_and_candidate()
+    release = threading.Event()
+    shadow = ShadowPolicyEngine(CanonicalPolicyEngine([current]), [candidate], lambda event: release.wait(),
+                                sample_rate=1.0, max_queue=50, processes=0, batch_size=1,
+                                disagrees=lambda enforced, shadow: True)
+    for request in random_requests(20):
+        shadow.evaluate(*request)
+    closer = threading.Thread(target=shadow.close)
+    closer.start()
+    release.set()
+    closer.join(timeout=30)
+    assert shadow.flush(timeout=5)
+    shadow.evaluate(*random_requests(1)[0])
+    assert shadow.flush(timeout=5)
+    assert shadow.stats.evaluated + shadow.stats.abandoned + shadow.stats.dropped == shadow.stats.sampled == 21
+
+
+def test_disagreements_carry_the_versions_they_were_evaluated_against(monkeypatch):
+    """
+    Tests that a batch in flight during set_shadow_policies is labelled with the candidate versions it ran against.
+    """
+    current, candidate = current_and_candidate()
+    events, started, release = [], threading.Event(), threading.Event()
+    evaluate_batch = shadow_engine._evaluate_batch
+
+    def held(requests, engine=None):
+        started.set()
+        release.wait()
+        return evaluate_batch(requests, engine)
+
+    monkeypatch.setattr(shadow_engine, "_evaluate_batch", held)
+    shadow = ShadowPolicyEngine(CanonicalPolicyEngine([current]), [candidate], events.append,
+                                sample_rate=1.0, processes=0, batch_size=1,
+                                disagrees=lambda enforced, shadow: True)
+    try:
+        shadow.evaluate(*random_requests(1)[0])
+        assert started.wait(timeout=30)
+        shadow.set_shadow_policies([replace(candidate, version=candidate.version + 1)])
+        release.set()
+        shadow.evaluate(*random_requests(1)[0])
+        assert shadow.flush(timeout=30)
+    finally:
+        release.set()
+        shadow.close()
+    assert [e["shadow"]["policy_versions"] for e in events] == [{"rbac-basic": 2}, {"rbac-basic": 3}]
@@ -0,0 +1,137 @@
+import json
+import os
+import pathlib
+import random
+
+from grid_examples.canonical_policy_engine import CanonicalPolicyEngine, load_policy_file
+from grid_examples.decision_matrix import PrecomputedPolicyEngine
+from grid_examples.http_adapter_template import Action, Context, Principal, Resource
+from grid_examples.team_directory import TeamDirectory, TeamFeed
+
+POLICIES = pathlib.Path(__file__).resolve().parents[3] / "examples" / "engine" / "policies"
+OPERATIONS = ["read", "write", "execute", "manage", "create", "grant_access", "audit", "delete"]
+CONTEXT = Context(timestamp="2025-11-27T10:00:00Z")
+
+
+def population(rng, count):
+    teams = [f"team-{i}" for i in range(60)] + ["security", "platform"]
+    principals, resources = [], []
+    for i in range(count):
+        member = rng.sample(teams, rng.randint(0, 30))
+        leads = {team: True for team in member if rng.random() < 0.2}
+        principals.append(Principal(id=f"user-{i}@company.com", type="human",
+                                    role=rng.choice(["developer", "developer", "admin"]),
+                                    teams=member, attributes={"is_team_lead": leads}))
+        resources.append(Resource(id=f"res-{i}", type=rng.choice(["tool", "service", "data"]),
+                                  name=f"Resource {i}", sensitivity=rng.choice(["low", "high", "critical"]),
+                                  owner=rng.choice(teams), managers=rng.sample(teams, rng.randint(0, 4))))
+    return principals, resources
+
+
+def test_bitset_evaluation_matches_list_evaluation():
+    """
+    Tests that the team-based policy decides the same with and without the directory, for claims and listed principals.
+    """
+    policy = load_policy_file(str(POLICIES / "rbac-team-based.yaml"))
+    plain = CanonicalPolicyEngine([policy])
+    directory = TeamDirectory()
+    engine = CanonicalPolicyEngine([policy], directory=directory)
+    rng = random.Random(3)
+    principals, resources = population(rng, 300)
+    for principal in principals[::2]:  # Half are listed, the rest evaluated from claims
+        leads = [team for team, lead in principal.attributes["is_team_lead"].items() if lead]
+        directory.set_principal(principal.id, principal.teams, leads)
+
+    for _ in range(5000):
+        principal, resource = rng.choice(principals), rng.choice(resources)
+        action = Action(operation=rng.choice(OPERATIONS))
+        expected = plain.evaluate(directory.enrich(principal), resource, action, CONTEXT)
+        assert engine.evaluate(principal, resource, action, CONTEXT) == expected
+
+
+def test_directory_is_authoritative_for_listed_principals():
+    """
+    Tests that listed principals are evaluated with the directory's teams and leads, not their claims.
+    """
+    directory = TeamDirectory()
+    engine = CanonicalPolicyEngine([load_policy_file(str(POLICIES / "rbac-team-based.yaml"))],
+                                   directory=directory)
+    ledger = Resource(id="ledger", type="service", name="Ledger", sensitivity="high", managers=["payments"])
+    claims = Principal(id="alice@company.com", type="human", role="developer", teams=["payments"],
+                       attributes={"is_team_lead": {"payments": True}})
+    assert engine.evaluate(claims, ledger, Action(operation="manage"), CONTEXT).allowed
+
+    directory.set_principal("alice@company.com", ["payments", "search"], lead_teams=["search", "billing"])
+    assert directory.is_team_lead("alice@company.com", "search")
+    assert not directory.is_team_lead("alice@company.com", "billing")  # Not a member
+    assert not directory.is_team_lead("alice@company.com", "payments")
+    assert not engine.evaluate(claims, ledger, Action(operation="manage"), CONTEXT).allowed
+    assert engine.evaluate(claims, ledger, Action(operation="read"), CONTEXT).allowed
+
+    directory.remove_principal("alice@company.com")
+    assert directory.teams_of("alice@company.com") is None
+    assert engine.evaluate(claims, ledger, Action(operation="manage"), CONTEXT).allowed
+
+
+def test_precomputed_engine_follows_the_directory():
+    """
+    Tests that the decision matrix decides like the engine with a directory, before and after feed updates.
+    """
+    directory = TeamDirectory()
+    engine = CanonicalPolicyEngine([load_policy_file(str(POLICIES / "rbac-team-based.yaml"))],
+                                   directory=directory)
+    rng = random.Random(11)
+    principals, resources = population(rng, 60)
+    for principal in principals[::2]:
+        directory.set_principal(principal.id, rng.sample(principal.teams or ["security"], 1), ["security"])
+    precomputed = PrecomputedPolicyEngine(engine, principals, resources)
+
+    def check():
+        for principal in principals:
+            for resource in resources[:20]:
+                for operation in OPERATIONS:
+                    action = Action(operation=operation)
+                    assert precomputed.evaluate(principal, resource, action, CONTEXT) == \
+                        engine.evaluate(principal, resource, action, CONTEXT)
+
+    check()
+    assert precomputed.matrix.stats.hits > 0
+    for round in range(3):
+        directory.apply([{"principal": p.id, "teams": rng.sample(["security", "platform", "team-1"], 2),
+                          "leads": ["platform"]} for p in rng.sample(principals, 10)])
+        check()
+    directory.remove_principal(principals[0].id)
+    check()
+    assert precomputed.matrix.stats.membership_updates == 4
+
+
+def test_feed_applies_appended_records_and_full_exports(tmp_path):
+    """
+    Tests that the feed applies appended records, waits for partial lines, skips invalid ones and reloads replaced files.
+    """
+    path = tmp_path / "hr.ndjson"
+    directory = TeamDirectory()
+    changed = []
+    directory.subscribe(lambda ids: changed.append(sorted(ids)))
+    feed = TeamFeed(str(path), directory)
+    assert feed.poll() == 0  # No file yet
+
+    path.write_text(json.dumps({"principal": "alice", "teams": ["payments"], "leads": ["payments"]}) + "\n" +
+                    json.dumps({"principal": "bob", "teams": ["search"]}) + "\n")
+    assert feed.poll() == 2 and len(directory) == 2
+    with open(path, "a") as f:
+        f.write(json.dumps({"op": "delete", "principal": "bob"}) + "\n")
+        f.write("not json\n")
+        f.write('{"principal": "carol", "teams": ["sea')
+    assert feed.poll() == 1 and "bob" not in directory and feed.stats.invalid == 1
+    with open(path, "a") as f:
+        f.write('rch"]}\n')
+    assert feed.poll() == 1 and directory.teams_of("carol") == ["search"]
+    assert feed.poll() == 0
+    assert changed == [["alice", "bob"], ["bob"], ["carol"]]
+
+    replacement = tmp_path / "hr.ndjson.new"  # A new full export replaces the file
+    replacement.write_text(json.dumps({"principal": "carol", "teams": ["search", "platform"]}) + "\n")
+    os.replace(replacement, path)
+    assert feed.poll() == 2 and feed.stats.reloads == 2
+    assert "alice" not in directory and directory.teams_of("carol") == ["search", "platform"]
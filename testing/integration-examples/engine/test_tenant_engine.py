@@ -0,0 +1,99 @@
+import pathlib
+import threading
+
+import pytest
+
+from grid_examples.canonical_policy_engine import load_policy_file
+from grid_examples.http_adapter_template import Action, Context, Principal, Resource
+from grid_examples.tenant_engine import FairScheduler, TenantConfig, TenantPolicyEngine, tenant_package
+
+POLICIES = pathlib.Path(__file__).resolve().parents[3] / "examples" / "engine" / "policies"
+CONTEXT = Context(timestamp="2025-11-27T10:00:00Z")
+
+
+def member(tenant, name="alice", role="developer"):
+    return Principal(id=f"{name}@{tenant}.com", type="human", role=role, teams=["payments"],
+                     attributes={"tenant": tenant, "is_team_lead": {"payments": True}})
+
+
+def ledger(i=0):
+    return Resource(id=f"ledger-{i}", type="service", name="Ledger", sensitivity="high", managers=["payments"])
+
+
+def test_namespaces_keep_tenant_policies_apart():
+    """
+    Tests that tenant policies only apply in their namespace, shared ones apply everywhere and cannot be replaced.
+    """
+    basic = load_policy_file(str(POLICIES / "rbac-basic.yaml"))
+    teams = load_policy_file(str(POLICIES / "rbac-team-based.yaml"))
+    engine = TenantPolicyEngine([TenantConfig("acme"), TenantConfig("globex")], shared_policies=[basic], workers=1)
+    engine.deploy_policy(teams, tenant="acme")
+    manage = Action(operation="manage")
+
+    assert engine.evaluate(member("acme"), ledger(), manage, CONTEXT).allowed
+    assert not engine.evaluate(member("globex"), ledger(), manage, CONTEXT).allowed
+    assert engine.evaluate(member("globex", "root", role="admin"), ledger(), manage, CONTEXT).allowed  # Shared
+    unknown = engine.evaluate(member("initech", "root", role="admin"), ledger(), manage, CONTEXT)
+    assert not unknown.allowed and "unknown tenant" in unknown.reason
+
+    with pytest.raises(ValueError):
+        engine.deploy_policy(basic, tenant="globex")
+    with pytest.raises(ValueError):
+        engine.add_tenant(TenantConfig("Globex Corp"))
+    with pytest.raises(KeyError):
+        engine.deploy_policy(teams, tenant="initech")
+
+    # Redeploying acme's policy clears only acme's partition
+    assert len(engine.cache("acme")) == 1 and len(engine.cache("globex")) == 2
+    engine.remove_policy(teams.id, tenant="acme")
+    assert len(engine.cache("acme")) == 0 and len(engine.cache("globex")) == 2
+    assert not engine.evaluate(member("acme"), ledger(), manage, CONTEXT).allowed
+    assert tenant_package("acme") == "grid.authorization.tenants.acme"
+    engine.close()
+
+
+def test_cache_partitions_hold_their_quota():
+    """
+    Tests that a noisy tenant only evicts its own decisions and hit rates are counted per tenant.
+    """
+    engine = TenantPolicyEngine([TenantConfig("acme", cache_entries=10), TenantConfig("globex", cache_entries=50)],
+                                shared_policies=[load_policy_file(str(POLICIES / "rbac-basic.yaml"))], workers=2)
+    read = Action(operation="read")
+    for _ in range(2):
+        for i in range(10):
+            engine.evaluate(member("acme"), ledger(i), read, CONTEXT)
+    for i in range(1000):
+        engine.evaluate(member("globex"), ledger(i), read, CONTEXT)
+    for i in range(10):
+        engine.evaluate(member("acme"), ledger(i), read, CONTEXT)
+
+    acme, globex = engine.stats("acme"), engine.stats("globex")
+    assert (acme.requests, acme.cache_hits, acme.evaluations) == (30, 20, 10)
+    assert globex.hit_rate == 0.0 and len(engine.cache("globex")) == 50
+    assert engine.cache("acme").stats.evictions == 0
+    report = engine.report()
+    assert report["acme"]["hit_rate"] == pytest.approx(2 / 3, abs=1e-3) and report["acme"]["p99_ms"] is not None
+    engine.close()
+
+
+def test_scheduler_serves_a_new_tenant_ahead_of_a_backlog():
+    """
+    Tests that queued calls are dispatched by weighted fair order, not arrival order.
+    """
+    scheduler = FairScheduler(workers=1, weights={"acme": 2.0})
+    gate, order = threading.Event(), []
+    scheduler.submit("blocker", gate.wait)
+    futures = [scheduler.submit("globex", order.append, "globex") for _ in range(6)]
+    futures += [scheduler.submit("acme", order.append, "acme") for _ in range(4)]
+    futures.append(scheduler.submit("initech", order.append, "initech"))
+    assert scheduler.queued("globex") == 6
+    gate.set()
+    for future in futures:
+        future.result(timeout=5)
+
+    assert order.index("initech") <= 3  # Not behind the other tenants' backlogs
+    assert order[:6].count("acme") >= 3  # Twice globex's share
+    failing = scheduler.submit("acme", lambda: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        failing.result(timeout=5)
+    scheduler.close()
@@ -0,0 +1,15 @@
+"""
+Launch examples/federation/federation-node.py as a local node process.
+
+Arguments are passed through to the node, e.g.
+    python run_node.py --node-id grid-b.org-b.com --policy ... --principals ...
+"""
+
+import pathlib
+import runpy
+import sys
+
+sys.path.insert(0, str(pathlib.Path(__file__).resolve().parents[1]))
+import conftest  # noqa: E402,F401  (makes grid_examples importable)
+
+runpy.run_module("grid_examples.federation_node", run_name="__main__", alter_sys=True)
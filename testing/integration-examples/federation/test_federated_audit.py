@@ -0,0 +1,193 @@
+import json
+import socket
+import threading
+import time
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+
+from grid_examples.audit_store import MAX_LIMIT, AuditQuery, AuditStore, serve as serve_audit
+from grid_examples.canonical_policy_engine import CanonicalPolicyEngine, PolicyDecision
+from grid_examples.federated_audit import TRACE_PATH, FederatedAudit, serve
+from grid_examples.federation_client import ensure_trace_id
+from grid_examples.federation_node import FederationNode, NodeIdentity
+from grid_examples.http_adapter_template import Action, Context, Principal, Resource
+from grid_examples.resilient_engine import audit_event
+
+TOOL = Resource(id="reports-api", type="tool", name="Reports API", sensitivity="medium")
+
+
+def event_at(second, trace_id, principal="alice@org-b.com"):
+    context = Context(timestamp=f"2025-11-26T10:00:{second:02d}Z", trace_id=trace_id)
+    return audit_event(Principal(id=principal, type="human"), TOOL, Action(operation="read"), context,
+                       PolicyDecision(allowed=True, reason="test"))
+
+
+def store_with(path, events):
+    store = AuditStore(str(path))
+    for event in events:
+        store.append(event)
+    return store
+
+
+def local_source(store):
+    return lambda trace_id: store.query(AuditQuery(trace_id=trace_id, limit=MAX_LIMIT))
+
+
+class SlowHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        time.sleep(3)
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"[]")
+
+
+class ObjectHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        body = json.dumps({"events": []}).encode()
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def unused_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_peer_records_the_requesters_trace_id(tmp_path):
+    """
+    Tests that a trace id is assigned once and that a federation node records it with the requesting node.
+    """
+    context = Context(timestamp="2025-11-26T10:00:00Z")
+    trace_id = ensure_trace_id(context)
+    assert context.trace_id == trace_id and ensure_trace_id(context) == trace_id
+
+    key = ec.generate_private_key(ec.SECP256R1()).private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()).decode()
+    store = AuditStore(str(tmp_path))
+    node = FederationNode(NodeIdentity("grid-b.org-b.com", "http://localhost", "", key, "b-1"),
+                          CanonicalPolicyEngine([]), {"alice@org-b.com": Principal(id="alice@org-b.com", type="human")},
+                          audit=store.append)
+    node.evaluate_batch([{"principal_id": "alice@org-b.com", "resource": vars(TOOL), "action": "read",
+                          "context": vars(context)}], "grid-a.org-a.com")
+
+    events = store.query(AuditQuery(trace_id=trace_id))
+    assert len(events) == 1 and events[0]["event"]["trace_id"] == trace_id
+    assert events[0]["federation"] == {"node": "grid-b.org-b.com", "requester": "grid-a.org-a.com"}
+    assert events[0]["decision"]["result"] == "deny"  # No policies deployed
+
+
+def test_trace_is_merged_in_time_order_within_the_deadline(tmp_path):
+    """
+    Tests that local and peer events are merged by timestamp, and a slow or unreachable peer is marked, not waited for.
+    """
+    local = store_with(tmp_path / "a", [event_at(1, "t-1"), event_at(5, "t-1"), event_at(6, "t-2")])
+    peer = store_with(tmp_path / "b", [event_at(3, "t-1"), event_at(4, "t-2"), event_at(7, "t-1")])
+    peer.seal()
+    peer.wait_for_indexes()  # Sealed and indexed, so the lookup goes through postings
+    peer_httpd = serve_audit(peer)
+    slow_httpd = ThreadingHTTPServer(("127.0.0.1", 0), SlowHandler)
+    threading.Thread(target=slow_httpd.serve_forever, daemon=True).start()
+    audit = FederatedAudit("grid-a", local_source(local), {
+        "grid-b": f"http://127.0.0.1:{peer_httpd.server_address[1]}/api/v1/audit",
+        "grid-c": f"http://127.0.0.1:{slow_httpd.server_address[1]}/api/v1/audit",
+        "grid-d": f"http://127.0.0.1:{unused_port()}/api/v1/audit",
+    }, timeout=0.5)
+    try:
+        started = time.monotonic()
+        records = list(audit.trace("t-1"))
+        assert time.monotonic() - started < 2.0
+    finally:
+        audit.close()
+        peer_httpd.shutdown()
+        slow_httpd.shutdown()
+
+    *events, marker = records
+    assert [(r["node"], r["event"]["event"]["timestamp"][-3:-1]) for r in events] == \
+        [("grid-a", "01"), ("grid-b", "03"), ("grid-a", "05"), ("grid-b", "07")]
+    assert marker["trace_id"] == "t-1" and marker["complete"] is False
+    status = {node["node"]: node for node in marker["nodes"]}
+    assert status["grid-a"]["status"] == status["grid-b"]["status"] == "ok" and status["grid-b"]["events"] == 2
+    assert status["grid-c"]["status"] == "timeout" and status["grid-c"]["elapsed_ms"] is None
+    assert status["grid-d"]["status"] == "error" and status["grid-d"]["error"]
+
+
+def test_trace_endpoint_streams_ndjson(tmp_path):
+    """
+    Tests that GET /api/v1/audit/trace/{id} streams one JSON record per line and ends with a complete marker.
+    """
+    local = store_with(tmp_path / "a", [event_at(2, "t 1"), event_at(1, "t 1")])
+    peer = store_with(tmp_path / "b", [event_at(3, "t 1")])
+    peer_httpd = serve_audit(peer)
+    audit = FederatedAudit("grid-a", local_source(local),
+                           {"grid-b": f"http://127.0.0.1:{peer_httpd.server_address[1]}/api/v1/audit"})
+    httpd = serve(audit)
+    try:
+        connection = HTTPConnection("127.0.0.1", httpd.server_address[1], timeout=5)
+        connection.request("GET", f"{TRACE_PATH}/t%201?timeout_ms=1000")
+        response = connection.getresponse()
+        assert response.status == 200 and response.getheader("Content-Type") == "application/x-ndjson"
+        records = [json.loads(line) for line in response.read().decode().splitlines()]
+        connection.request("GET", f"{TRACE_PATH}/t%201?timeout_ms=soon")
+        assert connection.getresponse().status == 400
+        connection.close()
+    finally:
+        httpd.shutdown()
+        peer_httpd.shutdown()
+        audit.close()
+
+    assert [r["node"] for r in records[:-1]] == ["grid-a", "grid-a", "grid-b"]
+    assert records[-1]["complete"] is True
+
+
+def test_failing_local_source_or_malformed_peer_reply_is_marked_not_truncated(tmp_path):
+    """
+    Tests that a local source raising any error, or a peer replying with an object, ends the stream with error markers.
+    """
+    def broken(trace_id):
+        raise RuntimeError("index unavailable")
+
+    peer = store_with(tmp_path / "b", [event_at(3, "t-1")])
+    peer_httpd = serve_audit(peer)
+    object_httpd = ThreadingHTTPServer(("127.0.0.1", 0), ObjectHandler)
+    threading.Thread(target=object_httpd.serve_forever, daemon=True).start()
+    audit = FederatedAudit("grid-a", broken, {
+        "grid-b": f"http://127.0.0.1:{peer_httpd.server_address[1]}/api/v1/audit",
+        "grid-c": f"http://127.0.0.1:{object_httpd.server_address[1]}/api/v1/audit",
+    })
+    httpd = serve(audit)
+    try:
+        connection = HTTPConnection("127.0.0.1", httpd.server_address[1], timeout=5)
+        connection.request("GET", f"{TRACE_PATH}/t-1?timeout_ms=1000")
+        response = connection.getresponse()
+        records = [json.loads(line) for line in response.read().decode().splitlines()]
+        connection.close()
+    finally:
+        httpd.shutdown()
+        peer_httpd.shutdown()
+        object_httpd.shutdown()
+        audit.close()
+
+    *events, marker = records
+    assert [r["node"] for r in events] == ["grid-b"]
+    assert marker["complete"] is False
+    status = {node["node"]: node for node in marker["nodes"]}
+    assert status["grid-a"]["status"] == "error" and status["grid-a"]["error"] == "index unavailable"
+    assert status["grid-b"]["status"] == "ok"
+    assert status["grid-c"]["status"] == "error" and status["grid-c"]["error"]
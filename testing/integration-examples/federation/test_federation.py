@@ -0,0 +1,241 @@
+import datetime
+import ipaddress
+import json
+import pathlib
+import ssl
+import subprocess
+import sys
+
+import jwt
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from grid_examples.federation_client import (
+    FederationClient, FederationError, PeerUnavailableError, mtls_context
+)
+from grid_examples.http_adapter_template import Action, Context, Principal, Resource
+
+HERE = pathlib.Path(__file__).resolve().parent
+POLICY = HERE.parents[2] / "examples" / "engine" / "policies" / "rbac-basic.yaml"
+NODE_ID = "grid-a.org-a.com"
+
+PRINCIPALS = {
+    "org-b.com": [{"id": "alice@org-b.com", "type": "human", "role": "developer"}],
+    "org-c.com": [{"id": "bob@org-c.com", "type": "human", "role": "viewer"}],
+}
+
+CONTEXT = Context(timestamp="2025-11-26T10:00:00Z")
+MEDIUM_TOOL = Resource(id="reports-api", type="tool", name="Reports API", sensitivity="medium")
+LOW_DATA = Resource(id="wiki", type="data", name="Wiki", sensitivity="low")
+
+
+def issue_cert(common_name, ca=None):
+    """Create an EC key and certificate, self-signed when no CA is given"""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, common_name)])
+    issuer_name, issuer_key = (ca[0].subject, ca[1]) if ca else (name, key)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    builder = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(issuer_name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now - datetime.timedelta(minutes=1))
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .add_extension(x509.BasicConstraints(ca=ca is None, path_length=None), critical=True)
+    )
+    if ca:
+        builder = builder.add_extension(x509.SubjectAlternativeName([
+            x509.DNSName("localhost"), x509.IPAddress(ipaddress.ip_address("127.0.0.1"))
+        ]), critical=False)
+    return builder.sign(issuer_key, hashes.SHA256()), key
+
+
+def write_pair(directory, stem, cert, key):
+    cert_file, key_file = directory / f"{stem}.crt", directory / f"{stem}.key"
+    cert_file.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_file.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()))
+    return str(cert_file), str(key_file)
+
+
+@pytest.fixture(scope="module")
+def pki(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("pki")
+    ca = issue_cert("GRID Test CA")
+    files = {"ca": write_pair(directory, "ca", *ca)[0]}
+    for name in ["grid-b.org-b.com", "grid-c.org-c.com", NODE_ID, "intruder"]:
+        files[name] = write_pair(directory, name, *issue_cert(name, ca))
+    return files
+
+
+def start_node(pki, directory, node_id, domain):
+    principals = directory / f"{domain}.json"
+    principals.write_text(json.dumps(PRINCIPALS[domain]))
+    cert, key = pki[node_id]
+    process = subprocess.Popen(
+        [sys.executable, str(HERE / "run_node.py"), "--node-id", node_id,
+         "--policy", str(POLICY), "--principals", str(principals),
+         "--cert", cert, "--key", key, "--ca", pki["ca"]],
+        stdout=subprocess.PIPE, text=True)
+    port = int(process.stdout.readline().split()[-1])
+    return process, f"https://localhost:{port}"
+
+
+@pytest.fixture(scope="module")
+def nodes(pki, tmp_path_factory):
+    directory = tmp_path_factory.mktemp("nodes")
+    started = {
+        "org-b.com": start_node(pki, directory, "grid-b.org-b.com", "org-b.com"),
+        "org-c.com": start_node(pki, directory, "grid-c.org-c.com", "org-c.com"),
+    }
+    yield {domain: url for domain, (_, url) in started.items()}
+    for process, _ in started.values():
+        process.terminate()
+        process.wait()
+
+
+@pytest.fixture
+def client(pki, nodes):
+    federation = FederationClient(NODE_ID, nodes, ssl_context=mtls_context(*pki[NODE_ID], pki["ca"]))
+    yield federation
+    federation.close()
+
+
+def request(principal_id, resource, operation="execute"):
+    return (Principal(id=principal_id, type="human"), resource, Action(operation=operation), CONTEXT)
+
+
+def test_remote_decisions_are_made_by_home_node(client):
+    """
+    Tests that each principal is evaluated by its own node's policies.
+    """
+    assert client.evaluate(*request("alice@org-b.com", MEDIUM_TOOL)).allowed
+    assert not client.evaluate(*request("bob@org-c.com", MEDIUM_TOOL)).allowed
+    assert not client.evaluate(*request("mallory@org-b.com", MEDIUM_TOOL)).allowed
+
+
+def test_decision_tokens_and_discovery_are_cached(client):
+    """
+    Tests that repeated requests are answered from verified tokens.
+    """
+    for _ in range(5):
+        assert client.evaluate(*request("alice@org-b.com", MEDIUM_TOOL)).allowed
+    assert client.stats.round_trips == 1
+    assert client.stats.token_hits == 4
+    assert client.stats.discovery_fetches == 1
+
+
+def test_batch_sends_one_request_per_peer(client):
+    """
+    Tests that a mixed batch is deduplicated and split into one round trip per peer.
+    """
+    batch = [
+        request("alice@org-b.com", MEDIUM_TOOL),
+        request("bob@org-c.com", LOW_DATA, "read"),
+        request("alice@org-b.com", LOW_DATA, "write"),
+        request("alice@org-b.com", MEDIUM_TOOL),
+        request("bob@org-c.com", MEDIUM_TOOL, "read"),
+    ]
+    decisions = client.evaluate_batch(batch)
+    assert [d.allowed for d in decisions] == [True, True, True, True, False]
+    assert client.stats.round_trips == 2
+    assert client.stats.remote_requests == 4
+
+
+def test_connections_are_reused(client):
+    """
+    Tests that sequential requests to a peer share one keep-alive connection.
+    """
+    for operation in ["read", "write", "execute", "control"]:
+        client.evaluate(*request("alice@org-b.com", LOW_DATA, operation))
+    assert client.pools["org-b.com"].created == 1
+
+
+def test_mtls_is_required(pki, nodes):
+    """
+    Tests that a client without a certificate signed by the federation CA is refused.
+    """
+    context = ssl.create_default_context(cafile=pki["ca"])
+    federation = FederationClient(NODE_ID, nodes, ssl_context=context)
+    decision = federation.evaluate(*request("alice@org-b.com", MEDIUM_TOOL))
+    assert not decision.allowed
+    assert "unavailable" in decision.reason
+
+
+def test_tokens_for_another_audience_are_rejected(pki, nodes):
+    """
+    Tests that tokens are bound to the requesting node's certificate identity.
+    """
+    federation = FederationClient("someone-else", nodes,
+                                  ssl_context=mtls_context(*pki["intruder"], pki["ca"]),
+                                  fail_closed=False)
+    with pytest.raises(FederationError):
+        federation.evaluate(*request("alice@org-b.com", MEDIUM_TOOL))
+
+
+def test_forged_token_is_rejected(client, pki):
+    """
+    Tests that a token signed by another node's key fails verification.
+    """
+    document = client.discover("org-b.com")
+    with open(pki["grid-c.org-c.com"][1]) as f:
+        forged = jwt.encode(
+            {"iss": document.node_id, "aud": NODE_ID, "sub": "alice@org-b.com",
+             "iat": 0, "exp": 2 ** 31, "resource": "reports-api", "action": "execute",
+             "allowed": True, "reason": "forged"},
+            f.read(), algorithm="ES256", headers={"kid": document.key_id})
+    with pytest.raises(FederationError):
+        client._verify(forged, document, ("alice@org-b.com", "reports-api", "execute"))
+
+
+def test_circuit_breaker_fails_closed(pki):
+    """
+    Tests that an unreachable peer is denied and its circuit opens.
+    """
+    federation = FederationClient(NODE_ID, {"org-b.com": "https://localhost:1"},
+                                  ssl_context=mtls_context(*pki[NODE_ID], pki["ca"]),
+                                  failure_threshold=2, reset_timeout=60)
+    for _ in range(4):
+        assert not federation.evaluate(*request("alice@org-b.com", MEDIUM_TOOL)).allowed
+    assert federation.breakers["org-b.com"].state == "open"
+    assert federation.pools["org-b.com"].created == 2
+    assert federation.stats.failed_closed == 4
+
+    federation.fail_closed = False
+    with pytest.raises(PeerUnavailableError):
+        federation.evaluate(*request("alice@org-b.com", MEDIUM_TOOL))
+
+
+def test_malformed_replies_count_as_failures(client):
+    """
+    Tests that malformed peer replies fail closed and re-open a half-open circuit.
+    """
+    class MalformedPool:
+        def __init__(self, pool, body):
+            self.pool, self.body = pool, body
+
+        def request(self, method, path, body=None):
+            if method == "GET":
+                return self.pool.request(method, path, body)
+            return 200, self.body, None
+
+    pool = client.pools["org-b.com"]
+    breaker = client.breakers["org-b.com"]
+    for body in [{"status": "ok"}, ["not", "an", "object"], {"decision_tokens": None}]:
+        client.pools["org-b.com"] = MalformedPool(pool, body)
+        breaker.state, breaker.opened_at = breaker.OPEN, -breaker.reset_timeout
+        assert not client.evaluate(*request("alice@org-b.com", MEDIUM_TOOL)).allowed
+        assert breaker.state == breaker.OPEN
+
+    client.pools["org-b.com"] = pool
+    document = client.discover("org-b.com")
+    document.endpoints.pop("policy")
+    breaker.state, breaker.opened_at = breaker.OPEN, -breaker.reset_timeout
+    assert not client.evaluate(*request("alice@org-b.com", MEDIUM_TOOL)).allowed
+    assert breaker.state == breaker.OPEN
@@ -0,0 +1,192 @@
+import pathlib
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from grid_examples.canonical_policy_engine import CanonicalPolicyEngine
+from grid_examples.decision_matrix import PrecomputedPolicyEngine
+from grid_examples.federation_client import ConnectionPool
+from grid_examples.federation_node import FederationNode, NodeIdentity
+from grid_examples.http_adapter_template import Action, Context, Principal, Resource
+from grid_examples.policy_sync import PolicyPublisher, PolicySubscriber
+
+POLICIES = pathlib.Path(__file__).resolve().parents[3] / "examples" / "engine" / "policies"
+DOCUMENTS = {path.stem: path.read_text() for path in sorted(POLICIES.glob("*.yaml"))}
+
+PRINCIPALS = [Principal(id=f"user-{role}", type="human", role=role)
+              for role in ["admin", "developer", "viewer", "service"]]
+RESOURCES = [Resource(id=f"res-{s}", type="tool", name=s, sensitivity=s)
+             for s in ["low", "medium", "high", "critical"]]
+
+
+class RecordingEngine(CanonicalPolicyEngine):
+    """Canonical engine that records which policies were (re)deployed"""
+
+    def __init__(self):
+        super().__init__()
+        self.deployed = []
+
+    def deploy_policy(self, policy):
+        self.deployed.append(policy.id)
+        super().deploy_policy(policy)
+
+
+@pytest.fixture
+def publisher():
+    publisher = PolicyPublisher()
+    for document in DOCUMENTS.values():
+        publisher.publish(document)
+    return publisher
+
+
+@pytest.fixture
+def node(publisher):
+    identity = NodeIdentity("grid-b.org-b.com", "", "", "", "key-1")
+    node = FederationNode(identity, CanonicalPolicyEngine(), {}, publisher=publisher)
+    httpd = node.serve()
+    identity.base_url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    yield node
+    httpd.shutdown()
+
+
+def subscriber_for(node, engine):
+    return PolicySubscriber(ConnectionPool(node.identity.base_url), engine, namespace="org-b.com")
+
+
+def edit(document):
+    return document.replace('description: "Admin has full access"',
+                            'description: "Admin has full access (edited)"')
+
+
+def test_initial_sync_then_nothing_to_transfer(node):
+    """
+    Tests that a second sync with an up-to-date manifest transfers nothing.
+    """
+    engine = RecordingEngine()
+    subscriber = subscriber_for(node, engine)
+    assert subscriber.sync() == sorted(DOCUMENTS)
+    assert sorted(engine.policies) == [f"org-b.com/{name}" for name in sorted(DOCUMENTS)]
+
+    received = subscriber.stats.bytes_received
+    assert subscriber.sync() == []
+    assert subscriber.stats.bytes_received == received
+
+
+def test_edit_is_sent_as_small_delta_and_redeploys_one_policy(node, publisher):
+    """
+    Tests that an edit transfers a delta against the previous version and redeploys only that policy.
+    """
+    engine = RecordingEngine()
+    subscriber = subscriber_for(node, engine)
+    subscriber.sync()
+    engine.deployed.clear()
+    before = subscriber.stats.bytes_received
+
+    publisher.publish(edit(DOCUMENTS["rbac-basic"]))
+    assert subscriber.sync() == ["rbac-basic"]
+    assert engine.deployed == ["org-b.com/rbac-basic"]
+    assert subscriber.stats.bytes_received - before < len(DOCUMENTS["rbac-basic"]) // 20
+
+    rule = next(r for _, r in engine.ordered_rules() if r.name == "admin_full_access")
+    assert rule.description.endswith("(edited)")
+
+
+def test_withdrawn_policy_is_removed(node, publisher):
+    """
+    Tests that a withdrawn policy is removed from the subscriber's engine.
+    """
+    engine = RecordingEngine()
+    subscriber = subscriber_for(node, engine)
+    subscriber.sync()
+    publisher.withdraw("time-based-access")
+    assert subscriber.sync() == ["time-based-access"]
+    assert "org-b.com/time-based-access" not in engine.policies
+
+
+def test_mirrored_policies_only_apply_to_peer_principals(node):
+    """
+    Tests that a peer's allow rules grant nothing to local principals.
+    """
+    engine = CanonicalPolicyEngine()
+    subscriber_for(node, engine).sync()
+    context = Context(timestamp="2025-11-26T10:00:00Z")
+    action = Action(operation="write")
+    assert engine.evaluate(Principal(id="admin@org-b.com", type="human", role="admin"),
+                           RESOURCES[3], action, context).allowed
+    assert not engine.evaluate(Principal(id="admin", type="human", role="admin"),
+                               RESOURCES[3], action, context).allowed
+    assert not engine.evaluate(Principal(id="admin@org-c.com", type="human", role="admin"),
+                               RESOURCES[3], action, context).allowed
+
+
+def test_malformed_sync_requests_are_rejected(node):
+    """
+    Tests that non-numeric query parameters and bad bodies get 400.
+    """
+    base = node.identity.base_url + "/api/v1/policy"
+    requests = [urllib.request.Request(base + "/changes?since=abc"),
+                urllib.request.Request(base + "/changes?timeout=soon"),
+                urllib.request.Request(base + "/events?since=1.5"),
+                urllib.request.Request(base + "/sync", data=b"[1]", method="POST")]
+    for request in requests:
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(request, timeout=5)
+        assert error.value.code == 400
+
+
+def test_precomputed_engine_matches_fresh_engine_after_sync(node, publisher):
+    """
+    Tests that incremental updates leave a precomputed matrix equal to a fresh build.
+    """
+    engine = PrecomputedPolicyEngine(CanonicalPolicyEngine(), PRINCIPALS, RESOURCES)
+    subscriber = subscriber_for(node, engine)
+    subscriber.sync()
+    publisher.publish(edit(DOCUMENTS["rbac-basic"]).replace("priority: 100", "priority: 10"))
+    subscriber.sync()
+
+    fresh = CanonicalPolicyEngine(list(engine.engine.policies.values()))
+    context = Context(timestamp="2025-11-26T10:00:00Z")
+    for principal in PRINCIPALS:
+        for resource in RESOURCES:
+            for operation in ["read", "write", "execute"]:
+                action = Action(operation=operation)
+                assert engine.evaluate(principal, resource, action, context) == \
+                    fresh.evaluate(principal, resource, action, context)
+
+
+def test_long_poll_wakes_on_change(node, publisher):
+    """
+    Tests that a long poll returns as soon as a policy changes.
+    """
+    subscriber = subscriber_for(node, RecordingEngine())
+    subscriber.sync()
+    timer = threading.Timer(0.2, publisher.publish, [edit(DOCUMENTS["rbac-basic"])])
+    timer.start()
+    assert subscriber.long_poll(timeout=10) == ["rbac-basic"]
+
+
+def test_long_poll_outlasts_the_pool_timeout_when_nothing_changes(node):
+    """
+    Tests that a long poll with nothing published waits out its timeout and returns nothing, without raising.
+    """
+    subscriber = PolicySubscriber(ConnectionPool(node.identity.base_url, timeout=0.3), RecordingEngine(),
+                                  namespace="org-b.com")
+    subscriber.sync()
+    started = time.monotonic()
+    assert subscriber.long_poll(timeout=1.0) == []
+    assert time.monotonic() - started >= 1.0
+
+
+def test_event_stream_delivers_changes(node, publisher):
+    """
+    Tests that the server-sent event stream announces new revisions.
+    """
+    subscriber = subscriber_for(node, RecordingEngine())
+    subscriber.sync()
+    timer = threading.Timer(0.2, publisher.publish, [edit(DOCUMENTS["rbac-basic"])])
+    timer.start()
+    event = next(subscriber.events(timeout=10))
+    assert event == {"revision": subscriber.revision + 1, "changed": ["rbac-basic"]}
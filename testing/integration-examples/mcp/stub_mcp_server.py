@@ -0,0 +1,99 @@
+"""
+Stub MCP server for adapter integration tests.
+
+Speaks newline-delimited JSON-RPC over stdio (default) or streamable HTTP
+(--http PORT). Tools do nothing but echo their arguments, and every
+`tools/call` is recorded so tests can check what reached the server.
+"""
+
+import argparse
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+TOOLS = [
+    {"name": "jira_search", "description": "Search issues",
+     "inputSchema": {"type": "object", "properties": {"query": {"type": "string"}}}},
+    {"name": "jira_create_issue", "description": "Create an issue",
+     "inputSchema": {"type": "object", "properties": {"summary": {"type": "string"}}}},
+    {"name": "jira_delete_project", "description": "Delete a project",
+     "inputSchema": {"type": "object", "properties": {"key": {"type": "string"}}}},
+]
+
+calls = []
+
+
+def handle_one(message):
+    method = message.get("method")
+    params = message.get("params") or {}
+
+    if method == "initialize":
+        result = {"protocolVersion": "2025-03-26",
+                  "capabilities": {"tools": {}},
+                  "serverInfo": {"name": "stub-mcp-server", "version": "0.1.0"}}
+    elif method == "ping":
+        result = {}
+    elif method == "tools/list":
+        result = {"tools": TOOLS}
+    elif method == "tools/call":
+        calls.append(params.get("name"))
+        result = {"content": [{"type": "text", "text": json.dumps(params)}]}
+    elif method == "stub/calls":
+        result = {"calls": list(calls)}
+    elif "id" not in message:
+        return None  # Notification, e.g. notifications/initialized
+    else:
+        return {"jsonrpc": "2.0", "id": message.get("id"),
+                "error": {"code": -32601, "message": f"Method not found: {method}"}}
+
+    if "id" not in message:
+        return None
+    return {"jsonrpc": "2.0", "id": message["id"], "result": result}
+
+
+def handle(message):
+    if isinstance(message, list):
+        replies = [r for r in (handle_one(m) for m in message) if r is not None]
+        return replies or None
+    return handle_one(message)
+
+
+def serve_stdio():
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        reply = handle(json.loads(line))
+        if reply is not None:
+            sys.stdout.write(json.dumps(reply) + "\n")
+            sys.stdout.flush()
+
+
+class Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        reply = handle(json.loads(body))
+        data = json.dumps(reply).encode() if reply is not None else b""
+        self.send_response(200 if reply is not None else 202)
+        self.send_header("Mcp-Session-Id", "stub-session")
+        if reply is not None:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--http", type=int, metavar="PORT",
+                        help="Serve streamable HTTP on PORT instead of stdio")
+    args = parser.parse_args()
+
+    if args.http is not None:
+        server = ThreadingHTTPServer(("127.0.0.1", args.http), Handler)
+        print(f"listening on {server.server_address[1]}", flush=True)
+        server.serve_forever()
+    else:
+        serve_stdio()
@@ -0,0 +1,258 @@
+import io
+import json
+import pathlib
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+import jwt
+import pytest
+
+from grid_examples.canonical_policy_engine import CanonicalPolicyEngine, load_policy_file
+from grid_examples.mcp_adapter_template import (
+    ACCESS_DENIED, INTERNAL_ERROR, INVALID_REQUEST, HTTPUpstream, MCPAdapter, MCPServer, MCPTool,
+    StdioUpstream, StreamableHTTPTransport, serve_stdio
+)
+
+HERE = pathlib.Path(__file__).resolve().parent
+POLICY = HERE.parents[2] / "examples" / "engine" / "policies" / "rbac-basic.yaml"
+SECRET = "integration-test-secret-at-least-32-bytes"
+
+SERVER = MCPServer(
+    name="jira-server",
+    tools=[
+        MCPTool(name="jira_search", sensitivity_level="medium"),
+        MCPTool(name="jira_create_issue", sensitivity_level="medium"),
+        MCPTool(name="jira_delete_project", sensitivity_level="critical"),
+    ],
+)
+
+
+class CountingEngine:
+    """Policy engine wrapper that counts evaluations"""
+
+    def __init__(self):
+        self.engine = CanonicalPolicyEngine([load_policy_file(str(POLICY))])
+        self.evaluations = 0
+
+    def evaluate(self, principal, resource, action, context):
+        self.evaluations += 1
+        return self.engine.evaluate(principal, resource, action, context)
+
+
+def token(role, **claims):
+    return "Bearer " + jwt.encode({"sub": f"{role}-1", "role": role, **claims}, SECRET, algorithm="HS256")
+
+
+def call(request_id, tool, **arguments):
+    return {"jsonrpc": "2.0", "id": request_id, "method": "tools/call",
+            "params": {"name": tool, "arguments": arguments}}
+
+
+def stub_calls(adapter):
+    reply = adapter.upstream({"jsonrpc": "2.0", "id": "calls", "method": "stub/calls"})
+    return reply["result"]["calls"]
+
+
+@pytest.fixture
+def upstream():
+    stdio = StdioUpstream([sys.executable, str(HERE / "stub_mcp_server.py")])
+    yield stdio
+    stdio.close()
+
+
+@pytest.fixture
+def engine():
+    return CountingEngine()
+
+
+@pytest.fixture
+def adapter(upstream, engine):
+    return MCPAdapter(server=SERVER, policy_engine=engine, upstream=upstream, jwt_secret=SECRET)
+
+
+def test_allowed_tool_call_is_forwarded(adapter):
+    """
+    Tests that a developer can call a medium sensitivity tool.
+    """
+    session = adapter.open_session(token("developer"))
+    reply = adapter.handle(call(1, "jira_search", query="bug"), session)
+    assert reply["id"] == 1
+    assert json.loads(reply["result"]["content"][0]["text"])["arguments"] == {"query": "bug"}
+    assert stub_calls(adapter) == ["jira_search"]
+
+
+def test_denied_tool_call_never_reaches_server(adapter):
+    """
+    Tests that a denied call is answered with -32000 by the adapter.
+    """
+    session = adapter.open_session(token("viewer"))
+    reply = adapter.handle(call(1, "jira_search"), session)
+    assert reply["error"]["code"] == ACCESS_DENIED
+    assert stub_calls(adapter) == []
+
+
+def test_batch_is_authorized_in_one_deduplicated_pass(adapter, engine):
+    """
+    Tests that each distinct tool in a batch is evaluated once and replies keep batch order.
+    """
+    session = adapter.open_session(token("developer"))
+    batch = [
+        call(1, "jira_search", query="a"),
+        call(2, "jira_delete_project", key="OPS"),
+        call(3, "jira_search", query="b"),
+        {"jsonrpc": "2.0", "method": "notifications/initialized"},
+        call(4, "jira_search", query="c"),
+    ]
+    replies = adapter.handle(batch, session)
+    assert engine.evaluations == 2
+    assert [r["id"] for r in replies] == [1, 2, 3, 4]
+    assert replies[1]["error"]["code"] == ACCESS_DENIED
+    assert stub_calls(adapter) == ["jira_search"] * 3
+
+
+def test_tools_list_is_pre_authorized(adapter):
+    """
+    Tests that tools/list only returns tools the principal may call.
+    """
+    developer = adapter.open_session(token("developer"))
+    viewer = adapter.open_session(token("viewer"))
+    message = {"jsonrpc": "2.0", "id": 7, "method": "tools/list"}
+
+    developer_tools = [t["name"] for t in adapter.handle(message, developer)["result"]["tools"]]
+    viewer_tools = [t["name"] for t in adapter.handle(message, viewer)["result"]["tools"]]
+    assert developer_tools == ["jira_search", "jira_create_issue"]
+    assert viewer_tools == []
+
+
+def test_principal_is_resolved_once_per_session(adapter, monkeypatch):
+    """
+    Tests that the session JWT is decoded once, not per message.
+    """
+    decodes = []
+    original = adapter._extract_principal
+    monkeypatch.setattr(adapter, "_extract_principal",
+                        lambda credentials: decodes.append(credentials) or original(credentials))
+
+    session = adapter.open_session(token("developer"))
+    for i in range(5):
+        adapter.handle(call(i, "jira_search"), session)
+    assert len(decodes) == 1
+
+
+def test_invalid_session_token_is_rejected(adapter):
+    """
+    Tests that a session cannot be opened with an invalid JWT.
+    """
+    with pytest.raises(ValueError):
+        adapter.open_session("Bearer not-a-jwt")
+
+
+def test_session_expires_with_its_token(adapter):
+    """
+    Tests that a session cannot be resumed past its JWT exp and is then evicted.
+    """
+    now = [time.time()]
+    adapter.clock = lambda: now[0]
+    credentials = token("developer", exp=int(now[0]) + 60)
+    session = adapter.open_session(credentials)
+    assert adapter.resume_session(session.session_id, credentials) is session
+
+    now[0] += 61
+    with pytest.raises(KeyError):
+        adapter.resume_session(session.session_id, credentials)
+    assert session.session_id not in adapter.sessions
+
+    adapter.session_ttl = 30
+    session = adapter.open_session(token("developer"))
+    assert session.expires_at == now[0] + 30
+
+
+def test_malformed_messages_do_not_end_stdio_session(adapter):
+    """
+    Tests that non-object params get -32600, upstream failures -32603, and the session goes on.
+    """
+    def broken_upstream(message):
+        raise OSError("connection reset")
+
+    lines = [
+        {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": [1]},
+        call(2, "jira_search"),
+    ]
+    stdin = io.StringIO("".join(json.dumps(line) + "\n" for line in lines))
+    stdout = io.StringIO()
+    serve_stdio(adapter, token("developer"), stdin, stdout)
+    adapter.upstream, upstream = broken_upstream, adapter.upstream
+    stdin = io.StringIO(json.dumps(call(3, "jira_search")) + "\n")
+    serve_stdio(adapter, token("developer"), stdin, stdout)
+    adapter.upstream = upstream
+
+    replies = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert replies[0]["error"]["code"] == INVALID_REQUEST
+    assert "result" in replies[1]
+    assert replies[2]["id"] == 3 and replies[2]["error"]["code"] == INTERNAL_ERROR
+
+
+def post(url, message, credentials, session_id=None):
+    headers = {"Content-Type": "application/json", "Authorization": credentials}
+    if session_id:
+        headers["Mcp-Session-Id"] = session_id
+    request = urllib.request.Request(url, data=json.dumps(message).encode(),
+                                     headers=headers, method="POST")
+    try:
+        with urllib.request.urlopen(request) as response:
+            body = response.read()
+            return response.status, response.headers, json.loads(body) if body else None
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, None
+
+
+def test_streamable_http_sessions(adapter):
+    """
+    Tests session pinning over the streamable HTTP transport.
+    """
+    transport = StreamableHTTPTransport(adapter).start()
+    try:
+        developer = token("developer")
+        initialize = {"jsonrpc": "2.0", "id": 0, "method": "initialize", "params": {}}
+        status, headers, _ = post(transport.url, initialize, developer)
+        assert status == 200
+        session_id = headers["Mcp-Session-Id"]
+
+        status, _, reply = post(transport.url, call(1, "jira_search"), developer, session_id)
+        assert status == 200 and "result" in reply
+
+        status, _, _ = post(transport.url, call(2, "jira_search"), token("admin"), session_id)
+        assert status == 401
+
+        status, _, _ = post(transport.url, call(3, "jira_search"), developer, "unknown")
+        assert status == 404
+
+        status, _, _ = post(transport.url, call(4, "jira_search"), developer)
+        assert status == 400
+    finally:
+        transport.shutdown()
+
+
+def test_http_upstream(engine):
+    """
+    Tests the adapter against the stub server running in HTTP mode.
+    """
+    process = subprocess.Popen([sys.executable, str(HERE / "stub_mcp_server.py"), "--http", "0"],
+                               stdout=subprocess.PIPE, text=True)
+    try:
+        port = int(process.stdout.readline().split()[-1])
+        adapter = MCPAdapter(server=SERVER, policy_engine=engine,
+                             upstream=HTTPUpstream(f"http://127.0.0.1:{port}/mcp"),
+                             jwt_secret=SECRET)
+        assert adapter.health_check()
+
+        session = adapter.open_session(token("developer"))
+        replies = adapter.handle([call(1, "jira_search"), call(2, "jira_delete_project")], session)
+        assert "result" in replies[0]
+        assert replies[1]["error"]["code"] == ACCESS_DENIED
+    finally:
+        process.terminate()
+        process.wait()